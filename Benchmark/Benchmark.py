@@ -0,0 +1,311 @@
+"""
+__________________________________________________________________________________________
+Módulo: Benchmark.py
+Descripción: Suite de rendimiento del sistema Montecarlo distribuido. No necesita RabbitMQ:
+las etapas que usan el broker corren contra el sustituto en memoria de BrokerMemoria.py.
+Mide, para modelos sintéticos de distinto número de variables y tamaños de bloque:
+    1. Generación: `Modelo.generar_escenarios` por rango de escenarios.
+    2. Serialización: codificación y decodificación de bloques columnares o de escenarios JSON.
+    3. Evaluación: la fórmula compilada del Consumidor sobre un bloque.
+    4. Agregación: `Receptor.recibir` del Visualizador sobre un bloque de resultados.
+    5. Extremo a extremo: Productor -> broker -> Consumidor -> broker -> Receptor con distintas
+       cantidades de trabajadores, midiendo cada fase y la latencia de los mensajes en la cola
+       de escenarios (desde su publicación hasta su confirmación; como las fases corren una
+       tras otra, incluye la espera en la cola).
+Cada medición reporta escenarios por segundo y percentiles de latencia por operación. Los
+resultados se guardan en JSON y pueden compararse contra una línea base guardada para detectar
+regresiones.
+__________________________________________________________________________________________
+"""
+import io
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import contextlib
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DIRECTORIO: str = os.path.dirname(os.path.abspath(__file__))
+for componente in ("Comun", "Productor", "Consumidor", "Visualizador"):
+    sys.path.append(os.path.join(DIRECTORIO, "..", componente))
+from Modelo import Modelo, generador_para_rango
+from Mensajes import codificar_bloque, decodificar_bloque
+from Formula import compilar_formula, compilar_salidas
+from Productor import Productor
+from Consumidor import Consumidor
+from Receptor import Receptor
+from BrokerMemoria import BrokerMemoria
+
+ETAPA_GENERACION: str = "generacion"
+ETAPA_SERIALIZACION: str = "serializacion"
+ETAPA_EVALUACION: str = "evaluacion"
+ETAPA_AGREGACION: str = "agregacion"
+ETAPA_EXTREMO: str = "extremo_a_extremo"
+
+EXCHANGE: str = "Configuracion"
+COLA_ESCENARIOS: str = "Escenarios"
+COLA_RESULTADOS: str = "Resultados"
+
+PERCENTILES: tuple = (50, 90, 99)
+
+def modelo_sintetico(num_variables: int, iteraciones: int) -> Dict[str, Any]:
+    """
+    Construye un modelo con `num_variables` variables que alternan distribuciones uniformes,
+    normales, categóricas, triangulares y exponenciales, y una fórmula que usa todas.
+        num_variables (int): Cantidad de variables del modelo.
+        iteraciones (int): Escenarios de la corrida.
+        Returns: Modelo en el mismo formato que modelo.json.
+    """
+    tipos: List[Dict[str, Any]] = [
+        {"tipo": "continua", "parametros": {"distribucion": "uniforme", "limite_inferior": 0, "limite_superior": 10}},
+        {"tipo": "continua", "parametros": {"distribucion": "normal", "media": 5, "desviacion": 2,
+                                            "limite_inferior": 0, "limite_superior": 10}},
+        {"tipo": "discreta", "parametros": {"valores": [1, 2, 3, 4, 5], "probabilidades": [0.1, 0.3, 0.3, 0.2, 0.1]}},
+        {"tipo": "continua", "parametros": {"distribucion": "triangular", "minimo": 0, "moda": 3, "maximo": 10}},
+        {"tipo": "continua", "parametros": {"distribucion": "exponencial", "media": 4}},
+    ]
+    variables: Dict[str, Any] = {f"v{i}": tipos[i % len(tipos)] for i in range(num_variables)}
+    terminos: List[str] = [f"v{i} * v{(i + 1) % num_variables}" for i in range(num_variables)]
+    return {
+        "formula": f"k * ({' + '.join(terminos)}) - c",
+        "iteraciones": iteraciones,
+        "num_variables": num_variables,
+        "constantes": {"k": 1.5, "c": 100},
+        "variables": variables,
+    }
+
+def cargar_modelo(definicion: Dict[str, Any], directorio: str) -> tuple:
+    """
+    Escribe un modelo sintético en `directorio` y lo carga con `Modelo`.
+        definicion (dict): Modelo generado por `modelo_sintetico`.
+        directorio (str): Directorio temporal de la suite.
+        Returns: Tupla (ruta del archivo, modelo configurado).
+    """
+    ruta: str = os.path.join(directorio, f"modelo_{definicion['num_variables']}_{definicion['iteraciones']}.json")
+    with open(ruta, "w") as archivo:
+        json.dump(definicion, archivo)
+    modelo: Modelo = Modelo(ruta_modelo=ruta)
+    modelo.configurar_modelo()
+    return ruta, modelo
+
+def resumir(latencias: Iterable[float], escenarios: int, duracion: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Resume una serie de latencias (en segundos) en throughput y percentiles.
+        latencias (iterable): Latencia de cada operación medida.
+        escenarios (int): Escenarios procesados en total por las operaciones.
+        duracion (float | None): Tiempo total; por defecto, la suma de las latencias.
+        Returns: Diccionario con escenarios_por_segundo, operaciones y latencia_ms (p50, p90, p99, max).
+    """
+    valores: np.ndarray = np.asarray(list(latencias), dtype=np.float64)
+    total: float = float(valores.sum()) if duracion is None else duracion
+    latencia: Dict[str, float] = {"max": float(valores.max() * 1000) if valores.size else 0.0}
+    for percentil in PERCENTILES:
+        latencia[f"p{percentil}"] = float(np.percentile(valores, percentil) * 1000) if valores.size else 0.0
+    return {
+        "escenarios_por_segundo": escenarios / total if total > 0 else 0.0,
+        "operaciones": int(valores.size),
+        "latencia_ms": latencia,
+    }
+
+def medir(operacion: Callable[[int], Any], repeticiones: int, escenarios_por_operacion: int,
+          calentamiento: int = 1) -> Dict[str, Any]:
+    """
+    Ejecuta `operacion(i)` varias veces y mide la latencia de cada ejecución.
+        operacion (callable): Operación a medir; recibe el número de repetición.
+        repeticiones (int): Ejecuciones medidas.
+        escenarios_por_operacion (int): Escenarios que procesa cada ejecución.
+        calentamiento (int): Ejecuciones previas que no se miden (cachés, asignaciones iniciales).
+        Returns: Resumen de `resumir`.
+    """
+    for i in range(calentamiento):
+        operacion(i)
+    latencias: List[float] = []
+    for i in range(repeticiones):
+        inicio: float = time.perf_counter()
+        operacion(calentamiento + i)
+        latencias.append(time.perf_counter() - inicio)
+    return resumir(latencias, repeticiones * escenarios_por_operacion)
+
+def medir_etapas(modelo: Modelo, tamano_bloque: int, repeticiones: int) -> List[Dict[str, Any]]:
+    """
+    Mide por separado la generación, la serialización, la evaluación y la agregación de bloques
+    de `tamano_bloque` escenarios del modelo.
+        modelo (Modelo): Modelo configurado.
+        tamano_bloque (int): Escenarios por bloque.
+        repeticiones (int): Bloques medidos por etapa.
+        Returns: Lista de mediciones.
+    """
+    entropia: int = 12345
+    parametros: Dict[str, Any] = {"variables": modelo.num_variables, "tamano_bloque": tamano_bloque}
+    mediciones: List[Dict[str, Any]] = []
+
+    def generar(i: int) -> Dict[str, np.ndarray]:
+        inicio: int = i * tamano_bloque
+        return modelo.generar_escenarios(rng=generador_para_rango(entropia, inicio), n=tamano_bloque,
+                                         inicio=inicio, entropia=entropia)
+    mediciones.append({"etapa": ETAPA_GENERACION, "parametros": parametros,
+                       **medir(generar, repeticiones, tamano_bloque)})
+
+    columnas: Dict[str, np.ndarray] = generar(0)
+    bloque: bytes = codificar_bloque(columnas)
+    mediciones.append({"etapa": ETAPA_SERIALIZACION, "parametros": {**parametros, "formato": "bloque"},
+                       **medir(lambda i: decodificar_bloque(codificar_bloque(columnas)), repeticiones, tamano_bloque)})
+
+    nombres: List[str] = sorted(columnas)
+    def serializar_json(i: int) -> None:
+        filas = zip(*(columnas[nombre].tolist() for nombre in nombres))
+        for escenario in [json.dumps(dict(zip(nombres, fila)), sort_keys=True) for fila in filas]:
+            json.loads(escenario)
+    mediciones.append({"etapa": ETAPA_SERIALIZACION, "parametros": {**parametros, "formato": "json"},
+                       **medir(serializar_json, repeticiones, tamano_bloque)})
+
+    # Con varias salidas se mide la evaluación conjunta de todas (la principal es la primera)
+    if modelo.salidas:
+        salidas = compilar_salidas(modelo.salidas, modelo.constantes)
+        evaluar: Callable[[Dict[str, np.ndarray]], Any] = lambda columnas: salidas.evaluar(columnas)[0]
+    else:
+        evaluar = compilar_formula(modelo.formula, modelo.constantes).evaluar
+    decodificado: Dict[str, np.ndarray] = decodificar_bloque(bloque)
+    mediciones.append({"etapa": ETAPA_EVALUACION, "parametros": parametros,
+                       **medir(lambda i: evaluar(decodificado), repeticiones, tamano_bloque)})
+
+    resultados: bytes = codificar_bloque({"resultado": np.asarray(evaluar(decodificado), dtype=np.float64)})
+    receptor: Receptor = Receptor(host="memoria", cola=COLA_RESULTADOS)
+    mediciones.append({"etapa": ETAPA_AGREGACION, "parametros": parametros,
+                       **medir(lambda i: receptor.recibir(None, None, None, resultados), repeticiones, tamano_bloque)})
+    return mediciones
+
+def medir_extremo_a_extremo(ruta_modelo: str, modo: str, tamano_bloque: int, trabajadores: int,
+                            paralelismo: str, prefetch: int) -> Dict[str, Any]:
+    """
+    Ejecuta una corrida completa contra el broker en memoria: el Productor publica todos los
+    escenarios, el Consumidor los evalúa y el Receptor agrega los resultados. Las fases corren
+    una después de otra, así que cada una se mide por separado.
+        ruta_modelo (str): Archivo del modelo.
+        modo (str): Modo de envío del Productor ("json", "bloque" o "semilla").
+        tamano_bloque (int): Escenarios por mensaje.
+        trabajadores (int): Trabajadores del pool del Productor.
+        paralelismo (str): "procesos" o "hilos".
+        prefetch (int): Ventana de prefetch del Consumidor.
+        Returns: Medición con el throughput total, el de cada fase y la latencia de los mensajes.
+    """
+    broker: BrokerMemoria = BrokerMemoria()
+    with broker.instalar(), contextlib.redirect_stdout(io.StringIO()):
+        productor: Productor = Productor(
+            ip="memoria", nom_exchange=EXCHANGE, nom_queue=COLA_ESCENARIOS, ruta_modelo=ruta_modelo,
+            modo=modo, tamano_bloque=tamano_bloque, semilla=12345, paralelismo=paralelismo,
+            trabajadores=trabajadores, unicidad="ninguno"
+        )
+        consumidor: Consumidor = Consumidor(
+            ip="memoria", nom_exchange=EXCHANGE, nom_queue_escenarios=COLA_ESCENARIOS,
+            nom_queue_resultados=COLA_RESULTADOS, prefetch=prefetch
+        )
+        receptor: Receptor = Receptor(host="memoria", cola=COLA_RESULTADOS)
+        productor.configurar_modelo()
+        productor.configurar_conexion()
+        consumidor.configurar_conexion()
+        configuracion: Dict[str, Any] = productor.modelo.obtener_configuracion()
+        configuracion["corrida"] = productor.corrida
+        consumidor.aplicar_configuracion(configuracion)
+        total: int = productor.modelo.iteraciones
+
+        inicio: float = time.perf_counter()
+        productor.generar_escenarios()
+        producido: float = time.perf_counter()
+        consumidor.procesar_escenarios()
+        consumidor.vaciar_lote()
+        consumido: float = time.perf_counter()
+        canal = broker.conexion().channel()
+        canal.basic_consume(queue=consumidor.cola_resultados, on_message_callback=receptor.recibir, auto_ack=True)
+        canal.start_consuming()
+        fin: float = time.perf_counter()
+        productor.conexion.close()
+        consumidor.conexion.close()
+
+    if receptor.estadisticas.n != total:
+        raise RuntimeError(f"El Receptor agregó {receptor.estadisticas.n} de {total} escenarios.")
+    medicion: Dict[str, Any] = resumir(broker.latencias.get(COLA_ESCENARIOS, ()), total, fin - inicio)
+    medicion["fases_escenarios_por_segundo"] = {
+        "produccion": total / (producido - inicio),
+        "consumo": total / (consumido - producido),
+        "recepcion": total / (fin - consumido),
+    }
+    medicion["mensajes"] = broker.publicados
+    return medicion
+
+def ejecutar_suite(variables: Iterable[int], tamanos_bloque: Iterable[int], trabajadores: Iterable[int],
+                   escenarios: int, repeticiones: int, modos: Iterable[str] = ("bloque",),
+                   paralelismo: str = "procesos", prefetch: int = 1) -> Dict[str, Any]:
+    """
+    Ejecuta todas las mediciones de la suite.
+        variables (iterable): Cantidades de variables de los modelos sintéticos.
+        tamanos_bloque (iterable): Escenarios por bloque.
+        trabajadores (iterable): Trabajadores del Productor en las corridas de extremo a extremo.
+        escenarios (int): Escenarios de cada corrida de extremo a extremo.
+        repeticiones (int): Bloques medidos en cada etapa.
+        modos (iterable): Modos de envío de las corridas de extremo a extremo.
+        paralelismo (str): Pool del Productor: "procesos" o "hilos".
+        prefetch (int): Ventana de prefetch del Consumidor.
+        Returns: Diccionario con el entorno de ejecución y la lista de mediciones.
+    """
+    mediciones: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for num_variables in variables:
+            ruta, modelo = cargar_modelo(modelo_sintetico(num_variables, escenarios), directorio)
+            for tamano_bloque in tamanos_bloque:
+                print(f"[BENCHMARK] Etapas: {num_variables} variables, bloques de {tamano_bloque}.")
+                mediciones.extend(medir_etapas(modelo, tamano_bloque, repeticiones))
+                for modo in modos:
+                    for cantidad in trabajadores:
+                        print(f"[BENCHMARK] Extremo a extremo: modo {modo}, {cantidad} trabajadores.")
+                        parametros: Dict[str, Any] = {
+                            "variables": num_variables, "tamano_bloque": tamano_bloque, "modo": modo,
+                            "trabajadores": cantidad, "escenarios": escenarios
+                        }
+                        mediciones.append({"etapa": ETAPA_EXTREMO, "parametros": parametros,
+                                           **medir_extremo_a_extremo(ruta, modo, tamano_bloque, cantidad,
+                                                                     paralelismo, prefetch)})
+    return {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "entorno": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "nucleos": os.cpu_count(),
+        },
+        "mediciones": mediciones,
+    }
+
+def clave_medicion(medicion: Dict[str, Any]) -> str:
+    """
+    Identifica una medición por su etapa y sus parámetros, para compararla entre ejecuciones.
+    """
+    return f"{medicion['etapa']} {json.dumps(medicion['parametros'], sort_keys=True)}"
+
+def comparar(actual: Dict[str, Any], base: Dict[str, Any], tolerancia: float) -> List[Dict[str, Any]]:
+    """
+    Compara el throughput de cada medición con la de la línea base.
+        actual (dict): Resultados de `ejecutar_suite`.
+        base (dict): Resultados guardados de una ejecución anterior.
+        tolerancia (float): Caída relativa de throughput tolerada (0.1 = 10 %).
+        Returns: Una entrada por medición presente en ambas ejecuciones, con el cambio relativo y
+            si se considera una regresión.
+    """
+    referencias: Dict[str, Dict[str, Any]] = {clave_medicion(m): m for m in base["mediciones"]}
+    comparacion: List[Dict[str, Any]] = []
+    for medicion in actual["mediciones"]:
+        referencia: Optional[Dict[str, Any]] = referencias.get(clave_medicion(medicion))
+        if referencia is None or not referencia["escenarios_por_segundo"]:
+            continue
+        cambio: float = medicion["escenarios_por_segundo"] / referencia["escenarios_por_segundo"] - 1
+        comparacion.append({
+            "clave": clave_medicion(medicion),
+            "base": referencia["escenarios_por_segundo"],
+            "actual": medicion["escenarios_por_segundo"],
+            "cambio": cambio,
+            "regresion": cambio < -tolerancia,
+        })
+    return comparacion
@@ -0,0 +1,241 @@
+"""
+__________________________________________________________________________________________
+Módulo: BrokerMemoria.py
+Descripción: Sustituto en memoria de RabbitMQ para los benchmarks. Implementa el
+subconjunto de `pika.BlockingConnection` y de su canal que usan el Productor, el Consumidor
+y el Visualizador:
+    1. exchange_declare, queue_declare (incluidas colas exclusivas con nombre generado y
+       consultas pasivas), queue_bind (exchanges fanout y exchange por defecto) y queue_purge.
+    2. basic_publish, basic_consume, basic_get, basic_ack / basic_nack / basic_reject
+       (con `multiple`) y basic_qos (prefetch por canal).
+    3. start_consuming / stop_consuming, call_later y process_data_events.
+Todo ocurre en el mismo proceso: `start_consuming` entrega mensajes hasta que se llama a
+`stop_consuming` o hasta que el broker queda inactivo (sin mensajes entregables ni
+temporizadores que puedan liberar mensajes sin confirmar), para que un benchmark pueda
+drenar una etapa y medir la siguiente. El broker registra la latencia de cada mensaje desde
+su publicación hasta su confirmación. Los canales y conexiones comparten con el transporte local
+la emulación de `pika` de Comun/Transporte.py (consumidores, prefetch, confirmaciones y
+temporizadores); aquí solo se definen las colas y su enrutamiento.
+__________________________________________________________________________________________
+"""
+import os
+import sys
+import time
+import itertools
+from collections import deque
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set, Tuple
+import pika
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Comun"))
+from Transporte import CanalEmulado, ConexionEmulada, MensajeEmulado
+
+# Mensaje almacenado en una cola, con el instante de su publicación
+Mensaje = MensajeEmulado
+
+class BrokerMemoria:
+    """
+    Estado compartido del broker: colas, exchanges y enlaces, más contadores y latencias.
+
+    Atributos:
+        colas (dict): Nombre de cola -> mensajes pendientes.
+        exchanges (dict): Nombre de exchange -> tipo.
+        enlaces (dict): Nombre de exchange -> colas enlazadas.
+        publicados (int): Mensajes publicados que llegaron a alguna cola.
+        confirmados (int): Mensajes confirmados por los consumidores.
+        rechazados (int): Mensajes rechazados sin reencolar.
+        latencias (dict): Nombre de cola -> latencias en segundos desde la publicación hasta la confirmación.
+    """
+
+    def __init__(self) -> None:
+        self.colas: Dict[str, Deque[Mensaje]] = {}
+        self.exchanges: Dict[str, str] = {}
+        self.enlaces: Dict[str, Set[str]] = {}
+        self.publicados: int = 0
+        self.confirmados: int = 0
+        self.rechazados: int = 0
+        self.latencias: Dict[str, List[float]] = {}
+        self._contador_colas: Iterator[int] = itertools.count(1)
+
+    def conexion(self, parametros: Any = None, **_: Any) -> "ConexionMemoria":
+        """
+        Abre una conexión al broker; recibe (e ignora) los mismos parámetros que pika.
+        """
+        return ConexionMemoria(self)
+
+    @contextmanager
+    def instalar(self) -> Iterator["BrokerMemoria"]:
+        """
+        Reemplaza temporalmente `pika.BlockingConnection` por conexiones a este broker, de modo que el
+        Productor, el Consumidor y el Receptor se usen sin modificarlos.
+        """
+        original = pika.BlockingConnection
+        pika.BlockingConnection = self.conexion
+        try:
+            yield self
+        finally:
+            pika.BlockingConnection = original
+
+    def declarar_cola(self, nombre: str) -> str:
+        if not nombre:
+            nombre = f"amq.gen-{next(self._contador_colas)}"
+        self.colas.setdefault(nombre, deque())
+        return nombre
+
+    def enrutar(self, exchange: str, routing_key: str) -> List[str]:
+        """
+        Colas destino de un mensaje: la cola `routing_key` en el exchange por defecto, o todas las
+        colas enlazadas a un exchange fanout.
+        """
+        if exchange == "":
+            return [routing_key] if routing_key in self.colas else []
+        if exchange not in self.exchanges:
+            raise ValueError(f"El exchange '{exchange}' no está declarado.")
+        return sorted(self.enlaces.get(exchange, ()))
+
+    def registrar_confirmacion(self, cola: str, mensaje: Mensaje) -> None:
+        self.confirmados += 1
+        self.latencias.setdefault(cola, []).append(time.perf_counter() - mensaje.instante)
+
+class ConexionMemoria(ConexionEmulada):
+    """
+    Conexión en memoria con la interfaz de `pika.BlockingConnection` usada en el proyecto.
+    """
+
+    def __init__(self, broker: BrokerMemoria) -> None:
+        super().__init__()
+        self.broker: BrokerMemoria = broker
+
+    def crear_canal(self) -> "CanalMemoria":
+        return CanalMemoria(self)
+
+    def ejecutar_temporizadores(self, esperar: bool = False) -> bool:
+        """
+        Ejecuta los temporizadores vencidos; con `esperar` duerme hasta el siguiente si aún no vence.
+        Retorna True si ejecutó alguno.
+        """
+        restante: Optional[float] = self.tiempo_restante()
+        if restante is None:
+            return False
+        if esperar and restante > 0:
+            time.sleep(restante)
+        return self.ejecutar_pendientes()
+
+    def process_data_events(self, time_limit: float = 0) -> None:
+        self.ejecutar_temporizadores()
+        for canal in self.canales:
+            canal.entregar_pendientes()
+
+    def sleep(self, duracion: float) -> None:
+        time.sleep(duracion)
+        self.process_data_events()
+
+class CanalMemoria(CanalEmulado):
+    """
+    Canal en memoria con la interfaz de `BlockingChannel` usada en el proyecto.
+    """
+
+    def __init__(self, conexion: ConexionMemoria) -> None:
+        super().__init__(conexion)
+        self.broker: BrokerMemoria = conexion.broker
+        self._detenido: bool = False
+
+    # -- Declaraciones ---------------------------------------------------------------
+
+    def exchange_declare(self, exchange: str, exchange_type: str = "direct", **_: Any) -> None:
+        self.broker.exchanges.setdefault(exchange, exchange_type)
+
+    def queue_declare(self, queue: str = "", passive: bool = False, **_: Any) -> SimpleNamespace:
+        if passive and queue not in self.broker.colas:
+            raise ValueError(f"La cola '{queue}' no existe.")
+        nombre: str = self.broker.declarar_cola(queue)
+        consumidores: int = sum(1 for cola, _, _ in self._consumidores.values() if cola == nombre)
+        return SimpleNamespace(method=SimpleNamespace(
+            queue=nombre, message_count=len(self.broker.colas[nombre]), consumer_count=consumidores
+        ))
+
+    def queue_bind(self, queue: str, exchange: str, routing_key: Optional[str] = None, **_: Any) -> None:
+        self.broker.enlaces.setdefault(exchange, set()).add(queue)
+
+    def queue_purge(self, queue: str) -> SimpleNamespace:
+        cantidad: int = len(self.broker.colas.get(queue, ()))
+        self.broker.colas.get(queue, deque()).clear()
+        return SimpleNamespace(method=SimpleNamespace(message_count=cantidad))
+
+    # -- Publicación -----------------------------------------------------------------
+
+    def basic_publish(self, exchange: str, routing_key: str, body: Any, properties: Any = None, **_: Any) -> None:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        mensaje: Mensaje = Mensaje(body, properties, exchange, routing_key, time.perf_counter())
+        destinos: List[str] = self.broker.enrutar(exchange, routing_key)
+        for cola in destinos:
+            self.broker.colas[cola].append(mensaje)
+        if destinos:
+            self.broker.publicados += 1
+
+    # -- Colas del broker ------------------------------------------------------------
+
+    def _retirar(self, cola: str, espera: float) -> Optional[Mensaje]:
+        mensajes: Optional[Deque[Mensaje]] = self.broker.colas.get(cola)
+        return mensajes.popleft() if mensajes else None
+
+    def _devolver(self, cola: str, mensajes: List[Mensaje]) -> None:
+        self.broker.colas[cola].extendleft(reversed(mensajes))
+
+    def _confirmar(self, cola: str, mensaje: Mensaje) -> None:
+        self.broker.registrar_confirmacion(cola, mensaje)
+
+    def _descartar(self, cola: str, mensaje: Mensaje) -> None:
+        self.broker.rechazados += 1
+
+    # -- Consumo ---------------------------------------------------------------------
+
+    def basic_get(self, queue: str, auto_ack: bool = False) -> Tuple[Any, Any, Optional[bytes]]:
+        metodo, propiedades, cuerpo = super().basic_get(queue, auto_ack)
+        if metodo is not None:
+            metodo.message_count = len(self.broker.colas[queue])
+        return metodo, propiedades, cuerpo
+
+    def entregar_pendientes(self) -> int:
+        """
+        Entrega a los consumidores del canal los mensajes disponibles, respetando el prefetch.
+        Retorna la cantidad de mensajes entregados.
+        """
+        entregados: int = 0
+        progreso: bool = True
+        while progreso and self.is_open:
+            progreso = False
+            for etiqueta, (cola, callback, auto_ack) in list(self._consumidores.items()):
+                if self._limitado(cola, auto_ack):
+                    continue
+                mensaje: Optional[Mensaje] = self._retirar(cola, 0.0)
+                if mensaje is None:
+                    continue
+                self._despachar(etiqueta, cola, callback, auto_ack, mensaje)
+                entregados += 1
+                progreso = True
+                if self._detenido:
+                    return entregados
+        return entregados
+
+    def start_consuming(self) -> None:
+        """
+        Entrega mensajes y ejecuta temporizadores hasta `stop_consuming` o hasta que el broker quede inactivo.
+        """
+        self._consumiendo, self._detenido = True, False
+        while self._consumiendo:
+            entregados: int = self.entregar_pendientes()
+            temporizadores: bool = self.conexion.ejecutar_temporizadores()
+            if entregados or temporizadores:
+                continue
+            # Sin trabajo inmediato: solo vale la pena esperar un temporizador si puede confirmar mensajes
+            if self._sin_confirmar and self.conexion.tiempo_restante() is not None:
+                self.conexion.ejecutar_temporizadores(esperar=True)
+                continue
+            break
+        self._consumiendo = False
+
+    def stop_consuming(self) -> None:
+        self._consumiendo, self._detenido = False, True
@@ -0,0 +1,72 @@
+"""
+______________________________________________________________________________
+Módulo: main.py
+Descripción: Script principal de la suite de rendimiento. Ejecuta las mediciones
+de Benchmark.py sin necesitar RabbitMQ, guarda los resultados en JSON y, si existe
+una línea base, reporta los cambios de throughput y termina con código 1 si alguna
+medición cae más de la tolerancia.
+______________________________________________________________________________
+"""
+import os
+import sys
+import json
+from Benchmark import comparar, ejecutar_suite
+
+VARIABLES: tuple = (3, 10, 30)            # Variables de los modelos sintéticos
+TAMANOS_BLOQUE: tuple = (1000, 10000)     # Escenarios por bloque (y por mensaje en las corridas completas)
+TRABAJADORES: tuple = (1, 2, 4)           # Trabajadores del Productor en las corridas completas
+MODOS: tuple = ('bloque', 'semilla')      # Modos de envío de las corridas completas ('json' también es válido)
+ESCENARIOS: int = 200000                  # Escenarios de cada corrida completa
+REPETICIONES: int = 20                    # Bloques medidos en cada etapa
+PARALELISMO: str = 'procesos'             # Pool del Productor: 'procesos' o 'hilos'
+PREFETCH: int = 1                         # Ventana de prefetch del Consumidor
+RUTA_RESULTADOS: str = './resultados.json'  # Archivo donde se guardan los resultados
+RUTA_BASE: str = './base.json'            # Línea base para comparar (se omite si no existe)
+ACTUALIZAR_BASE: bool = False             # Guarda los resultados como nueva línea base
+TOLERANCIA: float = 0.15                  # Caída relativa de throughput tolerada antes de reportar regresión
+
+def main() -> int:
+    """
+    Ejecuta la suite, guarda los resultados y los compara con la línea base.
+    """
+    resultados: dict = ejecutar_suite(
+        variables=VARIABLES,
+        tamanos_bloque=TAMANOS_BLOQUE,
+        trabajadores=TRABAJADORES,
+        escenarios=ESCENARIOS,
+        repeticiones=REPETICIONES,
+        modos=MODOS,
+        paralelismo=PARALELISMO,
+        prefetch=PREFETCH
+    )
+    with open(RUTA_RESULTADOS, "w") as archivo:
+        json.dump(resultados, archivo, indent=2)
+    print(f"[BENCHMARK] Resultados guardados en {RUTA_RESULTADOS}.")
+
+    for medicion in resultados["mediciones"]:
+        latencia: dict = medicion["latencia_ms"]
+        print(f"{medicion['etapa']:<18} {json.dumps(medicion['parametros'], sort_keys=True):<90} "
+              f"{medicion['escenarios_por_segundo']:>14,.0f} esc/s  p50 {latencia['p50']:.3f} ms  "
+              f"p99 {latencia['p99']:.3f} ms")
+
+    if ACTUALIZAR_BASE:
+        with open(RUTA_BASE, "w") as archivo:
+            json.dump(resultados, archivo, indent=2)
+        print(f"[BENCHMARK] Línea base actualizada en {RUTA_BASE}.")
+        return 0
+    if not os.path.exists(RUTA_BASE):
+        print(f"[BENCHMARK] No hay línea base en {RUTA_BASE}; no se compara.")
+        return 0
+
+    with open(RUTA_BASE, "r") as archivo:
+        base: dict = json.load(archivo)
+    regresiones: int = 0
+    for entrada in comparar(resultados, base, TOLERANCIA):
+        marca: str = "REGRESIÓN" if entrada["regresion"] else ""
+        regresiones += entrada["regresion"]
+        print(f"{entrada['clave']:<110} {entrada['cambio']:+8.1%} {marca}")
+    print(f"[BENCHMARK] {regresiones} regresiones (tolerancia {TOLERANCIA:.0%}).")
+    return 1 if regresiones else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
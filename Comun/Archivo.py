@@ -0,0 +1,209 @@
+"""
+_____________________________________________________________________________________
+Módulo: Archivo.py
+Descripción: Archivo columnar en disco de los escenarios y resultados de una corrida.
+    1. `EscritorArchivo` acumula las columnas (entradas del escenario, "resultado" y, si la
+       hay, "control") en buffers float64 preasignados y las escribe en trozos grandes, una
+       columna por archivo binario sin cabecera, de modo que se pueden abrir con `np.memmap`.
+    2. Cada proceso escribe su propia parte en <ruta>/<corrida>/<parte>/, con un índice
+       (indice.json) que solo se actualiza después de escribir cada trozo; tras una caída,
+       los bytes posteriores a las filas indicadas por el índice se ignoran.
+    3. `LectorArchivo` abre todas las partes de una corrida y recorre sus filas en bloques
+       sin cargarlas completas en memoria, por ejemplo para reproducirla en el Visualizador.
+El índice guarda por trozo si los resultados vienen en pares antitéticos consecutivos y, por
+parte, la media conocida de la variable de control (para recalcular el estimador) y los nombres
+de las salidas si el modelo define varias (cada salida secundaria es una columna más).
+_____________________________________________________________________________________
+"""
+import os
+import time
+import socket
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from PuntoControl import cargar_json, guardar_json
+
+DTYPE: str = "<f8"
+ARCHIVO_INDICE: str = "indice.json"
+EXTENSION_COLUMNA: str = ".f64"
+
+def ruta_corrida(ruta: str, corrida: Optional[str]) -> str:
+    """
+    Directorio del archivo de una corrida.
+    """
+    return os.path.join(ruta, corrida or "sin_corrida")
+
+class EscritorArchivo:
+    """
+    Escritor de la parte del archivo de un proceso. Las columnas quedan fijas en la primera
+    escritura: las que falten después se rellenan con NaN y las nuevas se ignoran.
+    """
+    def __init__(self, ruta: str, corrida: Optional[str], filas_trozo: int = 1 << 20,
+                 metadatos: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Argumentos:
+            ruta (str): Directorio raíz de los archivos.
+            corrida (Optional[str]): Identificador de la corrida.
+            filas_trozo (int): Filas acumuladas antes de escribir un trozo (se redondea a par
+                para no separar pares antitéticos).
+            metadatos (Optional[dict]): Datos de la corrida que se guardan en el índice
+                (por ejemplo, "media_control").
+        """
+        parte: str = f"{socket.gethostname()}-{os.getpid()}-{time.time_ns()}"
+        self.directorio: str = os.path.join(ruta_corrida(ruta, corrida), parte)
+        os.makedirs(self.directorio, exist_ok=True)
+        self.filas_trozo: int = max(2, filas_trozo + filas_trozo % 2)
+        self.metadatos: Dict[str, Any] = {"corrida": corrida, **(metadatos or {})}
+        self.columnas: List[str] = []
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._salidas: Dict[str, Any] = {}
+        self._n: int = 0
+        self._pares: bool = True
+        self.filas: int = 0
+        self.trozos: List[List[Any]] = []
+
+    def _abrir(self, columnas: List[str]) -> None:
+        self.columnas = columnas
+        for nombre in columnas:
+            self._buffers[nombre] = np.empty(self.filas_trozo, dtype=DTYPE)
+            self._salidas[nombre] = open(os.path.join(self.directorio, nombre + EXTENSION_COLUMNA), "ab")
+
+    def agregar(self, columnas: Dict[str, Any], antiteticas: bool = False) -> None:
+        """
+        Añade filas al archivo; escribe un trozo cada vez que se llenan los buffers.
+
+        Argumentos:
+            columnas (dict): Nombre -> valor escalar o arreglo (todas con la misma cantidad de filas).
+            antiteticas (bool): Si las filas forman pares antitéticos consecutivos.
+        """
+        valores: Dict[str, np.ndarray] = {
+            nombre: np.atleast_1d(np.asarray(valor, dtype=np.float64)) for nombre, valor in columnas.items()
+        }
+        if not self.columnas:
+            self._abrir(list(valores))
+        filas: int = max((columna.size for columna in valores.values()), default=0)
+        pares: bool = antiteticas and not filas % 2
+        escritas: int = 0
+        while escritas < filas:
+            # Los pares solo siguen alineados si el segmento es par y comienza en una fila par del
+            # trozo; se marca en cada trozo porque un segmento largo puede ocupar varios
+            if not pares or self._n % 2:
+                self._pares = False
+            cantidad: int = min(filas - escritas, self.filas_trozo - self._n)
+            for nombre in self.columnas:
+                columna: Optional[np.ndarray] = valores.get(nombre)
+                destino: np.ndarray = self._buffers[nombre][self._n:self._n + cantidad]
+                if columna is None:
+                    destino.fill(np.nan)
+                else:
+                    destino[:] = columna[escritas:escritas + cantidad] if columna.size > 1 else columna[0]
+            self._n += cantidad
+            escritas += cantidad
+            if self._n == self.filas_trozo:
+                self.vaciar()
+
+    def vaciar(self) -> None:
+        """
+        Escribe el trozo pendiente y actualiza el índice.
+        """
+        if not self._n:
+            return
+        for nombre in self.columnas:
+            salida = self._salidas[nombre]
+            salida.write(memoryview(self._buffers[nombre][:self._n]))
+            salida.flush()
+            os.fsync(salida.fileno())
+        self.trozos.append([self.filas, self._n, self._pares])
+        self.filas += self._n
+        self._n = 0
+        self._pares = True
+        guardar_json(os.path.join(self.directorio, ARCHIVO_INDICE), {
+            **self.metadatos,
+            "dtype": DTYPE,
+            "columnas": self.columnas,
+            "filas": self.filas,
+            "trozos": self.trozos,
+        })
+
+    def cerrar(self) -> None:
+        """
+        Escribe lo pendiente y cierra los archivos de las columnas.
+        """
+        self.vaciar()
+        for salida in self._salidas.values():
+            salida.close()
+        self._salidas = {}
+
+class LectorArchivo:
+    """
+    Lectura del archivo de una corrida a partir de los índices de sus partes. Las columnas se
+    abren con `np.memmap`, así que solo se leen del disco las filas que se recorren.
+    """
+    def __init__(self, directorio: str) -> None:
+        """
+        Argumentos:
+            directorio (str): Directorio de la corrida (ver `ruta_corrida`).
+        """
+        self.directorio: str = directorio
+        self.partes: List[Tuple[str, Dict[str, Any]]] = []
+        for nombre in sorted(os.listdir(directorio)):
+            indice: Optional[Dict[str, Any]] = cargar_json(os.path.join(directorio, nombre, ARCHIVO_INDICE))
+            if indice is not None and indice.get("filas"):
+                self.partes.append((os.path.join(directorio, nombre), indice))
+        if not self.partes:
+            raise FileNotFoundError(f"No hay partes con datos en el archivo {directorio}.")
+
+    @property
+    def filas(self) -> int:
+        return sum(indice["filas"] for _, indice in self.partes)
+
+    @property
+    def columnas(self) -> List[str]:
+        nombres: Dict[str, None] = {}
+        for _, indice in self.partes:
+            nombres.update(dict.fromkeys(indice["columnas"]))
+        return list(nombres)
+
+    @property
+    def salidas(self) -> Optional[List[str]]:
+        """
+        Nombres de las salidas de la corrida (la principal se guarda como "resultado"), o None si tiene una sola.
+        """
+        return self.partes[0][1].get("salidas")
+
+    def memmap(self, parte: int, columna: str) -> np.ndarray:
+        """
+        Abre una columna de una parte como arreglo de solo lectura respaldado por el archivo.
+
+        Argumentos:
+            parte (int): Posición de la parte en `partes`.
+            columna (str): Nombre de la columna.
+
+        Retorna:
+            np.memmap: Arreglo con las filas registradas en el índice.
+        """
+        ruta, indice = self.partes[parte]
+        return np.memmap(os.path.join(ruta, columna + EXTENSION_COLUMNA), dtype=indice["dtype"],
+                         mode="r", shape=(indice["filas"],))
+
+    def bloques(self, columnas: Optional[List[str]] = None,
+                filas_bloque: int = 1 << 16) -> Iterator[Tuple[Dict[str, np.ndarray], bool, Optional[float]]]:
+        """
+        Recorre todas las filas en bloques de a lo sumo `filas_bloque` filas, sin cruzar trozos.
+
+        Argumentos:
+            columnas (Optional[list]): Columnas que se leen (todas si es None); las que falten
+                en una parte se omiten del bloque.
+            filas_bloque (int): Filas máximas por bloque (se redondea a par).
+
+        Retorna:
+            Iterator: Tuplas (columnas del bloque, si son pares antitéticos, media de la variable de control).
+        """
+        filas_bloque = max(2, filas_bloque + filas_bloque % 2)
+        for parte, (_, indice) in enumerate(self.partes):
+            nombres: List[str] = [nombre for nombre in (columnas or indice["columnas"]) if nombre in indice["columnas"]]
+            mapas: Dict[str, np.ndarray] = {nombre: self.memmap(parte, nombre) for nombre in nombres}
+            for inicio, filas, pares in indice["trozos"]:
+                for desde in range(inicio, inicio + filas, filas_bloque):
+                    hasta: int = min(desde + filas_bloque, inicio + filas)
+                    yield {nombre: mapa[desde:hasta] for nombre, mapa in mapas.items()}, pares, indice.get("media_control")
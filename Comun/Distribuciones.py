@@ -0,0 +1,336 @@
+"""
+_____________________________________________________________________________________
+Módulo: Distribuciones.py
+Descripción: Registro de distribuciones y compilación del plan de muestreo del Modelo.
+Las definiciones de variables del JSON se compilan una sola vez en un plan inmutable:
+cada variable queda con sus parámetros ya validados y tipados y con las funciones de su
+distribución resueltas, de modo que generar un bloque de escenarios no vuelve a
+interpretar cadenas ni diccionarios.
+Contiene:
+    1. Distribucion: funciones de una distribución (compilar parámetros, muestrear de forma
+       vectorizada y, si existe, cuantil, reflexión antitética y ajuste final).
+    2. registrar_distribucion / DISTRIBUCIONES: registro por nombre, en el que se agregan
+       distribuciones nuevas sin tocar el Modelo.
+    3. Tablas de alias de Walker/Vose para las variables discretas, con muestreo O(1) por valor.
+    4. compilar_plan: convierte las definiciones de variables en el plan de muestreo.
+Distribuciones incluidas: uniforme, normal, lognormal, triangular, exponencial, beta, gamma
+(continuas) y categorica, poisson, empirica (discretas). Una variable "discreta" sin
+"distribucion" es categórica, como en los modelos existentes.
+_____________________________________________________________________________________
+"""
+import math
+import numpy as np
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+from Muestreo import normal_inversa
+
+class Distribucion(NamedTuple):
+    """
+    Funciones que definen una distribución en el registro.
+
+    Atributos:
+        nombre (str): Nombre con el que se usa en el JSON.
+        discreta (bool): Las variables discretas se comparten dentro de un par antitético.
+        compilar (Callable): Parámetros del JSON -> parámetros tipados.
+        muestrear (Callable): (rng, parámetros, n) -> arreglo de n valores.
+        cuantil (Callable | None): (parámetros, u) -> valores; permite el muestreo de baja
+            discrepancia y las variables antitéticas por inversión.
+        reflejar (Callable | None): (parámetros, valores) -> valores antitéticos de una muestra cruda.
+        ajustar (Callable | None): (parámetros, valores) -> valores finales (por ejemplo, recorte a límites).
+    """
+    nombre: str
+    discreta: bool
+    compilar: Callable[[Dict[str, Any]], Any]
+    muestrear: Callable[[np.random.Generator, Any, int], np.ndarray]
+    cuantil: Optional[Callable[[Any, np.ndarray], np.ndarray]] = None
+    reflejar: Optional[Callable[[Any, np.ndarray], np.ndarray]] = None
+    ajustar: Optional[Callable[[Any, np.ndarray], np.ndarray]] = None
+
+class VariableCompilada(NamedTuple):
+    """
+    Variable del plan de muestreo: nombre, distribución resuelta y parámetros tipados.
+    """
+    nombre: str
+    distribucion: Distribucion
+    parametros: Any
+
+DISTRIBUCIONES: Dict[str, Distribucion] = {}
+
+def registrar_distribucion(distribucion: Distribucion) -> Distribucion:
+    """
+    Agrega una distribución al registro, reemplazando la que tenga el mismo nombre.
+
+    Argumentos:
+        distribucion (Distribucion): Distribución a registrar.
+
+    Retorna:
+        Distribucion: La misma distribución.
+    """
+    DISTRIBUCIONES[distribucion.nombre] = distribucion
+    return distribucion
+
+def _solo_lectura(arreglo: np.ndarray) -> np.ndarray:
+    arreglo.setflags(write=False)
+    return arreglo
+
+def _limites(p: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Límites de recorte opcionales; como en los modelos existentes, solo se aplican si están ambos.
+    """
+    li, ls = p.get("limite_inferior"), p.get("limite_superior")
+    if li is None or ls is None:
+        return None, None
+    return float(li), float(ls)
+
+def _recortar(p: Any, v: np.ndarray) -> np.ndarray:
+    if p.limite_inferior is not None:
+        np.clip(v, p.limite_inferior, p.limite_superior, out=v)
+    return v
+
+# ---------------------------------------------------------------------------------
+# Tablas de alias
+# ---------------------------------------------------------------------------------
+
+def tabla_alias(probabilidades: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Construye la tabla de alias de Walker con el método de Vose, en O(k).
+
+    Argumentos:
+        probabilidades (np.ndarray): Probabilidades no negativas (se normalizan).
+
+    Retorna:
+        tuple: (umbrales, alias). Para muestrear se elige una columna i uniforme y se devuelve
+        i si u < umbrales[i], o alias[i] en otro caso.
+    """
+    k: int = len(probabilidades)
+    escaladas: np.ndarray = np.asarray(probabilidades, dtype=np.float64) * k / np.sum(probabilidades)
+    umbrales: np.ndarray = np.ones(k, dtype=np.float64)
+    alias: np.ndarray = np.arange(k, dtype=np.int64)
+    pequenos = [i for i in range(k) if escaladas[i] < 1.0]
+    grandes = [i for i in range(k) if escaladas[i] >= 1.0]
+    while pequenos and grandes:
+        menor, mayor = pequenos.pop(), grandes.pop()
+        umbrales[menor] = escaladas[menor]
+        alias[menor] = mayor
+        escaladas[mayor] -= 1.0 - escaladas[menor]
+        (pequenos if escaladas[mayor] < 1.0 else grandes).append(mayor)
+    # Las columnas restantes quedan llenas (umbral 1) salvo errores de redondeo
+    return umbrales, alias
+
+def muestrear_alias(rng: np.random.Generator, umbrales: np.ndarray, alias: np.ndarray, n: int) -> np.ndarray:
+    """
+    Extrae `n` índices de una tabla de alias con dos números aleatorios por valor.
+    """
+    columnas: np.ndarray = rng.integers(0, len(umbrales), size=n)
+    return np.where(rng.random(n) < umbrales[columnas], columnas, alias[columnas])
+
+# ---------------------------------------------------------------------------------
+# Distribuciones continuas
+# ---------------------------------------------------------------------------------
+
+class ParametrosUniforme(NamedTuple):
+    limite_inferior: float
+    limite_superior: float
+
+registrar_distribucion(Distribucion(
+    nombre="uniforme",
+    discreta=False,
+    compilar=lambda p: ParametrosUniforme(float(p["limite_inferior"]), float(p["limite_superior"])),
+    muestrear=lambda rng, p, n: rng.uniform(p.limite_inferior, p.limite_superior, size=n),
+    cuantil=lambda p, u: p.limite_inferior + u * (p.limite_superior - p.limite_inferior),
+    reflejar=lambda p, v: p.limite_inferior + p.limite_superior - v,
+))
+
+class ParametrosNormal(NamedTuple):
+    media: float
+    desviacion: float
+    limite_inferior: Optional[float]
+    limite_superior: Optional[float]
+
+registrar_distribucion(Distribucion(
+    nombre="normal",
+    discreta=False,
+    compilar=lambda p: ParametrosNormal(float(p["media"]), float(p["desviacion"]), *_limites(p)),
+    muestrear=lambda rng, p, n: rng.normal(p.media, p.desviacion, size=n),
+    cuantil=lambda p, u: p.media + p.desviacion * normal_inversa(u),
+    reflejar=lambda p, v: 2 * p.media - v,
+    ajustar=_recortar,
+))
+
+class ParametrosLognormal(NamedTuple):
+    media_log: float
+    desviacion_log: float
+    limite_inferior: Optional[float]
+    limite_superior: Optional[float]
+
+registrar_distribucion(Distribucion(
+    nombre="lognormal",
+    discreta=False,
+    compilar=lambda p: ParametrosLognormal(float(p["media_log"]), float(p["desviacion_log"]), *_limites(p)),
+    muestrear=lambda rng, p, n: rng.lognormal(p.media_log, p.desviacion_log, size=n),
+    cuantil=lambda p, u: np.exp(p.media_log + p.desviacion_log * normal_inversa(u)),
+    ajustar=_recortar,
+))
+
+class ParametrosTriangular(NamedTuple):
+    minimo: float
+    moda: float
+    maximo: float
+
+def _cuantil_triangular(p: ParametrosTriangular, u: np.ndarray) -> np.ndarray:
+    ancho: float = p.maximo - p.minimo
+    corte: float = (p.moda - p.minimo) / ancho
+    izquierda: np.ndarray = p.minimo + np.sqrt(u * ancho * (p.moda - p.minimo))
+    derecha: np.ndarray = p.maximo - np.sqrt((1 - u) * ancho * (p.maximo - p.moda))
+    return np.where(u < corte, izquierda, derecha)
+
+registrar_distribucion(Distribucion(
+    nombre="triangular",
+    discreta=False,
+    compilar=lambda p: ParametrosTriangular(float(p["minimo"]), float(p["moda"]), float(p["maximo"])),
+    muestrear=lambda rng, p, n: rng.triangular(p.minimo, p.moda, p.maximo, size=n),
+    cuantil=_cuantil_triangular,
+))
+
+class ParametrosExponencial(NamedTuple):
+    escala: float
+
+registrar_distribucion(Distribucion(
+    nombre="exponencial",
+    discreta=False,
+    # Acepta la tasa (lambda) o la media (escala)
+    compilar=lambda p: ParametrosExponencial(float(p["media"]) if "media" in p else 1.0 / float(p["tasa"])),
+    muestrear=lambda rng, p, n: rng.exponential(p.escala, size=n),
+    cuantil=lambda p, u: -p.escala * np.log1p(-u),
+))
+
+class ParametrosBeta(NamedTuple):
+    alfa: float
+    beta: float
+    minimo: float
+    maximo: float
+
+registrar_distribucion(Distribucion(
+    nombre="beta",
+    discreta=False,
+    compilar=lambda p: ParametrosBeta(float(p["alfa"]), float(p["beta"]),
+                                      float(p.get("minimo", 0.0)), float(p.get("maximo", 1.0))),
+    muestrear=lambda rng, p, n: p.minimo + (p.maximo - p.minimo) * rng.beta(p.alfa, p.beta, size=n),
+))
+
+class ParametrosGamma(NamedTuple):
+    forma: float
+    escala: float
+
+registrar_distribucion(Distribucion(
+    nombre="gamma",
+    discreta=False,
+    compilar=lambda p: ParametrosGamma(float(p["forma"]), float(p["escala"]) if "escala" in p else 1.0 / float(p["tasa"])),
+    muestrear=lambda rng, p, n: rng.gamma(p.forma, p.escala, size=n),
+))
+
+# ---------------------------------------------------------------------------------
+# Distribuciones discretas
+# ---------------------------------------------------------------------------------
+
+class ParametrosCategorica(NamedTuple):
+    valores: np.ndarray
+    umbrales: np.ndarray
+    alias: np.ndarray
+    acumuladas: np.ndarray
+
+def _compilar_categorica(p: Dict[str, Any]) -> ParametrosCategorica:
+    valores: np.ndarray = np.asarray(p["valores"], dtype=np.float64)
+    probabilidades: np.ndarray = np.asarray(p["probabilidades"], dtype=np.float64)
+    if valores.shape != probabilidades.shape or valores.size == 0:
+        raise ValueError("Los valores y las probabilidades deben tener la misma longitud (no nula).")
+    if np.any(probabilidades < 0) or probabilidades.sum() <= 0:
+        raise ValueError("Las probabilidades deben ser no negativas y sumar más que cero.")
+    umbrales, alias = tabla_alias(probabilidades)
+    acumuladas: np.ndarray = np.cumsum(probabilidades / probabilidades.sum())
+    return ParametrosCategorica(*(_solo_lectura(a) for a in (valores, umbrales, alias, acumuladas)))
+
+def _cuantil_acumuladas(valores: np.ndarray, acumuladas: np.ndarray, u: np.ndarray) -> np.ndarray:
+    indices: np.ndarray = np.searchsorted(acumuladas, u * acumuladas[-1], side="right")
+    return valores[np.minimum(indices, len(acumuladas) - 1)]
+
+registrar_distribucion(Distribucion(
+    nombre="categorica",
+    discreta=True,
+    compilar=_compilar_categorica,
+    muestrear=lambda rng, p, n: p.valores[muestrear_alias(rng, p.umbrales, p.alias, n)],
+    cuantil=lambda p, u: _cuantil_acumuladas(p.valores, p.acumuladas, u),
+))
+
+class ParametrosPoisson(NamedTuple):
+    tasa: float
+    acumuladas: np.ndarray
+
+def _compilar_poisson(p: Dict[str, Any]) -> ParametrosPoisson:
+    tasa: float = float(p["tasa"])
+    # Función de distribución tabulada hasta que la cola es despreciable, para el cuantil
+    maximo: int = int(tasa + 12 * math.sqrt(tasa) + 20)
+    k: np.ndarray = np.arange(maximo + 1, dtype=np.float64)
+    log_factorial: np.ndarray = np.concatenate(([0.0], np.cumsum(np.log(k[1:]))))
+    acumuladas: np.ndarray = np.cumsum(np.exp(k * math.log(tasa) - tasa - log_factorial)) if tasa > 0 else np.ones(1)
+    return ParametrosPoisson(tasa, _solo_lectura(acumuladas))
+
+registrar_distribucion(Distribucion(
+    nombre="poisson",
+    discreta=True,
+    compilar=_compilar_poisson,
+    muestrear=lambda rng, p, n: rng.poisson(p.tasa, size=n).astype(np.float64),
+    cuantil=lambda p, u: np.minimum(np.searchsorted(p.acumuladas, u, side="right"),
+                                    len(p.acumuladas) - 1).astype(np.float64),
+))
+
+class ParametrosEmpirica(NamedTuple):
+    ordenados: np.ndarray
+
+registrar_distribucion(Distribucion(
+    nombre="empirica",
+    discreta=True,
+    compilar=lambda p: ParametrosEmpirica(_solo_lectura(np.sort(np.asarray(p["valores"], dtype=np.float64)))),
+    muestrear=lambda rng, p, n: p.ordenados[rng.integers(0, len(p.ordenados), size=n)],
+    cuantil=lambda p, u: p.ordenados[np.minimum((u * len(p.ordenados)).astype(np.int64), len(p.ordenados) - 1)],
+))
+
+# ---------------------------------------------------------------------------------
+# Plan de muestreo
+# ---------------------------------------------------------------------------------
+
+def nombre_distribucion(definicion: Dict[str, Any]) -> str:
+    """
+    Nombre de la distribución de una variable del JSON.
+
+    Argumentos:
+        definicion (Dict[str, Any]): Definición de la variable (tipo y parámetros).
+
+    Retorna:
+        str: Nombre en el registro; las variables discretas sin "distribucion" son categóricas.
+    """
+    distribucion: Optional[str] = definicion["parametros"].get("distribucion")
+    if distribucion is None and definicion["tipo"] == "discreta":
+        return "categorica"
+    return distribucion
+
+def compilar_plan(variables: Dict[str, Any]) -> Tuple[VariableCompilada, ...]:
+    """
+    Compila las definiciones de variables en el plan de muestreo, validando los parámetros.
+
+    Argumentos:
+        variables (Dict[str, Any]): Definiciones de las variables aleatorias del JSON.
+
+    Retorna:
+        tuple: Una `VariableCompilada` por variable, en el orden del JSON.
+    """
+    plan = []
+    for nombre, definicion in variables.items():
+        distribucion: Optional[Distribucion] = DISTRIBUCIONES.get(nombre_distribucion(definicion))
+        if distribucion is None:
+            raise ValueError(f"Distribución desconocida para la variable '{nombre}': {nombre_distribucion(definicion)}")
+        try:
+            parametros: Any = distribucion.compilar(definicion["parametros"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Parámetros inválidos para la variable '{nombre}': {e}") from e
+        plan.append(VariableCompilada(nombre, distribucion, parametros))
+    return tuple(plan)
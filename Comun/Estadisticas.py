@@ -0,0 +1,564 @@
+"""
+_____________________________________________________________________________________
+Módulo: Estadisticas.py
+Descripción: Estadísticos acumulados que se pueden combinar entre procesos, usados por
+el Consumidor para publicar agregados parciales y por el Visualizador para fusionarlos.
+Contiene:
+    1. Histograma con bins alineados a potencias de dos, que se ensancha cuando los
+       datos exceden el número máximo de bins y se puede fusionar con otros histogramas.
+    2. Estimador: momentos conjuntos de las observaciones y de una variable de control, para
+       las técnicas de reducción de varianza (variables antitéticas y variables de control).
+    3. Estadisticas: conteo, media, M2 (Welford/Chan), mínimo, máximo e histograma, con la
+       estimación de la media, su error estándar y su intervalo de confianza.
+Todos se serializan a diccionarios JSON para viajar por RabbitMQ. Con varias salidas por escenario,
+el agregado de la salida principal lleva además en la clave "salidas" los de las demás
+(`codificar_agregado` y `decodificar_agregado`).
+    4. EstadisticasBarrido: un Estimador por punto de un barrido de parámetros para la salida
+       principal y otro para su diferencia con la configuración base sobre los mismos escenarios.
+_____________________________________________________________________________________
+"""
+import math
+import json
+from statistics import NormalDist
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+class Histograma:
+    """
+    Histograma cuyos bins tienen ancho 2**exponente y bordes en múltiplos de ese ancho. Como
+    todos los histogramas comparten la misma rejilla, dos histogramas se fusionan llevando el
+    de bins más finos al ancho del otro.
+
+    Atributos:
+        max_bins (int): Número máximo de bins entre el primero y el último ocupados.
+        exponente (int | None): Exponente del ancho de bin; None si aún no hay datos.
+        conteos (dict): Índice de bin -> cantidad de valores.
+    """
+
+    def __init__(self, max_bins: int = 64) -> None:
+        self.max_bins: int = max_bins
+        self.exponente: Optional[int] = None
+        self.conteos: Dict[int, int] = {}
+
+    def _exponente_inicial(self, minimo: float, maximo: float) -> int:
+        rango: float = maximo - minimo
+        if rango <= 0:
+            escala: float = abs(maximo) or 1.0
+            return math.floor(math.log2(escala)) - 4
+        return math.ceil(math.log2(rango / self.max_bins))
+
+    def _reducir(self, pasos: int) -> None:
+        """
+        Duplica `pasos` veces el ancho de los bins fusionando bins vecinos.
+        """
+        if pasos <= 0:
+            return
+        conteos: Dict[int, int] = {}
+        for indice, conteo in self.conteos.items():
+            nuevo: int = indice >> pasos
+            conteos[nuevo] = conteos.get(nuevo, 0) + conteo
+        self.conteos = conteos
+        self.exponente += pasos
+
+    def _ajustar(self) -> None:
+        while self.conteos and max(self.conteos) - min(self.conteos) + 1 > self.max_bins:
+            self._reducir(1)
+
+    def agregar(self, valores: np.ndarray) -> None:
+        """
+        Agrega un arreglo de valores; los valores no finitos se ignoran.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        valores = valores[np.isfinite(valores)]
+        if valores.size == 0:
+            return
+        minimo, maximo = float(valores.min()), float(valores.max())
+        if self.exponente is None:
+            self.exponente = self._exponente_inicial(minimo, maximo)
+        else:
+            # Ensancha antes de indexar para no crear demasiados bins intermedios
+            limite_inferior: float = min(minimo, self.bordes()[0])
+            limite_superior: float = max(maximo, self.bordes()[-1])
+            self._reducir(max(0, self._exponente_inicial(limite_inferior, limite_superior) - self.exponente))
+        indices, cantidades = np.unique(np.floor(np.ldexp(valores, -self.exponente)).astype(np.int64), return_counts=True)
+        for indice, cantidad in zip(indices.tolist(), cantidades.tolist()):
+            self.conteos[indice] = self.conteos.get(indice, 0) + cantidad
+        self._ajustar()
+
+    def combinar(self, otro: "Histograma") -> None:
+        """
+        Fusiona otro histograma en este.
+        """
+        if otro.exponente is None:
+            return
+        conteos: Dict[int, int] = dict(otro.conteos)
+        if self.exponente is None:
+            self.exponente = otro.exponente
+        elif otro.exponente > self.exponente:
+            self._reducir(otro.exponente - self.exponente)
+        elif otro.exponente < self.exponente:
+            pasos: int = self.exponente - otro.exponente
+            conteos = {}
+            for indice, conteo in otro.conteos.items():
+                conteos[indice >> pasos] = conteos.get(indice >> pasos, 0) + conteo
+        for indice, conteo in conteos.items():
+            self.conteos[indice] = self.conteos.get(indice, 0) + conteo
+        self._ajustar()
+
+    def bordes(self) -> np.ndarray:
+        """
+        Devuelve los bordes de los bins desde el primero hasta el último ocupados.
+        """
+        if not self.conteos:
+            return np.empty(0)
+        inicio, fin = min(self.conteos), max(self.conteos)
+        return np.ldexp(np.arange(inicio, fin + 2, dtype=np.float64), self.exponente)
+
+    def densos(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve los bordes y los conteos de todos los bins, incluidos los vacíos intermedios.
+        """
+        if not self.conteos:
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        inicio, fin = min(self.conteos), max(self.conteos)
+        conteos = np.zeros(fin - inicio + 1, dtype=np.int64)
+        for indice, conteo in self.conteos.items():
+            conteos[indice - inicio] = conteo
+        return self.bordes(), conteos
+
+    def a_dict(self) -> Dict[str, Any]:
+        if not self.conteos:
+            return {"max_bins": self.max_bins, "exponente": self.exponente, "inicio": 0, "conteos": []}
+        _, conteos = self.densos()
+        return {
+            "max_bins": self.max_bins,
+            "exponente": self.exponente,
+            "inicio": min(self.conteos),
+            "conteos": conteos.tolist(),
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "Histograma":
+        histograma: Histograma = cls(max_bins=datos.get("max_bins", 64))
+        histograma.exponente = datos.get("exponente")
+        inicio: int = datos.get("inicio", 0)
+        histograma.conteos = {inicio + i: c for i, c in enumerate(datos.get("conteos", [])) if c}
+        return histograma
+
+
+def promediar_pares(valores: np.ndarray) -> np.ndarray:
+    """
+    Promedia los pares antitéticos consecutivos (posiciones 2i y 2i+1) de un arreglo, a lo largo
+    del último eje. Si la longitud es impar, el último valor se conserva como observación individual.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    pares: int = valores.shape[-1] // 2
+    promedios: np.ndarray = 0.5 * (valores[..., 0:2 * pares:2] + valores[..., 1:2 * pares:2])
+    return np.concatenate([promedios, valores[..., 2 * pares:]], axis=-1)
+
+
+class Estimador:
+    """
+    Momentos combinables de las observaciones del estimador de la media: cada observación es
+    un resultado, o el promedio de un par antitético, opcionalmente acompañada del valor de una
+    variable de control de media conocida. El coeficiente de la variable de control se estima
+    por mínimos cuadrados con los momentos fusionados de todos los consumidores.
+
+    Atributos:
+        n (int): Cantidad de observaciones.
+        media (float): Media de las observaciones.
+        m2 (float): Suma de cuadrados de las desviaciones de las observaciones.
+        media_conocida (float | None): Esperanza conocida de la variable de control.
+        media_control (float): Media observada de la variable de control.
+        m2_control (float): Suma de cuadrados de las desviaciones de la variable de control.
+        comomento (float): Suma de productos cruzados de las desviaciones.
+    """
+
+    def __init__(self, media_conocida: Optional[float] = None) -> None:
+        self.n: int = 0
+        self.media: float = 0.0
+        self.m2: float = 0.0
+        self.media_conocida: Optional[float] = media_conocida
+        self.media_control: float = 0.0
+        self.m2_control: float = 0.0
+        self.comomento: float = 0.0
+
+    def _fusionar(self, n: int, media: float, m2: float, media_control: float = 0.0,
+                  m2_control: float = 0.0, comomento: float = 0.0) -> None:
+        """
+        Combina los momentos conjuntos de otro conjunto con la fórmula de Chan et al.
+        """
+        if n == 0:
+            return
+        total: int = self.n + n
+        delta: float = media - self.media
+        delta_control: float = media_control - self.media_control
+        peso: float = self.n * n / total
+        self.media += delta * n / total
+        self.media_control += delta_control * n / total
+        self.m2 += m2 + delta * delta * peso
+        self.m2_control += m2_control + delta_control * delta_control * peso
+        self.comomento += comomento + delta * delta_control * peso
+        self.n = total
+
+    def agregar(self, observaciones: np.ndarray, control: Optional[np.ndarray] = None) -> None:
+        """
+        Agrega observaciones y, si hay variable de control, sus valores correspondientes.
+        """
+        observaciones = np.atleast_1d(np.asarray(observaciones, dtype=np.float64))
+        if observaciones.size == 0:
+            return
+        media: float = float(observaciones.mean())
+        desviaciones: np.ndarray = observaciones - media
+        if control is None or self.media_conocida is None:
+            self._fusionar(int(observaciones.size), media, float(np.dot(desviaciones, desviaciones)))
+            return
+        control = np.atleast_1d(np.asarray(control, dtype=np.float64))
+        media_control: float = float(control.mean())
+        desviaciones_control: np.ndarray = control - media_control
+        self._fusionar(
+            int(observaciones.size), media, float(np.dot(desviaciones, desviaciones)), media_control,
+            float(np.dot(desviaciones_control, desviaciones_control)), float(np.dot(desviaciones, desviaciones_control))
+        )
+
+    def combinar(self, otro: "Estimador") -> None:
+        """
+        Fusiona otro estimador en este.
+        """
+        if self.media_conocida is None:
+            self.media_conocida = otro.media_conocida
+        self._fusionar(otro.n, otro.media, otro.m2, otro.media_control, otro.m2_control, otro.comomento)
+
+    def coeficiente(self) -> float:
+        """
+        Coeficiente óptimo estimado de la variable de control (Cov(Y, C) / Var(C)).
+        """
+        if self.media_conocida is None or self.m2_control <= 0:
+            return 0.0
+        return self.comomento / self.m2_control
+
+    def estimacion(self) -> float:
+        """
+        Estimación de la media, corregida por la variable de control si la hay.
+        """
+        if self.media_conocida is None:
+            return self.media
+        return self.media - self.coeficiente() * (self.media_control - self.media_conocida)
+
+    def error_estandar(self) -> float:
+        """
+        Error estándar de la estimación. Con variable de control usa la varianza residual de la
+        regresión, que pierde un grado de libertad adicional por el coeficiente estimado.
+        """
+        if self.media_conocida is None or self.m2_control <= 0:
+            return math.sqrt(self.m2 / (self.n - 1) / self.n) if self.n > 1 else math.inf
+        residual: float = max(self.m2 - self.comomento * self.comomento / self.m2_control, 0.0)
+        return math.sqrt(residual / (self.n - 2) / self.n) if self.n > 2 else math.inf
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            "n": self.n,
+            "media": self.media,
+            "m2": self.m2,
+            "media_conocida": self.media_conocida,
+            "media_control": self.media_control,
+            "m2_control": self.m2_control,
+            "comomento": self.comomento,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "Estimador":
+        estimador: Estimador = cls(media_conocida=datos.get("media_conocida"))
+        estimador.n = datos["n"]
+        estimador.media = datos["media"]
+        estimador.m2 = datos["m2"]
+        estimador.media_control = datos.get("media_control", 0.0)
+        estimador.m2_control = datos.get("m2_control", 0.0)
+        estimador.comomento = datos.get("comomento", 0.0)
+        return estimador
+
+
+class Estadisticas:
+    """
+    Estadísticos acumulados y combinables de una serie de resultados.
+
+    Atributos:
+        n (int): Cantidad de valores.
+        media (float): Media de los valores.
+        m2 (float): Suma de cuadrados de las desviaciones respecto a la media.
+        minimo (float): Valor mínimo.
+        maximo (float): Valor máximo.
+        histograma (Histograma): Distribución de los valores.
+        estimador (Estimador | None): Momentos del estimador con reducción de varianza; None si
+            los resultados son independientes y la estimación es la media simple.
+    """
+
+    def __init__(self, max_bins: int = 64) -> None:
+        self.n: int = 0
+        self.media: float = 0.0
+        self.m2: float = 0.0
+        self.minimo: float = math.inf
+        self.maximo: float = -math.inf
+        self.histograma: Histograma = Histograma(max_bins=max_bins)
+        self.estimador: Optional[Estimador] = None
+
+    def _fusionar(self, n: int, media: float, m2: float, minimo: float, maximo: float) -> None:
+        """
+        Combina los momentos de otro conjunto con la fórmula de Chan et al.
+        """
+        if n == 0:
+            return
+        total: int = self.n + n
+        delta: float = media - self.media
+        self.media += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.minimo = min(self.minimo, minimo)
+        self.maximo = max(self.maximo, maximo)
+
+    def agregar(self, valores: Any, control: Any = None, media_control: Optional[float] = None,
+                antiteticas: bool = False) -> None:
+        """
+        Agrega un valor o un arreglo de valores. Con `antiteticas` los valores vienen en pares
+        antitéticos consecutivos y el estimador usa el promedio de cada par como observación; con
+        `control` y `media_control` el estimador corrige la media con esa variable de control.
+        """
+        valores = np.atleast_1d(np.asarray(valores, dtype=np.float64))
+        if valores.size == 0:
+            return
+        if self.estimador is None and (antiteticas or media_control is not None):
+            self.estimador = Estimador(media_conocida=media_control)
+            if media_control is None:
+                # Los resultados previos cuentan como observaciones independientes
+                self.estimador._fusionar(self.n, self.media, self.m2)
+        media: float = float(valores.mean())
+        m2: float = float(np.square(valores - media).sum())
+        self._fusionar(int(valores.size), media, m2, float(valores.min()), float(valores.max()))
+        self.histograma.agregar(valores)
+        if self.estimador is not None:
+            if control is not None:
+                control = np.atleast_1d(np.asarray(control, dtype=np.float64))
+            if antiteticas:
+                valores = promediar_pares(valores)
+                control = promediar_pares(control) if control is not None else None
+            self.estimador.agregar(valores, control)
+
+    def combinar(self, otra: "Estadisticas") -> None:
+        """
+        Fusiona otras estadísticas (por ejemplo, un agregado parcial de un consumidor).
+        """
+        if otra.estimador is not None and self.estimador is None:
+            self.estimador = Estimador(media_conocida=otra.estimador.media_conocida)
+            if otra.estimador.media_conocida is None:
+                self.estimador._fusionar(self.n, self.media, self.m2)
+        if self.estimador is not None:
+            if otra.estimador is not None:
+                self.estimador.combinar(otra.estimador)
+            elif self.estimador.media_conocida is None:
+                self.estimador._fusionar(otra.n, otra.media, otra.m2)
+        self._fusionar(otra.n, otra.media, otra.m2, otra.minimo, otra.maximo)
+        self.histograma.combinar(otra.histograma)
+
+    def estimacion(self) -> float:
+        """
+        Estimación de la media de los resultados según la técnica de muestreo usada.
+        """
+        return self.estimador.estimacion() if self.estimador is not None else self.media
+
+    def varianza(self) -> float:
+        """
+        Varianza poblacional (igual que `np.var`).
+        """
+        return self.m2 / self.n if self.n > 1 else 0.0
+
+    def desviacion(self) -> float:
+        """
+        Desviación estándar poblacional (igual que `np.std`).
+        """
+        return math.sqrt(self.varianza())
+
+    def error_estandar(self) -> float:
+        """
+        Error estándar de la estimación; sin reducción de varianza usa la varianza muestral (n - 1).
+        """
+        if self.estimador is not None:
+            return self.estimador.error_estandar()
+        return math.sqrt(self.m2 / (self.n - 1) / self.n) if self.n > 1 else math.inf
+
+    def semiamplitud(self, confianza: float = 0.95) -> float:
+        """
+        Semiamplitud del intervalo de confianza normal de la estimación al nivel `confianza`.
+        """
+        return NormalDist().inv_cdf(0.5 + confianza / 2) * self.error_estandar()
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            "n": self.n,
+            "media": self.media,
+            "m2": self.m2,
+            "minimo": self.minimo if self.n else None,
+            "maximo": self.maximo if self.n else None,
+            "histograma": self.histograma.a_dict(),
+            "estimador": self.estimador.a_dict() if self.estimador is not None else None,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "Estadisticas":
+        histograma: Histograma = Histograma.desde_dict(datos.get("histograma", {}))
+        estadisticas: Estadisticas = cls(max_bins=histograma.max_bins)
+        estadisticas.n = datos["n"]
+        estadisticas.media = datos["media"]
+        estadisticas.m2 = datos["m2"]
+        if estadisticas.n:
+            estadisticas.minimo = datos["minimo"]
+            estadisticas.maximo = datos["maximo"]
+        estadisticas.histograma = histograma
+        if datos.get("estimador") is not None:
+            estadisticas.estimador = Estimador.desde_dict(datos["estimador"])
+        return estadisticas
+
+    def codificar(self) -> bytes:
+        """
+        Serializa las estadísticas como mensaje JSON.
+        """
+        return json.dumps(self.a_dict()).encode("utf-8")
+
+    @classmethod
+    def decodificar(cls, cuerpo: bytes) -> "Estadisticas":
+        """
+        Reconstruye las estadísticas a partir de un mensaje JSON.
+        """
+        return cls.desde_dict(json.loads(cuerpo.decode("utf-8")))
+
+def _momentos(estimador: Estimador) -> List[Any]:
+    return [estimador.n, estimador.media, estimador.m2, estimador.media_control, estimador.m2_control, estimador.comomento]
+
+
+class EstadisticasBarrido:
+    """
+    Estimadores combinables de cada punto de un barrido de parámetros. Todos los puntos se evalúan
+    sobre los mismos escenarios que la configuración base (números aleatorios comunes), así que
+    la diferencia con la base se estima escenario a escenario y su error estándar es mucho menor
+    que el de comparar dos corridas independientes. La variable de control y los pares antitéticos
+    se aplican igual que a la salida principal.
+
+    Atributos:
+        puntos (list): Constantes que cambian en cada punto.
+        media_conocida (float | None): Esperanza conocida de la variable de control.
+        valores (list): Estimador de la salida principal en cada punto.
+        diferencias (list): Estimador de la diferencia de cada punto con la configuración base.
+    """
+
+    def __init__(self, puntos: List[Dict[str, Any]], media_conocida: Optional[float] = None) -> None:
+        self.puntos: List[Dict[str, Any]] = puntos
+        self.media_conocida: Optional[float] = media_conocida
+        self.valores: List[Estimador] = [Estimador(media_conocida) for _ in puntos]
+        self.diferencias: List[Estimador] = [Estimador(media_conocida) for _ in puntos]
+
+    def agregar(self, matriz: np.ndarray, base: Any, control: Any = None, antiteticas: bool = False) -> None:
+        """
+        Agrega un bloque de escenarios evaluado en todos los puntos. Los momentos de todos los puntos
+        se calculan juntos sobre la matriz y después se fusionan en cada estimador.
+
+        Argumentos:
+            matriz (np.ndarray): Resultados con una fila por punto y una columna por escenario.
+            base (Any): Resultados de los mismos escenarios con la configuración base.
+            control (Any): Valores de la variable de control de los escenarios, si la hay.
+            antiteticas (bool): Si los escenarios forman pares antitéticos consecutivos.
+        """
+        matriz = np.asarray(matriz, dtype=np.float64).reshape(len(self.puntos), -1)
+        if matriz.shape[1] == 0:
+            return
+        diferencias: np.ndarray = matriz - np.asarray(base, dtype=np.float64).reshape(1, -1)
+        if control is not None and self.media_conocida is not None:
+            control = np.atleast_1d(np.asarray(control, dtype=np.float64))
+        else:
+            control = None
+        if antiteticas:
+            matriz, diferencias = promediar_pares(matriz), promediar_pares(diferencias)
+            control = promediar_pares(control) if control is not None else None
+        for estimadores, observaciones in ((self.valores, matriz), (self.diferencias, diferencias)):
+            n: int = observaciones.shape[1]
+            medias: np.ndarray = observaciones.mean(axis=1)
+            desviaciones: np.ndarray = observaciones - medias[:, None]
+            m2: np.ndarray = np.einsum("ij,ij->i", desviaciones, desviaciones)
+            if control is None:
+                for estimador, media, suma in zip(estimadores, medias.tolist(), m2.tolist()):
+                    estimador._fusionar(n, media, suma)
+                continue
+            media_control: float = float(control.mean())
+            desviaciones_control: np.ndarray = control - media_control
+            m2_control: float = float(np.dot(desviaciones_control, desviaciones_control))
+            comomentos: np.ndarray = desviaciones @ desviaciones_control
+            for estimador, media, suma, comomento in zip(estimadores, medias.tolist(), m2.tolist(), comomentos.tolist()):
+                estimador._fusionar(n, media, suma, media_control, m2_control, comomento)
+
+    def combinar(self, otra: "EstadisticasBarrido") -> None:
+        """
+        Fusiona los estimadores de otro barrido con los mismos puntos.
+        """
+        if self.media_conocida is None:
+            self.media_conocida = otra.media_conocida
+        for propio, ajeno in zip(self.valores + self.diferencias, otra.valores + otra.diferencias):
+            propio.combinar(ajeno)
+
+    def resumen(self) -> List[Dict[str, Any]]:
+        """
+        Estimación y error estándar de cada punto y de su diferencia con la configuración base.
+        """
+        return [
+            {
+                "punto": punto,
+                "n": valor.n,
+                "media": valor.estimacion(),
+                "error_estandar": valor.error_estandar(),
+                "diferencia": diferencia.estimacion(),
+                "error_diferencia": diferencia.error_estandar(),
+            }
+            for punto, valor, diferencia in zip(self.puntos, self.valores, self.diferencias)
+        ]
+
+    def a_dict(self) -> Dict[str, Any]:
+        # Los momentos van en listas en lugar de diccionarios porque el barrido viaja en las cabeceras
+        return {
+            "puntos": self.puntos,
+            "media_conocida": self.media_conocida,
+            "valores": [_momentos(estimador) for estimador in self.valores],
+            "diferencias": [_momentos(estimador) for estimador in self.diferencias],
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "EstadisticasBarrido":
+        barrido: EstadisticasBarrido = cls(list(datos["puntos"]), datos.get("media_conocida"))
+        for estimador, (n, media, m2, media_control, m2_control, comomento) in zip(
+            barrido.valores + barrido.diferencias, list(datos["valores"]) + list(datos["diferencias"])
+        ):
+            estimador._fusionar(n, media, m2, media_control, m2_control, comomento)
+        return barrido
+
+
+def codificar_agregado(estadisticas: Estadisticas, salidas: Optional[Dict[str, Estadisticas]] = None) -> bytes:
+    """
+    Serializa el agregado de la salida principal junto con los de las salidas secundarias.
+
+    Argumentos:
+        estadisticas (Estadisticas): Estadísticas de la salida principal.
+        salidas (Optional[dict]): Nombre -> estadísticas de cada salida secundaria.
+
+    Retorna:
+        bytes: Mensaje JSON compatible con `Estadisticas.decodificar`.
+    """
+    datos: Dict[str, Any] = estadisticas.a_dict()
+    if salidas:
+        datos["salidas"] = {nombre: secundaria.a_dict() for nombre, secundaria in salidas.items()}
+    return json.dumps(datos).encode("utf-8")
+
+def decodificar_agregado(cuerpo: bytes) -> Tuple[Estadisticas, Dict[str, Estadisticas]]:
+    """
+    Reconstruye un agregado y los de sus salidas secundarias (vacío si no las tiene).
+    """
+    datos: Dict[str, Any] = json.loads(cuerpo.decode("utf-8"))
+    salidas: Dict[str, Estadisticas] = {
+        nombre: Estadisticas.desde_dict(secundaria) for nombre, secundaria in (datos.get("salidas") or {}).items()
+    }
+    return Estadisticas.desde_dict(datos), salidas
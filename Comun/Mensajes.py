@@ -0,0 +1,184 @@
+"""
+_____________________________________________________________________________________
+Módulo: Mensajes.py
+Descripción: Define el formato binario columnar que comparten el Productor, el
+Consumidor y el Visualizador para enviar bloques de escenarios o de resultados en un
+único mensaje de RabbitMQ.
+Estructura de un bloque:
+    1. Cabecera fija (little-endian): firma, versión, número de columnas, número de
+       filas y longitud de la sección de nombres.
+    2. Nombres de las columnas en UTF-8 separados por salto de línea, rellenados
+       hasta múltiplo de 8 bytes.
+    3. Una columna float64 contigua por cada nombre, en el mismo orden.
+Define también las unidades de trabajo por semilla: mensajes JSON pequeños que indican a un
+consumidor qué rango de escenarios debe generar localmente. Los agregados parciales de
+resultados (ver Comun/Estadisticas.py) se identifican con TIPO_CONTENIDO_AGREGADO. Los
+mensajes de control (progreso de una corrida y orden de detenerla) viajan en JSON por el
+exchange de control.
+_____________________________________________________________________________________
+"""
+import json
+import struct
+import numpy as np
+from typing import Any, Dict
+
+FIRMA_BLOQUE: bytes = b"MCBQ"
+VERSION_BLOQUE: int = 1
+TIPO_CONTENIDO_BLOQUE: str = "application/x-montecarlo-bloque"
+TIPO_CONTENIDO_JSON: str = "application/json"
+TIPO_CONTENIDO_UNIDAD: str = "application/x-montecarlo-unidad"
+TIPO_CONTENIDO_AGREGADO: str = "application/x-montecarlo-agregado"
+TIPO_CONTENIDO_CONTROL: str = "application/x-montecarlo-control"
+
+CONTROL_PROGRESO: str = "progreso"
+CONTROL_DETENER: str = "detener"
+
+_CABECERA: struct.Struct = struct.Struct("<4sBBHQI")
+_DTYPE: np.dtype = np.dtype("<f8")
+
+def _relleno(longitud: int) -> int:
+    """
+    Calcula los bytes de relleno necesarios para alinear `longitud` a 8 bytes.
+    """
+    return (-longitud) % 8
+
+def es_bloque(cuerpo: bytes) -> bool:
+    """
+    Indica si el cuerpo de un mensaje corresponde a un bloque binario.
+
+    Argumentos:
+        cuerpo (bytes): Contenido del mensaje recibido.
+
+    Retorna:
+        bool: True si el mensaje empieza con la firma del formato de bloque.
+    """
+    return cuerpo[:len(FIRMA_BLOQUE)] == FIRMA_BLOQUE
+
+def codificar_bloque(columnas: Dict[str, np.ndarray]) -> bytes:
+    """
+    Serializa un conjunto de columnas de igual longitud en el formato de bloque.
+
+    Argumentos:
+        columnas (dict): Diccionario nombre -> arreglo unidimensional de valores.
+
+    Retorna:
+        bytes: Mensaje listo para publicarse en RabbitMQ.
+    """
+    nombres = list(columnas)
+    filas: int = len(columnas[nombres[0]]) if nombres else 0
+    seccion_nombres: bytes = "\n".join(nombres).encode("utf-8")
+
+    partes = [
+        _CABECERA.pack(FIRMA_BLOQUE, VERSION_BLOQUE, 0, len(nombres), filas, len(seccion_nombres)),
+        seccion_nombres,
+        b"\0" * _relleno(_CABECERA.size + len(seccion_nombres)),
+    ]
+    for nombre in nombres:
+        valores = np.ascontiguousarray(columnas[nombre], dtype=_DTYPE)
+        if valores.shape != (filas,):
+            raise ValueError(f"La columna '{nombre}' no tiene {filas} filas.")
+        partes.append(valores.tobytes())
+    return b"".join(partes)
+
+def filas_bloque(cuerpo: bytes) -> int:
+    """
+    Lee de la cabecera la cantidad de filas de un bloque, sin decodificar sus columnas.
+
+    Argumentos:
+        cuerpo (bytes): Contenido del mensaje en formato de bloque.
+
+    Retorna:
+        int: Cantidad de escenarios del bloque.
+    """
+    firma, _, _, _, filas, _ = _CABECERA.unpack_from(cuerpo, 0)
+    if firma != FIRMA_BLOQUE:
+        raise ValueError("El mensaje no es un bloque de escenarios.")
+    return filas
+
+def decodificar_bloque(cuerpo: bytes) -> Dict[str, np.ndarray]:
+    """
+    Reconstruye las columnas de un bloque sin copiar los datos (vistas de solo lectura
+    sobre el buffer del mensaje obtenidas con `np.frombuffer`).
+
+    Argumentos:
+        cuerpo (bytes): Contenido del mensaje en formato de bloque.
+
+    Retorna:
+        dict: Diccionario nombre -> arreglo float64 con los valores de la columna.
+    """
+    firma, version, _, num_columnas, filas, long_nombres = _CABECERA.unpack_from(cuerpo, 0)
+    if firma != FIRMA_BLOQUE:
+        raise ValueError("El mensaje no es un bloque de escenarios.")
+    if version != VERSION_BLOQUE:
+        raise ValueError(f"Versión de bloque no soportada: {version}.")
+
+    desplazamiento: int = _CABECERA.size
+    texto: str = bytes(cuerpo[desplazamiento:desplazamiento + long_nombres]).decode("utf-8")
+    nombres = texto.split("\n") if num_columnas else []
+    desplazamiento += long_nombres + _relleno(desplazamiento + long_nombres)
+
+    columnas: Dict[str, np.ndarray] = {}
+    for nombre in nombres:
+        columnas[nombre] = np.frombuffer(cuerpo, dtype=_DTYPE, count=filas, offset=desplazamiento)
+        desplazamiento += filas * _DTYPE.itemsize
+    return columnas
+
+def codificar_unidad(corrida: str, entropia: int, inicio: int, cantidad: int) -> bytes:
+    """
+    Serializa una unidad de trabajo: el consumidor genera `cantidad` escenarios a partir del
+    índice `inicio` usando la entropía de la corrida.
+
+    Argumentos:
+        corrida (str): Identificador de la corrida.
+        entropia (int): Entropía de la `SeedSequence` de la corrida.
+        inicio (int): Índice del primer escenario del rango.
+        cantidad (int): Cantidad de escenarios del rango.
+
+    Retorna:
+        bytes: Mensaje JSON listo para publicarse.
+    """
+    unidad: Dict[str, Any] = {
+        "corrida": corrida,
+        "entropia": entropia,
+        "inicio": inicio,
+        "cantidad": cantidad,
+    }
+    return json.dumps(unidad).encode("utf-8")
+
+def decodificar_unidad(cuerpo: bytes) -> Dict[str, Any]:
+    """
+    Reconstruye una unidad de trabajo a partir del cuerpo del mensaje.
+
+    Argumentos:
+        cuerpo (bytes): Contenido del mensaje JSON.
+
+    Retorna:
+        dict: Diccionario con las llaves corrida, entropia, inicio y cantidad.
+    """
+    return json.loads(cuerpo.decode("utf-8"))
+
+def codificar_control(tipo: str, corrida: str | None, **datos: Any) -> bytes:
+    """
+    Serializa un mensaje de control de una corrida.
+
+    Argumentos:
+        tipo (str): CONTROL_PROGRESO o CONTROL_DETENER.
+        corrida (str | None): Identificador de la corrida a la que se refiere el mensaje.
+        **datos: Campos adicionales (por ejemplo, las estadísticas parciales o el motivo).
+
+    Retorna:
+        bytes: Mensaje JSON listo para publicarse.
+    """
+    return json.dumps({"tipo": tipo, "corrida": corrida, **datos}).encode("utf-8")
+
+def decodificar_control(cuerpo: bytes) -> Dict[str, Any]:
+    """
+    Reconstruye un mensaje de control a partir del cuerpo del mensaje.
+
+    Argumentos:
+        cuerpo (bytes): Contenido del mensaje JSON.
+
+    Retorna:
+        dict: Diccionario con las llaves tipo y corrida, y los campos adicionales.
+    """
+    return json.loads(cuerpo.decode("utf-8"))
@@ -0,0 +1,235 @@
+"""
+_____________________________________________________________________________________
+Módulo: Metricas.py
+Descripción: Métricas de bajo costo de los componentes, expuestas por HTTP en el formato
+de texto de Prometheus.
+    1. Contadores e histogramas guardan sus valores en celdas propias de cada hilo, así
+       que registrar una observación en el camino crítico es una suma sobre una lista sin
+       bloqueos; las celdas de todos los hilos se suman solo al consultar las métricas.
+    2. Los indicadores guardan el último valor establecido o se calculan con una función
+       en el momento de la consulta (por ejemplo, una tasa o la profundidad de una cola).
+    3. `ServidorMetricas` atiende GET /metrics desde un hilo propio.
+_____________________________________________________________________________________
+"""
+import math
+import time
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Límites (en segundos) de los histogramas de latencia, de 10 µs a 10 s
+LIMITES_LATENCIA: tuple = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+TIPO_CONTENIDO_PROMETHEUS: str = "text/plain; version=0.0.4; charset=utf-8"
+
+def _formatear(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+class _Celdas:
+    """
+    Valores de una métrica separados por hilo: cada hilo escribe solo en su celda.
+    """
+    def __init__(self, tamano: int) -> None:
+        self._tamano: int = tamano
+        self._local: threading.local = threading.local()
+        self._celdas: List[List[float]] = []
+        self._bloqueo: threading.Lock = threading.Lock()
+
+    def celda(self) -> List[float]:
+        try:
+            return self._local.celda
+        except AttributeError:
+            celda: List[float] = [0.0] * self._tamano
+            with self._bloqueo:
+                self._celdas.append(celda)
+            self._local.celda = celda
+            return celda
+
+    def sumar(self) -> List[float]:
+        with self._bloqueo:
+            celdas: List[List[float]] = list(self._celdas)
+        return [sum(celda[i] for celda in celdas) for i in range(self._tamano)]
+
+class Contador:
+    """
+    Contador monótono.
+    """
+    tipo: str = "counter"
+
+    def __init__(self, nombre: str, ayuda: str) -> None:
+        self.nombre: str = nombre
+        self.ayuda: str = ayuda
+        self._celdas: _Celdas = _Celdas(1)
+
+    def incrementar(self, valor: float = 1) -> None:
+        self._celdas.celda()[0] += valor
+
+    def valor(self) -> float:
+        return self._celdas.sumar()[0]
+
+    def muestras(self) -> List[str]:
+        return [f"{self.nombre} {_formatear(self.valor())}"]
+
+class HistogramaMetrica:
+    """
+    Histograma de observaciones con límites fijos (acumulados al exponerse, como en Prometheus).
+    """
+    tipo: str = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, limites: Sequence[float] = LIMITES_LATENCIA) -> None:
+        self.nombre: str = nombre
+        self.ayuda: str = ayuda
+        self.limites: tuple = tuple(sorted(limites))
+        # Un conteo por límite, uno para +Inf y la suma de las observaciones
+        self._celdas: _Celdas = _Celdas(len(self.limites) + 2)
+
+    def observar(self, valor: float) -> None:
+        celda: List[float] = self._celdas.celda()
+        celda[bisect_left(self.limites, valor)] += 1
+        celda[-1] += valor
+
+    def muestras(self) -> List[str]:
+        valores: List[float] = self._celdas.sumar()
+        lineas: List[str] = []
+        acumulado: float = 0.0
+        for limite, conteo in zip(self.limites + (math.inf,), valores[:-1]):
+            acumulado += conteo
+            lineas.append(f'{self.nombre}_bucket{{le="{_formatear(limite)}"}} {_formatear(acumulado)}')
+        lineas.append(f"{self.nombre}_sum {_formatear(valores[-1])}")
+        lineas.append(f"{self.nombre}_count {_formatear(acumulado)}")
+        return lineas
+
+class Indicador:
+    """
+    Valor instantáneo: el último establecido o el que devuelve `funcion` al consultarse.
+    """
+    tipo: str = "gauge"
+
+    def __init__(self, nombre: str, ayuda: str, funcion: Optional[Callable[[], float]] = None) -> None:
+        self.nombre: str = nombre
+        self.ayuda: str = ayuda
+        self.funcion: Optional[Callable[[], float]] = funcion
+        self._valor: float = 0.0
+
+    def establecer(self, valor: float) -> None:
+        self._valor = valor
+
+    def valor(self) -> float:
+        return float(self.funcion()) if self.funcion is not None else self._valor
+
+    def muestras(self) -> List[str]:
+        return [f"{self.nombre} {_formatear(self.valor())}"]
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas de un componente.
+    """
+    def __init__(self) -> None:
+        self.metricas: Dict[str, Any] = {}
+
+    def _registrar(self, metrica: Any) -> Any:
+        if metrica.nombre in self.metricas:
+            raise ValueError(f"La métrica '{metrica.nombre}' ya está registrada.")
+        self.metricas[metrica.nombre] = metrica
+        return metrica
+
+    def contador(self, nombre: str, ayuda: str) -> Contador:
+        return self._registrar(Contador(nombre, ayuda))
+
+    def histograma(self, nombre: str, ayuda: str, limites: Sequence[float] = LIMITES_LATENCIA) -> HistogramaMetrica:
+        return self._registrar(HistogramaMetrica(nombre, ayuda, limites))
+
+    def indicador(self, nombre: str, ayuda: str, funcion: Optional[Callable[[], float]] = None) -> Indicador:
+        return self._registrar(Indicador(nombre, ayuda, funcion))
+
+    def exponer(self) -> str:
+        """
+        Texto de todas las métricas en el formato de exposición de Prometheus.
+        """
+        lineas: List[str] = []
+        for metrica in list(self.metricas.values()):
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            lineas.extend(metrica.muestras())
+        return "\n".join(lineas) + "\n"
+
+class Tasa:
+    """
+    Tasa de crecimiento de un total entre dos consultas consecutivas, para indicadores calculados.
+    """
+    def __init__(self, total: Callable[[], float]) -> None:
+        self.total: Callable[[], float] = total
+        self._anterior: float = total()
+        self._instante: float = time.monotonic()
+
+    def __call__(self) -> float:
+        actual, ahora = self.total(), time.monotonic()
+        tasa: float = (actual - self._anterior) / (ahora - self._instante) if ahora > self._instante else 0.0
+        self._anterior, self._instante = actual, ahora
+        return tasa
+
+class ServidorMetricas(threading.Thread):
+    """
+    Servidor HTTP que expone un registro de métricas en /metrics.
+    """
+    def __init__(self, registro: RegistroMetricas, puerto: int, host: str = "127.0.0.1") -> None:
+        """
+        Abre el puerto; las peticiones se atienden al iniciar el hilo.
+
+        Argumentos:
+            registro (RegistroMetricas): Métricas expuestas.
+            puerto (int): Puerto HTTP (0 elige uno libre).
+            host (str): Interfaz de escucha; por defecto solo la local.
+        """
+        super().__init__(name="ServidorMetricas", daemon=True)
+        self.registro: RegistroMetricas = registro
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(manejador) -> None:
+                if manejador.path.split("?")[0] not in ("/", "/metrics"):
+                    manejador.send_error(404)
+                    return
+                cuerpo: bytes = registro.exponer().encode("utf-8")
+                manejador.send_response(200)
+                manejador.send_header("Content-Type", TIPO_CONTENIDO_PROMETHEUS)
+                manejador.send_header("Content-Length", str(len(cuerpo)))
+                manejador.end_headers()
+                manejador.wfile.write(cuerpo)
+
+            def log_message(manejador, formato: str, *argumentos: Any) -> None:
+                pass
+
+        self.servidor: ThreadingHTTPServer = ThreadingHTTPServer((host, puerto), Manejador)
+        self.servidor.daemon_threads = True
+        self.puerto: int = self.servidor.server_address[1]
+
+    def run(self) -> None:
+        self.servidor.serve_forever()
+
+    def cerrar(self) -> None:
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+def iniciar_servidor(registro: RegistroMetricas, puerto: Optional[int], host: str = "127.0.0.1") -> Optional[ServidorMetricas]:
+    """
+    Inicia el servidor de métricas si se indicó un puerto.
+
+    Argumentos:
+        registro (RegistroMetricas): Métricas expuestas.
+        puerto (Optional[int]): Puerto HTTP; None no inicia el servidor.
+        host (str): Interfaz de escucha.
+
+    Retorna:
+        Optional[ServidorMetricas]: Servidor iniciado, o None.
+    """
+    if puerto is None:
+        return None
+    servidor: ServidorMetricas = ServidorMetricas(registro, puerto, host)
+    servidor.start()
+    print(f"[METRICAS] Métricas en http://{host}:{servidor.puerto}/metrics")
+    return servidor
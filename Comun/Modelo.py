@@ -0,0 +1,361 @@
+"""
+_____________________________________________________________________________________
+Modelo: Modelo.py
+Descripción: Define y generar escenarios de simulación o experimentación estadística,
+usando variables aleatorias configuradas por el usuario en un archivo JSON.
+Funciones clave: 
+    1. Lee configuración desde un archivo JSON
+    2. Configura los atributos del modelo.
+    3. Obtiene configuración básica del modelo.
+    4. Genera escenarios aleatorios, uno a uno o en bloques vectorizados (un arreglo por variable).
+    5. Obtiene las variables definidas del modelo.
+    6. Construye generadores reproducibles para rangos de escenarios (unidades de trabajo).
+_____________________________________________________________________________________
+"""
+import numpy as np
+import json
+import itertools
+from typing import Dict, Any, List, Optional, Tuple
+from Muestreo import METODO_LHS, METODO_PSEUDOALEATORIO, crear_secuencia
+from Distribuciones import VariableCompilada, compilar_plan
+
+# Llaves de la configuración difundida que no son constantes de la fórmula
+CLAVES_RESERVADAS: tuple = ("formula", "variables", "corrida", "parada", "reduccion_varianza", "muestreo", "salidas", "barrido")
+
+# Nombre de la salida principal cuando el modelo la define con "formula"
+SALIDA_PRINCIPAL: str = "resultado"
+
+def generador_para_rango(entropia: int, inicio: int) -> np.random.Generator:
+    """
+    Construye el generador de números aleatorios de un rango de escenarios. El flujo depende
+    solo de la entropía de la corrida y del índice inicial del rango, por lo que cualquier
+    proceso puede regenerar exactamente los mismos escenarios.
+
+    Argumentos:
+        entropia (int): Entropía de la `SeedSequence` de la corrida.
+        inicio (int): Índice del primer escenario del rango.
+
+    Retorna:
+        np.random.Generator: Generador independiente para ese rango.
+    """
+    return np.random.default_rng(np.random.SeedSequence(entropia, spawn_key=(inicio,)))
+
+def expandir_barrido(barrido: Any, constantes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Convierte la definición de un barrido de parámetros en la lista de sus puntos. Se acepta una
+    lista de puntos ({"puntos": [{"tasa": 0.05}, {"tasa": 0.06}]}, o directamente la lista) o una
+    rejilla ({"rejilla": {"tasa": [0.05, 0.06], "costo": [10, 20]}}), cuyo producto cartesiano
+    da los puntos. Cada punto solo indica las constantes que cambian respecto a la configuración base.
+
+    Argumentos:
+        barrido (Any): Valor de "barrido" en el archivo JSON.
+        constantes (Dict[str, Any]): Constantes base del modelo.
+
+    Retorna:
+        list: Un diccionario nombre -> valor por punto, en orden.
+    """
+    if isinstance(barrido, list):
+        puntos: List[Dict[str, Any]] = [dict(punto) for punto in barrido]
+    elif "rejilla" in barrido:
+        rejilla: Dict[str, List[Any]] = barrido["rejilla"]
+        puntos = [dict(zip(rejilla, valores)) for valores in itertools.product(*rejilla.values())]
+    else:
+        puntos = [dict(punto) for punto in barrido.get("puntos", [])]
+    desconocidas: set = {nombre for punto in puntos for nombre in punto} - set(constantes)
+    if desconocidas:
+        raise ValueError(f"El barrido usa constantes que el modelo no define: {', '.join(sorted(desconocidas))}.")
+    return puntos
+
+def _intercalar(primeros: np.ndarray, reflejados: np.ndarray, n: int) -> np.ndarray:
+    """
+    Intercala dos arreglos (a0, b0, a1, b1, ...) y recorta el resultado a `n` valores.
+    """
+    v: np.ndarray = np.empty(2 * primeros.size, dtype=np.float64)
+    v[0::2] = primeros
+    v[1::2] = reflejados
+    return v[:n]
+
+class Modelo:
+    def __init__(self, ruta_modelo: str) -> None:
+        """
+        Inicializa una instancia del modelo leyendo la configuración desde un archivo JSON.
+
+        Argumentos:   
+            ruta_modelo (str): Ruta al archivo JSON que contiene la configuración del modelo.
+
+        Atributos:
+            self.configuracion_modelo (Dict[str, Any]): Diccionario con los datos del archivo JSON.
+            self.formula (Optional[str]): Fórmula para evaluar el modelo.
+            self.salidas (Dict[str, str]): Salidas con nombre que se evalúan juntas (nombre -> expresión),
+                empezando por la principal; vacío si el modelo solo define "formula". Con "formula" y
+                "salidas" a la vez, la fórmula es la salida principal ("resultado") y las demás se añaden.
+            self.iteraciones (Optional[int]): Cantidad de iteraciones para la simulación.
+            self.num_variables (Optional[int]): Número de variables aleatorias.
+            self.constantes (Optional[Dict[str, Any]]): Constantes del modelo.
+            self.variables (Optional[Dict[str, Any]]): Definiciones de las variables aleatorias.
+            self.parada (Optional[Dict[str, Any]]): Criterio de parada anticipada (precision,
+                confianza, tiempo_maximo, minimo_escenarios); None ejecuta todas las iteraciones.
+            self.reduccion_varianza (Dict[str, Any]): Técnicas de reducción de varianza: "antiteticas"
+                (bool) y "control" ({"expresion", "media"} de la variable de control).
+            self.muestreo (Dict[str, Any]): Método de muestreo: {"metodo": "pseudoaleatorio" | "sobol" |
+                "halton" | "lhs"}; el hipercubo latino incluye además el "total" de escenarios.
+            self.barrido (List[Dict[str, Any]]): Puntos del barrido de parámetros (constantes que cambian
+                en cada uno); vacío si el modelo no define barrido.
+            self.plan (Tuple[VariableCompilada, ...]): Variables compiladas una sola vez en un plan de
+                muestreo inmutable (ver Distribuciones.py), con tablas de alias para las discretas.
+        """
+        try:
+            with open(ruta_modelo, "r") as modelo:
+                self.configuracion_modelo: Dict[str, Any] = json.load(modelo)
+            self.formula: Optional[str] = None
+            self.salidas: Dict[str, str] = {}
+            self.iteraciones: Optional[int] = None
+            self.num_variables: Optional[int] = None
+            self.constantes: Optional[Dict[str, Any]] = None
+            self.variables: Optional[Dict[str, Any]] = None
+            self.parada: Optional[Dict[str, Any]] = None
+            self.reduccion_varianza: Dict[str, Any] = {}
+            self.muestreo: Dict[str, Any] = {}
+            self.barrido: List[Dict[str, Any]] = []
+            self.plan: Tuple[VariableCompilada, ...] = ()
+            self._secuencias: Dict[int, Any] = {}
+        except FileNotFoundError:
+            print(f"ERROR: El archivo {ruta_modelo} no existe.")
+        except json.JSONDecodeError:
+            print(f"ERROR: El archivo {ruta_modelo} no cumple con el formato JSON.")
+
+    @classmethod
+    def desde_variables(cls, variables: Dict[str, Any],
+                        reduccion_varianza: Optional[Dict[str, Any]] = None,
+                        muestreo: Optional[Dict[str, Any]] = None) -> "Modelo":
+        """
+        Crea un modelo sin archivo JSON a partir de las definiciones de variables, por ejemplo
+        las recibidas en la configuración difundida por el productor.
+
+        Argumentos:
+            variables (Dict[str, Any]): Definiciones de las variables aleatorias.
+            reduccion_varianza (Optional[Dict[str, Any]]): Técnicas de reducción de varianza.
+            muestreo (Optional[Dict[str, Any]]): Método de muestreo.
+
+        Retorna:
+            Modelo: Instancia lista para generar escenarios.
+        """
+        modelo: Modelo = cls.__new__(cls)
+        modelo.configuracion_modelo = {"variables": variables}
+        modelo.formula = None
+        modelo.salidas = {}
+        modelo.iteraciones = None
+        modelo.num_variables = len(variables)
+        modelo.constantes = None
+        modelo.variables = variables
+        modelo.parada = None
+        modelo.reduccion_varianza = reduccion_varianza or {}
+        modelo.muestreo = muestreo or {}
+        modelo.barrido = []
+        modelo._secuencias = {}
+        modelo.plan = compilar_plan(variables)
+        return modelo
+
+    def configurar_modelo(self) -> None:
+        """
+        Asigna los valores de configuración del modelo desde el archivo JSON a los 
+        atributos internos de la clase.
+        """
+        salidas: Dict[str, str] = dict(self.configuracion_modelo.get("salidas") or {})
+        if "formula" in self.configuracion_modelo or not salidas:
+            self.formula = self.configuracion_modelo["formula"]
+            if SALIDA_PRINCIPAL in salidas:
+                raise ValueError(f"La salida '{SALIDA_PRINCIPAL}' ya es la fórmula del modelo.")
+            self.salidas = {SALIDA_PRINCIPAL: self.formula, **salidas} if salidas else {}
+        else:
+            self.formula = next(iter(salidas.values()))
+            self.salidas = salidas
+        self.iteraciones = self.configuracion_modelo["iteraciones"]
+        self.num_variables = self.configuracion_modelo["num_variables"]
+        self.constantes = self.configuracion_modelo["constantes"]
+        repetidas: List[str] = [nombre for nombre in self.salidas if nombre in self.constantes]
+        if repetidas:
+            raise ValueError(f"Salidas con el nombre de una constante del modelo: {', '.join(repetidas)}.")
+        self.variables = self.configuracion_modelo["variables"]
+        self.plan = compilar_plan(self.variables)
+        self.parada = self.configuracion_modelo.get("parada")
+        self.reduccion_varianza = self.configuracion_modelo.get("reduccion_varianza") or {}
+        if self.antiteticas and self.iteraciones % 2:
+            # Los pares antitéticos no deben quedar incompletos
+            self.iteraciones += 1
+        self.muestreo = dict(self.configuracion_modelo.get("muestreo") or {})
+        if self.metodo_muestreo == METODO_LHS:
+            self.muestreo["total"] = self.iteraciones
+        barrido: Any = self.configuracion_modelo.get("barrido")
+        self.barrido = expandir_barrido(barrido, self.constantes) if barrido else []
+
+    def obtener_configuracion(self) -> Dict[str, Any]:
+        """
+        Obtiene la configuración del modelo que incluye la fórmula, las constantes y las
+        definiciones de las variables (para que los consumidores puedan generar escenarios),
+        además de las salidas con nombre, del criterio de parada, de la reducción de varianza, del método de muestreo y de
+        los puntos del barrido de parámetros si el modelo los define.
+        
+        Retorna:
+            dict: Diccionario con la fórmula, constantes y variables del modelo.
+        """
+        configuracion: Dict[str, Any] = {
+            "formula": self.formula,
+            **self.constantes,
+            "variables": self.variables
+        }
+        if self.salidas:
+            configuracion["salidas"] = self.salidas
+        if self.parada:
+            configuracion["parada"] = self.parada
+        if self.reduccion_varianza:
+            configuracion["reduccion_varianza"] = self.reduccion_varianza
+        if self.muestreo:
+            configuracion["muestreo"] = self.muestreo
+        if self.barrido:
+            configuracion["barrido"] = self.barrido
+        return configuracion
+
+    @property
+    def metodo_muestreo(self) -> str:
+        """
+        Método de muestreo de los escenarios ("pseudoaleatorio" por defecto).
+        """
+        return self.muestreo.get("metodo", METODO_PSEUDOALEATORIO)
+
+    @property
+    def antiteticas(self) -> bool:
+        """
+        Indica si los escenarios se generan en pares antitéticos.
+        """
+        return bool(self.reduccion_varianza.get("antiteticas"))
+            
+    def obtener_variables(self) -> Dict[str, Any]:
+        """
+        Retorna las definiciones de las variables aleatorias del modelo.        
+        
+        Retorna:
+            dict: Diccionario con las variables y sus distribuciones asociadas.
+        """
+        return self.variables
+
+    def generar_escenarios(self, rng: np.random.Generator, n: int, inicio: int = 0,
+                           entropia: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Genera un bloque de `n` escenarios aleatorios de forma vectorizada recorriendo el plan de
+        muestreo compilado: cada variable se muestrea con una sola llamada a su distribución.
+        Con variables antitéticas, los escenarios 2i y 2i+1 forman un par: las variables continuas
+        del segundo se reflejan respecto al centro de su distribución (o se invierten con 1 - u) antes
+        de aplicar los límites, y las discretas se comparten. Con los métodos de baja discrepancia
+        delega en `generar_por_cuantiles`.
+
+        Argumentos:
+            rng (np.random.Generator): Generador de números aleatorios de NumPy.
+            n (int): Cantidad de escenarios a generar.
+            inicio (int): Índice del primer escenario del bloque dentro de la corrida.
+            entropia (Optional[int]): Entropía de la corrida; obligatoria con los métodos de baja discrepancia.
+
+        Retorna:
+            dict: Diccionario con un arreglo float64 de longitud `n` por cada variable.
+        """
+        if self.metodo_muestreo != METODO_PSEUDOALEATORIO:
+            return self.generar_por_cuantiles(rng, n, inicio, entropia)
+
+        antiteticas: bool = self.antiteticas
+        base: int = (n + 1) // 2 if antiteticas else n
+        escenarios: Dict[str, np.ndarray] = {}
+        for nombre, distribucion, parametros in self.plan:
+            if not antiteticas:
+                v = distribucion.muestrear(rng, parametros, n)
+            elif distribucion.discreta:
+                v = np.repeat(distribucion.muestrear(rng, parametros, base), 2)[:n]
+            elif distribucion.reflejar is not None:
+                v = distribucion.muestrear(rng, parametros, base)
+                v = _intercalar(v, distribucion.reflejar(parametros, v), n)
+            elif distribucion.cuantil is not None:
+                u: np.ndarray = rng.random(base)
+                v = _intercalar(distribucion.cuantil(parametros, u), distribucion.cuantil(parametros, 1 - u), n)
+            else:
+                # Sin reflexión ni cuantil, los dos escenarios del par son independientes
+                v = distribucion.muestrear(rng, parametros, n)
+            v = np.asarray(v, dtype=np.float64)
+            if distribucion.ajustar is not None:
+                v = distribucion.ajustar(parametros, v)
+            escenarios[nombre] = v
+
+        return escenarios
+
+    def obtener_secuencia(self, entropia: int) -> Any:
+        """
+        Devuelve (y guarda para los siguientes bloques) la secuencia de baja discrepancia de la corrida.
+
+        Argumentos:
+            entropia (int): Entropía de la corrida, de la que depende la aleatorización.
+
+        Retorna:
+            Sobol | Halton | HipercuboLatino: Secuencia con una dimensión por variable.
+        """
+        if entropia not in self._secuencias:
+            sin_cuantil = [nombre for nombre, distribucion, _ in self.plan if distribucion.cuantil is None]
+            if sin_cuantil:
+                raise ValueError(f"El muestreo '{self.metodo_muestreo}' requiere distribuciones con cuantil; "
+                                 f"no lo tienen: {', '.join(sin_cuantil)}.")
+            total: Optional[int] = self.muestreo.get("total")
+            if total is not None and self.antiteticas:
+                total = (total + 1) // 2
+            self._secuencias[entropia] = crear_secuencia(self.metodo_muestreo, len(self.variables), entropia, total)
+        return self._secuencias[entropia]
+
+    def generar_por_cuantiles(self, rng: np.random.Generator, n: int, inicio: int,
+                              entropia: Optional[int]) -> Dict[str, np.ndarray]:
+        """
+        Genera los escenarios inicio, ..., inicio + n - 1 de una secuencia de baja discrepancia (o de un
+        hipercubo latino), con una dimensión por variable. Los puntos solo dependen de la entropía y del
+        índice, por lo que rangos disjuntos generados en procesos distintos forman una única secuencia.
+        Con variables antitéticas, el punto u del par i produce los escenarios 2i (u) y 2i+1 (1 - u en las
+        variables continuas).
+
+        Argumentos:
+            rng (np.random.Generator): Generador del rango (posición dentro de los estratos del hipercubo latino).
+            n (int): Cantidad de escenarios a generar.
+            inicio (int): Índice del primer escenario (par en modo antitético).
+            entropia (Optional[int]): Entropía de la corrida.
+
+        Retorna:
+            dict: Diccionario con un arreglo float64 de longitud `n` por cada variable.
+        """
+        if entropia is None:
+            raise ValueError(f"El muestreo '{self.metodo_muestreo}' requiere la entropía de la corrida.")
+        antiteticas: bool = self.antiteticas
+        base: int = (n + 1) // 2 if antiteticas else n
+        inicio_base: int = inicio // 2 if antiteticas else inicio
+        secuencia = self.obtener_secuencia(entropia)
+        if self.metodo_muestreo == METODO_LHS:
+            puntos: np.ndarray = secuencia.puntos(inicio_base, base, rng)
+        else:
+            puntos = secuencia.puntos(inicio_base, base)
+
+        escenarios: Dict[str, np.ndarray] = {}
+        for d, (nombre, distribucion, parametros) in enumerate(self.plan):
+            u: np.ndarray = puntos[:, d]
+            if antiteticas:
+                u = np.repeat(u, 2)[:n] if distribucion.discreta else _intercalar(u, 1 - u, n)
+            v: np.ndarray = np.asarray(distribucion.cuantil(parametros, u), dtype=np.float64)
+            if distribucion.ajustar is not None:
+                v = distribucion.ajustar(parametros, v)
+            escenarios[nombre] = v
+        return escenarios
+
+    def generar_escenario(self, rng: np.random.Generator) -> Dict[str, float]:
+        """
+        Genera un escenario aleatorio con base en las distribuciones de las variables.
+        Se mantiene por compatibilidad y delega en `generar_escenarios` con un bloque de uno.
+        
+        Argumentos:
+            rng (np.random.Generator): Generador de números aleatorios de NumPy.
+        
+        Retorna:
+            dict: Diccionario con los valores simulados para cada variable.
+        """
+        bloque: Dict[str, np.ndarray] = self.generar_escenarios(rng=rng, n=1)
+        return {nombre: float(valores[0]) for nombre, valores in bloque.items()}
@@ -0,0 +1,342 @@
+"""
+_____________________________________________________________________________________
+Módulo: Muestreo.py
+Descripción: Métodos de muestreo de baja discrepancia para el Modelo, implementados con
+NumPy. Cada método entrega puntos en el hipercubo unitario (0, 1)^d que el Modelo lleva
+a las distribuciones de las variables con sus funciones de distribución inversas.
+Contiene:
+    1. Sobol: secuencia de Sobol (números de dirección de Joe y Kuo) con aleatorización
+       lineal de matriz y desplazamiento digital.
+    2. Halton: secuencia de Halton con permutaciones aleatorias de los dígitos.
+    3. HipercuboLatino: diseño de hipercubo latino; el estrato de cada índice se obtiene
+       con una permutación pseudoaleatoria evaluable índice por índice (red de Feistel).
+    4. normal_inversa: inversa de la función de distribución normal estándar.
+Todos los puntos dependen solo de la entropía de la corrida y del índice del escenario,
+así que el espacio de índices se puede repartir en rangos disjuntos entre trabajadores
+del Productor o consumidores sin coordinación: el rango [inicio, inicio + cantidad)
+produce siempre los mismos puntos.
+_____________________________________________________________________________________
+"""
+import numpy as np
+from typing import List, Optional, Tuple
+
+METODO_PSEUDOALEATORIO: str = "pseudoaleatorio"
+METODO_SOBOL: str = "sobol"
+METODO_HALTON: str = "halton"
+METODO_LHS: str = "lhs"
+
+# Bits de precisión de los puntos (un float64 representa exactamente k / 2**52 + 2**-53)
+BITS: int = 52
+
+# Clave de aleatorización; no coincide con ningún índice de rango de `generador_para_rango`
+_CLAVE_ALEATORIZACION: int = 2**64 - 1
+
+# Números de dirección de Joe y Kuo (new-joe-kuo-6.21201) para las dimensiones 2 a 21:
+# grado s del polinomio primitivo, coeficientes intermedios a y valores iniciales m_1..m_s
+_DIRECCIONES_SOBOL: List[Tuple[int, int, Tuple[int, ...]]] = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+]
+
+def generador_aleatorizacion(entropia: int, dimension: int) -> np.random.Generator:
+    """
+    Construye el generador con el que se aleatoriza una dimensión de la secuencia. Todos los
+    procesos de la corrida obtienen la misma aleatorización a partir de la entropía.
+
+    Argumentos:
+        entropia (int): Entropía de la `SeedSequence` de la corrida.
+        dimension (int): Dimensión (variable) que se aleatoriza.
+
+    Retorna:
+        np.random.Generator: Generador independiente de los de los rangos de escenarios.
+    """
+    return np.random.default_rng(np.random.SeedSequence(entropia, spawn_key=(_CLAVE_ALEATORIZACION, dimension)))
+
+def _a_unitario(enteros: np.ndarray) -> np.ndarray:
+    """
+    Convierte enteros de `BITS` bits en puntos del intervalo abierto (0, 1).
+    """
+    return (enteros.astype(np.float64) + 0.5) * 2.0 ** -BITS
+
+class Sobol:
+    """
+    Secuencia de Sobol aleatorizada. El punto i es el XOR de los números de dirección de los
+    bits de i, por lo que se calcula directamente para cualquier rango de índices.
+
+    Atributos:
+        dimensiones (int): Cantidad de coordenadas de cada punto (máximo 21).
+        direcciones (np.ndarray): Números de dirección aleatorizados, de forma (dimensiones, BITS).
+        desplazamientos (np.ndarray): Desplazamiento digital de cada dimensión.
+    """
+
+    def __init__(self, dimensiones: int, entropia: int) -> None:
+        if dimensiones > len(_DIRECCIONES_SOBOL) + 1:
+            raise ValueError(f"Sobol admite a lo más {len(_DIRECCIONES_SOBOL) + 1} variables.")
+        self.dimensiones: int = dimensiones
+        self.direcciones: np.ndarray = np.empty((dimensiones, BITS), dtype=np.uint64)
+        self.desplazamientos: np.ndarray = np.empty(dimensiones, dtype=np.uint64)
+        for d in range(dimensiones):
+            rng: np.random.Generator = generador_aleatorizacion(entropia, d)
+            mezcla: List[int] = self._matriz_mezcla(rng)
+            for j, v in enumerate(self._direcciones(d)):
+                self.direcciones[d, j] = self._aplicar_mezcla(mezcla, v)
+            self.desplazamientos[d] = int(rng.integers(0, 2**BITS, dtype=np.uint64))
+
+    @staticmethod
+    def _direcciones(dimension: int) -> List[int]:
+        """
+        Números de dirección v_j = m_j / 2**(j+1) de una dimensión, como enteros de `BITS` bits.
+        """
+        if dimension == 0:
+            m: List[int] = [1] * BITS
+        else:
+            s, a, iniciales = _DIRECCIONES_SOBOL[dimension - 1]
+            m = list(iniciales)
+            for i in range(s, BITS):
+                valor: int = m[i - s] ^ (m[i - s] << s)
+                for k in range(1, s):
+                    valor ^= ((a >> (s - 1 - k)) & 1) * m[i - k] << k
+                m.append(valor)
+        return [m[j] << (BITS - 1 - j) for j in range(BITS)]
+
+    @staticmethod
+    def _matriz_mezcla(rng: np.random.Generator) -> List[int]:
+        """
+        Filas de una matriz binaria triangular inferior con diagonal unitaria (aleatorización
+        lineal de matriz). La fila r actúa sobre los dígitos 0..r, del más significativo al menos.
+        """
+        filas: List[int] = []
+        for r in range(BITS):
+            aleatorios: int = int(rng.integers(0, 2**r, dtype=np.uint64)) if r else 0
+            filas.append((aleatorios << (BITS - r)) | (1 << (BITS - 1 - r)))
+        return filas
+
+    @staticmethod
+    def _aplicar_mezcla(filas: List[int], v: int) -> int:
+        resultado: int = 0
+        for r, fila in enumerate(filas):
+            resultado |= (bin(fila & v).count("1") & 1) << (BITS - 1 - r)
+        return resultado
+
+    def puntos(self, inicio: int, cantidad: int) -> np.ndarray:
+        """
+        Devuelve los puntos con índices inicio, ..., inicio + cantidad - 1.
+
+        Argumentos:
+            inicio (int): Índice del primer punto.
+            cantidad (int): Cantidad de puntos.
+
+        Retorna:
+            np.ndarray: Arreglo (cantidad, dimensiones) con valores en (0, 1).
+        """
+        indices: np.ndarray = np.arange(inicio, inicio + cantidad, dtype=np.uint64)
+        enteros: np.ndarray = np.broadcast_to(self.desplazamientos, (cantidad, self.dimensiones)).copy()
+        bits: int = int(inicio + cantidad - 1).bit_length() if cantidad else 0
+        if bits > BITS:
+            raise ValueError(f"Sobol admite a lo más 2**{BITS} puntos.")
+        for j in range(bits):
+            activo: np.ndarray = ((indices >> np.uint64(j)) & np.uint64(1)).astype(bool)
+            enteros[activo] ^= self.direcciones[:, j]
+        return _a_unitario(enteros)
+
+_PRIMOS_PEQUENOS: List[int] = [p for p in range(2, 2000) if all(p % q for q in range(2, int(p ** 0.5) + 1))]
+
+class Halton:
+    """
+    Secuencia de Halton con una base prima por dimensión y una permutación aleatoria de los
+    dígitos para cada posición, lo que rompe las correlaciones de las bases grandes.
+
+    Atributos:
+        dimensiones (int): Cantidad de coordenadas de cada punto.
+        bases (list): Base prima de cada dimensión.
+        permutaciones (list): Por dimensión, un arreglo (dígitos, base) con la permutación de cada posición.
+    """
+
+    def __init__(self, dimensiones: int, entropia: int) -> None:
+        if dimensiones > len(_PRIMOS_PEQUENOS):
+            raise ValueError(f"Halton admite a lo más {len(_PRIMOS_PEQUENOS)} variables.")
+        self.dimensiones: int = dimensiones
+        self.bases: List[int] = _PRIMOS_PEQUENOS[:dimensiones]
+        self.permutaciones: List[np.ndarray] = []
+        for d, base in enumerate(self.bases):
+            rng: np.random.Generator = generador_aleatorizacion(entropia, d)
+            digitos: int = int(np.ceil(BITS / np.log2(base)))
+            self.permutaciones.append(np.array([rng.permutation(base) for _ in range(digitos)]))
+
+    def puntos(self, inicio: int, cantidad: int) -> np.ndarray:
+        """
+        Devuelve los puntos con índices inicio, ..., inicio + cantidad - 1.
+
+        Argumentos:
+            inicio (int): Índice del primer punto.
+            cantidad (int): Cantidad de puntos.
+
+        Retorna:
+            np.ndarray: Arreglo (cantidad, dimensiones) con valores en (0, 1).
+        """
+        resultado: np.ndarray = np.empty((cantidad, self.dimensiones), dtype=np.float64)
+        for d, base in enumerate(self.bases):
+            restantes: np.ndarray = np.arange(inicio, inicio + cantidad, dtype=np.int64)
+            valor: np.ndarray = np.zeros(cantidad, dtype=np.float64)
+            escala: float = 1.0
+            for permutacion in self.permutaciones[d]:
+                escala /= base
+                restantes, digito = np.divmod(restantes, base)
+                valor += permutacion[digito] * escala
+            # Evita los extremos del intervalo, donde las inversas no son finitas
+            resultado[:, d] = np.clip(valor, 2.0 ** -(BITS + 1), 1.0 - 2.0 ** -(BITS + 1))
+        return resultado
+
+def _mezclar(x: np.ndarray) -> np.ndarray:
+    """
+    Función de mezcla de splitmix64 sobre enteros uint64 (con desbordamiento modular).
+    """
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+class HipercuboLatino:
+    """
+    Diseño de hipercubo latino de `total` puntos: en cada dimensión, el punto i cae en el estrato
+    π_d(i) de ancho 1/total, donde π_d es una permutación pseudoaleatoria de [0, total) construida
+    con una red de Feistel y recorrido de ciclos, y se ubica uniformemente dentro del estrato.
+
+    Atributos:
+        dimensiones (int): Cantidad de coordenadas de cada punto.
+        total (int): Cantidad de puntos del diseño completo.
+        claves (np.ndarray): Claves de las rondas de Feistel, de forma (dimensiones, rondas).
+    """
+
+    RONDAS: int = 4
+
+    def __init__(self, dimensiones: int, entropia: int, total: int) -> None:
+        if total < 1:
+            raise ValueError("El hipercubo latino necesita el total de escenarios de la corrida.")
+        self.dimensiones: int = dimensiones
+        self.total: int = total
+        self._medio: int = max(1, (max(1, total - 1).bit_length() + 1) // 2)
+        self.claves: np.ndarray = np.array([
+            generador_aleatorizacion(entropia, d).integers(0, 2**63, size=self.RONDAS, dtype=np.uint64)
+            for d in range(dimensiones)
+        ], dtype=np.uint64).reshape(dimensiones, self.RONDAS)
+
+    def _feistel(self, x: np.ndarray, claves: np.ndarray) -> np.ndarray:
+        mascara: np.uint64 = np.uint64((1 << self._medio) - 1)
+        medio: np.uint64 = np.uint64(self._medio)
+        izquierda, derecha = x >> medio, x & mascara
+        for clave in claves:
+            izquierda, derecha = derecha, izquierda ^ (_mezclar(derecha ^ clave) & mascara)
+        return (izquierda << medio) | derecha
+
+    def permutar(self, indices: np.ndarray, dimension: int) -> np.ndarray:
+        """
+        Aplica la permutación de la dimensión; los valores fuera de [0, total) se vuelven a
+        cifrar hasta caer dentro (recorrido de ciclos), lo que conserva la biyección.
+        """
+        claves: np.ndarray = self.claves[dimension]
+        y: np.ndarray = self._feistel(indices.astype(np.uint64), claves)
+        fuera: np.ndarray = y >= np.uint64(self.total)
+        while fuera.any():
+            y[fuera] = self._feistel(y[fuera], claves)
+            fuera = y >= np.uint64(self.total)
+        return y
+
+    def puntos(self, inicio: int, cantidad: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Devuelve los puntos con índices inicio, ..., inicio + cantidad - 1.
+
+        Argumentos:
+            inicio (int): Índice del primer punto.
+            cantidad (int): Cantidad de puntos.
+            rng (np.random.Generator): Generador del rango, para la posición dentro de cada estrato.
+
+        Retorna:
+            np.ndarray: Arreglo (cantidad, dimensiones) con valores en (0, 1).
+        """
+        if inicio + cantidad > self.total:
+            raise ValueError(f"El hipercubo latino tiene {self.total} puntos; se pidieron hasta {inicio + cantidad}.")
+        indices: np.ndarray = np.arange(inicio, inicio + cantidad, dtype=np.uint64)
+        resultado: np.ndarray = np.empty((cantidad, self.dimensiones), dtype=np.float64)
+        for d in range(self.dimensiones):
+            estratos: np.ndarray = self.permutar(indices, d).astype(np.float64)
+            resultado[:, d] = (estratos + rng.random(cantidad)) / self.total
+        np.clip(resultado, 2.0 ** -(BITS + 1), 1.0 - 2.0 ** -(BITS + 1), out=resultado)
+        return resultado
+
+def crear_secuencia(metodo: str, dimensiones: int, entropia: int, total: Optional[int] = None):
+    """
+    Crea la secuencia de puntos de un método de muestreo.
+
+    Argumentos:
+        metodo (str): METODO_SOBOL, METODO_HALTON o METODO_LHS.
+        dimensiones (int): Cantidad de variables del modelo.
+        entropia (int): Entropía de la corrida.
+        total (int | None): Puntos del diseño completo (obligatorio para METODO_LHS).
+
+    Retorna:
+        Sobol | Halton | HipercuboLatino: Secuencia lista para generar rangos de puntos.
+    """
+    if metodo == METODO_SOBOL:
+        return Sobol(dimensiones, entropia)
+    if metodo == METODO_HALTON:
+        return Halton(dimensiones, entropia)
+    if metodo == METODO_LHS:
+        return HipercuboLatino(dimensiones, entropia, total or 0)
+    raise ValueError(f"Método de muestreo desconocido: {metodo}")
+
+# Coeficientes de la aproximación racional de Acklam (error relativo < 1.15e-9)
+_A: Tuple[float, ...] = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+                         1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_B: Tuple[float, ...] = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+                         6.680131188771972e+01, -1.328068155288572e+01)
+_C: Tuple[float, ...] = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+                         -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_D: Tuple[float, ...] = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+                         3.754408661907416e+00)
+_P_BAJO: float = 0.02425
+
+def normal_inversa(u: np.ndarray) -> np.ndarray:
+    """
+    Inversa de la función de distribución normal estándar (algoritmo de Acklam) para valores
+    en (0, 1).
+
+    Argumentos:
+        u (np.ndarray): Probabilidades.
+
+    Retorna:
+        np.ndarray: Cuantiles z con Φ(z) = u.
+    """
+    u = np.asarray(u, dtype=np.float64)
+    z: np.ndarray = np.empty_like(u)
+
+    central: np.ndarray = (u >= _P_BAJO) & (u <= 1 - _P_BAJO)
+    q: np.ndarray = u[central] - 0.5
+    r: np.ndarray = q * q
+    z[central] = (((((_A[0] * r + _A[1]) * r + _A[2]) * r + _A[3]) * r + _A[4]) * r + _A[5]) * q / \
+                 (((((_B[0] * r + _B[1]) * r + _B[2]) * r + _B[3]) * r + _B[4]) * r + 1)
+
+    colas: np.ndarray = ~central
+    inferior: np.ndarray = u[colas] < 0.5
+    q = np.sqrt(-2 * np.log(np.where(inferior, u[colas], 1 - u[colas])))
+    cola: np.ndarray = (((((_C[0] * q + _C[1]) * q + _C[2]) * q + _C[3]) * q + _C[4]) * q + _C[5]) / \
+                       ((((_D[0] * q + _D[1]) * q + _D[2]) * q + _D[3]) * q + 1)
+    z[colas] = np.where(inferior, cola, -cola)
+    return z
@@ -0,0 +1,233 @@
+"""
+_____________________________________________________________________________________
+Módulo: PuntoControl.py
+Descripción: Puntos de control para reanudar corridas largas tras una caída.
+    1. `Intervalos` guarda conjuntos de índices de escenarios como intervalos [inicio, fin)
+       disjuntos, así que el estado de una corrida ocupa poco aunque tenga millones de rangos.
+    2. `PuntoControlProductor` registra los rangos que el productor publicó y los que el
+       broker confirmó, junto con la entropía y los parámetros de la corrida.
+    3. `SeguimientoRangos` cuenta los resultados recibidos de cada rango; los agregadores lo
+       guardan junto con sus estadísticos combinables y descartan los rangos ya completos.
+Cada componente escribe su estado en <directorio>/<corrida>.<componente>.json de forma
+atómica (archivo temporal y os.replace), por lo que una caída durante la escritura conserva
+el punto de control anterior.
+_____________________________________________________________________________________
+"""
+import os
+import json
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+COMPONENTE_PRODUCTOR: str = "productor"
+COMPONENTE_AGREGADOR: str = "agregador"
+
+def ruta_punto_control(directorio: str, corrida: str, componente: str) -> str:
+    """
+    Ruta del punto de control de un componente de la corrida.
+    """
+    return os.path.join(directorio, f"{corrida}.{componente}.json")
+
+def guardar_json(ruta: str, datos: Dict[str, Any]) -> None:
+    """
+    Escribe `datos` en `ruta` reemplazando el archivo anterior de forma atómica.
+    """
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal: str = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as salida:
+        json.dump(datos, salida)
+        salida.flush()
+        os.fsync(salida.fileno())
+    os.replace(temporal, ruta)
+
+def cargar_json(ruta: str) -> Optional[Dict[str, Any]]:
+    """
+    Lee un punto de control; devuelve None si no existe.
+    """
+    try:
+        with open(ruta, "r", encoding="utf-8") as entrada:
+            return json.load(entrada)
+    except FileNotFoundError:
+        return None
+
+class Intervalos:
+    """
+    Conjunto de enteros representado como intervalos [inicio, fin) ordenados y disjuntos;
+    los intervalos contiguos o solapados se fusionan al agregarse.
+    """
+    def __init__(self, intervalos: Iterable[Sequence[int]] = ()) -> None:
+        self.inicios: List[int] = []
+        self.fines: List[int] = []
+        for inicio, fin in intervalos:
+            self.agregar(inicio, fin)
+
+    def agregar(self, inicio: int, fin: int) -> None:
+        if fin <= inicio:
+            return
+        # Intervalos que se solapan o tocan con [inicio, fin)
+        primero: int = bisect_left(self.fines, inicio)
+        ultimo: int = bisect_right(self.inicios, fin)
+        if primero < ultimo:
+            inicio = min(inicio, self.inicios[primero])
+            fin = max(fin, self.fines[ultimo - 1])
+        self.inicios[primero:ultimo] = [inicio]
+        self.fines[primero:ultimo] = [fin]
+
+    def unir(self, otros: "Intervalos") -> None:
+        for inicio, fin in zip(otros.inicios, otros.fines):
+            self.agregar(inicio, fin)
+
+    def contiene(self, inicio: int, fin: int) -> bool:
+        """
+        Indica si [inicio, fin) está completamente dentro del conjunto.
+        """
+        posicion: int = bisect_right(self.inicios, inicio) - 1
+        return posicion >= 0 and self.fines[posicion] >= fin
+
+    def total(self) -> int:
+        return sum(fin - inicio for inicio, fin in zip(self.inicios, self.fines))
+
+    def a_lista(self) -> List[List[int]]:
+        return [[inicio, fin] for inicio, fin in zip(self.inicios, self.fines)]
+
+class PuntoControlProductor:
+    """
+    Estado del productor de una corrida: parámetros, entropía, rangos publicados y rangos
+    confirmados por el broker (es decir, guardados en la cola de escenarios).
+    Los rangos se marcan desde el hilo principal y las confirmaciones pueden llegar desde el
+    hilo del publicador asíncrono, por lo que el estado se protege con un bloqueo.
+    """
+    def __init__(self, directorio: str, corrida: str, intervalo: float = 5.0) -> None:
+        """
+        Argumentos:
+            directorio (str): Directorio de los puntos de control.
+            corrida (str): Identificador de la corrida.
+            intervalo (float): Segundos mínimos entre escrituras periódicas.
+        """
+        self.directorio: str = directorio
+        self.corrida: str = corrida
+        self.intervalo: float = intervalo
+        self.ruta: str = ruta_punto_control(directorio, corrida, COMPONENTE_PRODUCTOR)
+        self.datos: Dict[str, Any] = cargar_json(self.ruta) or {}
+        self.reanudada: bool = bool(self.datos)
+        self.publicados: Intervalos = Intervalos(self.datos.get("publicados", []))
+        self.confirmados: Intervalos = Intervalos(self.datos.get("confirmados", []))
+        # Rangos publicados con mensajes sin confirmar: inicio -> [fin, mensajes pendientes]
+        self._pendientes: Dict[int, List[int]] = {}
+        self._bloqueo: threading.Lock = threading.Lock()
+        self._guardado: float = time.monotonic()
+
+    def iniciar(self, entropia: int, parametros: Dict[str, Any]) -> int:
+        """
+        Registra una corrida nueva o valida la que se reanuda.
+
+        Argumentos:
+            entropia (int): Entropía de la corrida si es nueva.
+            parametros (dict): Parámetros que deben coincidir al reanudar (iteraciones, tamaño de bloque, modo).
+
+        Retorna:
+            int: Entropía con la que debe generarse la corrida (la guardada si se reanuda).
+        """
+        if self.reanudada:
+            guardados: Dict[str, Any] = self.datos.get("parametros", {})
+            distintos: List[str] = [clave for clave, valor in parametros.items() if guardados.get(clave) != valor]
+            if distintos:
+                raise ValueError(f"La corrida {self.corrida} se inició con otros parámetros ({', '.join(distintos)}); "
+                                 f"no puede reanudarse con la configuración actual.")
+            return int(self.datos["entropia"])
+        self.datos = {"corrida": self.corrida, "entropia": entropia, "parametros": parametros}
+        self.guardar(forzar=True)
+        return entropia
+
+    def completados(self, incluir_confirmados: bool) -> Intervalos:
+        """
+        Escenarios que no hace falta volver a publicar: los que el agregador ya recibió (según su
+        punto de control en el mismo directorio) y, si la cola de escenarios es duradera, los que
+        el broker confirmó.
+        """
+        hechos: Intervalos = Intervalos()
+        agregador: Optional[Dict[str, Any]] = cargar_json(
+            ruta_punto_control(self.directorio, self.corrida, COMPONENTE_AGREGADOR)
+        )
+        if agregador is not None:
+            hechos.unir(SeguimientoRangos.desde_dict(agregador.get("rangos", {})).completados)
+        if incluir_confirmados:
+            with self._bloqueo:
+                hechos.unir(self.confirmados)
+        return hechos
+
+    def publicado(self, inicio: int, cantidad: int, mensajes: int = 1) -> None:
+        """
+        Marca un rango como publicado; queda pendiente hasta recibir `mensajes` confirmaciones.
+        """
+        with self._bloqueo:
+            self.publicados.agregar(inicio, inicio + cantidad)
+            self._pendientes[inicio] = [inicio + cantidad, mensajes]
+
+    def confirmado(self, inicio: int, mensajes: int = 1) -> None:
+        """
+        Registra confirmaciones del broker para mensajes del rango que comienza en `inicio`.
+        """
+        with self._bloqueo:
+            pendiente: Optional[List[int]] = self._pendientes.get(inicio)
+            if pendiente is None:
+                return
+            pendiente[1] -= mensajes
+            if pendiente[1] <= 0:
+                del self._pendientes[inicio]
+                self.confirmados.agregar(inicio, pendiente[0])
+
+    def guardar(self, forzar: bool = False) -> None:
+        """
+        Escribe el punto de control si pasó el intervalo desde la última escritura (o si se fuerza).
+        """
+        if not forzar and time.monotonic() - self._guardado < self.intervalo:
+            return
+        with self._bloqueo:
+            datos: Dict[str, Any] = {
+                **self.datos,
+                "publicados": self.publicados.a_lista(),
+                "confirmados": self.confirmados.a_lista(),
+            }
+        guardar_json(self.ruta, datos)
+        self._guardado = time.monotonic()
+
+class SeguimientoRangos:
+    """
+    Resultados recibidos por rango de escenarios. Los consumidores indican en la cabecera
+    "rangos" de cada mensaje de resultados tripletas [inicio, escenarios incluidos, tamaño del
+    rango]; un rango se completa cuando llegaron todos sus escenarios.
+    """
+    def __init__(self, completados: Iterable[Sequence[int]] = (), parciales: Optional[Dict[Any, List[int]]] = None) -> None:
+        self.completados: Intervalos = Intervalos(completados)
+        # inicio -> [escenarios recibidos, tamaño del rango]
+        self.parciales: Dict[int, List[int]] = {int(inicio): list(valor) for inicio, valor in (parciales or {}).items()}
+
+    def duplicado(self, rangos: Sequence[Sequence[int]]) -> bool:
+        """
+        Indica si todos los rangos del mensaje ya estaban completos (una reentrega o una
+        republicación tras reanudar).
+        """
+        return bool(rangos) and all(self.completados.contiene(inicio, inicio + tamano) for inicio, _, tamano in rangos)
+
+    def registrar(self, rangos: Sequence[Sequence[int]]) -> None:
+        for inicio, cantidad, tamano in rangos:
+            if self.completados.contiene(inicio, inicio + tamano):
+                continue
+            recibidos: List[int] = self.parciales.pop(inicio, [0, tamano])
+            recibidos[0] += cantidad
+            if recibidos[0] >= tamano:
+                self.completados.agregar(inicio, inicio + tamano)
+            else:
+                self.parciales[inicio] = recibidos
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            "completados": self.completados.a_lista(),
+            "parciales": {str(inicio): valor for inicio, valor in self.parciales.items()},
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "SeguimientoRangos":
+        return cls(datos.get("completados", []), datos.get("parciales"))
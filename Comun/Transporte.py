@@ -0,0 +1,657 @@
+"""
+_____________________________________________________________________________________
+Módulo: Transporte.py
+Descripción: Capa de transporte de los componentes. Un transporte abre conexiones con
+la interfaz de `pika.BlockingConnection` (canales con exchange_declare, queue_declare,
+queue_bind, basic_publish, basic_consume, basic_get, basic_ack / basic_nack, basic_qos,
+start_consuming y call_later), que cubre los tres canales del sistema: la difusión de la
+configuración (y del control), la cola de trabajo y la cola de resultados. Hay dos backends:
+    1. "rabbitmq": conexiones a un servidor RabbitMQ con host, puerto, virtual host y
+       credenciales configurables (por defecto, las variables de entorno RABBITMQ_USUARIO y
+       RABBITMQ_CONTRASENA, o guest/guest).
+    2. "local": todos los componentes corren en una sola máquina como procesos hijos de un
+       mismo lanzador (ver Local/), sin broker. Cada cola con nombre es una
+       `multiprocessing.Queue` acotada, por la que los mensajes pasan directamente de un proceso
+       a otro, y los exchanges fanout son un registro compartido de los mensajes difundidos que
+       cada suscripción lee desde el principio, así que el orden de arranque no importa (el
+       registro descarta lo que todas las suscripciones ya leyeron tras RETENCION_DIFUSIONES). Las
+       colas viven solo durante la ejecución y un mensaje retirado de la cola no vuelve a ella
+       si su consumidor termina sin confirmarlo; los que se rechazan o quedan sin confirmar al
+       cerrar un canal vuelven por una cola de reentregas sin límite, que se lee primero.
+Varias corridas pueden compartir los consumidores: cada transporte nombra las colas propias de una
+corrida (`cola_corrida`). Con RabbitMQ, los resultados y la configuración de cada corrida van a colas
+"<nombre>.<corrida>" que el broker elimina tras un tiempo sin uso; el transporte local solo atiende a
+las corridas de su lanzador, así que usa directamente las colas con nombre.
+_____________________________________________________________________________________
+"""
+import os
+import heapq
+import itertools
+import queue
+import time
+import multiprocessing as mp
+from multiprocessing.managers import BaseManager
+from collections import OrderedDict, deque
+from types import SimpleNamespace
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import pika
+
+BACKEND_RABBITMQ: str = "rabbitmq"
+BACKEND_LOCAL: str = "local"
+
+# Segundos máximos que un canal local espera mensajes antes de revisar temporizadores y difusiones
+ESPERA_LOCAL: float = 0.05
+
+# Segundos que el registro local conserva un mensaje difundido que ya leyeron todas las suscripciones,
+# para que los componentes que se suscriben después también lo reciban
+RETENCION_DIFUSIONES: float = 60.0
+
+# Milisegundos sin consumidores ni declaraciones tras los que RabbitMQ elimina las colas de una corrida
+EXPIRACION_COLA_CORRIDA_MS: int = 24 * 60 * 60 * 1000
+
+class TransporteRabbitMQ:
+    """
+    Transporte a través de un servidor RabbitMQ.
+
+    Atributos:
+        backend (str): BACKEND_RABBITMQ.
+        host (str): Dirección del servidor.
+        puerto (int): Puerto AMQP.
+        vhost (str): Virtual host.
+        usuario (str): Usuario de RabbitMQ.
+        contrasena (str): Contraseña de RabbitMQ.
+    """
+    backend: str = BACKEND_RABBITMQ
+
+    def __init__(self, host: str = "localhost", puerto: int = 5672, vhost: str = "/",
+                 usuario: Optional[str] = None, contrasena: Optional[str] = None) -> None:
+        self.host: str = host
+        self.puerto: int = puerto
+        self.vhost: str = vhost
+        self.usuario: str = usuario if usuario is not None else os.environ.get("RABBITMQ_USUARIO", "guest")
+        self.contrasena: str = contrasena if contrasena is not None else os.environ.get("RABBITMQ_CONTRASENA", "guest")
+
+    def parametros(self) -> pika.ConnectionParameters:
+        """
+        Parámetros de conexión de pika, también para conexiones asíncronas (`SelectConnection`).
+        """
+        return pika.ConnectionParameters(
+            host=self.host, port=self.puerto, virtual_host=self.vhost,
+            credentials=pika.PlainCredentials(self.usuario, self.contrasena)
+        )
+
+    def conectar(self) -> pika.BlockingConnection:
+        """
+        Abre una conexión bloqueante al servidor.
+        """
+        return pika.BlockingConnection(self.parametros())
+
+    def cola_corrida(self, nombre: str, corrida: Optional[str]) -> str:
+        """
+        Nombre de la cola `nombre` propia de una corrida; sin corrida, la cola compartida.
+        """
+        return f"{nombre}.{corrida}" if corrida else nombre
+
+class RegistroDifusiones:
+    """
+    Registro de los mensajes difundidos a los exchanges del transporte local. Vive en el proceso
+    del administrador y los demás procesos lo usan a través de un proxy, así que cada método es
+    una sola llamada entre procesos. Cada lector (una suscripción) avanza su propia posición, y
+    los mensajes que todos los lectores ya leyeron se descartan tras `retencion` segundos.
+    """
+    def __init__(self, retencion: float = RETENCION_DIFUSIONES) -> None:
+        self.retencion: float = retencion
+        self._mensajes: Deque[Tuple[float, str, bytes, Any]] = deque()
+        self._inicio: int = 0
+        self._lectores: Dict[str, int] = {}
+
+    def difundir(self, exchange: str, cuerpo: bytes, propiedades: Any) -> None:
+        self._mensajes.append((time.monotonic(), exchange, cuerpo, propiedades))
+        self._recortar()
+
+    def registrar(self, lector: str) -> None:
+        """
+        Registra un lector, que leerá desde el mensaje más antiguo conservado.
+        """
+        self._lectores.setdefault(lector, self._inicio)
+
+    def leer(self, lector: str, exchange: str) -> List[Tuple[bytes, Any]]:
+        """
+        Mensajes de `exchange` que el lector aún no leyó (lo registra si no lo estaba).
+        """
+        posicion: int = max(self._lectores.get(lector, self._inicio), self._inicio)
+        nuevos: List[Tuple[bytes, Any]] = [
+            (cuerpo, propiedades)
+            for _, origen, cuerpo, propiedades in itertools.islice(self._mensajes, posicion - self._inicio, None)
+            if origen == exchange
+        ]
+        self._lectores[lector] = self._inicio + len(self._mensajes)
+        self._recortar()
+        return nuevos
+
+    def olvidar(self, lector: str) -> None:
+        self._lectores.pop(lector, None)
+        self._recortar()
+
+    def cantidad(self) -> int:
+        """
+        Mensajes conservados en el registro.
+        """
+        return len(self._mensajes)
+
+    def _recortar(self) -> None:
+        leidos: int = min(self._lectores.values(), default=self._inicio + len(self._mensajes))
+        limite: float = time.monotonic() - self.retencion
+        while self._mensajes and self._inicio < leidos and self._mensajes[0][0] <= limite:
+            self._mensajes.popleft()
+            self._inicio += 1
+
+class AdministradorLocal(BaseManager):
+    """
+    Proceso que aloja el registro de difusiones del transporte local.
+    """
+
+AdministradorLocal.register("RegistroDifusiones", RegistroDifusiones)
+
+class TransporteLocal:
+    """
+    Transporte entre procesos de una misma máquina. Debe crearse en el proceso lanzador y
+    entregarse a los procesos hijos al crearlos (las colas de multiprocessing solo se heredan).
+
+    Atributos:
+        backend (str): BACKEND_LOCAL.
+        colas (dict): Nombre de cola -> `multiprocessing.Queue`.
+        reentregas (dict): Nombre de cola -> `multiprocessing.Queue` sin límite con los mensajes
+            devueltos por `basic_nack` o al cerrar un canal. Devolver un mensaje a la cola acotada
+            podría bloquear al consumidor para siempre si los productores ya la llenaron.
+    """
+    backend: str = BACKEND_LOCAL
+
+    def __init__(self, colas: Iterable[str], capacidad: int = 64) -> None:
+        """
+        Crea las colas y el registro de difusiones.
+
+        Argumentos:
+            colas (Iterable[str]): Nombres de las colas de trabajo y de resultados.
+            capacidad (int): Mensajes máximos por cola; al llenarse, la publicación se bloquea
+                hasta que un consumidor retire mensajes (contrapresión).
+        """
+        self._administrador: Optional[AdministradorLocal] = AdministradorLocal()
+        self._administrador.start()
+        self.colas: Dict[str, Any] = {nombre: mp.Queue(maxsize=capacidad) for nombre in colas}
+        self.reentregas: Dict[str, Any] = {nombre: mp.Queue() for nombre in self.colas}
+        self.registro: Any = self._administrador.RegistroDifusiones()
+        # Cantidad de difusiones en memoria compartida: las suscripciones solo consultan el
+        # registro (en otro proceso) cuando cambia
+        self._difundidas: Any = mp.Value("q", 0)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # El administrador solo existe en el proceso lanzador; los hijos usan sus proxies
+        estado: Dict[str, Any] = dict(self.__dict__)
+        estado["_administrador"] = None
+        return estado
+
+    def conectar(self) -> "ConexionLocal":
+        """
+        Abre una conexión local con la interfaz de `pika.BlockingConnection`.
+        """
+        return ConexionLocal(self)
+
+    def cola_corrida(self, nombre: str, corrida: Optional[str]) -> str:
+        """
+        Las colas locales solo viven durante la corrida de su lanzador, así que no hace falta separarlas.
+        """
+        return nombre
+
+    def cola(self, nombre: str) -> Any:
+        if nombre not in self.colas:
+            raise ValueError(f"La cola '{nombre}' no está definida en el transporte local.")
+        return self.colas[nombre]
+
+    def pendientes(self, nombre: str) -> int:
+        """
+        Mensajes en una cola, incluidos los devueltos (0 si la plataforma no permite contarlos).
+        """
+        try:
+            return self.cola(nombre).qsize() + self.reentregas[nombre].qsize()
+        except NotImplementedError:
+            return 0
+
+    def difundir(self, exchange: str, cuerpo: bytes, propiedades: Any) -> None:
+        self.registro.difundir(exchange, cuerpo, propiedades)
+        with self._difundidas.get_lock():
+            self._difundidas.value += 1
+
+    def difundidas(self) -> int:
+        """
+        Cantidad de mensajes difundidos desde la creación del transporte.
+        """
+        return self._difundidas.value
+
+def crear_transporte(configuracion: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Crea el transporte indicado por una configuración.
+
+    Argumentos:
+        configuracion (Optional[Dict[str, Any]]): "backend" ("rabbitmq" por defecto o "local") y
+            los argumentos del transporte: host, puerto, vhost, usuario y contrasena para RabbitMQ;
+            colas y capacidad para el transporte local.
+
+    Retorna:
+        TransporteRabbitMQ | TransporteLocal: Transporte listo para abrir conexiones.
+    """
+    argumentos: Dict[str, Any] = dict(configuracion or {})
+    backend: str = argumentos.pop("backend", BACKEND_RABBITMQ)
+    if backend == BACKEND_RABBITMQ:
+        return TransporteRabbitMQ(**argumentos)
+    if backend == BACKEND_LOCAL:
+        return TransporteLocal(**argumentos)
+    raise ValueError(f"Backend de transporte desconocido: {backend}")
+
+def declarar_cola_corrida(canal: Any, transporte: Any, nombre: str, corrida: Optional[str]) -> str:
+    """
+    Declara la cola duradera `nombre` de una corrida. Las colas propias de una corrida se declaran
+    siempre con la misma expiración, ya que RabbitMQ rechaza redeclarar una cola con otros argumentos.
+
+    Argumentos:
+        canal (Any): Canal del transporte.
+        transporte (TransporteRabbitMQ | TransporteLocal): Transporte que nombra la cola.
+        nombre (str): Nombre de la cola compartida.
+        corrida (Optional[str]): Identificador de la corrida.
+
+    Retorna:
+        str: Nombre de la cola declarada.
+    """
+    cola: str = transporte.cola_corrida(nombre, corrida)
+    argumentos: Optional[Dict[str, Any]] = {"x-expires": EXPIRACION_COLA_CORRIDA_MS} if cola != nombre else None
+    canal.queue_declare(queue=cola, durable=True, arguments=argumentos)
+    return cola
+
+class MensajeEmulado(NamedTuple):
+    """
+    Mensaje de una cola emulada (transporte local o broker en memoria de los benchmarks).
+    """
+    cuerpo: bytes
+    propiedades: Any
+    exchange: str = ""
+    routing_key: str = ""
+    instante: float = 0.0
+    reentregado: bool = False
+
+class ConexionEmulada:
+    """
+    Base de las conexiones que emulan `pika.BlockingConnection` dentro de un proceso (la del transporte
+    local y la del broker en memoria de los benchmarks): mantiene los temporizadores de `call_later` y
+    las llamadas recibidas de otros hilos, que se ejecutan dentro del ciclo de consumo.
+    """
+    def __init__(self) -> None:
+        self.canales: List["CanalEmulado"] = []
+        self.is_open: bool = True
+        self._temporizadores: List[Tuple[float, int, Callable[[], None]]] = []
+        self._secuencia: Iterator[int] = itertools.count()
+        self._externas: Deque[Callable[[], None]] = deque()
+
+    def crear_canal(self) -> "CanalEmulado":
+        raise NotImplementedError
+
+    def channel(self) -> "CanalEmulado":
+        canal: CanalEmulado = self.crear_canal()
+        self.canales.append(canal)
+        return canal
+
+    def call_later(self, retraso: float, callback: Callable[[], None]) -> int:
+        identificador: int = next(self._secuencia)
+        heapq.heappush(self._temporizadores, (time.monotonic() + retraso, identificador, callback))
+        return identificador
+
+    def add_callback_threadsafe(self, callback: Callable[[], None]) -> None:
+        self._externas.append(callback)
+
+    def tiempo_restante(self) -> Optional[float]:
+        """
+        Segundos hasta la próxima llamada pendiente (0 si ya hay alguna), o None si no hay ninguna.
+        """
+        if self._externas:
+            return 0.0
+        if not self._temporizadores:
+            return None
+        return max(0.0, self._temporizadores[0][0] - time.monotonic())
+
+    def ejecutar_pendientes(self) -> bool:
+        """
+        Ejecuta las llamadas de otros hilos y los temporizadores vencidos. Retorna True si ejecutó alguna.
+        """
+        ejecutadas: bool = False
+        while self._externas:
+            self._externas.popleft()()
+            ejecutadas = True
+        ahora: float = time.monotonic()
+        while self._temporizadores and self._temporizadores[0][0] <= ahora:
+            _, _, callback = heapq.heappop(self._temporizadores)
+            callback()
+            ejecutadas = True
+        return ejecutadas
+
+    def close(self) -> None:
+        for canal in self.canales:
+            canal.close()
+        self.is_open = False
+
+class CanalEmulado:
+    """
+    Base de los canales emulados, con la interfaz de `BlockingChannel` que usan los componentes:
+    consumidores, prefetch, mensajes sin confirmar y confirmaciones (también con `multiple`). Las
+    subclases definen las declaraciones, la publicación y de dónde se retiran los mensajes y adónde
+    vuelven (`_retirar` y `_devolver`).
+    """
+    def __init__(self, conexion: ConexionEmulada) -> None:
+        self.conexion: ConexionEmulada = conexion
+        self.prefetch: int = 0
+        self.is_open: bool = True
+        self._consumidores: "OrderedDict[str, Tuple[str, Callable, bool]]" = OrderedDict()
+        self._sin_confirmar: "OrderedDict[int, Tuple[str, MensajeEmulado]]" = OrderedDict()
+        self._siguiente_tag: Iterator[int] = itertools.count(1)
+        self._etiquetas: Iterator[int] = itertools.count(1)
+        self._consumiendo: bool = False
+
+    # -- Operaciones de cada backend -------------------------------------------------
+
+    def _retirar(self, cola: str, espera: float) -> Optional[MensajeEmulado]:
+        """
+        Retira el siguiente mensaje de una cola, esperando a lo más `espera` segundos.
+        """
+        raise NotImplementedError
+
+    def _devolver(self, cola: str, mensajes: List[MensajeEmulado]) -> None:
+        """
+        Devuelve a su cola mensajes entregados y no confirmados, en el mismo orden y antes que los
+        que esperan. No debe bloquearse: el canal que devuelve puede ser el único que consume la cola.
+        """
+        raise NotImplementedError
+
+    def _confirmar(self, cola: str, mensaje: MensajeEmulado) -> None:
+        """
+        Registra la confirmación de un mensaje (o su entrega con `auto_ack`).
+        """
+
+    def _descartar(self, cola: str, mensaje: MensajeEmulado) -> None:
+        """
+        Registra un mensaje rechazado sin reencolar.
+        """
+
+    def _requiere_confirmacion(self, cola: str) -> bool:
+        """
+        Indica si los mensajes de la cola quedan sin confirmar (y cuentan para el prefetch) al entregarse.
+        """
+        return True
+
+    # -- Consumo ---------------------------------------------------------------------
+
+    def basic_qos(self, prefetch_count: int = 0, **_: Any) -> None:
+        self.prefetch = prefetch_count
+
+    def basic_consume(self, queue: str, on_message_callback: Callable, auto_ack: bool = False, **_: Any) -> str:
+        etiqueta: str = f"ctag-{next(self._etiquetas)}"
+        self._consumidores[etiqueta] = (queue, on_message_callback, auto_ack)
+        return etiqueta
+
+    def basic_cancel(self, consumer_tag: str) -> None:
+        self._consumidores.pop(consumer_tag, None)
+
+    def _limitado(self, cola: str, auto_ack: bool) -> bool:
+        """
+        Indica si el prefetch impide entregar otro mensaje de `cola` antes de confirmar los pendientes.
+        """
+        return (bool(self.prefetch) and not auto_ack and self._requiere_confirmacion(cola)
+                and len(self._sin_confirmar) >= self.prefetch)
+
+    def _metodo(self, cola: str, mensaje: MensajeEmulado, auto_ack: bool, etiqueta: str = "") -> SimpleNamespace:
+        tag: int = next(self._siguiente_tag)
+        if auto_ack or not self._requiere_confirmacion(cola):
+            self._confirmar(cola, mensaje)
+        else:
+            self._sin_confirmar[tag] = (cola, mensaje)
+        return SimpleNamespace(delivery_tag=tag, consumer_tag=etiqueta, exchange=mensaje.exchange,
+                               routing_key=mensaje.routing_key, redelivered=mensaje.reentregado)
+
+    def _despachar(self, etiqueta: str, cola: str, callback: Callable, auto_ack: bool, mensaje: MensajeEmulado) -> None:
+        callback(self, self._metodo(cola, mensaje, auto_ack, etiqueta), mensaje.propiedades, mensaje.cuerpo)
+
+    def basic_get(self, queue: str, auto_ack: bool = False) -> Tuple[Any, Any, Optional[bytes]]:
+        mensaje: Optional[MensajeEmulado] = self._retirar(queue, 0.0)
+        if mensaje is None:
+            return None, None, None
+        return self._metodo(queue, mensaje, auto_ack), mensaje.propiedades, mensaje.cuerpo
+
+    def stop_consuming(self) -> None:
+        self._consumiendo = False
+
+    # -- Confirmaciones --------------------------------------------------------------
+
+    def _resolver(self, delivery_tag: int, multiple: bool) -> List[Tuple[str, MensajeEmulado]]:
+        if not multiple:
+            entrada = self._sin_confirmar.pop(delivery_tag, None)
+            return [entrada] if entrada is not None else []
+        resueltos: List[Tuple[str, MensajeEmulado]] = []
+        while self._sin_confirmar and next(iter(self._sin_confirmar)) <= delivery_tag:
+            resueltos.append(self._sin_confirmar.popitem(last=False)[1])
+        return resueltos
+
+    def _reencolar(self, entradas: List[Tuple[str, MensajeEmulado]]) -> None:
+        """
+        Devuelve mensajes sin confirmar a sus colas, agrupados por cola y en el orden de entrega,
+        marcados como reentregados.
+        """
+        por_cola: Dict[str, List[MensajeEmulado]] = {}
+        for cola, mensaje in entradas:
+            por_cola.setdefault(cola, []).append(mensaje._replace(reentregado=True))
+        for cola, mensajes in por_cola.items():
+            self._devolver(cola, mensajes)
+
+    def basic_ack(self, delivery_tag: int = 0, multiple: bool = False) -> None:
+        for cola, mensaje in self._resolver(delivery_tag, multiple):
+            self._confirmar(cola, mensaje)
+
+    def basic_nack(self, delivery_tag: int = 0, multiple: bool = False, requeue: bool = True) -> None:
+        entradas: List[Tuple[str, MensajeEmulado]] = self._resolver(delivery_tag, multiple)
+        if requeue:
+            self._reencolar(entradas)
+            return
+        for cola, mensaje in entradas:
+            self._descartar(cola, mensaje)
+
+    def basic_reject(self, delivery_tag: int, requeue: bool = True) -> None:
+        self.basic_nack(delivery_tag=delivery_tag, requeue=requeue)
+
+    def close(self) -> None:
+        """
+        Cierra el canal devolviendo a su cola los mensajes sin confirmar, como RabbitMQ.
+        """
+        if not self.is_open:
+            return
+        self._reencolar(list(self._sin_confirmar.values()))
+        self._sin_confirmar.clear()
+        self._consumidores.clear()
+        self.is_open = False
+
+class ConexionLocal(ConexionEmulada):
+    """
+    Conexión del transporte local.
+    """
+    def __init__(self, transporte: TransporteLocal) -> None:
+        super().__init__()
+        self.transporte: TransporteLocal = transporte
+
+    def crear_canal(self) -> "CanalLocal":
+        return CanalLocal(self)
+
+    def espera_maxima(self) -> float:
+        """
+        Segundos que el ciclo de consumo puede bloquearse sin retrasar un temporizador.
+        """
+        restante: Optional[float] = self.tiempo_restante()
+        return ESPERA_LOCAL if restante is None else min(ESPERA_LOCAL, restante)
+
+    def process_data_events(self, time_limit: float = 0) -> None:
+        self.ejecutar_pendientes()
+        for canal in self.canales:
+            canal.entregar(espera=0.0)
+
+    def sleep(self, duracion: float) -> None:
+        limite: float = time.monotonic() + duracion
+        while time.monotonic() < limite:
+            time.sleep(min(ESPERA_LOCAL, max(0.0, limite - time.monotonic())))
+            self.process_data_events()
+
+class CanalLocal(CanalEmulado):
+    """
+    Canal del transporte local. Las colas exclusivas sin nombre (`queue_declare(queue="")`) solo
+    sirven para suscribirse a un exchange fanout con `queue_bind`.
+    """
+    def __init__(self, conexion: ConexionLocal) -> None:
+        super().__init__(conexion)
+        self.transporte: TransporteLocal = conexion.transporte
+        # Suscripción -> [exchange, difusiones ya vistas]
+        self._suscripciones: Dict[str, List[Any]] = {}
+        self._pendientes: Dict[str, Deque[MensajeEmulado]] = {}
+
+    # -- Declaraciones ---------------------------------------------------------------
+
+    def exchange_declare(self, exchange: str, exchange_type: str = "fanout", **_: Any) -> None:
+        if exchange_type != "fanout":
+            raise ValueError("El transporte local solo admite exchanges fanout.")
+
+    def queue_declare(self, queue: str = "", **_: Any) -> SimpleNamespace:
+        if not queue:
+            queue = f"local.suscripcion-{len(self._suscripciones) + 1}"
+            self._suscripciones[queue] = [None, 0]
+            cantidad: int = 0
+        elif queue in self._suscripciones:
+            cantidad = 0
+        else:
+            cantidad = self.transporte.pendientes(queue)
+        return SimpleNamespace(method=SimpleNamespace(queue=queue, message_count=cantidad, consumer_count=0))
+
+    def queue_bind(self, queue: str, exchange: str, **_: Any) -> None:
+        if queue not in self._suscripciones:
+            raise ValueError("En el transporte local solo las colas exclusivas pueden enlazarse a un exchange.")
+        self._suscripciones[queue][0] = exchange
+        self.transporte.registro.registrar(self._lector(queue))
+
+    def queue_purge(self, queue: str) -> SimpleNamespace:
+        """
+        Las colas locales se crean con cada ejecución, así que nunca contienen mensajes de una
+        ejecución anterior: purgarlas no descarta nada (y no compite con un productor ya iniciado).
+        """
+        return SimpleNamespace(method=SimpleNamespace(message_count=0))
+
+    # -- Publicación -----------------------------------------------------------------
+
+    def basic_publish(self, exchange: str, routing_key: str, body: Any, properties: Any = None, **_: Any) -> None:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if exchange:
+            self.transporte.difundir(exchange, body, properties)
+        else:
+            self.transporte.cola(routing_key).put(MensajeEmulado(body, properties, "", routing_key))
+
+    # -- Consumo ---------------------------------------------------------------------
+
+    def basic_consume(self, queue: str, on_message_callback: Callable, auto_ack: bool = False, **_: Any) -> str:
+        if queue not in self._suscripciones:
+            self.transporte.cola(queue)
+        return super().basic_consume(queue, on_message_callback, auto_ack)
+
+    def _requiere_confirmacion(self, cola: str) -> bool:
+        # Las suscripciones a un exchange se consumen siempre con auto_ack
+        return cola not in self._suscripciones
+
+    def _lector(self, suscripcion: str) -> str:
+        """
+        Identificador de una suscripción de este canal en el registro de difusiones.
+        """
+        return f"{os.getpid()}-{id(self)}-{suscripcion}"
+
+    def _retirar(self, cola: str, espera: float) -> Optional[MensajeEmulado]:
+        if cola in self._suscripciones:
+            pendientes: Deque[MensajeEmulado] = self._pendientes.setdefault(cola, deque())
+            exchange, vistas = self._suscripciones[cola]
+            # El registro está en otro proceso: solo se consulta si hubo difusiones nuevas
+            if not pendientes and exchange is not None:
+                difundidas: int = self.transporte.difundidas()
+                if difundidas != vistas:
+                    self._suscripciones[cola][1] = difundidas
+                    pendientes.extend(
+                        MensajeEmulado(cuerpo, propiedades, exchange, cola)
+                        for cuerpo, propiedades in self.transporte.registro.leer(self._lector(cola), exchange)
+                    )
+            return pendientes.popleft() if pendientes else None
+        principal: Any = self.transporte.cola(cola)
+        try:
+            return self.transporte.reentregas[cola].get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            if espera > 0:
+                return principal.get(timeout=espera)
+            return principal.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _devolver(self, cola: str, mensajes: List[MensajeEmulado]) -> None:
+        reentregas: Any = self.transporte.reentregas[cola]
+        for mensaje in mensajes:
+            reentregas.put_nowait(mensaje)
+
+    def entregar(self, espera: float) -> int:
+        """
+        Entrega a cada consumidor del canal a lo más un mensaje, respetando el prefetch. Si ninguno
+        tenía mensajes, espera hasta `espera` segundos en la primera cola con nombre.
+        Retorna la cantidad de mensajes entregados.
+        """
+        entregados: int = 0
+        for etiqueta, (cola, callback, auto_ack) in list(self._consumidores.items()):
+            if self._limitado(cola, auto_ack):
+                continue
+            mensaje: Optional[MensajeEmulado] = self._retirar(cola, 0.0)
+            if mensaje is None:
+                continue
+            self._despachar(etiqueta, cola, callback, auto_ack, mensaje)
+            entregados += 1
+        if entregados or espera <= 0:
+            return entregados
+        for etiqueta, (cola, callback, auto_ack) in self._consumidores.items():
+            if cola in self._suscripciones or self._limitado(cola, auto_ack):
+                continue
+            mensaje = self._retirar(cola, espera)
+            if mensaje is not None:
+                self._despachar(etiqueta, cola, callback, auto_ack, mensaje)
+                return 1
+            return 0
+        time.sleep(espera)
+        return 0
+
+    def start_consuming(self) -> None:
+        """
+        Entrega mensajes y ejecuta temporizadores hasta que se llame a `stop_consuming`.
+        """
+        self._consumiendo = True
+        while self._consumiendo and self.is_open:
+            self.conexion.ejecutar_pendientes()
+            if self._consumiendo:
+                self.entregar(self.conexion.espera_maxima())
+
+    def close(self) -> None:
+        """
+        Cierra el canal y deja de retener en el registro las difusiones que sus suscripciones no leyeron.
+        """
+        if self.is_open:
+            for suscripcion, (exchange, _) in self._suscripciones.items():
+                if exchange is None:
+                    continue
+                try:
+                    self.transporte.registro.olvidar(self._lector(suscripcion))
+                except (OSError, EOFError):
+                    # El administrador ya terminó (el lanzador está saliendo)
+                    break
+        super().close()
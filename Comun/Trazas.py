@@ -0,0 +1,438 @@
+"""
+_____________________________________________________________________________________
+Módulo: Trazas.py
+Descripción: Trazas por etapa y perfilado opcionales de los componentes.
+    1. `Trazador.tramo(etapa)` mide una etapa del pipeline (decodificación, evaluación,
+       publicación, ...). Desactivado, devuelve un contexto vacío compartido; activo,
+       registra solo una de cada 1/muestreo llamadas por etapa.
+    2. Los tramos se exportan como traza de Chrome (chrome://tracing o Perfetto) junto con
+       un resumen por etapa (muestras, tiempo total, percentiles).
+    3. `Perfil` envuelve un componente en cProfile (solo el hilo que lo inicia) o en un
+       muestreador estadístico de pilas de todos los hilos, durante una ventana de tiempo.
+    4. En POSIX, las trazas se activan y desactivan sin reiniciar con SIGUSR1, y SIGUSR2
+       muestrea las pilas del proceso durante la ventana configurada.
+_____________________________________________________________________________________
+"""
+import os
+import sys
+import json
+import time
+import signal
+import cProfile
+import pstats
+import threading
+from collections import Counter, deque
+from contextlib import nullcontext
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Tramos máximos conservados; al superarse se descartan los más antiguos
+MAX_TRAMOS: int = 200000
+
+PERFIL_CPROFILE: str = "cprofile"
+PERFIL_MUESTREO: str = "muestreo"
+
+# Contexto vacío que devuelve `tramo` cuando la etapa no se registra
+_NULO: nullcontext = nullcontext()
+
+# Trazadores del proceso a los que llegan las señales
+_TRAZADORES: List["Trazador"] = []
+
+def _marca_tiempo() -> str:
+    return time.strftime("%Y%m%d-%H%M%S")
+
+class _Tramo:
+    """
+    Medición de una ejecución de una etapa.
+    """
+    __slots__ = ("trazador", "etapa", "inicio")
+
+    def __init__(self, trazador: "Trazador", etapa: str) -> None:
+        self.trazador: Trazador = trazador
+        self.etapa: str = etapa
+
+    def __enter__(self) -> "_Tramo":
+        self.inicio: int = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.trazador.tramos.append((self.etapa, self.inicio, time.perf_counter_ns(), threading.get_ident()))
+
+class Trazador:
+    """
+    Registro de tramos por etapa de un componente.
+
+    Atributos:
+        componente (str): Nombre del componente (productor, consumidor, visualizador).
+        activo (bool): Si se registran tramos.
+        periodo (int): Se registra una de cada `periodo` llamadas de cada etapa.
+        ruta (str): Directorio donde se escriben las trazas y los perfiles.
+        metodo_perfil (Optional[str]): Perfil de la ejecución completa ('cprofile', 'muestreo' o None).
+        segundos_perfil (float): Ventana de los muestreos de pilas (el iniciado con SIGUSR2 y, si se
+            indica, el de la ejecución completa).
+        tramos (deque): Tramos registrados como (etapa, inicio_ns, fin_ns, hilo).
+    """
+    def __init__(self, componente: str, activo: bool = False, muestreo: float = 1.0, ruta: str = "./trazas",
+                 metodo_perfil: Optional[str] = None, segundos_perfil: float = 10.0) -> None:
+        """
+        Argumentos:
+            componente (str): Nombre del componente.
+            activo (bool): Si se registran tramos desde el inicio.
+            muestreo (float): Fracción de llamadas registradas por etapa, en (0, 1].
+            ruta (str): Directorio de salida.
+            metodo_perfil (Optional[str]): Perfil de la ejecución completa: 'cprofile', 'muestreo' o None.
+            segundos_perfil (float): Duración de los muestreos de pilas.
+        """
+        if metodo_perfil not in (None, PERFIL_CPROFILE, PERFIL_MUESTREO):
+            raise ValueError(f"Perfil '{metodo_perfil}' no reconocido; use '{PERFIL_CPROFILE}' o '{PERFIL_MUESTREO}'.")
+        if not 0 < muestreo <= 1:
+            raise ValueError("La fracción de muestreo de las trazas debe estar en (0, 1].")
+        self.componente: str = componente
+        self.activo: bool = activo
+        self.periodo: int = max(1, round(1 / muestreo))
+        self.ruta: str = ruta
+        self.metodo_perfil: Optional[str] = metodo_perfil
+        self.segundos_perfil: float = segundos_perfil
+        self.tramos: Deque[Tuple[str, int, int, int]] = deque(maxlen=MAX_TRAMOS)
+        self.llamadas: Dict[str, int] = {}
+        # Referencias para convertir perf_counter a tiempo de reloj y alinear trazas de varios procesos
+        self._origen_ns: int = time.perf_counter_ns()
+        self._origen_epoca_us: float = time.time() * 1e6
+
+    def tramo(self, etapa: str) -> Any:
+        """
+        Contexto que mide la etapa si el trazador está activo y le toca a esta llamada.
+        """
+        if not self.activo:
+            return _NULO
+        llamadas: int = self.llamadas.get(etapa, 0) + 1
+        self.llamadas[etapa] = llamadas
+        if llamadas % self.periodo:
+            return _NULO
+        return _Tramo(self, etapa)
+
+    def registrar(self, etapa: str, inicio: float, fin: float) -> None:
+        """
+        Registra un tramo medido por el llamador con `time.perf_counter`, respetando el muestreo
+        (para esperas que no encajan en un bloque `with`, como la de un iterador).
+        """
+        if not self.activo:
+            return
+        llamadas: int = self.llamadas.get(etapa, 0) + 1
+        self.llamadas[etapa] = llamadas
+        if llamadas % self.periodo == 0:
+            self.tramos.append((etapa, int(inicio * 1e9), int(fin * 1e9), threading.get_ident()))
+
+    def activar(self) -> None:
+        self.tramos.clear()
+        self.llamadas.clear()
+        self.activo = True
+        print(f"[TRAZAS] Trazas de {self.componente} activadas (1 de cada {self.periodo} llamadas por etapa).")
+
+    def desactivar(self) -> Optional[str]:
+        """
+        Deja de registrar tramos y exporta los registrados.
+
+        Retorna:
+            Optional[str]: Ruta de la traza escrita, o None si no había tramos.
+        """
+        self.activo = False
+        return self.exportar()
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        """
+        Estadísticos por etapa de los tramos registrados, en milisegundos.
+
+        Retorna:
+            dict: Por etapa, llamadas, muestras, total, media, p50, p99, máximo y fracción del tiempo medido.
+        """
+        duraciones: Dict[str, List[int]] = {}
+        for etapa, inicio, fin, _ in list(self.tramos):
+            duraciones.setdefault(etapa, []).append(fin - inicio)
+        total_medido: float = sum(sum(valores) for valores in duraciones.values()) or 1
+        resumen: Dict[str, Dict[str, float]] = {}
+        for etapa, valores in sorted(duraciones.items(), key=lambda par: -sum(par[1])):
+            ms: np.ndarray = np.asarray(valores, dtype=np.float64) / 1e6
+            resumen[etapa] = {
+                "llamadas": self.llamadas.get(etapa, len(valores)),
+                "muestras": len(valores),
+                "total_ms": float(ms.sum()),
+                "media_ms": float(ms.mean()),
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p99_ms": float(np.percentile(ms, 99)),
+                "max_ms": float(ms.max()),
+                "fraccion": float(sum(valores) / total_medido),
+            }
+        return resumen
+
+    def eventos(self) -> List[Dict[str, Any]]:
+        """
+        Tramos en el formato de eventos de traza de Chrome (eventos completos "X", en microsegundos).
+        """
+        pid: int = os.getpid()
+        eventos: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{self.componente} ({pid})"}}
+        ]
+        for etapa, inicio, fin, hilo in list(self.tramos):
+            eventos.append({
+                "name": etapa,
+                "cat": self.componente,
+                "ph": "X",
+                "ts": self._origen_epoca_us + (inicio - self._origen_ns) / 1e3,
+                "dur": (fin - inicio) / 1e3,
+                "pid": pid,
+                "tid": hilo,
+            })
+        return eventos
+
+    def exportar(self, archivo: Optional[str] = None) -> Optional[str]:
+        """
+        Escribe la traza de Chrome (con el resumen en "otherData") e imprime el resumen por etapa.
+
+        Argumentos:
+            archivo (Optional[str]): Ruta del archivo; por defecto se genera en `ruta`.
+
+        Retorna:
+            Optional[str]: Ruta escrita, o None si no había tramos.
+        """
+        if not self.tramos:
+            return None
+        resumen: Dict[str, Dict[str, float]] = self.resumen()
+        if archivo is None:
+            os.makedirs(self.ruta, exist_ok=True)
+            archivo = os.path.join(self.ruta, f"{self.componente}-{os.getpid()}-{_marca_tiempo()}.trace.json")
+        with open(archivo, "w", encoding="utf-8") as salida:
+            json.dump({
+                "traceEvents": self.eventos(),
+                "displayTimeUnit": "ms",
+                "otherData": {"componente": self.componente, "periodo_muestreo": self.periodo, "resumen": resumen},
+            }, salida)
+        print(f"[TRAZAS] Traza de {self.componente} escrita en {archivo}")
+        print(formatear_resumen(resumen))
+        return archivo
+
+    def perfilar(self) -> Any:
+        """
+        Contexto para la ejecución completa del componente: la perfila con `metodo_perfil` (el
+        muestreo de pilas, solo durante `segundos_perfil`) y al salir exporta las trazas activas.
+        """
+        return _Ejecucion(self)
+
+class _Ejecucion:
+    """
+    Contexto de `Trazador.perfilar`.
+    """
+    def __init__(self, trazador: Trazador) -> None:
+        self.trazador: Trazador = trazador
+        self.perfil: Optional[Perfil] = None
+        if trazador.metodo_perfil is not None:
+            segundos: Optional[float] = trazador.segundos_perfil if trazador.metodo_perfil == PERFIL_MUESTREO else None
+            self.perfil = Perfil(trazador.componente, trazador.metodo_perfil, trazador.ruta, segundos)
+
+    def __enter__(self) -> "_Ejecucion":
+        if self.perfil is not None:
+            self.perfil.iniciar()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        if self.perfil is not None:
+            self.perfil.detener()
+        if self.trazador.activo:
+            self.trazador.exportar()
+
+def formatear_resumen(resumen: Dict[str, Dict[str, float]]) -> str:
+    """
+    Tabla de texto con el resumen por etapa.
+    """
+    lineas: List[str] = [
+        f"{'etapa':<24}{'llamadas':>10}{'muestras':>10}{'total ms':>12}{'media ms':>11}"
+        f"{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'%':>7}"
+    ]
+    for etapa, valores in resumen.items():
+        lineas.append(
+            f"{etapa:<24}{valores['llamadas']:>10}{valores['muestras']:>10}{valores['total_ms']:>12.2f}"
+            f"{valores['media_ms']:>11.4f}{valores['p50_ms']:>10.4f}{valores['p99_ms']:>10.4f}"
+            f"{valores['max_ms']:>10.4f}{100 * valores['fraccion']:>7.1f}"
+        )
+    return "\n".join(lineas)
+
+class MuestreadorPilas(threading.Thread):
+    """
+    Perfilador estadístico: cada `intervalo` segundos toma la pila de todos los hilos del
+    proceso (salvo el suyo) y cuenta las pilas repetidas. Su costo no depende de cuántas
+    llamadas hagan los hilos muestreados.
+    """
+    def __init__(self, intervalo: float = 0.005, segundos: Optional[float] = None) -> None:
+        """
+        Argumentos:
+            intervalo (float): Segundos entre muestras.
+            segundos (Optional[float]): Duración de la ventana; None muestrea hasta `detener`.
+        """
+        super().__init__(name="MuestreadorPilas", daemon=True)
+        self.intervalo: float = intervalo
+        self.segundos: Optional[float] = segundos
+        self.pilas: Counter = Counter()
+        self.muestras: int = 0
+        self._detenido: threading.Event = threading.Event()
+
+    def run(self) -> None:
+        propio: int = threading.get_ident()
+        nombres: Dict[int, str] = {}
+        limite: float = time.monotonic() + self.segundos if self.segundos is not None else float("inf")
+        while not self._detenido.wait(self.intervalo) and time.monotonic() < limite:
+            if len(nombres) != threading.active_count():
+                nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+            for hilo, marco in sys._current_frames().items():
+                if hilo == propio:
+                    continue
+                funciones: List[str] = []
+                while marco is not None:
+                    codigo = marco.f_code
+                    funciones.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                    marco = marco.f_back
+                funciones.append(nombres.get(hilo, str(hilo)))
+                self.pilas[";".join(reversed(funciones))] += 1
+            self.muestras += 1
+
+    def detener(self) -> None:
+        self._detenido.set()
+        self.join()
+
+    def funciones(self, cantidad: int = 15) -> List[Tuple[str, int, int]]:
+        """
+        Funciones con más muestras, como (función, muestras propias, muestras inclusivas).
+        """
+        propias: Counter = Counter()
+        inclusivas: Counter = Counter()
+        for pila, conteo in self.pilas.items():
+            marcos: List[str] = pila.split(";")[1:]
+            propias[marcos[-1] if marcos else pila] += conteo
+            for funcion in set(marcos):
+                inclusivas[funcion] += conteo
+        return [(funcion, conteo, inclusivas[funcion]) for funcion, conteo in propias.most_common(cantidad)]
+
+    def exportar(self, archivo: str) -> None:
+        """
+        Escribe las pilas en formato colapsado (una pila por línea y su conteo), que leen
+        flamegraph.pl y speedscope, e imprime las funciones con más muestras.
+        """
+        with open(archivo, "w", encoding="utf-8") as salida:
+            for pila, conteo in self.pilas.most_common():
+                salida.write(f"{pila} {conteo}\n")
+        print(f"[TRAZAS] {self.muestras} muestras de pilas escritas en {archivo}")
+        print(f"{'propias':>9}{'inclusivas':>12}  función")
+        for funcion, propias, inclusivas in self.funciones():
+            print(f"{propias:>9}{inclusivas:>12}  {funcion}")
+
+class Perfil:
+    """
+    Perfil de un componente durante un bloque `with` o una ventana de tiempo.
+    Con 'cprofile' se perfila el hilo que entra al bloque (en Python 3.11 cProfile no
+    sigue a otros hilos); con 'muestreo' se muestrean las pilas de todos los hilos.
+    """
+    def __init__(self, componente: str, metodo: str, ruta: str = "./trazas", segundos: Optional[float] = None) -> None:
+        """
+        Argumentos:
+            componente (str): Nombre del componente, usado en el nombre de los archivos.
+            metodo (str): 'cprofile' o 'muestreo'.
+            ruta (str): Directorio de salida.
+            segundos (Optional[float]): Ventana del muestreo; None perfila todo el bloque.
+        """
+        if metodo not in (PERFIL_CPROFILE, PERFIL_MUESTREO):
+            raise ValueError(f"Perfil '{metodo}' no reconocido; use '{PERFIL_CPROFILE}' o '{PERFIL_MUESTREO}'.")
+        self.componente: str = componente
+        self.metodo: str = metodo
+        self.ruta: str = ruta
+        self.segundos: Optional[float] = segundos
+        self._perfilador: Optional[cProfile.Profile] = None
+        self._muestreador: Optional[MuestreadorPilas] = None
+
+    def archivo(self, extension: str) -> str:
+        os.makedirs(self.ruta, exist_ok=True)
+        return os.path.join(self.ruta, f"{self.componente}-{os.getpid()}-{_marca_tiempo()}.{extension}")
+
+    def iniciar(self) -> None:
+        if self.metodo == PERFIL_CPROFILE:
+            self._perfilador = cProfile.Profile()
+            self._perfilador.enable()
+        else:
+            self._muestreador = MuestreadorPilas(segundos=self.segundos)
+            self._muestreador.start()
+
+    def detener(self) -> None:
+        """
+        Detiene el perfil y escribe sus resultados (.prof de pstats o pilas colapsadas).
+        """
+        if self._perfilador is not None:
+            self._perfilador.disable()
+            archivo: str = self.archivo("prof")
+            self._perfilador.dump_stats(archivo)
+            print(f"[TRAZAS] Perfil de cProfile escrito en {archivo}")
+            pstats.Stats(self._perfilador).sort_stats("cumulative").print_stats(15)
+            self._perfilador = None
+        if self._muestreador is not None:
+            self._muestreador.detener()
+            self._muestreador.exportar(self.archivo("folded"))
+            self._muestreador = None
+
+    def __enter__(self) -> "Perfil":
+        self.iniciar()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.detener()
+
+def _alternar_trazas(*_: Any) -> None:
+    for trazador in _TRAZADORES:
+        if trazador.activo:
+            trazador.desactivar()
+        else:
+            trazador.activar()
+
+def _muestrear_ventana(*_: Any) -> None:
+    if not _TRAZADORES:
+        return
+    trazador: Trazador = _TRAZADORES[0]
+    perfil: Perfil = Perfil(trazador.componente, PERFIL_MUESTREO, trazador.ruta)
+    print(f"[TRAZAS] Muestreando las pilas durante {trazador.segundos_perfil} s.")
+    perfil.iniciar()
+    threading.Timer(trazador.segundos_perfil, perfil.detener).start()
+
+def _terminar(*_: Any) -> None:
+    # Sale con SystemExit para que `perfilar` exporte las trazas y el perfil antes de terminar
+    raise SystemExit(0)
+
+def crear_trazador(componente: str, configuracion: Optional[Dict[str, Any]] = None) -> Trazador:
+    """
+    Crea el trazador de un componente. Sin configuración queda desactivado y no atiende
+    señales; con configuración (claves "activo", "muestreo", "ruta", "perfil" y
+    "segundos_perfil") se registra para que SIGUSR1 y SIGUSR2 lo controlen en tiempo de ejecución.
+    Además, si SIGTERM conserva su acción por defecto, el proceso termina ordenadamente para no
+    perder las trazas de los procesos detenidos con `terminate()`.
+
+    Argumentos:
+        componente (str): Nombre del componente.
+        configuracion (Optional[dict]): Configuración de las trazas.
+
+    Retorna:
+        Trazador: Trazador del componente.
+    """
+    if configuracion is None:
+        return Trazador(componente)
+    trazador: Trazador = Trazador(
+        componente,
+        activo=configuracion.get("activo", False),
+        muestreo=configuracion.get("muestreo", 1.0),
+        ruta=configuracion.get("ruta", "./trazas"),
+        metodo_perfil=configuracion.get("perfil"),
+        segundos_perfil=configuracion.get("segundos_perfil", 10.0)
+    )
+    _TRAZADORES.append(trazador)
+    # Las señales solo pueden instalarse desde el hilo principal y no existen en Windows
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, _alternar_trazas)
+        signal.signal(signal.SIGUSR2, _muestrear_ventana)
+        if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, _terminar)
+    return trazador
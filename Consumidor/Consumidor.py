@@ -1,20 +1,51 @@
 """
 __________________________________________________________________________________________________________________________________________
 Módulo: Consumidor.py
-Descripción: El Consumidor es un proceso autónomo que se encarga de ejecutar simulaciones Montecarlo a partir de los escenarios enviados 
-por el productor. Principalmente se encarga de recibir una configuración y luego procesar escenarios usando mensajes intercambiados con 
-RabbitMQ que es un sistema de mensajería basado en colas. El consumidor procesa dos tipos de mensajes, despues ejecuta la formula con las 
-variables recibidas y finalmente se publica el resultado en otra cola.
-    1.Configuración inicial con formula matematica. 
-    2. escenarios con valores variables. 
+Descripción: El Consumidor es un proceso autónomo que se encarga de ejecutar simulaciones Montecarlo a partir de los escenarios enviados
+por el productor. Recibe la configuración de cada corrida (fórmula, constantes y opciones) por el exchange de configuración, evalúa
+los escenarios que llegan por la cola de trabajo (uno por mensaje en JSON, en bloques columnares o como unidades de trabajo que
+genera localmente) y publica los resultados, o agregados parciales, en la cola de resultados de la corrida.
 __________________________________________________________________________________________________________________________________________
 """
 
+import os
+import sys
+import time
+import signal
+import threading
 import pika
 import json
+import numpy as np
+from collections import OrderedDict
 from pika.adapters.blocking_connection import BlockingChannel
 from pika.spec import Basic, BasicProperties
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Comun"))
+from Mensajes import (
+    CONTROL_DETENER, CONTROL_PROGRESO, TIPO_CONTENIDO_AGREGADO, TIPO_CONTENIDO_BLOQUE, TIPO_CONTENIDO_CONTROL,
+    TIPO_CONTENIDO_JSON, TIPO_CONTENIDO_UNIDAD, codificar_bloque, codificar_control, decodificar_bloque,
+    decodificar_control, decodificar_unidad, es_bloque, filas_bloque
+)
+from Modelo import CLAVES_RESERVADAS, Modelo, generador_para_rango
+from Estadisticas import Estadisticas, EstadisticasBarrido, codificar_agregado
+from Transporte import TransporteRabbitMQ, declarar_cola_corrida
+from Metricas import RegistroMetricas, iniciar_servidor
+from Trazas import Trazador, crear_trazador
+from Archivo import EscritorArchivo
+from Formula import (
+    BarridoCompilado, FormulaCompilada, FormulaInvalida, SalidasCompiladas, compilar_barrido, compilar_formula,
+    compilar_salidas
+)
+
+# Atributos que dependen de la corrida y se guardan en la caché de corridas al cambiar de una a otra
+ATRIBUTOS_CORRIDA: tuple = (
+    "configuracion", "formula", "constantes", "corrida", "parada", "antiteticas", "modelo", "formula_compilada",
+    "salidas_compiladas", "barrido_compilado", "control_compilado", "media_control", "archivo", "cola_resultados"
+)
+
+# Segundos que se retiene un mensaje de una corrida sin configuración conocida antes de devolverlo a la cola
+ESPERA_CORRIDA_DESCONOCIDA: float = 1.0
+
 class Consumidor:
     """
     Clase que implementa un consumidor de mensajes con RabbitMQ para procesar escenarios de simulación.
@@ -24,28 +55,149 @@ class Consumidor:
     2. Procesa escenarios usando dicha fórmula y publica los resultados en otra cola.
 
     Atributos:
-        conexion (pika.BlockingConnection): Conexión al servidor RabbitMQ.
-        canal (pika.channel.Channel): Canal de comunicación con RabbitMQ.
+        transporte (TransporteRabbitMQ | TransporteLocal): Transporte de los mensajes (ver Comun/Transporte.py).
+        conexion (pika.BlockingConnection): Conexión del transporte.
+        canal (pika.channel.Channel): Canal de comunicación.
         nom_exchange (str): Nombre del exchange.
         nom_queue_escenarios (str): Nombre de la cola desde donde se reciben los escenarios.
-        nom_queue_resultados (str): Nombre de la cola donde se publican los resultados.
+        nom_queue_resultados (str): Nombre base de las colas de resultados de cada corrida.
         formula (str | None): Fórmula matemática a evaluar.
         constantes (dict): Diccionario con las constantes necesarias para la evaluación.
+        formula_compilada (FormulaCompilada | None): Fórmula validada, con las constantes plegadas y compilada.
+        salidas_compiladas (SalidasCompiladas | None): Salidas con nombre compiladas juntas, si el modelo define más de una.
+        barrido_compilado (BarridoCompilado | None): Salida principal compilada para los puntos del barrido de parámetros.
+        configuracion (dict): Última configuración recibida, tal como la difundió el productor.
+        escenarios_procesados (int): Escenarios evaluados y publicados por este consumidor.
+        modelo (Modelo | None): Modelo reconstruido con las variables difundidas, para las unidades de trabajo.
+        prefetch (int): Mensajes que el broker puede entregar sin confirmar.
+        ack_lote (int): Mensajes que se confirman juntos; 1 confirma cada mensaje por separado.
+        ack_intervalo_ms (int | None): Tiempo máximo que un lote (o un agregado parcial) puede esperar antes de confirmarse.
+        agregacion (bool): Publica estadísticos parciales en lugar de resultados individuales.
+        agregado_escenarios (int): Escenarios que se acumulan antes de publicar un agregado parcial.
+        nom_exchange_control (str | None): Exchange de control para la parada anticipada.
+        intervalo_control (float): Segundos entre reportes de progreso por el exchange de control.
+        corrida (str | None): Identificador de la corrida de la configuración vigente.
+        parada (dict | None): Criterio de parada de la corrida; None si se ejecuta completa.
+        corridas_detenidas (OrderedDict): Últimas `max_corridas` corridas detenidas, cuyo trabajo pendiente se descarta.
+        mensajes_descartados (int): Mensajes confirmados sin procesar por pertenecer a una corrida detenida.
+        mensajes_devueltos (int): Veces que se devolvió a la cola un mensaje de una corrida sin configuración conocida.
+        escenarios_rechazados (int): Escenarios de mensajes rechazados por un error de evaluación.
+        antiteticas (bool): Los bloques de escenarios vienen en pares antitéticos consecutivos.
+        control_compilado (FormulaCompilada | None): Expresión compilada de la variable de control.
+        media_control (float | None): Media conocida de la variable de control.
+        metricas (RegistroMetricas): Métricas del consumidor, expuestas por HTTP si se indica `puerto_metricas`.
+        ruta_archivo (str | None): Directorio del archivo de escenarios y resultados; None no los guarda.
+        archivo (EscritorArchivo | None): Parte del archivo de la corrida vigente, creada con el primer resultado.
+        cola_resultados (str): Cola donde se publican los resultados de la corrida vigente.
+        max_corridas (int): Corridas cuyo estado compilado se conserva a la vez.
+        corridas (OrderedDict): Estado de las demás corridas usadas recientemente (ver ATRIBUTOS_CORRIDA), de la menos a la más reciente.
+        configuraciones (OrderedDict): Configuraciones recibidas aún no compiladas, por corrida.
+        cola_configuracion (str | None): Cola exclusiva suscrita al exchange de configuración.
     """
 
-    def __init__(self, ip: str, nom_exchange: str, nom_queue_escenarios: str, nom_queue_resultados: str) -> None:
-        self.conexion: pika.BlockingConnection = pika.BlockingConnection(pika.ConnectionParameters(host=ip))
+    def __init__(self, ip: str, nom_exchange: str, nom_queue_escenarios: str, nom_queue_resultados: str,
+                 prefetch: int = 1, ack_lote: int = 1, ack_intervalo_ms: int | None = None,
+                 agregacion: bool = False, agregado_escenarios: int = 100000,
+                 nom_exchange_control: str | None = None, intervalo_control: float = 1.0,
+                 transporte=None, puerto_metricas: int | None = None, trazas: dict | None = None,
+                 ruta_archivo: str | None = None, filas_trozo_archivo: int = 1 << 20, max_corridas: int = 8) -> None:
+        self.transporte = transporte if transporte is not None else TransporteRabbitMQ(host=ip)
+        self.conexion: pika.BlockingConnection = self.transporte.conectar()
         self.canal: pika.channel.Channel = self.conexion.channel()
         self.nom_exchange: str = nom_exchange
         self.nom_queue_escenarios: str = nom_queue_escenarios
         self.nom_queue_resultados: str = nom_queue_resultados
+        self.configuracion: dict = {}
         self.formula: str | None = None
         self.constantes: dict = {}
+        self.formula_compilada: FormulaCompilada | None = None
+        self.salidas_compiladas: SalidasCompiladas | None = None
+        self.barrido_compilado: BarridoCompilado | None = None
+        self.modelo: Modelo | None = None
+        self.prefetch: int = prefetch
+        self.ack_lote: int = ack_lote
+        self.ack_intervalo_ms: int | None = ack_intervalo_ms
+        self.agregacion: bool = agregacion
+        self.agregado_escenarios: int = agregado_escenarios
+        self.nom_exchange_control: str | None = nom_exchange_control
+        self.intervalo_control: float = intervalo_control
+        self.ruta_archivo: str | None = ruta_archivo
+        self.filas_trozo_archivo: int = filas_trozo_archivo
+        self.archivo: EscritorArchivo | None = None
+        self.corrida: str | None = None
+        self.parada: dict | None = None
+        self.corridas_detenidas: OrderedDict = OrderedDict()
+        self.mensajes_descartados: int = 0
+        self.mensajes_devueltos: int = 0
+        self.escenarios_rechazados: int = 0
+        self.escenarios_procesados: int = 0
+        self.antiteticas: bool = False
+        self.control_compilado: FormulaCompilada | None = None
+        self.media_control: float | None = None
+        self.cola_resultados: str = nom_queue_resultados
+        self.max_corridas: int = max(1, max_corridas)
+        self.corridas: OrderedDict = OrderedDict()
+        self.configuraciones: OrderedDict = OrderedDict()
+        self.cola_configuracion: str | None = None
+        self._corridas_desconocidas: set = set()
+        # Mensajes retenidos de corridas desconocidas: delivery tag -> canal
+        self._retenidos: dict = {}
+        self._progreso: Estadisticas = Estadisticas()
+        self._rechazados_progreso: int = 0
+        self._lote_estadisticas: Estadisticas = Estadisticas()
+        self._lote_resultados: list = []
+        self._lote_controles: list = []
+        # Salidas secundarias del lote: nombre -> lista de arreglos (o estadísticos en modo de agregación)
+        self._lote_salidas: dict = {}
+        self._lote_estadisticas_salidas: dict = {}
+        self._lote_barrido: EstadisticasBarrido | None = None
+        self._lote_pares: bool = True
+        self._lote_mensajes: int = 0
+        self._lote_tag: int | None = None
+        self._lote_canal: BlockingChannel | None = None
+        # Escenarios de cada rango incluidos en el lote: inicio -> [escenarios, tamaño del rango]
+        self._lote_rangos: dict = {}
+
+        self.metricas: RegistroMetricas = RegistroMetricas()
+        self.metrica_consumidos = self.metricas.contador(
+            "montecarlo_consumidor_mensajes_consumidos_total", "Mensajes recibidos de la cola de escenarios.")
+        self.metrica_evaluados = self.metricas.contador(
+            "montecarlo_consumidor_escenarios_evaluados_total", "Escenarios evaluados.")
+        self.metrica_evaluacion = self.metricas.histograma(
+            "montecarlo_consumidor_evaluacion_segundos",
+            "Tiempo de evaluación de cada mensaje (decodificación, generación local y fórmula).")
+        self.metrica_rechazos = self.metricas.contador(
+            "montecarlo_consumidor_nacks_total", "Mensajes rechazados con basic_nack.")
+        self.metrica_errores = self.metricas.contador(
+            "montecarlo_consumidor_errores_evaluacion_total", "Mensajes cuya evaluación falló.")
+        self.metrica_descartados = self.metricas.contador(
+            "montecarlo_consumidor_mensajes_descartados_total", "Mensajes descartados por pertenecer a una corrida detenida.")
+        self.metrica_resultados = self.metricas.contador(
+            "montecarlo_consumidor_mensajes_resultados_total", "Mensajes publicados en la cola de resultados.")
+        self.servidor_metricas = iniciar_servidor(self.metricas, puerto_metricas)
+        self.trazador: Trazador = crear_trazador("consumidor", trazas)
 
     def callback_configuracion(self, ch: BlockingChannel, method: Basic.Deliver, properties: BasicProperties, body: bytes) -> None:
         """
-        Maneja la recepción de mensajes de configuración.
-        Extrae la fórmula y las constantes del mensaje.
+        Maneja la recepción de la primera configuración.
+        Aplica la configuración recibida con `aplicar_configuracion` y deja de escuchar el exchange.
+
+        Args:
+            ch (BlockingChannel): Canal que recibe el mensaje.
+            method (Basic.Deliver): Información del método de entrega.
+            properties (BasicProperties): Propiedades del mensaje.
+            body (bytes): Contenido del mensaje en formato JSON.
+        """
+        self.aplicar_configuracion(json.loads(body.decode("utf-8")))
+        print(f"[CONSUMIDOR] Configuración recibida (corrida {self.corrida}).")
+        ch.basic_cancel(method.consumer_tag)
+        ch.stop_consuming()
+
+    def callback_nueva_configuracion(self, ch: BlockingChannel, method: Basic.Deliver, properties: BasicProperties,
+                                     body: bytes) -> None:
+        """
+        Registra las configuraciones difundidas mientras se procesan escenarios; cada una se compila
+        con el primer mensaje de su corrida.
 
         Args:
             ch (BlockingChannel): Canal que recibe el mensaje.
@@ -54,69 +206,734 @@ class Consumidor:
             body (bytes): Contenido del mensaje en formato JSON.
         """
         configuracion: dict = json.loads(body.decode("utf-8"))
+        self.registrar_configuracion(configuracion)
+        print(f"[CONSUMIDOR] Configuración recibida (corrida {configuracion.get('corrida')}).")
+
+    def registrar_configuracion(self, configuracion: dict) -> None:
+        """
+        Guarda una configuración sin compilarla, descartando las más antiguas por encima de `max_corridas`.
+        Si su corrida estaba en la caché, descarta el estado guardado para compilar la nueva al activarla.
+
+        Args:
+            configuracion (dict): Configuración difundida por el productor.
+        """
+        corrida: str | None = configuracion.get("corrida")
+        if corrida in self.corridas and corrida != self.corrida:
+            self.cerrar_corrida(self.corridas.pop(corrida))
+        self.configuraciones[corrida] = configuracion
+        self.configuraciones.move_to_end(corrida)
+        while len(self.configuraciones) > self.max_corridas:
+            self.configuraciones.popitem(last=False)
+        self._corridas_desconocidas.discard(corrida)
+
+    def aplicar_configuracion(self, configuracion: dict) -> None:
+        """
+        Registra una configuración y la activa como corrida vigente (ver `activar_corrida`).
+
+        Args:
+            configuracion (dict): Configuración difundida por el productor.
+        """
+        corrida: str | None = configuracion.get("corrida")
+        self.registrar_configuracion(configuracion)
+        if corrida == self.corrida:
+            self.vaciar_lote()
+            self.compilar_configuracion(self.configuraciones.pop(corrida))
+        else:
+            self.activar_corrida(corrida)
+
+    def activar_corrida(self, corrida: str | None) -> bool:
+        """
+        Convierte una corrida en la vigente: vacía el lote pendiente (que pertenece a la corrida anterior),
+        guarda el estado de la anterior en la caché de corridas y restaura el de la nueva, compilando
+        su configuración si no estaba en la caché.
+
+        Args:
+            corrida (str | None): Identificador de la corrida.
+
+        Returns:
+            bool: False si no se conoce la configuración de la corrida.
+        """
+        if corrida == self.corrida:
+            return True
+        if corrida not in self.corridas and corrida not in self.configuraciones:
+            configuracion: dict | None = self.buscar_configuracion(corrida)
+            if configuracion is None:
+                return False
+            self.registrar_configuracion(configuracion)
+        self.vaciar_lote()
+        if self.reporta_progreso():
+            self.reportar_progreso()
+        estado: dict | None = self.corridas.pop(corrida, None)
+        self.guardar_corrida()
+        if estado is not None:
+            for atributo, valor in estado.items():
+                setattr(self, atributo, valor)
+        else:
+            self.archivo = None
+            self.compilar_configuracion(self.configuraciones.pop(corrida))
+        return True
+
+    def guardar_corrida(self) -> None:
+        """
+        Guarda el estado de la corrida vigente en la caché, que junto con la vigente conserva a lo más
+        `max_corridas` corridas: las menos usadas se descartan, cerrando su archivo.
+        """
+        if self.formula is None:
+            return
+        self.corridas[self.corrida] = {atributo: getattr(self, atributo) for atributo in ATRIBUTOS_CORRIDA}
+        while len(self.corridas) >= self.max_corridas:
+            self.cerrar_corrida(self.corridas.popitem(last=False)[1])
+
+    def cerrar_corrida(self, estado: dict) -> None:
+        """
+        Cierra el archivo de una corrida que sale de la caché.
+
+        Args:
+            estado (dict): Estado guardado de la corrida.
+        """
+        if estado["archivo"] is not None:
+            estado["archivo"].cerrar()
+
+    def buscar_configuracion(self, corrida: str | None) -> dict | None:
+        """
+        Lee la configuración de una corrida de su cola de configuración, sin retirarla, con un canal
+        temporal (si la cola no existe, el broker cierra el canal).
+
+        Args:
+            corrida (str | None): Identificador de la corrida.
+
+        Returns:
+            dict | None: Configuración de la corrida, o None si no está disponible.
+        """
+        cola: str = self.transporte.cola_corrida(self.nom_exchange, corrida)
+        if cola == self.nom_exchange:
+            return None
+        canal = None
+        try:
+            canal = self.conexion.channel()
+            metodo, _, cuerpo = canal.basic_get(queue=cola)
+            if metodo is None:
+                return None
+            canal.basic_nack(delivery_tag=metodo.delivery_tag, requeue=True)
+            return json.loads(cuerpo.decode("utf-8"))
+        except (pika.exceptions.AMQPError, ValueError):
+            return None
+        finally:
+            if canal is not None and canal.is_open:
+                canal.close()
+
+    def compilar_configuracion(self, configuracion: dict) -> None:
+        """
+        Extrae la fórmula y las constantes de una configuración y compila la fórmula una sola vez.
+        Si la configuración incluye las variables, reconstruye el modelo para generar escenarios localmente.
+        También guarda el identificador de la corrida, su criterio de parada y la técnica de reducción de
+        varianza, compilando la expresión de la variable de control si la hay, y declara la cola de
+        resultados de la corrida.
+
+        Args:
+            configuracion (dict): Configuración difundida por el productor.
+        """
+        self.configuracion = configuracion
         self.formula = configuracion.get("formula")
         self.constantes = {
             nombre: valor for nombre, valor in configuracion.items()
-            if nombre != "formula"
+            if nombre not in CLAVES_RESERVADAS
         }
-        print(f"[CONSUMIDOR] Configuración recibida.")
-        ch.stop_consuming()
+        if self.archivo is not None and configuracion.get("corrida") != self.corrida:
+            self.archivo.cerrar()
+            self.archivo = None
+        self.corrida = configuracion.get("corrida")
+        self.cola_resultados = declarar_cola_corrida(self.canal, self.transporte, self.nom_queue_resultados, self.corrida)
+        self.parada = configuracion.get("parada")
+        reduccion: dict = configuracion.get("reduccion_varianza") or {}
+        self.antiteticas = bool(reduccion.get("antiteticas"))
+        variables: dict | None = configuracion.get("variables")
+        self.modelo = Modelo.desde_variables(variables, reduccion, configuracion.get("muestreo")) if variables else None
+        salidas: dict = configuracion.get("salidas") or {}
+        self.formula_compilada, self.salidas_compiladas = None, None
+        try:
+            if len(salidas) > 1:
+                reservados: set = {"resultado", "control", *(variables or {})}
+                repetidos: list = [nombre for nombre in list(salidas)[1:] if nombre in reservados]
+                if repetidos:
+                    raise FormulaInvalida(f"Nombres de salida reservados o iguales a una variable: {', '.join(repetidos)}")
+                self.salidas_compiladas = compilar_salidas(salidas, self.constantes)
+            else:
+                self.formula_compilada = compilar_formula(self.formula, self.constantes)
+        except (FormulaInvalida, TypeError) as e:
+            print(f"[CONSUMIDOR - ERROR]: fórmula inválida: {e}")
+        control: dict | None = reduccion.get("control")
+        self.control_compilado, self.media_control = None, None
+        if control:
+            try:
+                self.control_compilado = compilar_formula(control["expresion"], self.constantes)
+                self.media_control = float(control["media"])
+            except (FormulaInvalida, TypeError, KeyError) as e:
+                print(f"[CONSUMIDOR - ERROR]: variable de control inválida: {e}")
+                self.control_compilado, self.media_control = None, None
+        self.barrido_compilado = None
+        if configuracion.get("barrido"):
+            try:
+                self.barrido_compilado = compilar_barrido(
+                    self.formula, self.constantes, configuracion["barrido"], salidas if len(salidas) > 1 else None
+                )
+            except (FormulaInvalida, TypeError, ValueError) as e:
+                print(f"[CONSUMIDOR - ERROR]: barrido de parámetros inválido: {e}")
 
     def callback_escenario(self, ch: BlockingChannel, method: Basic.Deliver, properties: BasicProperties, body: bytes) -> None:
         """
         Maneja la recepción de un escenario, evalúa la fórmula y publica el resultado.
+        Si el mensaje es un bloque binario o una unidad de trabajo, delega en `procesar_bloque`
+        o `procesar_unidad` respectivamente. Antes activa la corrida del mensaje (cabecera "corrida"); si fue
+        detenida, confirma el mensaje sin procesarlo, y si su configuración no se conoce lo retiene y lo
+        devuelve más tarde a la cola (ver `retener_mensaje`).
 
         Args:
             ch (BlockingChannel): Canal que recibe el mensaje.
             method (Basic.Deliver): Información del método de entrega.
             properties (BasicProperties): Propiedades del mensaje.
-            body (bytes): Contenido del mensaje en formato JSON.
+            body (bytes): Contenido del mensaje en formato JSON o de bloque.
         """
-        escenario: dict = json.loads(body.decode("utf-8"))
+        self.metrica_consumidos.incrementar()
+        cabeceras: dict = (properties.headers or {}) if properties is not None else {}
+        corrida: str | None = cabeceras.get("corrida", self.corrida)
+        if corrida is not None and corrida in self.corridas_detenidas:
+            self.corridas_detenidas.move_to_end(corrida)
+            self.mensajes_descartados += 1
+            self.metrica_descartados.incrementar()
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+            return
+        if not self.activar_corrida(corrida):
+            if corrida not in self._corridas_desconocidas:
+                self._corridas_desconocidas.add(corrida)
+                print(f"[CONSUMIDOR - ERROR]: no se conoce la configuración de la corrida {corrida}.")
+            self.retener_mensaje(ch, method)
+            return
+        rango: list | None = cabeceras.get("rango")
+        if es_bloque(body):
+            self.procesar_bloque(ch, method, body, rango)
+            return
+        if properties is not None and properties.content_type == TIPO_CONTENIDO_UNIDAD:
+            self.procesar_unidad(ch, method, body, rango)
+            return
 
-        simulacion: dict = {}
-        simulacion.update(self.constantes)
-        simulacion.update(escenario)
+        inicio: float = time.perf_counter()
+        with self.trazador.tramo("decodificacion"):
+            escenario: dict = json.loads(body.decode("utf-8"))
 
         try:
-            resultado = eval(
-                self.formula,
-                {"__builtins__": None},
-                simulacion
-            )
+            with self.trazador.tramo("evaluacion"):
+                resultado, salidas = self.evaluar_salidas(escenario)
+                if isinstance(resultado, np.generic):
+                    resultado = resultado.item()
+                if salidas is not None:
+                    salidas = {nombre: float(valor) for nombre, valor in salidas.items()}
+                control = None
+                if self.control_compilado is not None:
+                    control = float(self.control_compilado.evaluar(escenario))
+                barrido: np.ndarray | None = self.evaluar_barrido(escenario)
         except Exception as e:
-            print(f"[CONSUMIDOR - ERROR]: error al evaluar fórmula: {e}")
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            self.rechazar_mensaje(ch, method, f"error al evaluar fórmula: {e}", escenarios=1)
             return
 
-        mensaje: str = json.dumps({"resultado": resultado})
+        self.metrica_evaluacion.observar(time.perf_counter() - inicio)
+        self.completar_mensaje(ch, method, resultado, en_bloque=False, control=control, rango=rango,
+                               entradas=escenario, salidas=salidas, barrido=barrido)
+
+    def retener_mensaje(self, ch: BlockingChannel, method: Basic.Deliver) -> None:
+        """
+        Retiene sin confirmar un mensaje de una corrida cuya configuración aún no se conoce (por ejemplo, si
+        llegó antes que su difusión) y lo devuelve a la cola tras `ESPERA_CORRIDA_DESCONOCIDA` segundos, en
+        lugar de recibirlo de nuevo de inmediato. El mensaje no se descarta nunca: vuelve a la cola hasta
+        que algún consumidor conozca la configuración de su corrida.
+
+        Args:
+            ch (BlockingChannel): Canal que recibió el mensaje.
+            method (Basic.Deliver): Información del método de entrega.
+        """
+        self._retenidos[method.delivery_tag] = ch
+        self.conexion.call_later(ESPERA_CORRIDA_DESCONOCIDA, lambda: self.devolver_retenidos(method.delivery_tag))
+
+    def devolver_retenidos(self, delivery_tag: int | None = None) -> None:
+        """
+        Devuelve a la cola un mensaje retenido o, sin `delivery_tag`, todos ellos. Un lote se confirma con
+        `multiple=True`, lo que también confirmaría los retenidos anteriores, así que se devuelven antes.
+
+        Args:
+            delivery_tag (int | None): Mensaje que se devuelve; None devuelve todos.
+        """
+        tags: list = list(self._retenidos) if delivery_tag is None else [delivery_tag]
+        for tag in tags:
+            canal: BlockingChannel | None = self._retenidos.pop(tag, None)
+            if canal is None or not canal.is_open:
+                continue
+            self.mensajes_devueltos += 1
+            self.metrica_rechazos.incrementar()
+            canal.basic_nack(delivery_tag=tag, requeue=True)
+
+    def evaluar_salidas(self, valores: dict) -> tuple:
+        """
+        Evalúa la fórmula o, si el modelo define varias salidas, todas ellas en una sola pasada que comparte las
+        subexpresiones comunes (ver Formula.py). La principal se publica en la columna "resultado" y las demás en
+        columnas con su nombre; la cabecera "salidas" las lista todas, empezando por la principal.
+
+        Args:
+            valores (dict): Variables de un escenario o de un bloque de escenarios.
+
+        Returns:
+            tuple: Resultado de la salida principal y diccionario nombre -> valor de las demás
+                (None si solo hay una salida).
+        """
+        if self.salidas_compiladas is None:
+            return self.formula_compilada.evaluar(valores), None
+        resultados: tuple = self.salidas_compiladas.evaluar(valores)
+        return resultados[0], dict(zip(self.salidas_compiladas.nombres[1:], resultados[1:]))
+
+    def evaluar_bloque(self, columnas: dict) -> tuple:
+        """
+        Evalúa la fórmula compilada (o todas las salidas) sobre un bloque de escenarios en formato columnar.
+
+        Args:
+            columnas (dict): Diccionario nombre -> arreglo con los valores de cada variable.
+
+        Returns:
+            tuple: Arreglo float64 con un resultado por escenario y diccionario con un arreglo float64
+                por salida secundaria (None si solo hay una salida).
+        """
+        filas: int = len(next(iter(columnas.values()))) if columnas else 0
+        resultado, salidas = self.evaluar_salidas(columnas)
+        if salidas is not None:
+            salidas = {
+                nombre: np.broadcast_to(np.asarray(valor, dtype=np.float64), (filas,)) for nombre, valor in salidas.items()
+            }
+        return np.broadcast_to(np.asarray(resultado, dtype=np.float64), (filas,)), salidas
+
+    def evaluar_control(self, columnas: dict) -> np.ndarray | None:
+        """
+        Evalúa la variable de control sobre un bloque de escenarios en formato columnar.
+
+        Args:
+            columnas (dict): Diccionario nombre -> arreglo con los valores de cada variable.
+
+        Returns:
+            np.ndarray | None: Arreglo float64 con un valor por escenario, o None si no hay variable de control.
+        """
+        if self.control_compilado is None:
+            return None
+        filas: int = len(next(iter(columnas.values()))) if columnas else 0
+        control = self.control_compilado.evaluar(columnas)
+        return np.broadcast_to(np.asarray(control, dtype=np.float64), (filas,))
+
+    def evaluar_barrido(self, valores: dict) -> np.ndarray | None:
+        """
+        Evalúa la salida principal en todos los puntos del barrido de parámetros, si la configuración lo define,
+        en una sola evaluación vectorizada sobre los mismos escenarios. Los momentos por punto (y de su diferencia
+        con la configuración base) viajan en la cabecera "barrido" de cada mensaje de resultados.
+
+        Args:
+            valores (dict): Variables de un escenario o de un bloque de escenarios.
+
+        Returns:
+            np.ndarray | None: Matriz con una fila por punto y una columna por escenario, o None sin barrido.
+        """
+        if self.barrido_compilado is None:
+            return None
+        return self.barrido_compilado.evaluar(valores)
+
+    def procesar_bloque(self, ch: BlockingChannel, method: Basic.Deliver, body: bytes, rango: list | None = None) -> None:
+        """
+        Evalúa la fórmula sobre un bloque completo de escenarios y publica los resultados
+        como un único bloque con la columna "resultado".
+
+        Args:
+            ch (BlockingChannel): Canal que recibe el mensaje.
+            method (Basic.Deliver): Información del método de entrega.
+            body (bytes): Contenido del mensaje en formato de bloque.
+            rango (list | None): Índice inicial y tamaño del rango de escenarios, si el mensaje lo indica.
+        """
+        inicio: float = time.perf_counter()
+        filas: int = 0
+        try:
+            filas = filas_bloque(body)
+            with self.trazador.tramo("decodificacion"):
+                columnas: dict = decodificar_bloque(body)
+            with self.trazador.tramo("evaluacion"):
+                resultados, salidas = self.evaluar_bloque(columnas)
+                control: np.ndarray | None = self.evaluar_control(columnas)
+                barrido: np.ndarray | None = self.evaluar_barrido(columnas)
+        except Exception as e:
+            self.rechazar_mensaje(ch, method, f"error al evaluar bloque: {e}", escenarios=filas)
+            return
+
+        self.metrica_evaluacion.observar(time.perf_counter() - inicio)
+        self.completar_mensaje(ch, method, resultados, en_bloque=True, control=control, rango=rango,
+                               entradas=columnas, salidas=salidas, barrido=barrido)
+
+    def procesar_unidad(self, ch: BlockingChannel, method: Basic.Deliver, body: bytes, rango: list | None = None) -> None:
+        """
+        Genera localmente los escenarios de una unidad de trabajo, los evalúa y publica los
+        resultados como un único bloque. Los escenarios son reproducibles a partir de la
+        entropía de la corrida y el índice inicial del rango.
+
+        Args:
+            ch (BlockingChannel): Canal que recibe el mensaje.
+            method (Basic.Deliver): Información del método de entrega.
+            body (bytes): Contenido del mensaje con la unidad de trabajo en JSON.
+            rango (list | None): Índice inicial y tamaño del rango de escenarios, si el mensaje lo indica.
+        """
+        inicio: float = time.perf_counter()
+        unidad: dict | None = None
+        try:
+            if self.modelo is None:
+                raise RuntimeError("la configuración no incluye las variables del modelo")
+            unidad = decodificar_unidad(body)
+            with self.trazador.tramo("generacion"):
+                rng = generador_para_rango(unidad["entropia"], unidad["inicio"])
+                columnas: dict = self.modelo.generar_escenarios(
+                    rng=rng, n=unidad["cantidad"], inicio=unidad["inicio"], entropia=unidad["entropia"]
+                )
+            with self.trazador.tramo("evaluacion"):
+                resultados, salidas = self.evaluar_bloque(columnas)
+                control: np.ndarray | None = self.evaluar_control(columnas)
+                barrido: np.ndarray | None = self.evaluar_barrido(columnas)
+        except Exception as e:
+            self.rechazar_mensaje(ch, method, f"error al procesar unidad de trabajo: {e}",
+                                  escenarios=unidad["cantidad"] if unidad is not None else 0)
+            return
+
+        self.metrica_evaluacion.observar(time.perf_counter() - inicio)
+        self.completar_mensaje(ch, method, resultados, en_bloque=True, control=control, rango=rango,
+                               entradas=columnas, salidas=salidas, barrido=barrido)
+
+    def rechazar_mensaje(self, ch: BlockingChannel, method: Basic.Deliver, motivo: str, escenarios: int = 0) -> None:
+        """
+        Rechaza sin reencolar un mensaje cuya evaluación falló. Sus escenarios se reportan por el exchange de
+        control, para que el productor los descuente del total de la corrida en lugar de esperarlos.
+
+        Args:
+            ch (BlockingChannel): Canal que recibió el mensaje.
+            method (Basic.Deliver): Información del método de entrega.
+            motivo (str): Descripción del error.
+            escenarios (int): Escenarios que contenía el mensaje.
+        """
+        print(f"[CONSUMIDOR - ERROR]: {motivo}")
+        self.escenarios_rechazados += escenarios
+        if self.reporta_progreso():
+            self._rechazados_progreso += escenarios
+        self.metrica_errores.incrementar()
+        self.metrica_rechazos.incrementar()
+        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+
+    def opciones_estimador(self, control, en_bloque: bool) -> dict:
+        """
+        Argumentos de `Estadisticas.agregar` según la técnica de reducción de varianza. Los pares antitéticos
+        solo se conservan dentro de un bloque, así que los escenarios individuales en JSON cuentan como
+        observaciones independientes.
+
+        Args:
+            control (float | np.ndarray | None): Valores de la variable de control.
+            en_bloque (bool): Si los resultados provienen de un bloque o de una unidad de trabajo.
+
+        Returns:
+            dict: Argumentos control, media_control y antiteticas.
+        """
+        return {
+            "control": control,
+            "media_control": self.media_control if control is not None else None,
+            "antiteticas": self.antiteticas and en_bloque,
+        }
+
+    def archivar(self, entradas: dict | None, resultado, opciones: dict, salidas: dict | None = None) -> None:
+        """
+        Añade las entradas, los resultados y la variable de control de los escenarios al archivo de la corrida.
+
+        Args:
+            entradas (dict | None): Variables de los escenarios.
+            resultado (float | np.ndarray): Resultado escalar o arreglo de resultados.
+            opciones (dict): Opciones del estimador devueltas por `opciones_estimador`.
+            salidas (dict | None): Valores de las salidas secundarias.
+        """
+        if self.archivo is None:
+            self.archivo = EscritorArchivo(
+                self.ruta_archivo, self.corrida, self.filas_trozo_archivo,
+                {"media_control": opciones["media_control"], "salidas": self.nombres_salidas()}
+            )
+        columnas: dict = dict(entradas or {})
+        columnas["resultado"] = resultado
+        columnas.update(salidas or {})
+        if opciones["control"] is not None:
+            columnas["control"] = opciones["control"]
+        with self.trazador.tramo("archivo"):
+            self.archivo.agregar(columnas, opciones["antiteticas"])
+
+    def nombres_salidas(self) -> list | None:
+        """
+        Nombres de todas las salidas, empezando por la principal; None si el modelo solo tiene una.
+        """
+        return list(self.salidas_compiladas.nombres) if self.salidas_compiladas is not None else None
+
+    def cabeceras_resultado(self, antiteticas: bool, rangos: list | None = None,
+                            barrido: EstadisticasBarrido | None = None) -> dict | None:
+        """
+        Cabeceras que indican a los agregadores cómo calcular el estimador a partir de los resultados
+        y de qué rangos de escenarios provienen.
+
+        Args:
+            antiteticas (bool): Si los resultados vienen en pares antitéticos consecutivos.
+            rangos (list | None): Tripletas [inicio, escenarios incluidos, tamaño del rango].
+            barrido (EstadisticasBarrido | None): Estimadores por punto del barrido de los mismos escenarios.
+
+        Returns:
+            dict | None: Cabeceras del mensaje, o None si no hacen falta.
+        """
+        cabeceras: dict = {}
+        if antiteticas:
+            cabeceras["antiteticas"] = True
+        if self.media_control is not None:
+            cabeceras["media_control"] = self.media_control
+        if rangos:
+            cabeceras["rangos"] = rangos
+        if self.salidas_compiladas is not None:
+            cabeceras["salidas"] = self.nombres_salidas()
+        if barrido is not None:
+            cabeceras["barrido"] = barrido.a_dict()
+        return cabeceras or None
+
+    def completar_mensaje(self, ch: BlockingChannel, method: Basic.Deliver, resultado, en_bloque: bool,
+                          control=None, rango: list | None = None, entradas: dict | None = None,
+                          salidas: dict | None = None, barrido: np.ndarray | None = None) -> None:
+        """
+        Publica el resultado de un mensaje y lo confirma. Si la confirmación por lotes está activa,
+        acumula el resultado y confirma el lote completo al alcanzar `ack_lote` mensajes. En modo de
+        agregación incorpora el resultado a los estadísticos del lote y lo vacía al alcanzar
+        `agregado_escenarios` escenarios. En ambos casos el lote también se vacía al llenar la ventana
+        de prefetch, ya que el broker no entregaría más mensajes sin confirmar los pendientes.
+
+        Args:
+            ch (BlockingChannel): Canal que recibió el mensaje.
+            method (Basic.Deliver): Información del método de entrega.
+            resultado (float | np.ndarray): Resultado escalar o arreglo de resultados.
+            en_bloque (bool): Si el mensaje original era un bloque o una unidad de trabajo.
+            control (float | np.ndarray | None): Valores de la variable de control, si la hay.
+            rango (list | None): Índice inicial y tamaño del rango al que pertenecen los escenarios.
+            entradas (dict | None): Variables de los escenarios, para el archivo de resultados.
+            salidas (dict | None): Valores de las salidas secundarias, si el modelo las define.
+            barrido (np.ndarray | None): Salida principal en cada punto del barrido de parámetros, si lo hay.
+        """
+        self.escenarios_procesados += np.size(resultado)
+        self.metrica_evaluados.incrementar(np.size(resultado))
+        opciones: dict = self.opciones_estimador(control, en_bloque)
+        if self.ruta_archivo is not None:
+            self.archivar(entradas, resultado, opciones, salidas)
+        if self.reporta_progreso():
+            self._progreso.agregar(resultado, **opciones)
+        if barrido is not None:
+            with self.trazador.tramo("barrido"):
+                if self._lote_barrido is None:
+                    self._lote_barrido = EstadisticasBarrido(list(self.barrido_compilado.puntos), self.media_control)
+                self._lote_barrido.agregar(barrido, resultado, opciones["control"], opciones["antiteticas"])
+        if self.ack_lote <= 1 and not self.agregacion:
+            rangos: list | None = [[rango[0], int(np.size(resultado)), rango[1]]] if rango is not None else None
+            cabeceras: dict | None = self.cabeceras_resultado(opciones["antiteticas"], rangos, self._lote_barrido)
+            self._lote_barrido = None
+            with self.trazador.tramo("codificacion"):
+                if en_bloque:
+                    columnas: dict = {"resultado": resultado, **(salidas or {})}
+                    if control is not None:
+                        columnas["control"] = control
+                    cuerpo: str | bytes = codificar_bloque(columnas)
+                    tipo_contenido: str = TIPO_CONTENIDO_BLOQUE
+                else:
+                    mensaje: dict = {"resultado": resultado, **(salidas or {})}
+                    if control is not None:
+                        mensaje["control"] = control
+                    cuerpo = json.dumps(mensaje)
+                    tipo_contenido = TIPO_CONTENIDO_JSON
+            self.publicar_resultado(cuerpo, tipo_contenido, cabeceras)
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+            return
+
+        if self.agregacion:
+            with self.trazador.tramo("agregacion"):
+                self._lote_estadisticas.agregar(resultado, **opciones)
+                for nombre, valores in (salidas or {}).items():
+                    self._lote_estadisticas_salidas.setdefault(nombre, Estadisticas()).agregar(
+                        valores, antiteticas=opciones["antiteticas"]
+                    )
+            lleno: bool = self._lote_estadisticas.n >= self.agregado_escenarios
+        else:
+            self._lote_resultados.append(np.atleast_1d(np.asarray(resultado, dtype=np.float64)))
+            if control is not None:
+                self._lote_controles.append(np.atleast_1d(np.asarray(control, dtype=np.float64)))
+            for nombre, valores in (salidas or {}).items():
+                self._lote_salidas.setdefault(nombre, []).append(np.atleast_1d(np.asarray(valores, dtype=np.float64)))
+            # Los pares se conservan al concatenar solo si todos los mensajes del lote son bloques de pares completos
+            self._lote_pares = self._lote_pares and opciones["antiteticas"] and np.size(resultado) % 2 == 0
+            lleno = self._lote_mensajes + 1 >= self.ack_lote
+        if rango is not None:
+            acumulado: list = self._lote_rangos.setdefault(rango[0], [0, rango[1]])
+            acumulado[0] += int(np.size(resultado))
+        self._lote_mensajes += 1
+        self._lote_tag = method.delivery_tag
+        self._lote_canal = ch
+        if lleno or (self.prefetch and self._lote_mensajes >= self.prefetch):
+            self.vaciar_lote()
+
+    def vaciar_lote(self) -> None:
+        """
+        Publica en un único bloque los resultados acumulados (o el agregado parcial del lote) y
+        confirma con `multiple=True` todos los mensajes del lote. Los resultados se publican antes
+        de confirmar, así que un fallo intermedio provoca la reentrega de los mensajes (entrega al
+        menos una vez).
+        """
+        if not self._lote_mensajes:
+            return
+        rangos: list = [[inicio, cantidad, tamano] for inicio, (cantidad, tamano) in self._lote_rangos.items()]
+        if self.agregacion:
+            cabeceras_agregado: dict = {"rangos": rangos} if rangos else {}
+            if self.salidas_compiladas is not None:
+                cabeceras_agregado["salidas"] = self.nombres_salidas()
+            if self._lote_barrido is not None:
+                cabeceras_agregado["barrido"] = self._lote_barrido.a_dict()
+            cuerpo: bytes = codificar_agregado(self._lote_estadisticas, self._lote_estadisticas_salidas)
+            self.publicar_resultado(cuerpo, TIPO_CONTENIDO_AGREGADO, cabeceras_agregado or None)
+            self._lote_estadisticas = Estadisticas()
+            self._lote_estadisticas_salidas = {}
+        else:
+            columnas: dict = {"resultado": np.concatenate(self._lote_resultados)}
+            columnas.update({nombre: np.concatenate(valores) for nombre, valores in self._lote_salidas.items()})
+            if self._lote_controles:
+                columnas["control"] = np.concatenate(self._lote_controles)
+            cabeceras: dict | None = self.cabeceras_resultado(self._lote_pares, rangos, self._lote_barrido)
+            self.publicar_resultado(codificar_bloque(columnas), TIPO_CONTENIDO_BLOQUE, cabeceras)
+        self.devolver_retenidos()
+        self._lote_canal.basic_ack(delivery_tag=self._lote_tag, multiple=True)
+        self._lote_resultados = []
+        self._lote_controles = []
+        self._lote_salidas = {}
+        self._lote_barrido = None
+        self._lote_pares = True
+        self._lote_rangos = {}
+        self._lote_mensajes = 0
+        self._lote_tag = None
+
+    def _vaciar_periodicamente(self) -> None:
+        """
+        Vacía el lote pendiente y vuelve a programarse cada `ack_intervalo_ms` milisegundos.
+        """
+        self.vaciar_lote()
+        self.conexion.call_later(self.ack_intervalo_ms / 1000, self._vaciar_periodicamente)
+
+    def reporta_progreso(self) -> bool:
+        """
+        Indica si la corrida vigente tiene criterio de parada y hay un exchange de control donde reportar.
+        """
+        return bool(self.parada) and self.nom_exchange_control is not None
+
+    def escuchar_control(self) -> None:
+        """
+        Se suscribe al exchange de control con una cola exclusiva y programa el reporte periódico del progreso
+        de las corridas con criterio de parada.
+        """
+        self.canal.exchange_declare(exchange=self.nom_exchange_control, exchange_type="fanout")
+        cola_control: str = self.canal.queue_declare(queue="", exclusive=True).method.queue
+        self.canal.queue_bind(exchange=self.nom_exchange_control, queue=cola_control)
+        self.canal.basic_consume(queue=cola_control, on_message_callback=self.callback_control, auto_ack=True)
+        self.conexion.call_later(self.intervalo_control, self._reportar_periodicamente)
+
+    def callback_control(self, ch: BlockingChannel, method: Basic.Deliver, properties: BasicProperties, body: bytes) -> None:
+        """
+        Maneja los mensajes del exchange de control. Al recibir la orden de detener una corrida vacía el lote
+        pendiente y la registra para descartar el resto de sus mensajes; solo se recuerdan las `max_corridas`
+        corridas detenidas más recientemente o con mensajes descartados más recientes.
+
+        Args:
+            ch (BlockingChannel): Canal que recibe el mensaje.
+            method (Basic.Deliver): Información del método de entrega.
+            properties (BasicProperties): Propiedades del mensaje.
+            body (bytes): Contenido del mensaje de control en JSON.
+        """
+        mensaje: dict = decodificar_control(body)
+        if mensaje["tipo"] != CONTROL_DETENER or mensaje["corrida"] in self.corridas_detenidas:
+            return
+        self.corridas_detenidas[mensaje["corrida"]] = None
+        while len(self.corridas_detenidas) > self.max_corridas:
+            self.corridas_detenidas.popitem(last=False)
+        if mensaje["corrida"] == self.corrida:
+            self.vaciar_lote()
+            print(f"[CONSUMIDOR] Corrida detenida ({mensaje.get('motivo')}), descartando el trabajo pendiente.")
+
+    def reportar_progreso(self) -> None:
+        """
+        Publica en el exchange de control las estadísticas de los resultados obtenidos desde el último reporte
+        y la cantidad de escenarios rechazados en ese lapso.
+        """
+        if (not self._progreso.n and not self._rechazados_progreso) or self.corrida in self.corridas_detenidas:
+            self._progreso = Estadisticas()
+            self._rechazados_progreso = 0
+            return
         self.canal.basic_publish(
-            exchange="",
-            routing_key=self.nom_queue_resultados,
-            body=mensaje,
-            properties=pika.BasicProperties(delivery_mode=2)
+            exchange=self.nom_exchange_control,
+            routing_key="",
+            body=codificar_control(CONTROL_PROGRESO, self.corrida, estadisticas=self._progreso.a_dict(),
+                                   rechazados=self._rechazados_progreso),
+            properties=pika.BasicProperties(content_type=TIPO_CONTENIDO_CONTROL)
         )
+        self._progreso = Estadisticas()
+        self._rechazados_progreso = 0
+
+    def _reportar_periodicamente(self) -> None:
+        """
+        Reporta el progreso y vuelve a programarse cada `intervalo_control` segundos.
+        """
+        self.reportar_progreso()
+        self.conexion.call_later(self.intervalo_control, self._reportar_periodicamente)
 
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+    def publicar_resultado(self, cuerpo: str | bytes, tipo_contenido: str, cabeceras: dict | None = None) -> None:
+        """
+        Publica un mensaje de resultados en la cola de resultados de la corrida vigente.
+
+        Args:
+            cuerpo (str | bytes): Contenido del mensaje.
+            tipo_contenido (str): Tipo MIME que identifica el formato del mensaje.
+            cabeceras (dict | None): Cabeceras AMQP con la técnica de reducción de varianza y los rangos de los resultados.
+        """
+        self.metrica_resultados.incrementar()
+        with self.trazador.tramo("publicacion"):
+            self.canal.basic_publish(
+                exchange="",
+                routing_key=self.cola_resultados,
+                body=cuerpo,
+                properties=pika.BasicProperties(delivery_mode=2, content_type=tipo_contenido, headers=cabeceras)
+            )
 
     def configurar_conexion(self) -> None:
         """
-        Declara el exchange y las colas necesarias, y configura el control de flujo de mensajes.
+        Declara el exchange y la cola de escenarios, y configura el control de flujo de mensajes.
+        La cola de resultados se declara por corrida al compilar su configuración.
         """
         self.canal.exchange_declare(exchange=self.nom_exchange, exchange_type="fanout")
         self.canal.queue_declare(queue=self.nom_queue_escenarios, durable=True)
-        self.canal.queue_declare(queue=self.nom_queue_resultados)
-        self.canal.basic_qos(prefetch_count=1)
+        self.canal.basic_qos(prefetch_count=self.prefetch)
+
+    def suscribir_configuracion(self) -> str:
+        """
+        Crea (una sola vez) la cola exclusiva que recibe las configuraciones difundidas por el exchange.
+
+        Returns:
+            str: Nombre de la cola.
+        """
+        if self.cola_configuracion is None:
+            self.cola_configuracion = self.canal.queue_declare(queue="", exclusive=True).method.queue
+            self.canal.queue_bind(exchange=self.nom_exchange, queue=self.cola_configuracion)
+        return self.cola_configuracion
 
     def recibir_configuracion(self) -> None:
         """
         Escucha temporalmente el exchange para recibir un único mensaje de configuración.
-        Lanza una excepción si no se recibe la fórmula o las constantes.
+        Lanza una excepción si no se recibe la fórmula o las constantes, o si la fórmula no es válida.
         """
-        cola = self.canal.queue_declare(queue="", exclusive=True)
-        cola_configuracion: str = cola.method.queue
-
-        self.canal.queue_bind(exchange=self.nom_exchange, queue=cola_configuracion)
+        cola_configuracion: str = self.suscribir_configuracion()
 
         print("[CONSUMIDOR] Esperando configuración...")
         self.canal.basic_consume(
@@ -129,29 +946,63 @@ class Consumidor:
 
         if not self.formula or not self.constantes:
             raise RuntimeError("No se recibió fórmula o constantes en la configuración.")
+        if self.formula_compilada is None and self.salidas_compiladas is None:
+            raise RuntimeError("La fórmula recibida no es válida.")
 
     def procesar_escenarios(self) -> None:
         """
-        Comienza a consumir escenarios desde la cola correspondiente y los procesa.
+        Comienza a consumir escenarios desde la cola correspondiente y los procesa, registrando
+        a la vez las configuraciones de las corridas que se anuncien.
         """
         print("[CONSUMIDOR]: Esperando escenarios...")
 
-        self.canal.basic_qos(prefetch_count=1)
+        self.canal.basic_qos(prefetch_count=self.prefetch)
+        self.canal.basic_consume(
+            queue=self.suscribir_configuracion(),
+            on_message_callback=self.callback_nueva_configuracion,
+            auto_ack=True
+        )
         self.canal.basic_consume(
             queue=self.nom_queue_escenarios,
             on_message_callback=self.callback_escenario
         )
+        if (self.ack_lote > 1 or self.agregacion) and self.ack_intervalo_ms:
+            self.conexion.call_later(self.ack_intervalo_ms / 1000, self._vaciar_periodicamente)
+        if self.nom_exchange_control is not None:
+            self.escuchar_control()
         self.canal.start_consuming()
 
-    def iniciar_consumidor(self) -> None:
+    def iniciar_consumidor(self, configuracion: dict | None = None) -> None:
         """
         Método principal que inicia todo el flujo del consumidor:
             - Configura conexión y colas.
-            - Purga la cola de escenarios.
-            - Espera y procesa la configuración.
+            - Espera y procesa la primera configuración (o aplica `configuracion`, si se indica).
             - Comienza el procesamiento de escenarios.
+        Con trazas configuradas, la ejecución se perfila y las trazas activas se exportan al terminar.
+        Con archivo de resultados, SIGTERM termina el proceso ordenadamente para escribir las filas pendientes.
+
+        Args:
+            configuracion (dict | None): Configuración ya recibida, como la que el `Supervisor` reparte a sus trabajadores.
+        """
+        if (self.ruta_archivo is not None and threading.current_thread() is threading.main_thread()
+                and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL):
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        with self.trazador.perfilar():
+            try:
+                self.configurar_conexion()
+                if configuracion is None:
+                    self.recibir_configuracion()
+                else:
+                    self.aplicar_configuracion(configuracion)
+                self.procesar_escenarios()
+            finally:
+                self.cerrar_archivos()
+
+    def cerrar_archivos(self) -> None:
+        """
+        Cierra el archivo de la corrida vigente y los de las corridas guardadas en la caché.
         """
-        self.configurar_conexion()
-        self.canal.queue_purge(queue=self.nom_queue_escenarios)
-        self.recibir_configuracion()
-        self.procesar_escenarios()
+        for estado in self.corridas.values():
+            self.cerrar_corrida(estado)
+        if self.archivo is not None:
+            self.archivo.cerrar()
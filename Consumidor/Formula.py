@@ -0,0 +1,476 @@
+"""
+______________________________________________________________________________________________
+Módulo: Formula.py
+Descripción: Compila la fórmula del modelo una sola vez para que el Consumidor no tenga que
+volver a interpretar la cadena en cada escenario. El proceso es el siguiente:
+    1. Analiza la fórmula con `ast` y la valida contra una lista blanca de operadores y
+       funciones matemáticas (implementadas con NumPy).
+    2. Sustituye las constantes del modelo por su valor y pliega las subexpresiones que solo
+       dependen de constantes.
+    3. Compila el árbol resultante a un objeto de código que se guarda en caché, indexado por
+       el hash de la fórmula y sus constantes.
+La fórmula compilada evalúa indistintamente valores escalares o arreglos de NumPy.
+Un modelo puede definir además varias salidas con nombre (`compilar_salidas`): cada una puede
+usar a las demás por su nombre, y las subexpresiones repetidas entre ellas se calculan una
+sola vez por evaluación y se reutilizan en todas las salidas.
+Para los barridos de parámetros (`compilar_barrido`), las constantes que cambian entre puntos no
+se pliegan: se enlazan como una columna con un valor por punto, de modo que una sola evaluación
+sobre un bloque de escenarios produce por difusión de NumPy una fila de resultados por punto.
+______________________________________________________________________________________________
+"""
+import ast
+import copy
+import json
+import math
+import hashlib
+import numpy as np
+from types import CodeType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Funciones permitidas dentro de la fórmula. Se usan las versiones de NumPy para que la
+# misma fórmula funcione sobre escalares y sobre bloques de escenarios.
+FUNCIONES: Dict[str, Callable[..., Any]] = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "log2": np.log2,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "min": np.minimum,
+    "max": np.maximum,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "clip": np.clip,
+    "where": np.where,
+}
+
+CONSTANTES_MATEMATICAS: Dict[str, float] = {
+    "pi": math.pi,
+    "e": math.e,
+}
+
+# Prefijos aceptados para escribir funciones como `np.sqrt(x)` o `math.exp(x)`.
+MODULOS: Tuple[str, ...] = ("np", "numpy", "math")
+
+OPERADORES: Tuple[type, ...] = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+NODOS: Tuple[type, ...] = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call,
+    ast.Name, ast.Constant, ast.Load,
+) + OPERADORES
+
+# Nodos que se comparten entre salidas cuando aparecen más de una vez (los nombres y constantes no ganan nada)
+NODOS_COMPARTIBLES: Tuple[type, ...] = (ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call)
+
+_CACHE: Dict[str, Any] = {}
+_TAMANO_CACHE: int = 64
+
+
+class FormulaInvalida(ValueError):
+    """
+    Error lanzado cuando la fórmula contiene construcciones fuera de la lista blanca.
+    """
+
+
+class _Plegador(ast.NodeTransformer):
+    """
+    Transforma el árbol de la fórmula: normaliza `np.f`/`math.f` a `f`, sustituye las
+    constantes del modelo y evalúa de antemano las subexpresiones constantes.
+    """
+
+    def __init__(self, constantes: Mapping[str, Any]) -> None:
+        self.constantes: Mapping[str, Any] = constantes
+
+    def visit_Attribute(self, nodo: ast.Attribute) -> ast.AST:
+        if isinstance(nodo.value, ast.Name) and nodo.value.id in MODULOS and (
+            nodo.attr in FUNCIONES or nodo.attr in CONSTANTES_MATEMATICAS
+        ):
+            return self.visit(ast.copy_location(ast.Name(id=nodo.attr, ctx=ast.Load()), nodo))
+        raise FormulaInvalida(f"Atributo no permitido: {ast.unparse(nodo)}")
+
+    def visit_Name(self, nodo: ast.Name) -> ast.AST:
+        if nodo.id in self.constantes:
+            return ast.copy_location(ast.Constant(value=self.constantes[nodo.id]), nodo)
+        if nodo.id in CONSTANTES_MATEMATICAS:
+            return ast.copy_location(ast.Constant(value=CONSTANTES_MATEMATICAS[nodo.id]), nodo)
+        return nodo
+
+    def visit_Call(self, nodo: ast.Call) -> ast.AST:
+        nodo.func = self.visit(nodo.func)
+        if not isinstance(nodo.func, ast.Name) or nodo.func.id not in FUNCIONES:
+            raise FormulaInvalida(f"Función no permitida: {ast.unparse(nodo.func)}")
+        if nodo.keywords:
+            raise FormulaInvalida("No se permiten argumentos con nombre en las funciones.")
+        nodo.args = [self.visit(argumento) for argumento in nodo.args]
+        return self._plegar(nodo, nodo.args)
+
+    def visit_BinOp(self, nodo: ast.BinOp) -> ast.AST:
+        self.generic_visit(nodo)
+        return self._plegar(nodo, [nodo.left, nodo.right])
+
+    def visit_UnaryOp(self, nodo: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(nodo)
+        return self._plegar(nodo, [nodo.operand])
+
+    def visit_Compare(self, nodo: ast.Compare) -> ast.AST:
+        self.generic_visit(nodo)
+        return self._plegar(nodo, [nodo.left, *nodo.comparators])
+
+    def _plegar(self, nodo: ast.AST, operandos: list) -> ast.AST:
+        """
+        Sustituye `nodo` por su valor si todos sus operandos son constantes. Si la evaluación
+        falla (p. ej. división entre cero) se conserva el nodo para que el error aparezca al
+        evaluar, igual que antes de compilar.
+        """
+        if not all(isinstance(operando, ast.Constant) for operando in operandos):
+            return nodo
+        try:
+            valor = eval(
+                compile(ast.Expression(body=nodo), "<formula>", "eval"),
+                {"__builtins__": {}, **FUNCIONES},
+            )
+        except Exception:
+            return nodo
+        if isinstance(valor, np.generic):
+            valor = valor.item()
+        if not isinstance(valor, (int, float, bool)):
+            return nodo
+        return ast.copy_location(ast.Constant(value=valor), nodo)
+
+
+def _validar(arbol: ast.AST) -> None:
+    """
+    Recorre el árbol y lanza `FormulaInvalida` ante cualquier nodo fuera de la lista blanca.
+    """
+    for nodo in ast.walk(arbol):
+        if not isinstance(nodo, NODOS) and not isinstance(nodo, ast.Attribute):
+            raise FormulaInvalida(f"Construcción no permitida: {type(nodo).__name__}")
+        if isinstance(nodo, ast.Name) and nodo.id.startswith("_"):
+            raise FormulaInvalida(f"Nombre no permitido: {nodo.id}")
+        if isinstance(nodo, ast.Constant) and not isinstance(nodo.value, (int, float)):
+            raise FormulaInvalida(f"Constante no permitida: {nodo.value!r}")
+
+
+class FormulaCompilada:
+    """
+    Fórmula validada, con constantes plegadas y compilada a un objeto de código.
+
+    Atributos:
+        formula (str): Fórmula original.
+        expresion (str): Fórmula tras sustituir y plegar las constantes.
+        variables (tuple): Nombres libres que deben proporcionarse en cada evaluación.
+        codigo (CodeType): Objeto de código listo para `eval`.
+    """
+
+    def __init__(self, formula: str, constantes: Mapping[str, Any]) -> None:
+        try:
+            arbol: ast.Expression = ast.parse(formula, mode="eval")
+        except SyntaxError as e:
+            raise FormulaInvalida(f"Sintaxis inválida: {e.msg}") from e
+        _validar(arbol)
+        arbol = ast.fix_missing_locations(_Plegador(constantes).visit(arbol))
+
+        self.formula: str = formula
+        self.expresion: str = ast.unparse(arbol)
+        self.variables: Tuple[str, ...] = tuple(sorted({
+            nodo.id for nodo in ast.walk(arbol)
+            if isinstance(nodo, ast.Name) and nodo.id not in FUNCIONES
+        }))
+        self.codigo: CodeType = compile(arbol, "<formula>", "eval")
+        self._globales: Dict[str, Any] = {"__builtins__": {}, **FUNCIONES}
+
+    def evaluar(self, valores: Mapping[str, Any]) -> Any:
+        """
+        Evalúa la fórmula enlazando únicamente las variables del escenario.
+
+        Args:
+            valores (Mapping): Valores de las variables; escalares o arreglos de NumPy.
+
+        Returns:
+            Resultado escalar o arreglo, según el tipo de las entradas.
+        """
+        return eval(self.codigo, self._globales, valores)
+
+
+class _Sustituidor(ast.NodeTransformer):
+    """
+    Reemplaza las referencias a otras salidas por una copia de su árbol ya resuelto.
+    """
+
+    def __init__(self, arboles: Mapping[str, ast.AST]) -> None:
+        self.arboles: Mapping[str, ast.AST] = arboles
+
+    def visit_Name(self, nodo: ast.Name) -> ast.AST:
+        if nodo.id in self.arboles:
+            return copy.deepcopy(self.arboles[nodo.id])
+        return nodo
+
+
+class _Compartidor(ast.NodeTransformer):
+    """
+    Sustituye cada subexpresión repetida por una variable temporal (`_t0`, `_t1`, ...) y
+    registra, en orden de dependencia, la asignación que la calcula.
+    """
+
+    def __init__(self, repetidas: set) -> None:
+        self.repetidas: set = repetidas
+        self.temporales: Dict[str, str] = {}
+        self.asignaciones: List[ast.stmt] = []
+
+    def visit(self, nodo: ast.AST) -> ast.AST:
+        if not isinstance(nodo, NODOS_COMPARTIBLES):
+            return super().visit(nodo)
+        clave: str = ast.dump(nodo)
+        if clave in self.temporales:
+            return ast.Name(id=self.temporales[clave], ctx=ast.Load())
+        nodo = self.generic_visit(nodo)
+        if clave not in self.repetidas:
+            return nodo
+        nombre: str = f"_t{len(self.temporales)}"
+        self.temporales[clave] = nombre
+        self.asignaciones.append(ast.Assign(targets=[ast.Name(id=nombre, ctx=ast.Store())], value=nodo))
+        return ast.Name(id=nombre, ctx=ast.Load())
+
+
+class SalidasCompiladas:
+    """
+    Conjunto de salidas con nombre compiladas en un único programa que calcula una sola vez las
+    subexpresiones comunes. Una salida puede referirse a otra por su nombre.
+
+    Atributos:
+        nombres (tuple): Nombres de las salidas, en el orden de la configuración.
+        expresiones (dict): Expresión de cada salida tras plegar constantes y sustituir las
+            subexpresiones compartidas.
+        compartidas (int): Subexpresiones que se calculan una vez y se reutilizan.
+        variables (tuple): Nombres libres que deben proporcionarse en cada evaluación.
+        codigo (CodeType): Objeto de código listo para `exec`.
+    """
+
+    def __init__(self, salidas: Mapping[str, str], constantes: Mapping[str, Any]) -> None:
+        if not salidas:
+            raise FormulaInvalida("Se requiere al menos una salida.")
+        arboles: Dict[str, ast.AST] = {}
+        for nombre, formula in salidas.items():
+            if not isinstance(nombre, str) or not nombre.isidentifier() or nombre.startswith("_"):
+                raise FormulaInvalida(f"Nombre de salida no permitido: {nombre!r}")
+            # Las constantes se sustituyen antes de resolver las referencias entre salidas
+            if nombre in constantes:
+                raise FormulaInvalida(f"El nombre de salida {nombre!r} coincide con una constante del modelo.")
+            if nombre in FUNCIONES or nombre in CONSTANTES_MATEMATICAS or nombre in MODULOS:
+                raise FormulaInvalida(f"El nombre de salida {nombre!r} está reservado.")
+            try:
+                arbol: ast.Expression = ast.parse(formula, mode="eval")
+            except SyntaxError as e:
+                raise FormulaInvalida(f"Sintaxis inválida en la salida {nombre}: {e.msg}") from e
+            _validar(arbol)
+            arboles[nombre] = _Plegador(constantes).visit(arbol).body
+
+        resueltos: Dict[str, ast.AST] = {}
+        def resolver(nombre: str, pendientes: Tuple[str, ...]) -> None:
+            if nombre in pendientes:
+                raise FormulaInvalida(f"Referencia circular entre salidas: {' -> '.join(pendientes + (nombre,))}")
+            if nombre in resueltos:
+                return
+            for nodo in ast.walk(arboles[nombre]):
+                if isinstance(nodo, ast.Name) and nodo.id in arboles:
+                    resolver(nodo.id, pendientes + (nombre,))
+            resueltos[nombre] = _Sustituidor(resueltos).visit(arboles[nombre])
+        for nombre in arboles:
+            resolver(nombre, ())
+
+        # Subexpresiones que aparecen más de una vez entre todas las salidas
+        conteos: Dict[str, int] = {}
+        for nombre in arboles:
+            for nodo in ast.walk(resueltos[nombre]):
+                if isinstance(nodo, NODOS_COMPARTIBLES):
+                    clave: str = ast.dump(nodo)
+                    conteos[clave] = conteos.get(clave, 0) + 1
+        compartidor: _Compartidor = _Compartidor({clave for clave, conteo in conteos.items() if conteo > 1})
+        finales: List[ast.AST] = [compartidor.visit(copy.deepcopy(resueltos[nombre])) for nombre in arboles]
+
+        self.nombres: Tuple[str, ...] = tuple(arboles)
+        self.expresiones: Dict[str, str] = {nombre: ast.unparse(final) for nombre, final in zip(self.nombres, finales)}
+        self.compartidas: int = len(compartidor.asignaciones)
+        self.variables: Tuple[str, ...] = tuple(sorted({
+            nodo.id for final in resueltos.values() for nodo in ast.walk(final)
+            if isinstance(nodo, ast.Name) and nodo.id not in FUNCIONES
+        }))
+        programa: ast.Module = ast.Module(body=[
+            *compartidor.asignaciones,
+            ast.Assign(targets=[ast.Name(id="_salidas", ctx=ast.Store())],
+                       value=ast.Tuple(elts=finales, ctx=ast.Load())),
+        ], type_ignores=[])
+        self.codigo: CodeType = compile(ast.fix_missing_locations(programa), "<salidas>", "exec")
+        self._globales: Dict[str, Any] = {"__builtins__": {}, **FUNCIONES}
+
+    def evaluar(self, valores: Mapping[str, Any]) -> Tuple[Any, ...]:
+        """
+        Evalúa todas las salidas con los valores de un escenario o de un bloque de escenarios.
+
+        Args:
+            valores (Mapping): Valores de las variables; escalares o arreglos de NumPy.
+
+        Returns:
+            tuple: Resultado de cada salida, en el orden de `nombres`.
+        """
+        locales: Dict[str, Any] = dict(valores)
+        exec(self.codigo, self._globales, locales)
+        return locales["_salidas"]
+
+
+def _dependencias(salidas: Mapping[str, str], nombre: str) -> Dict[str, str]:
+    """
+    Salidas de las que depende `nombre` (incluida ella misma), en el orden de la configuración.
+    """
+    requeridas: set = set()
+    pendientes: List[str] = [nombre]
+    while pendientes:
+        actual: str = pendientes.pop()
+        if actual in requeridas:
+            continue
+        requeridas.add(actual)
+        try:
+            arbol: ast.Expression = ast.parse(salidas[actual], mode="eval")
+        except SyntaxError as e:
+            raise FormulaInvalida(f"Sintaxis inválida en la salida {actual}: {e.msg}") from e
+        pendientes.extend(nodo.id for nodo in ast.walk(arbol) if isinstance(nodo, ast.Name) and nodo.id in salidas)
+    return {clave: formula for clave, formula in salidas.items() if clave in requeridas}
+
+
+class BarridoCompilado:
+    """
+    Salida principal compilada para evaluarse a la vez con las constantes de todos los puntos
+    de un barrido de parámetros.
+
+    Atributos:
+        puntos (tuple): Constantes que cambian en cada punto.
+        barridas (tuple): Nombres de las constantes que cambian en algún punto.
+        compilada (FormulaCompilada | SalidasCompiladas): Expresión con las constantes fijas plegadas.
+    """
+
+    def __init__(self, formula: str, constantes: Mapping[str, Any], puntos: List[Mapping[str, Any]],
+                 salidas: Optional[Mapping[str, str]] = None) -> None:
+        if not puntos:
+            raise FormulaInvalida("El barrido no tiene puntos.")
+        self.puntos: Tuple[Mapping[str, Any], ...] = tuple(puntos)
+        self.barridas: Tuple[str, ...] = tuple(sorted({nombre for punto in puntos for nombre in punto}))
+        faltantes: List[str] = [nombre for nombre in self.barridas if nombre not in constantes]
+        if faltantes:
+            raise FormulaInvalida(f"El barrido usa constantes no definidas: {', '.join(faltantes)}")
+        fijas: Dict[str, Any] = {nombre: valor for nombre, valor in constantes.items() if nombre not in self.barridas}
+        if salidas:
+            # Solo se evalúan las salidas que necesita la principal
+            self.compilada: Any = SalidasCompiladas(
+                _dependencias(salidas, next(iter(salidas))), fijas
+            )
+        else:
+            self.compilada = FormulaCompilada(formula, fijas)
+        # Un valor por punto en el primer eje, para difundirse contra los escenarios del segundo
+        self._columnas: Dict[str, np.ndarray] = {
+            nombre: np.array([punto.get(nombre, constantes[nombre]) for punto in puntos], dtype=np.float64)[:, None]
+            for nombre in self.barridas
+        }
+
+    def evaluar(self, valores: Mapping[str, Any]) -> np.ndarray:
+        """
+        Evalúa la salida principal en todos los puntos con los valores de un escenario o de un bloque.
+
+        Args:
+            valores (Mapping): Valores de las variables; escalares o arreglos de NumPy de igual longitud.
+
+        Returns:
+            np.ndarray: Matriz float64 con una fila por punto y una columna por escenario.
+        """
+        locales: Dict[str, Any] = {
+            nombre: np.asarray(valor, dtype=np.float64).reshape(1, -1) for nombre, valor in valores.items()
+        }
+        filas: int = max((valor.shape[1] for valor in locales.values()), default=1)
+        locales.update(self._columnas)
+        if isinstance(self.compilada, SalidasCompiladas):
+            resultado: Any = self.compilada.evaluar(locales)[0]
+        else:
+            resultado = self.compilada.evaluar(locales)
+        return np.broadcast_to(np.asarray(resultado, dtype=np.float64), (len(self.puntos), filas))
+
+
+def hash_formula(formula: str, constantes: Mapping[str, Any]) -> str:
+    """
+    Calcula la clave de caché de una fórmula junto con sus constantes.
+    """
+    contenido: str = json.dumps({"formula": formula, "constantes": constantes}, sort_keys=True)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+def compilar_formula(formula: str, constantes: Mapping[str, Any]) -> FormulaCompilada:
+    """
+    Devuelve la fórmula compilada, reutilizando la versión en caché si ya existe.
+
+    Args:
+        formula (str): Fórmula del modelo.
+        constantes (Mapping): Constantes del modelo que se pliegan en la fórmula.
+
+    Returns:
+        FormulaCompilada: Fórmula lista para evaluarse.
+    """
+    clave: str = hash_formula(formula, constantes)
+    compilada = _CACHE.get(clave)
+    if compilada is None:
+        compilada = FormulaCompilada(formula, constantes)
+        if len(_CACHE) >= _TAMANO_CACHE:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[clave] = compilada
+    return compilada
+
+
+def compilar_salidas(salidas: Mapping[str, str], constantes: Mapping[str, Any]) -> SalidasCompiladas:
+    """
+    Devuelve las salidas compiladas, reutilizando la versión en caché si ya existe.
+
+    Args:
+        salidas (Mapping): Nombre -> expresión de cada salida, en orden.
+        constantes (Mapping): Constantes del modelo que se pliegan en las expresiones.
+
+    Returns:
+        SalidasCompiladas: Salidas listas para evaluarse juntas.
+    """
+    clave: str = "salidas:" + hash_formula(json.dumps(list(salidas.items())), constantes)
+    compiladas = _CACHE.get(clave)
+    if compiladas is None:
+        compiladas = SalidasCompiladas(salidas, constantes)
+        if len(_CACHE) >= _TAMANO_CACHE:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[clave] = compiladas
+    return compiladas
+
+
+def compilar_barrido(formula: str, constantes: Mapping[str, Any], puntos: List[Mapping[str, Any]],
+                     salidas: Optional[Mapping[str, str]] = None) -> BarridoCompilado:
+    """
+    Devuelve la salida principal compilada para un barrido, reutilizando la versión en caché si ya existe.
+
+    Args:
+        formula (str): Fórmula del modelo (salida principal).
+        constantes (Mapping): Constantes base del modelo.
+        puntos (list): Constantes que cambian en cada punto del barrido.
+        salidas (Optional[Mapping]): Salidas con nombre, si el modelo define más de una; la principal es la primera.
+
+    Returns:
+        BarridoCompilado: Salida principal lista para evaluarse en todos los puntos.
+    """
+    clave: str = "barrido:" + hash_formula(json.dumps([formula, list((salidas or {}).items()), puntos]), constantes)
+    compilado = _CACHE.get(clave)
+    if compilado is None:
+        compilado = BarridoCompilado(formula, constantes, puntos, salidas)
+        if len(_CACHE) >= _TAMANO_CACHE:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[clave] = compilado
+    return compilado
@@ -0,0 +1,160 @@
+"""
+__________________________________________________________________________________________________
+Módulo: Supervisor.py
+Descripción: Ejecuta varios consumidores en paralelo detrás de un único punto de entrada. El
+supervisor se encarga de:
+    1. Recibir una sola vez la primera configuración difundida por el productor (cada trabajador
+       registra después las de las demás corridas que compartan la cola de escenarios).
+    2. Lanzar N procesos trabajadores (por defecto, uno por núcleo), cada uno con su propia
+       conexión y canal a RabbitMQ, que comparten la cola de escenarios.
+    3. Vigilar a los trabajadores y reiniciar los que terminen inesperadamente.
+    4. Reportar periódicamente el rendimiento (escenarios por segundo) de cada trabajador a
+       partir de contadores en memoria compartida.
+__________________________________________________________________________________________________
+"""
+import os
+import time
+import multiprocessing as mp
+from typing import Any, Dict, List
+from Consumidor import Consumidor
+
+def ejecutar_trabajador(parametros: Dict[str, Any], configuracion: dict, contador: Any, intervalo: float) -> None:
+    """
+    Punto de entrada de cada proceso trabajador: crea su propio consumidor y lo inicia con la configuración
+    recibida por el supervisor, igual que `Consumidor.iniciar_consumidor` (así, al terminar el trabajador,
+    también escribe las filas pendientes de su archivo). Copia su contador de escenarios procesados a la
+    memoria compartida cada `intervalo` segundos.
+
+    Args:
+        parametros (dict): Argumentos para construir el `Consumidor`.
+        configuracion (dict): Configuración difundida por el productor.
+        contador (mp.Value): Contador compartido con el supervisor.
+        intervalo (float): Segundos entre actualizaciones del contador.
+    """
+    consumidor: Consumidor = Consumidor(**parametros)
+
+    def reportar() -> None:
+        contador.value = consumidor.escenarios_procesados
+        consumidor.conexion.call_later(intervalo, reportar)
+
+    try:
+        reportar()
+        consumidor.iniciar_consumidor(configuracion)
+    except KeyboardInterrupt:
+        pass
+
+class Supervisor:
+    """
+    Supervisor de un pool de procesos consumidores.
+
+    Atributos:
+        parametros (dict): Argumentos con los que se construye cada `Consumidor`.
+        trabajadores (int): Cantidad de procesos trabajadores.
+        intervalo (float): Segundos entre revisiones y reportes de rendimiento.
+        configuracion (dict): Configuración recibida del productor.
+        procesos (list): Procesos trabajadores activos.
+        contadores (list): Contadores compartidos de escenarios procesados por trabajador.
+        acumulados (list): Escenarios procesados por instancias anteriores de cada trabajador.
+        reinicios (int): Cantidad de trabajadores reiniciados.
+    """
+
+    def __init__(self, parametros: Dict[str, Any], trabajadores: int | None = None, intervalo: float = 5.0) -> None:
+        self.parametros: Dict[str, Any] = parametros
+        self.trabajadores: int = trabajadores or os.cpu_count() or 1
+        self.intervalo: float = intervalo
+        self.configuracion: dict = {}
+        self.procesos: List[mp.Process] = []
+        self.contadores: List[Any] = [mp.Value("q", 0, lock=False) for _ in range(self.trabajadores)]
+        self.acumulados: List[int] = [0] * self.trabajadores
+        self.reinicios: int = 0
+
+    def recibir_configuracion(self) -> None:
+        """
+        Recibe la primera configuración con un consumidor temporal y cierra su conexión. Los trabajadores
+        registran por su cuenta las configuraciones de las corridas que se anuncien después.
+        """
+        consumidor: Consumidor = Consumidor(**{**self.parametros, "puerto_metricas": None, "trazas": None})
+        consumidor.configurar_conexion()
+        consumidor.recibir_configuracion()
+        self.configuracion = consumidor.configuracion
+        consumidor.conexion.close()
+
+    def parametros_trabajador(self, indice: int) -> Dict[str, Any]:
+        """
+        Argumentos del consumidor de un trabajador: si se exponen métricas, cada trabajador usa el
+        puerto indicado más su índice.
+
+        Args:
+            indice (int): Posición del trabajador en el pool.
+
+        Returns:
+            dict: Argumentos para construir el `Consumidor`.
+        """
+        puerto: int | None = self.parametros.get("puerto_metricas")
+        if puerto is None:
+            return self.parametros
+        return {**self.parametros, "puerto_metricas": puerto + indice}
+
+    def lanzar_trabajador(self, indice: int) -> None:
+        """
+        Lanza (o relanza) el proceso trabajador con el índice indicado.
+
+        Args:
+            indice (int): Posición del trabajador en el pool.
+        """
+        self.acumulados[indice] += self.contadores[indice].value
+        self.contadores[indice].value = 0
+        proceso: mp.Process = mp.Process(
+            target=ejecutar_trabajador,
+            args=(self.parametros_trabajador(indice), self.configuracion, self.contadores[indice], min(1.0, self.intervalo)),
+            name=f"Consumidor-{indice}",
+            daemon=True
+        )
+        proceso.start()
+        if indice < len(self.procesos):
+            self.procesos[indice] = proceso
+        else:
+            self.procesos.append(proceso)
+
+    def vigilar(self) -> None:
+        """
+        Revisa periódicamente a los trabajadores, reinicia los que hayan terminado y muestra el
+        rendimiento de cada uno desde la revisión anterior.
+        """
+        anteriores: List[int] = [0] * self.trabajadores
+        while True:
+            time.sleep(self.intervalo)
+            totales: List[int] = [self.acumulados[i] + self.contadores[i].value for i in range(self.trabajadores)]
+            tasas: List[float] = [(t - a) / self.intervalo for t, a in zip(totales, anteriores)]
+            anteriores = totales
+            detalle: str = ", ".join(f"{i}: {tasa:.0f}/s" for i, tasa in enumerate(tasas))
+            print(f"[SUPERVISOR] {sum(totales)} escenarios, {sum(tasas):.0f}/s ({detalle})")
+
+            for indice, proceso in enumerate(self.procesos):
+                if not proceso.is_alive():
+                    print(f"[SUPERVISOR] El trabajador {indice} terminó (código {proceso.exitcode}), reiniciando.")
+                    self.reinicios += 1
+                    self.lanzar_trabajador(indice)
+
+    def detener(self) -> None:
+        """
+        Termina a todos los trabajadores. Los mensajes sin confirmar vuelven a la cola.
+        """
+        for proceso in self.procesos:
+            proceso.terminate()
+        for proceso in self.procesos:
+            proceso.join()
+
+    def iniciar_supervisor(self) -> None:
+        """
+        Método principal: recibe la configuración, lanza los trabajadores y los vigila hasta que
+        el usuario detenga el proceso.
+        """
+        self.recibir_configuracion()
+        print(f"[SUPERVISOR] Lanzando {self.trabajadores} trabajadores.")
+        for indice in range(self.trabajadores):
+            self.lanzar_trabajador(indice)
+        try:
+            self.vigilar()
+        finally:
+            self.detener()
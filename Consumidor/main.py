@@ -10,11 +10,32 @@ ________________________________________________________________________________
 """
 
 from Consumidor import Consumidor
+from Supervisor import Supervisor
+from Transporte import crear_transporte
 
 IP: str = 'localhost'
 EXCHANGE: str = 'Cofiguracion'
 QUEUE_ESCENARIOS: str = 'Escenarios'
 QUEUE_RESULTADOS: str = 'Resultados'
+PREFETCH: int = 1               # Mensajes que el broker entrega sin esperar confirmación
+ACK_LOTE: int = 1               # Mensajes confirmados juntos (1 = confirmación individual)
+ACK_INTERVALO_MS: int | None = None  # Tiempo máximo antes de confirmar un lote incompleto
+AGREGACION: bool = False        # Publica estadísticos parciales en lugar de cada resultado
+AGREGADO_ESCENARIOS: int = 100000  # Escenarios por agregado parcial (también se publica cada ACK_INTERVALO_MS)
+POOL: bool = False              # Ejecuta un supervisor con varios procesos consumidores
+TRABAJADORES: int | None = None # Procesos del pool (None = un proceso por núcleo)
+EXCHANGE_CONTROL: str = 'Control'  # Exchange de progreso y parada anticipada de las corridas
+INTERVALO_CONTROL: float = 1.0  # Segundos entre reportes de progreso (solo si el modelo define "parada")
+MAX_CORRIDAS: int = 8           # Corridas simultáneas cuya configuración compilada se conserva
+RUTA_ARCHIVO: str | None = None # Directorio del archivo columnar de escenarios y resultados (None = no se guardan)
+FILAS_TROZO_ARCHIVO: int = 1 << 20  # Filas acumuladas antes de escribir cada trozo del archivo
+# Servidor de RabbitMQ; las credenciales se toman de RABBITMQ_USUARIO y RABBITMQ_CONTRASENA (guest por defecto)
+TRANSPORTE: dict = {'backend': 'rabbitmq', 'host': IP, 'puerto': 5672, 'vhost': '/'}
+PUERTO_METRICAS: int | None = None  # Puerto de /metrics en formato Prometheus; con POOL, cada trabajador usa el siguiente
+# Trazas por etapa y perfil (None = desactivadas), p. ej. {'activo': True, 'muestreo': 0.01, 'ruta': './trazas',
+# 'perfil': 'muestreo', 'segundos_perfil': 10}. Con trazas configuradas, SIGUSR1 las activa o desactiva (y exporta)
+# y SIGUSR2 muestrea las pilas del proceso durante 'segundos_perfil'
+TRAZAS: dict | None = None
 
 def main() -> None:
     """
@@ -24,16 +45,33 @@ def main() -> None:
         2. Escucha escenarios generados y recibidos en la cola correspondiente.
         3. Evalua los escenarios usando la fórmula y constantes proporcionadas.
         4. Publica los resultados en la cola de resultados.
-    Utiliza una instancia de la clase `Consumidor` para realizar todo el flujo de trabajo.
+    Utiliza una instancia de la clase `Consumidor` para realizar todo el flujo de trabajo o, si `POOL`
+    está activo, un `Supervisor` que reparte el trabajo entre varios procesos consumidores.
     """
-    consumidor: Consumidor = Consumidor(
-        ip=IP, 
-        nom_exchange=EXCHANGE, 
-        nom_queue_escenarios=QUEUE_ESCENARIOS, 
-        nom_queue_resultados=QUEUE_RESULTADOS
-    )
+    parametros: dict = {
+        "ip": IP,
+        "nom_exchange": EXCHANGE,
+        "nom_queue_escenarios": QUEUE_ESCENARIOS,
+        "nom_queue_resultados": QUEUE_RESULTADOS,
+        "prefetch": PREFETCH,
+        "ack_lote": ACK_LOTE,
+        "ack_intervalo_ms": ACK_INTERVALO_MS,
+        "agregacion": AGREGACION,
+        "agregado_escenarios": AGREGADO_ESCENARIOS,
+        "nom_exchange_control": EXCHANGE_CONTROL,
+        "intervalo_control": INTERVALO_CONTROL,
+        "max_corridas": MAX_CORRIDAS,
+        "ruta_archivo": RUTA_ARCHIVO,
+        "filas_trozo_archivo": FILAS_TROZO_ARCHIVO,
+        "transporte": crear_transporte(TRANSPORTE),
+        "puerto_metricas": PUERTO_METRICAS,
+        "trazas": TRAZAS
+    }
     try:
-        consumidor.iniciar_consumidor()
+        if POOL:
+            Supervisor(parametros=parametros, trabajadores=TRABAJADORES).iniciar_supervisor()
+        else:
+            Consumidor(**parametros).iniciar_consumidor()
     except KeyboardInterrupt:
         print("El usuario ha detenido al consumidor.")
 
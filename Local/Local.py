@@ -0,0 +1,188 @@
+"""
+__________________________________________________________________________________________
+Módulo: Local.py
+Descripción: Ejecuta el sistema completo en una sola máquina: lanza N consumidores (y, opcionalmente,
+el Visualizador) como procesos hijos, ejecuta el Productor en el proceso principal y, sin Visualizador,
+agrega los resultados con un Receptor propio y reporta la estimación y el rendimiento. Los componentes
+se conectan con el transporte indicado (ver Comun/Transporte.py): "local" usa colas de multiprocessing
+sin broker, que solo se comparten con los procesos de este lanzador, y "rabbitmq" usa un servidor.
+__________________________________________________________________________________________
+"""
+import os
+import sys
+import time
+import uuid
+import multiprocessing as mp
+from typing import Any, Dict, List, Optional
+
+DIRECTORIO: str = os.path.dirname(os.path.abspath(__file__))
+for componente in ("Comun", "Productor", "Consumidor", "Visualizador"):
+    sys.path.append(os.path.join(DIRECTORIO, "..", componente))
+from Transporte import BACKEND_LOCAL, BACKEND_RABBITMQ, crear_transporte
+from Productor import Productor
+from Consumidor import Consumidor
+from Receptor import Receptor
+
+def ejecutar_consumidor(parametros: Dict[str, Any]) -> None:
+    """
+    Punto de entrada de cada proceso consumidor.
+        parametros (dict): Argumentos del `Consumidor`, incluido el transporte.
+    """
+    try:
+        Consumidor(**parametros).iniciar_consumidor()
+    except KeyboardInterrupt:
+        pass
+
+def ejecutar_visualizador(parametros: Dict[str, Any], debug: bool) -> None:
+    """
+    Punto de entrada del proceso del Visualizador.
+        parametros (dict): Argumentos del `Visualizador`, incluido el transporte.
+        debug (bool): Modo debug de Dash.
+    """
+    from Visualizador import Visualizador
+    try:
+        Visualizador(**parametros).iniciar(debug=debug)
+    except KeyboardInterrupt:
+        pass
+
+class EjecucionLocal:
+    """
+    Lanzador del sistema completo en una sola máquina.
+
+    Atributos:
+        transporte (TransporteRabbitMQ | TransporteLocal): Transporte compartido por todos los componentes.
+        procesos (list): Procesos hijos (consumidores y Visualizador).
+    """
+    def __init__(self, transporte: Dict[str, Any], productor: Dict[str, Any], consumidor: Dict[str, Any],
+                 consumidores: Optional[int] = None, visualizador: Optional[Dict[str, Any]] = None,
+                 debug: bool = False, espera_arranque: float = 2.0, puerto_metricas: Optional[int] = None,
+                 espera_inactiva: float = 60.0) -> None:
+        """
+        Crea el transporte y guarda los parámetros de cada componente. Si el productor no indica la
+        corrida, le asigna un identificador nuevo para que el Receptor (o el Visualizador) consuma la
+        cola de resultados de esa corrida.
+            transporte (dict): Configuración del transporte; con el backend "local", si no se indican
+                las colas se crean la de escenarios y la de resultados.
+            productor (dict): Argumentos del `Productor` (sin el transporte).
+            consumidor (dict): Argumentos de cada `Consumidor` (sin el transporte).
+            consumidores (int | None): Procesos consumidores; None lanza uno por núcleo.
+            visualizador (dict | None): Argumentos del `Visualizador`; None agrega los resultados en
+                este proceso y termina al recibirlos todos.
+            debug (bool): Modo debug de Dash.
+            espera_arranque (float): Segundos que se espera a que los consumidores se suscriban a la
+                configuración con RabbitMQ, cuyos exchanges no conservan los mensajes difundidos.
+            puerto_metricas (int | None): Primer puerto de las métricas, que usa el productor; cada
+                consumidor y el Visualizador usan los siguientes. None no las expone.
+            espera_inactiva (float): Segundos sin resultados nuevos tras los que se deja de esperar
+                la corrida y se reporta lo recibido (por ejemplo, si se rechazaron escenarios).
+        """
+        configuracion: Dict[str, Any] = dict(transporte)
+        if configuracion.get("backend") == BACKEND_LOCAL:
+            configuracion.setdefault("colas", (productor["nom_queue"], consumidor["nom_queue_resultados"]))
+        self.transporte: Any = crear_transporte(configuracion)
+        corrida: str = productor.get("corrida") or uuid.uuid4().hex
+        self.parametros_productor: Dict[str, Any] = {**productor, "corrida": corrida}
+        self.parametros_consumidor: Dict[str, Any] = {**consumidor, "transporte": self.transporte}
+        self.consumidores: int = consumidores or os.cpu_count() or 1
+        self.parametros_visualizador: Optional[Dict[str, Any]] = (
+            {**visualizador, "transporte": self.transporte, "corrida": corrida} if visualizador is not None else None
+        )
+        self.debug: bool = debug
+        self.espera_arranque: float = espera_arranque
+        self.procesos: List[mp.Process] = []
+        self.puerto_metricas: Optional[int] = puerto_metricas
+        self.espera_inactiva: float = espera_inactiva
+
+    def puerto(self, desplazamiento: int) -> Optional[int]:
+        return self.puerto_metricas + desplazamiento if self.puerto_metricas is not None else None
+
+    def lanzar(self, objetivo: Any, argumentos: tuple, nombre: str) -> None:
+        proceso: mp.Process = mp.Process(target=objetivo, args=argumentos, name=nombre, daemon=True)
+        proceso.start()
+        self.procesos.append(proceso)
+
+    def esperar_resultados(self, receptor: Receptor, total: int, detenida: bool) -> None:
+        """
+        Espera a que el Receptor agregue `total` resultados. Si la corrida se detuvo antes de tiempo,
+        espera en cambio a que dejen de llegar resultados durante un segundo; si no, deja de esperar
+        tras `espera_inactiva` segundos sin resultados nuevos (los escenarios que un consumidor
+        rechaza sin reencolar nunca llegan).
+            receptor (Receptor): Receptor de los resultados.
+            total (int): Escenarios de la corrida.
+            detenida (bool): Si el control de parada detuvo la corrida.
+        """
+        anterior, quieto = -1, 0.0
+        while receptor.estadisticas.n < total:
+            time.sleep(0.1)
+            if not any(proceso.is_alive() for proceso in self.procesos):
+                raise RuntimeError("Todos los consumidores terminaron antes de procesar la corrida.")
+            quieto = quieto + 0.1 if receptor.estadisticas.n == anterior else 0.0
+            anterior = receptor.estadisticas.n
+            if detenida and quieto >= 1.0:
+                break
+            if quieto >= self.espera_inactiva:
+                print(f"[LOCAL] Sin resultados nuevos durante {self.espera_inactiva:g} s: faltan "
+                      f"{total - receptor.estadisticas.n} de {total} escenarios; se reporta la corrida parcial.")
+                break
+
+    def detener(self) -> None:
+        """
+        Termina los procesos hijos.
+        """
+        for proceso in self.procesos:
+            proceso.terminate()
+        for proceso in self.procesos:
+            proceso.join()
+
+    def ejecutar(self) -> None:
+        """
+        Lanza los componentes, ejecuta la corrida y, sin Visualizador, reporta el resultado. Con puntos
+        de control en el productor, el Receptor propio guarda los suyos en el mismo directorio y con la
+        misma corrida, de modo que repetir la ejecución la reanuda.
+        """
+        receptor: Optional[Receptor] = None
+        if self.parametros_visualizador is not None:
+            parametros: Dict[str, Any] = {**self.parametros_visualizador, "puerto_metricas": self.puerto(1 + self.consumidores)}
+            self.lanzar(ejecutar_visualizador, (parametros, self.debug), "Visualizador")
+        else:
+            receptor = Receptor(
+                host="", cola=self.parametros_consumidor["nom_queue_resultados"], transporte=self.transporte,
+                corrida=self.parametros_productor["corrida"],
+                ruta_puntos_control=self.parametros_productor.get("ruta_puntos_control"),
+                intervalo_punto_control=self.parametros_productor.get("intervalo_punto_control", 5.0)
+            )
+            receptor.start()
+            receptor.lista.wait()
+        print(f"[LOCAL] Lanzando {self.consumidores} consumidores (transporte {self.transporte.backend}).")
+        for indice in range(self.consumidores):
+            parametros = {**self.parametros_consumidor, "puerto_metricas": self.puerto(1 + indice)}
+            self.lanzar(ejecutar_consumidor, (parametros,), f"Consumidor-{indice}")
+        if self.transporte.backend == BACKEND_RABBITMQ:
+            time.sleep(self.espera_arranque)
+
+        try:
+            inicio: float = time.perf_counter()
+            productor: Productor = Productor(
+                **self.parametros_productor, transporte=self.transporte, puerto_metricas=self.puerto(0)
+            )
+            productor.iniciar_productor()
+            if receptor is None:
+                print("[LOCAL] Corrida enviada; el Visualizador sigue activo hasta que se interrumpa el proceso.")
+                for proceso in self.procesos:
+                    proceso.join()
+                return
+            self.esperar_resultados(receptor, productor.modelo.iteraciones, productor.corrida_detenida())
+            receptor.guardar_punto_control()
+            duracion: float = time.perf_counter() - inicio
+            instantanea: Dict[str, Any] = receptor.instantanea()
+            print(f"[LOCAL] {instantanea['n']} escenarios en {duracion:.2f} s "
+                  f"({instantanea['n'] / duracion:,.0f} escenarios/s).")
+            print(f"[LOCAL] Media {instantanea['media']:.6g} ± {instantanea['error_estandar']:.3g} (error estándar).")
+            for salida in instantanea["salidas"][1:]:
+                print(f"[LOCAL] Salida {salida['nombre']}: media {salida['media']:.6g} ± {salida['error_estandar']:.3g}.")
+            for punto in instantanea["barrido"]:
+                constantes: str = ", ".join(f"{nombre}={valor:g}" for nombre, valor in punto["punto"].items())
+                print(f"[LOCAL] Barrido {constantes}: media {punto['media']:.6g} ± {punto['error_estandar']:.3g}, "
+                      f"diferencia {punto['diferencia']:.6g} ± {punto['error_diferencia']:.3g}.")
+        finally:
+            self.detener()
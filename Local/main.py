@@ -0,0 +1,89 @@
+"""
+______________________________________________________________________________
+Módulo: main.py
+Descripción: Script principal para ejecutar el sistema completo en una sola
+máquina: productor, consumidores y, opcionalmente, el Visualizador. Con el
+transporte 'local' los procesos se comunican con colas de multiprocessing, sin
+RabbitMQ; con 'rabbitmq' la misma ejecución pasa por el servidor indicado.
+______________________________________________________________________________
+"""
+from Local import EjecucionLocal
+
+BACKEND: str = 'local'          # Transporte: 'local' (sin broker) o 'rabbitmq'
+IP: str = 'localhost'           # Servidor de RabbitMQ (solo con el backend 'rabbitmq')
+CAPACIDAD_COLAS: int = 64       # Mensajes máximos por cola local antes de bloquear al publicador
+EXCHANGE: str = 'Cofiguracion'
+QUEUE_ESCENARIOS: str = 'Escenarios'
+QUEUE_RESULTADOS: str = 'Resultados'
+EXCHANGE_CONTROL: str = 'Control'
+RUTA_MODELO: str = '../Productor/modelo.json'
+MODO: str = 'bloque'            # Formato de envío: 'json', 'bloque' o 'semilla'
+TAMANO_BLOQUE: int = 10000
+PARALELISMO: str = 'procesos'   # Pool del productor: 'procesos' o 'hilos'
+TRABAJADORES: int | None = None # Trabajadores del pool del productor (None = todos los núcleos)
+CONSUMIDORES: int | None = None # Procesos consumidores (None = uno por núcleo)
+PREFETCH: int = 4
+VISUALIZADOR: bool = False      # Lanza el Visualizador; si es False reporta la estimación al terminar
+DEBUG: bool = False
+CORRIDA: str | None = None      # Identificador de la corrida (None = nuevo); repetirlo reanuda la corrida
+RUTA_PUNTOS_CONTROL: str | None = None  # Directorio de los puntos de control (None = desactivados)
+INTERVALO_PUNTO_CONTROL: float = 5.0    # Segundos entre puntos de control
+RUTA_ARCHIVO: str | None = None # Directorio donde los consumidores archivan escenarios y resultados (None = no se guardan)
+PUERTO_METRICAS: int | None = None  # Puerto de métricas del productor; consumidores y Visualizador usan los siguientes
+ESPERA_INACTIVA: float = 60.0   # Segundos sin resultados nuevos tras los que se reporta la corrida parcial
+# Trazas por etapa y perfil (None = desactivadas), p. ej. {'activo': True, 'muestreo': 0.01, 'ruta': './trazas',
+# 'perfil': 'muestreo', 'segundos_perfil': 10}. Con trazas configuradas, SIGUSR1 las activa o desactiva (y exporta)
+# y SIGUSR2 muestrea las pilas de cada proceso durante 'segundos_perfil'
+TRAZAS: dict | None = None
+
+def main() -> None:
+    """
+    Construye el lanzador con la configuración de este archivo y ejecuta la corrida.
+    """
+    transporte: dict = (
+        {'backend': 'local', 'capacidad': CAPACIDAD_COLAS} if BACKEND == 'local'
+        else {'backend': 'rabbitmq', 'host': IP}
+    )
+    ejecucion: EjecucionLocal = EjecucionLocal(
+        transporte=transporte,
+        productor={
+            "ip": IP,
+            "nom_exchange": EXCHANGE,
+            "nom_queue": QUEUE_ESCENARIOS,
+            "ruta_modelo": RUTA_MODELO,
+            "modo": MODO,
+            "tamano_bloque": TAMANO_BLOQUE,
+            "paralelismo": PARALELISMO,
+            "trabajadores": TRABAJADORES,
+            "nom_exchange_control": EXCHANGE_CONTROL,
+            "corrida": CORRIDA,
+            "ruta_puntos_control": RUTA_PUNTOS_CONTROL,
+            "intervalo_punto_control": INTERVALO_PUNTO_CONTROL,
+            "trazas": TRAZAS
+        },
+        consumidor={
+            "ip": IP,
+            "nom_exchange": EXCHANGE,
+            "nom_queue_escenarios": QUEUE_ESCENARIOS,
+            "nom_queue_resultados": QUEUE_RESULTADOS,
+            "prefetch": PREFETCH,
+            "nom_exchange_control": EXCHANGE_CONTROL,
+            "ruta_archivo": RUTA_ARCHIVO,
+            "trazas": TRAZAS
+        },
+        consumidores=CONSUMIDORES,
+        visualizador={
+            "host": IP, "cola": QUEUE_RESULTADOS, "trazas": TRAZAS, "corrida": CORRIDA,
+            "ruta_puntos_control": RUTA_PUNTOS_CONTROL, "intervalo_punto_control": INTERVALO_PUNTO_CONTROL
+        } if VISUALIZADOR else None,
+        debug=DEBUG,
+        puerto_metricas=PUERTO_METRICAS,
+        espera_inactiva=ESPERA_INACTIVA
+    )
+    try:
+        ejecucion.ejecutar()
+    except KeyboardInterrupt:
+        print("El usuario ha detenido la ejecución.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+__________________________________________________________________________________________
+Módulo: Control.py
+Descripción: Control de parada anticipada de una corrida. Un hilo con su propia conexión
+(ver Comun/Transporte.py) escucha el exchange de control, donde los consumidores publican periódicamente
+estadísticas parciales de sus resultados (ver Comun/Estadisticas.py), y las fusiona. La
+corrida se detiene cuando:
+    1. La semiamplitud del intervalo de confianza de la media es menor que `precision` al
+       nivel `confianza` (con al menos `minimo_escenarios` resultados), o
+    2. Se agota el tiempo máximo de la corrida.
+Al detenerse publica un mensaje "detener" en el exchange de control, con el que los
+consumidores descartan el trabajo pendiente de la corrida, y avisa al Productor para que deje
+de generar escenarios. La corrida también termina, sin mensaje, al recibir todos los resultados
+(los escenarios que los consumidores rechazan por un error de evaluación cuentan como recibidos).
+__________________________________________________________________________________________
+"""
+import os
+import sys
+import time
+import threading
+import pika
+from typing import Any, Dict, Optional
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Comun"))
+from Estadisticas import Estadisticas
+from Mensajes import (
+    CONTROL_DETENER, CONTROL_PROGRESO, TIPO_CONTENIDO_CONTROL,
+    codificar_control, decodificar_control
+)
+
+MOTIVO_PRECISION: str = "precision"
+MOTIVO_TIEMPO: str = "tiempo"
+MOTIVO_COMPLETA: str = "completa"
+
+class ControlParada(threading.Thread):
+    """
+    Hilo que vigila la convergencia de una corrida.
+
+    Atributos:
+        estadisticas (Estadisticas): Estadísticas fusionadas de todos los consumidores.
+        rechazados (int): Escenarios que los consumidores rechazaron por un error de evaluación.
+        detenida (threading.Event): Se activa cuando la corrida termina por cualquier motivo.
+        motivo (str | None): MOTIVO_PRECISION, MOTIVO_TIEMPO o MOTIVO_COMPLETA.
+    """
+
+    def __init__(self, transporte: Any, nom_exchange: str, corrida: str, parada: Dict[str, Any],
+                 total: Optional[int] = None, intervalo: float = 0.5) -> None:
+        """
+        Prepara el control; la conexión se abre al iniciar el hilo.
+            transporte (TransporteRabbitMQ | TransporteLocal): Transporte con el que se abre la conexión.
+            nom_exchange (str): Nombre del exchange (fanout) de control.
+            corrida (str): Identificador de la corrida vigilada.
+            parada (dict): Criterio de parada del modelo: "precision", "confianza" (0.95 por
+                defecto), "tiempo_maximo" en segundos y "minimo_escenarios" (1000 por defecto).
+            total (int | None): Escenarios de la corrida completa.
+            intervalo (float): Segundos entre revisiones del tiempo máximo.
+        """
+        super().__init__(name="ControlParada", daemon=True)
+        self.transporte: Any = transporte
+        self.nom_exchange: str = nom_exchange
+        self.corrida: str = corrida
+        self.precision: Optional[float] = parada.get("precision")
+        self.confianza: float = parada.get("confianza", 0.95)
+        self.tiempo_maximo: Optional[float] = parada.get("tiempo_maximo")
+        self.minimo_escenarios: int = parada.get("minimo_escenarios", 1000)
+        self.total: Optional[int] = total
+        self.intervalo: float = intervalo
+
+        self.estadisticas: Estadisticas = Estadisticas()
+        self.rechazados: int = 0
+        self.detenida: threading.Event = threading.Event()
+        self.motivo: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self._listo: threading.Event = threading.Event()
+        self._inicio: float = time.monotonic()
+        self._conexion: Optional[pika.BlockingConnection] = None
+        self._canal = None
+
+    def esperar_conexion(self, tiempo: float = 10.0) -> None:
+        """
+        Bloquea hasta que el hilo esté escuchando el exchange de control.
+        """
+        if not self._listo.wait(tiempo) or self.error is not None:
+            raise RuntimeError("No se pudo abrir la conexión de control.") from self.error
+
+    def esperar(self, tiempo: Optional[float] = None) -> bool:
+        """
+        Bloquea hasta que la corrida termine o el hilo se detenga.
+            tiempo (float | None): Segundos máximos de espera.
+            Returns: True si la corrida terminó.
+        """
+        limite: Optional[float] = None if tiempo is None else time.monotonic() + tiempo
+        while self.is_alive() and not self.detenida.is_set():
+            restante: float = 1.0 if limite is None else min(1.0, limite - time.monotonic())
+            if restante <= 0:
+                break
+            self.detenida.wait(restante)
+        return self.detenida.is_set()
+
+    def cerrar(self) -> None:
+        """
+        Deja de escuchar el exchange de control y cierra la conexión.
+        """
+        if self._conexion is not None and self.is_alive():
+            self._conexion.add_callback_threadsafe(self._canal.stop_consuming)
+            self.join()
+
+    def semiamplitud(self) -> float:
+        """
+        Semiamplitud actual del intervalo de confianza de la media.
+        """
+        return self.estadisticas.semiamplitud(self.confianza)
+
+    def run(self) -> None:
+        try:
+            self._conexion = self.transporte.conectar()
+            self._canal = self._conexion.channel()
+            self._canal.exchange_declare(exchange=self.nom_exchange, exchange_type="fanout")
+            cola: str = self._canal.queue_declare(queue="", exclusive=True).method.queue
+            self._canal.queue_bind(exchange=self.nom_exchange, queue=cola)
+            self._canal.basic_consume(queue=cola, on_message_callback=self._al_recibir, auto_ack=True)
+            self._inicio = time.monotonic()
+            self._listo.set()
+            if self.tiempo_maximo is not None:
+                self._conexion.call_later(self.intervalo, self._revisar_tiempo)
+            self._canal.start_consuming()
+            self._conexion.close()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._listo.set()
+
+    def _al_recibir(self, ch: Any, method: Any, properties: Any, body: bytes) -> None:
+        """
+        Fusiona un mensaje de progreso de la corrida y revisa el criterio de parada.
+        """
+        mensaje: Dict[str, Any] = decodificar_control(body)
+        if mensaje["tipo"] != CONTROL_PROGRESO or mensaje["corrida"] != self.corrida or self.detenida.is_set():
+            return
+        self.estadisticas.combinar(Estadisticas.desde_dict(mensaje["estadisticas"]))
+        self.rechazados += mensaje.get("rechazados", 0)
+
+        if self.total is not None and self.estadisticas.n + self.rechazados >= self.total:
+            self._terminar(MOTIVO_COMPLETA)
+        elif (self.precision is not None and self.estadisticas.n >= self.minimo_escenarios
+              and self.semiamplitud() < self.precision):
+            self._terminar(MOTIVO_PRECISION)
+
+    def _revisar_tiempo(self) -> None:
+        if self.detenida.is_set():
+            return
+        if time.monotonic() - self._inicio >= self.tiempo_maximo:
+            self._terminar(MOTIVO_TIEMPO)
+        else:
+            self._conexion.call_later(self.intervalo, self._revisar_tiempo)
+
+    def _terminar(self, motivo: str) -> None:
+        """
+        Marca la corrida como terminada y, si quedó trabajo pendiente, ordena a los consumidores
+        descartarlo.
+        """
+        self.motivo = motivo
+        print(f"[CONTROL] Corrida {self.corrida} terminada ({motivo}): {self.estadisticas.n} escenarios, "
+              f"media {self.estadisticas.estimacion():.6g} ± {self.semiamplitud():.6g} ({self.confianza:.0%}).")
+        if self.rechazados:
+            print(f"[CONTROL] Los consumidores rechazaron {self.rechazados} escenarios por errores de evaluación.")
+        if motivo != MOTIVO_COMPLETA:
+            self._canal.basic_publish(
+                exchange=self.nom_exchange,
+                routing_key="",
+                body=codificar_control(CONTROL_DETENER, self.corrida, motivo=motivo),
+                properties=pika.BasicProperties(content_type=TIPO_CONTENIDO_CONTROL)
+            )
+        self.detenida.set()
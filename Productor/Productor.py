@@ -6,39 +6,122 @@ Este módulo se encargar de las siguientes acciones:
     1. Lee un modelo desde un archivo JSON.
     2. Publica la configuración del modelo en un exchange de RabbitMQ.
     3. Generar múltiples escenarios simulados en paralelo.
-    4. Envia los escenarios a una cola de mensajes.
-Este módulo utiliza multiprocessing para acelerar la generación de escenarios y pika para la
-comunicación con RabbitMQ.
+    4. Envia los escenarios a una cola de mensajes, uno por mensaje en JSON o agrupados en
+       bloques binarios columnares (ver Comun/Mensajes.py). En modo "semilla" solo publica
+       unidades de trabajo (corrida, entropía, inicio, cantidad) y los consumidores generan
+       los escenarios localmente.
+    5. Opcionalmente detiene la corrida antes de tiempo cuando la estimación converge o se agota
+       el tiempo máximo (ver Control.py).
+    6. Opcionalmente expone métricas (escenarios generados y publicados, latencia de publicación y
+       espera de la generación) en formato Prometheus (ver Comun/Metricas.py).
+    7. Opcionalmente registra trazas por etapa y perfila la ejecución (ver Comun/Trazas.py).
+    8. Opcionalmente guarda puntos de control de la corrida (rangos publicados y confirmados por el
+       broker, ver Comun/PuntoControl.py); al reiniciar con el mismo identificador de corrida, solo
+       publica los rangos que no se confirmaron ni agregaron.
+    9. Etiqueta cada mensaje de escenarios con el identificador de la corrida (cabecera "corrida"), de modo
+       que varias corridas pueden compartir la cola de escenarios y los consumidores; además de difundir la
+       configuración, la deja en la cola de configuración de la corrida para los consumidores que se unan después.
+Este módulo utiliza multiprocessing para acelerar la generación de escenarios y la capa de
+transporte (Comun/Transporte.py) para la comunicación: RabbitMQ o, en una sola máquina, colas
+locales entre procesos.
 """
+import os
+import sys
+import time
+import uuid
+import threading
+import functools
 import pika
 import json
 import numpy as np
 import multiprocessing as mp
-from typing import Any, Dict
-from Modelo import Modelo
+from multiprocessing.pool import ThreadPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Comun"))
+from Modelo import Modelo, generador_para_rango
+from Transporte import BACKEND_RABBITMQ, TransporteRabbitMQ, declarar_cola_corrida
+from Metricas import RegistroMetricas, iniciar_servidor
+from Trazas import Trazador, crear_trazador
+from PuntoControl import Intervalos, PuntoControlProductor
+from Mensajes import (
+    TIPO_CONTENIDO_BLOQUE, TIPO_CONTENIDO_JSON, TIPO_CONTENIDO_UNIDAD,
+    codificar_bloque, codificar_unidad, decodificar_bloque
+)
+from Unicidad import MODO_EXACTO, Unicidad, crear_unicidad
+from Publicador import Publicador
+from Control import MOTIVO_COMPLETA, ControlParada
+
+MODO_JSON: str = "json"
+MODO_BLOQUE: str = "bloque"
+MODO_SEMILLA: str = "semilla"
+
+PARALELISMO_PROCESOS: str = "procesos"
+PARALELISMO_HILOS: str = "hilos"
 
 modelo_global: Modelo = None
+entropia_global: int = None
 
-def iniciar_pool(ruta_modelo: str, variables: Dict[str, Any]) -> None:
+def iniciar_pool(ruta_modelo: str, variables: Dict[str, Any], entropia: int) -> None:
     """
     Función de inicialización de procesos, se encarga de cargar cada proceso hijo.
         ruta_modelo (str): Ruta al archivo del modelo JSON.
         variables (dict): Definiciones de las variables del modelo.
+        entropia (int): Entropía de la `SeedSequence` de la corrida, de la que se derivan
+            los generadores de cada rango de escenarios.
     """
-    global modelo_global
+    global modelo_global, entropia_global
     modelo_global = Modelo(ruta_modelo=ruta_modelo)
     modelo_global.configurar_modelo()
     modelo_global.variables = variables
+    entropia_global = entropia
+
+def generar_lote_json(rango: Tuple[int, int]) -> Tuple[Tuple[int, int], List[str]]:
+    """
+    Genera un lote de escenarios usando el modelo global y serializa cada uno en JSON.
+        rango (tuple): Índice inicial y cantidad de escenarios del lote.
+        Returns: El rango y la lista de escenarios generados en formato JSON.
+    """
+    inicio, cantidad = rango
+    rng = generador_para_rango(entropia_global, inicio)
+    bloque = modelo_global.generar_escenarios(rng=rng, n=cantidad, inicio=inicio, entropia=entropia_global)
+    nombres = sorted(bloque)
+    filas = zip(*(bloque[nombre].tolist() for nombre in nombres))
+    return rango, [json.dumps(dict(zip(nombres, fila)), sort_keys=True) for fila in filas]
 
-def generar_escenario(_: int) -> str:
+def generar_bloque(rango: Tuple[int, int]) -> Tuple[Tuple[int, int], bytes]:
     """
-    Genera un escenario simulado usando el modelo global y lo serializa en JSON.
-        _: Valor ignorado que permite la iteración.
-        Returns: Escenario generado en formato JSON.
+    Genera un bloque de escenarios con el modelo global y lo serializa en formato columnar.
+        rango (tuple): Índice inicial y cantidad de escenarios del bloque.
+        Returns: El rango y el bloque binario listo para publicarse.
     """
-    rng = np.random.default_rng()
-    escenario = modelo_global.generar_escenario(rng=rng)
-    return json.dumps(escenario, sort_keys=True)
+    inicio, cantidad = rango
+    rng = generador_para_rango(entropia_global, inicio)
+    return rango, codificar_bloque(modelo_global.generar_escenarios(rng=rng, n=cantidad, inicio=inicio, entropia=entropia_global))
+
+def dividir_en_rangos(total: int, tamano_bloque: int) -> List[Tuple[int, int]]:
+    """
+    Reparte `total` escenarios en rangos consecutivos de a lo más `tamano_bloque` escenarios.
+        total (int): Cantidad total de escenarios.
+        tamano_bloque (int): Tamaño máximo de cada rango.
+        Returns: Lista de tuplas (índice inicial, cantidad).
+    """
+    return [(inicio, min(tamano_bloque, total - inicio)) for inicio in range(0, total, tamano_bloque)]
+
+def limitar_rangos(rangos: List[Tuple[int, int]], semaforo: threading.Semaphore,
+                   detener: Optional[threading.Event] = None) -> Iterator[Tuple[int, int]]:
+    """
+    Entrega los rangos al pool solo cuando hay espacio en el semáforo, para que el pool no
+    genere más resultados de los que el publicador puede absorber.
+        rangos (list): Rangos (índice inicial, cantidad) a generar.
+        semaforo (threading.Semaphore): Semáforo que se libera al consumir cada resultado.
+        detener (threading.Event | None): Si se activa, deja de entregar rangos.
+    """
+    for rango in rangos:
+        semaforo.acquire()
+        if detener is not None and detener.is_set():
+            return
+        yield rango
 
 class Productor:
     """
@@ -46,44 +129,188 @@ class Productor:
     Esta clase sirve para gestionar la conexión con RabbitMQ, la carga del modelo, 
     la generación paralela de escenarios y el envío de resultados a una cola.
     """
-    def __init__(self, ip: str, nom_exchange: str, nom_queue: str, ruta_modelo: str) -> None:
+    def __init__(self, ip: str, nom_exchange: str, nom_queue: str, ruta_modelo: str,
+                 modo: str = MODO_JSON, tamano_bloque: int = 10000, semilla: Optional[int] = None,
+                 paralelismo: str = PARALELISMO_PROCESOS, trabajadores: Optional[int] = None,
+                 unicidad: str = MODO_EXACTO, memoria_unicidad: int = 1 << 14,
+                 asincrono: bool = False, ventana_confirmaciones: int = 1000,
+                 capacidad_envio: int = 64, limite_cola: Optional[int] = None,
+                 nom_exchange_control: Optional[str] = None, transporte: Optional[Any] = None,
+                 puerto_metricas: Optional[int] = None, trazas: Optional[Dict[str, Any]] = None,
+                 corrida: Optional[str] = None, ruta_puntos_control: Optional[str] = None,
+                 intervalo_punto_control: float = 5.0) -> None:
         """
         Inicializa el productor con la conexión y configuración del modelo.
             ip (str): Dirección IP del servidor de RabbitMQ.
             nom_exchange (str): Nombre del exchange para enviar la configuración.
             nom_queue (str): Nombre de la cola para publicar los escenarios.
             ruta_modelo (str): Ruta al archivo JSON con el modelo.
+            modo (str): Formato de envío: "json" (un escenario por mensaje), "bloque" o "semilla".
+            tamano_bloque (int): Escenarios por mensaje (o por unidad de trabajo en modo "semilla"); en
+                modo "json" es el lote que genera cada trabajador por tarea.
+            semilla (int | None): Entropía de la corrida; si es None se toma del sistema operativo.
+            paralelismo (str): "procesos" (multiprocessing) o "hilos" (sin arranque de procesos ni
+                pickling; conviene con bloques grandes, donde NumPy libera el GIL).
+            trabajadores (int | None): Cantidad de trabajadores del pool; None usa todos los núcleos.
+            unicidad (str): Rastreo de escenarios únicos: "ninguno", "exacto", "hll" o "bloom".
+            memoria_unicidad (int): Memoria máxima en bytes de los rastreos aproximados.
+            asincrono (bool): Publica desde un hilo propio con confirmaciones del broker y contrapresión.
+            ventana_confirmaciones (int): Mensajes máximos publicados sin confirmar (modo asíncrono).
+            capacidad_envio (int): Mensajes máximos en espera entre generación y publicación (modo asíncrono).
+            limite_cola (int | None): Profundidad de la cola del broker a partir de la cual se pausa el envío.
+            nom_exchange_control (str | None): Exchange de control para la parada anticipada; solo se usa si
+                el modelo define un criterio de "parada".
+            transporte (TransporteRabbitMQ | TransporteLocal | None): Transporte de los mensajes; None usa
+                RabbitMQ en `ip` con las credenciales por defecto.
+            puerto_metricas (int | None): Puerto HTTP de las métricas en formato Prometheus; None no las expone.
+            trazas (dict | None): Configuración de las trazas y del perfil (ver `crear_trazador`); None
+                las desactiva.
+            corrida (str | None): Identificador de la corrida; None genera uno nuevo. Para reanudar una
+                corrida se indica el mismo identificador y el mismo directorio de puntos de control.
+            ruta_puntos_control (str | None): Directorio de los puntos de control; None los desactiva.
+            intervalo_punto_control (float): Segundos entre escrituras del punto de control.
         """
-        self.conexion: pika.BlockingConnection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=ip, credentials=pika.PlainCredentials("guest", "guest"))
-        )
+        if modo not in (MODO_JSON, MODO_BLOQUE, MODO_SEMILLA):
+            raise ValueError(f"Modo de envío desconocido: {modo}")
+        if paralelismo not in (PARALELISMO_PROCESOS, PARALELISMO_HILOS):
+            raise ValueError(f"Paralelismo desconocido: {paralelismo}")
+        self.transporte: Any = transporte if transporte is not None else TransporteRabbitMQ(host=ip)
+        if asincrono and self.transporte.backend != BACKEND_RABBITMQ:
+            raise ValueError("El publicador asíncrono requiere el transporte de RabbitMQ.")
+        self.conexion: pika.BlockingConnection = self.transporte.conectar()
         self.canal = self.conexion.channel()
         self.ruta_modelo: str = ruta_modelo
         self.nom_exchange: str = nom_exchange
         self.nom_queue: str = nom_queue
-        self.escenarios: set = set()
+        self.nom_exchange_control: Optional[str] = nom_exchange_control
+        self.ip: str = ip
+        self.modo: str = modo
+        self.tamano_bloque: int = tamano_bloque
+        self.paralelismo: str = paralelismo
+        self.trabajadores: Optional[int] = trabajadores
+        self.corrida: str = corrida or uuid.uuid4().hex
+        self.semilla: np.random.SeedSequence = np.random.SeedSequence(semilla)
+        self.modo_unicidad: str = unicidad
+        self.memoria_unicidad: int = memoria_unicidad
+        self.unicidad: Unicidad = crear_unicidad(unicidad, memoria_unicidad)
+        self.publicador: Optional[Publicador] = None
+        self.control: Optional[ControlParada] = None
+        self.punto_control: Optional[PuntoControlProductor] = (
+            PuntoControlProductor(ruta_puntos_control, self.corrida, intervalo_punto_control)
+            if ruta_puntos_control is not None else None
+        )
+        # Escenarios que no se vuelven a publicar al reanudar la corrida
+        self.completados: Intervalos = Intervalos()
+        if asincrono:
+            self.publicador = Publicador(
+                parametros=self.transporte.parametros(),
+                nom_queue=nom_queue,
+                ventana=ventana_confirmaciones,
+                capacidad=capacidad_envio,
+                limite_cola=limite_cola
+            )
         self.modelo: Modelo = Modelo(ruta_modelo=ruta_modelo)
 
+        self.metricas: RegistroMetricas = RegistroMetricas()
+        self.metrica_generados = self.metricas.contador(
+            "montecarlo_productor_escenarios_generados_total", "Escenarios recibidos del pool de generación.")
+        self.metrica_publicados = self.metricas.contador(
+            "montecarlo_productor_escenarios_publicados_total",
+            "Escenarios publicados (en modo semilla, escenarios de las unidades de trabajo publicadas).")
+        self.metrica_mensajes = self.metricas.contador(
+            "montecarlo_productor_mensajes_publicados_total", "Mensajes publicados en la cola de escenarios.")
+        self.metrica_latencia_publicacion = self.metricas.histograma(
+            "montecarlo_productor_latencia_publicacion_segundos",
+            "Duración de cada publicación (en modo asíncrono, de la entrega al publicador).")
+        self.metrica_espera_generacion = self.metricas.histograma(
+            "montecarlo_productor_espera_generacion_segundos",
+            "Tiempo que el productor espera cada resultado del pool de generación.")
+        if self.publicador is not None:
+            self.metricas.indicador("montecarlo_productor_mensajes_confirmados",
+                                    "Mensajes confirmados por el broker (modo asíncrono).",
+                                    lambda: self.publicador.confirmados)
+        self.servidor_metricas = iniciar_servidor(self.metricas, puerto_metricas)
+        self.trazador: Trazador = crear_trazador("productor", trazas)
+
     def configurar_conexion(self) -> None:
         """
         Declara el exchange y la cola en RabbitMQ para asegurar que existan.
         """
         self.canal.exchange_declare(exchange=self.nom_exchange, exchange_type='fanout')
         self.canal.queue_declare(queue=self.nom_queue, durable=True)
+        if self.punto_control is not None and self.publicador is None and self.transporte.backend == BACKEND_RABBITMQ:
+            # Cada publicación espera la confirmación del broker antes de marcar el rango como confirmado
+            self.canal.confirm_delivery()
 
     def configurar_modelo(self) -> None:
         """
         Carga la configuración del modelo desde el archivo JSON.
         """
         self.modelo.configurar_modelo()
+        if self.modelo.antiteticas and self.tamano_bloque % 2:
+            # Cada rango debe contener pares antitéticos completos
+            self.tamano_bloque += 1
         print("[MODELO] Modelo cargado correctamente")
 
+    def preparar_punto_control(self) -> None:
+        """
+        Registra la corrida en su punto de control o, si ya existe, recupera su entropía y los
+        escenarios que no hace falta volver a publicar: los que el agregador ya recibió y, con
+        RabbitMQ (cuya cola de escenarios es duradera), los que el broker confirmó.
+        """
+        if self.punto_control is None:
+            return
+        parametros: Dict[str, Any] = {
+            "iteraciones": self.modelo.iteraciones, "tamano_bloque": self.tamano_bloque, "modo": self.modo
+        }
+        self.semilla = np.random.SeedSequence(self.punto_control.iniciar(self.semilla.entropy, parametros))
+        if self.punto_control.reanudada:
+            self.completados = self.punto_control.completados(
+                incluir_confirmados=self.transporte.backend == BACKEND_RABBITMQ
+            )
+            print(f"[PRODUCTOR] Reanudando la corrida {self.corrida}: {self.completados.total()} de "
+                  f"{self.modelo.iteraciones} escenarios ya confirmados o agregados.")
+
+    def rangos_pendientes(self, iteraciones: int) -> List[Tuple[int, int]]:
+        """
+        Rangos de la corrida que aún deben publicarse.
+            iteraciones (int): Cantidad total de escenarios de la corrida.
+        """
+        return [
+            (inicio, cantidad) for inicio, cantidad in dividir_en_rangos(iteraciones, self.tamano_bloque)
+            if not self.completados.contiene(inicio, inicio + cantidad)
+        ]
+
+    def registrar_rango(self, rango: Tuple[int, int], mensajes: int = 1) -> Dict[str, Any]:
+        """
+        Marca un rango como publicado en el punto de control, antes de publicar sus mensajes.
+            rango (tuple): Índice inicial y cantidad de escenarios.
+            mensajes (int): Mensajes en que se publica el rango.
+            Returns: Cabeceras de los mensajes del rango: la corrida y, con puntos de control, el
+                rango, que lo identifica ante consumidores y agregadores.
+        """
+        if self.punto_control is None:
+            return {"corrida": self.corrida}
+        self.punto_control.publicado(rango[0], rango[1], mensajes)
+        return {"corrida": self.corrida, "rango": list(rango)}
+
+    def al_confirmar(self, rango: Tuple[int, int]) -> Any:
+        """
+        Función que registra la confirmación de un mensaje del rango, o None sin puntos de control.
+        """
+        if self.punto_control is None:
+            return None
+        return functools.partial(self.punto_control.confirmado, rango[0])
+
     def publicar_configuracion(self) -> None:
         """
-        Publica la configuración del modelo (fórmula y constantes) al exchange.
+        Publica la configuración del modelo (fórmula y constantes) al exchange y la deja en la cola de
+        configuración de la corrida, de donde la leen los consumidores que no recibieron la difusión.
         """
-        print("[PRODUCTOR] Enviando configuración.")
-        mensaje: str = json.dumps(self.modelo.obtener_configuracion())
+        print(f"[PRODUCTOR] Enviando configuración de la corrida {self.corrida}.")
+        configuracion: Dict[str, Any] = self.modelo.obtener_configuracion()
+        configuracion["corrida"] = self.corrida
+        mensaje: str = json.dumps(configuracion)
         
         self.canal.basic_publish(
             exchange=self.nom_exchange, 
@@ -91,45 +318,240 @@ class Productor:
             body=mensaje,
             properties=pika.BasicProperties(delivery_mode=2)
         )
+        cola_configuracion: str = self.transporte.cola_corrida(self.nom_exchange, self.corrida)
+        if cola_configuracion != self.nom_exchange:
+            declarar_cola_corrida(self.canal, self.transporte, self.nom_exchange, self.corrida)
+            # Al reanudar la corrida, su cola ya tiene la configuración
+            if not self.canal.queue_declare(queue=cola_configuracion, passive=True).method.message_count:
+                self.canal.basic_publish(
+                    exchange='',
+                    routing_key=cola_configuracion,
+                    body=mensaje,
+                    properties=pika.BasicProperties(delivery_mode=2)
+                )
 
     def generar_escenarios(self) -> None:
         """
-        Genera escenarios aleatorios en paralelo utilizando un pool de procesos.
-        Cada escenario es generado por un proceso hijo, serializado a JSON y enviado a la cola de RabbitMQ.
-        Además, almacena los escenarios generados en el atributo `self.escenarios` para evitar duplicados.
+        Genera escenarios aleatorios en paralelo utilizando un pool de procesos (o de hilos).
+        El trabajo se reparte en rangos de `tamano_bloque` escenarios; cada trabajador genera el rango
+        completo con un generador derivado de la semilla de la corrida, por lo que la corrida es
+        reproducible. En modo "json" el lote vuelve como una lista de escenarios serializados que se
+        publican uno por mensaje. En modo "bloque" el rango viaja en un solo mensaje binario columnar.
+        Además, registra los escenarios generados en el rastreador `self.unicidad` para reportar cuántos
+        son únicos. Si el control de parada detiene la corrida, deja de entregar rangos al pool.
         """
         iteraciones: int = self.modelo.iteraciones
         variables: Dict[str, Any] = self.modelo.variables
 
+        if self.modo == MODO_SEMILLA:
+            self.publicar_unidades(iteraciones)
+            return
+
         print(f"[PRODUCTOR] Generando {iteraciones} escenarios en paralelo.")
 
-        with mp.Pool(
+        self.unicidad = crear_unicidad(self.modo_unicidad, self.memoria_unicidad, iteraciones)
+        rangos: List[Tuple[int, int]] = self.rangos_pendientes(iteraciones)
+        clase_pool = ThreadPool if self.paralelismo == PARALELISMO_HILOS else mp.Pool
+        trabajadores: int = self.trabajadores or os.cpu_count() or 1
+        # Rangos en proceso o esperando a publicarse; acota la memoria si el envío se retrasa
+        semaforo: threading.Semaphore = threading.Semaphore(2 * trabajadores)
+        detener: Optional[threading.Event] = self.control.detenida if self.control is not None else None
+        enviados: int = 0
+        espera: float = time.perf_counter()
+
+        with clase_pool(
+            processes=trabajadores,
             initializer=iniciar_pool,
-            initargs=(self.ruta_modelo, variables)
+            initargs=(self.ruta_modelo, variables, self.semilla.entropy)
         ) as pool:
-            for escenario_json in pool.imap_unordered(generar_escenario, range(iteraciones)):
+            if self.modo == MODO_BLOQUE:
+                for rango, bloque in pool.imap_unordered(generar_bloque, limitar_rangos(rangos, semaforo, detener)):
+                    recibido: float = time.perf_counter()
+                    self.metrica_espera_generacion.observar(recibido - espera)
+                    self.trazador.registrar("espera_pool", espera, recibido)
+                    if self.corrida_detenida():
+                        break
+                    with self.trazador.tramo("decodificacion"):
+                        columnas: Dict[str, np.ndarray] = decodificar_bloque(bloque)
+                    cantidad: int = len(next(iter(columnas.values()), ()))
+                    self.metrica_generados.incrementar(cantidad)
+                    cabeceras: Dict[str, Any] = self.registrar_rango(rango)
+                    self.publicar_escenarios(bloque, TIPO_CONTENIDO_BLOQUE, cabeceras, self.al_confirmar(rango))
+                    self.metrica_publicados.incrementar(cantidad)
+                    with self.trazador.tramo("unicidad"):
+                        self.unicidad.registrar_bloque(columnas)
+                    enviados += cantidad
+                    semaforo.release()
+                    if self.punto_control is not None:
+                        self.punto_control.guardar()
+                    espera = time.perf_counter()
+            else:
+                for rango, lote in pool.imap_unordered(generar_lote_json, limitar_rangos(rangos, semaforo, detener)):
+                    recibido = time.perf_counter()
+                    self.metrica_espera_generacion.observar(recibido - espera)
+                    self.trazador.registrar("espera_pool", espera, recibido)
+                    if self.corrida_detenida():
+                        break
+                    self.metrica_generados.incrementar(len(lote))
+                    cabeceras = self.registrar_rango(rango, mensajes=len(lote))
+                    al_confirmar: Any = self.al_confirmar(rango)
+                    for escenario_json in lote:
+                        self.publicar_escenarios(escenario_json, TIPO_CONTENIDO_JSON, cabeceras, al_confirmar)
+                    self.metrica_publicados.incrementar(len(lote))
+                    with self.trazador.tramo("unicidad"):
+                        self.unicidad.registrar_json(lote)
+                    enviados += len(lote)
+                    semaforo.release()
+                    if self.punto_control is not None:
+                        self.punto_control.guardar()
+                    espera = time.perf_counter()
+            # Despierta al generador de rangos si quedó bloqueado, para poder cerrar el pool
+            semaforo.release(max(1, len(rangos)))
+        
+        unicos: Optional[int] = self.unicidad.unicos()
+        if unicos is None:
+            print(f"[PRODUCTOR] Se han enviado {enviados} escenarios.")
+        elif self.unicidad.aproximado:
+            print(f"[PRODUCTOR] Se han enviado {enviados} escenarios (~{unicos} únicos, estimado).")
+        else:
+            print(f"[PRODUCTOR] Se han enviado {unicos} escenarios únicos.")
+
+    def publicar_unidades(self, iteraciones: int) -> None:
+        """
+        Publica las unidades de trabajo de la corrida. Cada unidad describe un rango de escenarios
+        que el consumidor genera localmente con `generador_para_rango`, así que la carga del
+        productor y del broker no depende del número de iteraciones.
+            iteraciones (int): Cantidad total de escenarios de la corrida.
+        """
+        print(f"[PRODUCTOR] Publicando unidades de trabajo de la corrida {self.corrida} (entropía {self.semilla.entropy}).")
+
+        unidades: int = 0
+        escenarios: int = 0
+        for inicio, cantidad in self.rangos_pendientes(iteraciones):
+            if self.corrida_detenida():
+                break
+            with self.trazador.tramo("codificacion"):
+                unidad: bytes = codificar_unidad(self.corrida, self.semilla.entropy, inicio, cantidad)
+            cabeceras: Dict[str, Any] = self.registrar_rango((inicio, cantidad))
+            self.publicar_escenarios(unidad, TIPO_CONTENIDO_UNIDAD, cabeceras, self.al_confirmar((inicio, cantidad)))
+            self.metrica_publicados.incrementar(cantidad)
+            unidades += 1
+            escenarios += cantidad
+            if self.punto_control is not None:
+                self.punto_control.guardar()
+
+        print(f"[PRODUCTOR] Se han enviado {unidades} unidades de trabajo ({escenarios} escenarios).")
+
+    def corrida_detenida(self) -> bool:
+        """
+        Indica si el control de parada ya detuvo la corrida.
+        """
+        return self.control is not None and self.control.detenida.is_set()
+
+    def iniciar_control(self) -> None:
+        """
+        Inicia el control de parada anticipada si el modelo define un criterio de "parada" y hay
+        un exchange de control configurado. Debe llamarse antes de publicar la configuración para
+        no perder el progreso de los consumidores.
+        """
+        if not self.modelo.parada or self.nom_exchange_control is None:
+            return
+        if self.punto_control is not None and self.punto_control.reanudada:
+            # El progreso anterior a la caída no se conserva, así que el criterio no puede evaluarse
+            print("[PRODUCTOR] La parada anticipada no se aplica al reanudar una corrida.")
+            return
+        self.control = ControlParada(
+            transporte=self.transporte,
+            nom_exchange=self.nom_exchange_control,
+            corrida=self.corrida,
+            parada=self.modelo.parada,
+            total=self.modelo.iteraciones
+        )
+        self.control.start()
+        self.control.esperar_conexion()
+        print(f"[PRODUCTOR] Parada anticipada activa: {self.modelo.parada}.")
+
+    def esperar_control(self) -> None:
+        """
+        Espera a que la corrida converja, agote su tiempo o reciba todos los resultados, y cierra
+        el control de parada.
+        """
+        if self.control is None:
+            return
+        print("[PRODUCTOR] Esperando la convergencia de la corrida.")
+        while not self.control.esperar(1.0) and self.control.is_alive():
+            # Mantiene viva la conexión principal (heartbeats) durante la espera
+            self.conexion.process_data_events()
+        if self.control.motivo not in (None, MOTIVO_COMPLETA):
+            print(f"[PRODUCTOR] Corrida detenida antes de tiempo ({self.control.motivo}).")
+        self.control.cerrar()
+
+    def publicar_escenarios(self, cuerpo: Any, tipo_contenido: str, cabeceras: Optional[Dict[str, Any]] = None,
+                            al_confirmar: Any = None) -> None:
+        """
+        Publica un mensaje de escenarios (JSON individual o bloque binario) en la cola. En modo
+        asíncrono lo entrega al publicador, que bloquea mientras su cola esté llena.
+            cuerpo (str | bytes): Contenido del mensaje.
+            tipo_contenido (str): Tipo MIME que identifica el formato del mensaje.
+            cabeceras (dict | None): Cabeceras AMQP del mensaje (la corrida y, con puntos de control, el rango).
+            al_confirmar (callable | None): Función llamada cuando el mensaje queda confirmado; en modo
+                síncrono, al volver la publicación.
+        """
+        inicio: float = time.perf_counter()
+        with self.trazador.tramo("publicacion"):
+            if self.publicador is not None:
+                self.publicador.publicar(cuerpo, tipo_contenido, cabeceras, al_confirmar)
+            else:
                 self.canal.basic_publish(
                     exchange='',
                     routing_key=self.nom_queue,
-                    body=escenario_json,
-                    properties=pika.BasicProperties(delivery_mode=2)
+                    body=cuerpo,
+                    properties=pika.BasicProperties(delivery_mode=2, content_type=tipo_contenido, headers=cabeceras)
                 )
-                
-                self.escenarios.add(escenario_json)
-        
-        print(f"[PRODUCTOR] Se han enviado {len(self.escenarios)} escenarios únicos.")
+                if al_confirmar is not None:
+                    al_confirmar()
+        self.metrica_latencia_publicacion.observar(time.perf_counter() - inicio)
+        self.metrica_mensajes.incrementar()
 
     def iniciar_productor(self) -> None:
         """
         Ejecuta el flujo principal del productor:
-        1. Carga la configuración del modelo desde el archivo JSON.
+        1. Carga la configuración del modelo desde el archivo JSON y, con puntos de control, registra
+           la corrida o recupera el estado de la que se reanuda.
         2. Declara el exchange y la cola en RabbitMQ.
-        3. Publica la configuración del modelo en el exchange.
-        4. Genera escenarios en paralelo y los envía a la cola de RabbitMQ.
-        5. Cierra la conexión con RabbitMQ al finalizar.
+        3. Inicia el control de parada anticipada, si el modelo lo define.
+        4. Publica la configuración del modelo en el exchange.
+        5. Genera escenarios en paralelo y los envía a la cola de RabbitMQ (directamente o a través
+           del publicador asíncrono, que se espera hasta que el broker confirme todos los mensajes).
+        6. Espera a que la corrida converja, si hay control de parada.
+        7. Cierra la conexión con RabbitMQ al finalizar.
+        Con trazas configuradas, la ejecución se perfila y las trazas activas se exportan al terminar.
+        """
+        with self.trazador.perfilar():
+            self.ejecutar_flujo()
+
+    def ejecutar_flujo(self) -> None:
+        """
+        Pasos de `iniciar_productor`.
         """
         self.configurar_modelo()
+        self.preparar_punto_control()
         self.configurar_conexion()
+        self.iniciar_control()
         self.publicar_configuracion()
-        self.generar_escenarios()
+        if self.publicador is not None:
+            self.publicador.start()
+            self.publicador.esperar_conexion()
+        try:
+            self.generar_escenarios()
+        finally:
+            try:
+                if self.publicador is not None:
+                    self.publicador.cerrar()
+                    print(f"[PRODUCTOR] El broker confirmó {self.publicador.confirmados} mensajes "
+                          f"({self.publicador.reintentos} reintentos).")
+            finally:
+                if self.punto_control is not None:
+                    self.punto_control.guardar(forzar=True)
+        self.esperar_control()
         self.conexion.close()
\ No newline at end of file
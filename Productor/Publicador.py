@@ -0,0 +1,221 @@
+"""
+__________________________________________________________________________________________
+Módulo: Publicador.py
+Descripción: Publicador asíncrono de escenarios para el Productor. Separa la generación de
+escenarios del envío a RabbitMQ:
+    1. La generación deja los mensajes en una cola acotada; si está llena, la generación se
+       detiene hasta que haya espacio (contrapresión).
+    2. Un hilo propio, con su conexión `SelectConnection`, publica los mensajes usando
+       confirmaciones del broker (publisher confirms) con una ventana máxima de mensajes
+       sin confirmar.
+    3. Periódicamente consulta la profundidad de la cola en el broker y pausa el envío si
+       supera el límite configurado, por ejemplo cuando los consumidores se retrasan.
+Los mensajes rechazados por el broker (basic.nack) se reintentan. Cada mensaje puede llevar una
+función que se llama (desde el hilo publicador) cuando el broker lo confirma, por ejemplo para
+registrar el rango en el punto de control de la corrida.
+__________________________________________________________________________________________
+"""
+import queue
+import threading
+import pika
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Optional, Tuple
+
+_FIN: object = object()
+
+class Publicador(threading.Thread):
+    """
+    Hilo publicador con confirmaciones y contrapresión.
+
+    Atributos:
+        pendientes (queue.Queue): Cola acotada entre la generación y el publicador.
+        ventana (int): Máximo de mensajes publicados sin confirmar.
+        limite_cola (int | None): Profundidad máxima de la cola del broker antes de pausar.
+        confirmados (int): Mensajes confirmados por el broker.
+        reintentos (int): Mensajes rechazados por el broker y vueltos a publicar.
+    """
+
+    def __init__(self, parametros: pika.ConnectionParameters, nom_queue: str, ventana: int = 1000, capacidad: int = 64,
+                 limite_cola: Optional[int] = None, intervalo_profundidad: float = 1.0) -> None:
+        """
+        Prepara el publicador; la conexión se abre al iniciar el hilo.
+            parametros (pika.ConnectionParameters): Parámetros de conexión a RabbitMQ (ver Comun/Transporte.py).
+            nom_queue (str): Nombre de la cola donde se publican los escenarios.
+            ventana (int): Máximo de mensajes en vuelo (publicados y sin confirmar).
+            capacidad (int): Tamaño de la cola local entre generación y publicación.
+            limite_cola (int | None): Mensajes máximos en la cola del broker; None desactiva el control.
+            intervalo_profundidad (float): Segundos entre consultas de profundidad de la cola.
+        """
+        super().__init__(name="Publicador", daemon=True)
+        self.parametros: pika.ConnectionParameters = parametros
+        self.nom_queue: str = nom_queue
+        self.ventana: int = ventana
+        self.limite_cola: Optional[int] = limite_cola
+        self.intervalo_profundidad: float = intervalo_profundidad
+        self.pendientes: "queue.Queue[Any]" = queue.Queue(maxsize=capacidad)
+
+        self.confirmados: int = 0
+        self.reintentos: int = 0
+        self.error: Optional[BaseException] = None
+
+        self._conexion: Optional[pika.SelectConnection] = None
+        self._canal = None
+        # Mensajes como (cuerpo, tipo de contenido, cabeceras, función al confirmar)
+        self._en_vuelo: "OrderedDict[int, Tuple[Any, ...]]" = OrderedDict()
+        self._reenviar: Deque[Tuple[Any, ...]] = deque()
+        self._siguiente_tag: int = 1
+        self._pausado: bool = False
+        self._terminando: bool = False
+        self._cerrado: bool = False
+        self._listo: threading.Event = threading.Event()
+
+    def publicar(self, cuerpo: Any, tipo_contenido: str, cabeceras: Optional[dict] = None,
+                 al_confirmar: Optional[Callable[[], None]] = None) -> None:
+        """
+        Encola un mensaje para su publicación. Bloquea mientras la cola local esté llena.
+            cuerpo (str | bytes): Contenido del mensaje.
+            tipo_contenido (str): Tipo MIME del mensaje.
+            cabeceras (dict | None): Cabeceras AMQP del mensaje.
+            al_confirmar (callable | None): Función llamada cuando el broker confirma el mensaje.
+        """
+        if self.error is not None:
+            raise RuntimeError("El publicador se detuvo por un error.") from self.error
+        while True:
+            try:
+                self.pendientes.put((cuerpo, tipo_contenido, cabeceras, al_confirmar), timeout=1.0)
+                return
+            except queue.Full:
+                if not self.is_alive():
+                    raise RuntimeError("El publicador no está activo.") from self.error
+
+    def cerrar(self) -> None:
+        """
+        Espera a que todos los mensajes encolados sean confirmados y cierra la conexión.
+        """
+        if self.is_alive():
+            self.pendientes.put(_FIN)
+            self.join()
+        if self.error is not None:
+            raise RuntimeError("El publicador se detuvo por un error.") from self.error
+
+    def esperar_conexion(self, tiempo: float = 10.0) -> None:
+        """
+        Bloquea hasta que el canal esté listo para publicar.
+        """
+        if not self._listo.wait(tiempo) or self.error is not None:
+            raise RuntimeError("No se pudo abrir la conexión del publicador.") from self.error
+
+    def run(self) -> None:
+        try:
+            self._conexion = pika.SelectConnection(
+                self.parametros,
+                on_open_callback=self._al_abrir_conexion,
+                on_open_error_callback=self._al_fallar_conexion,
+                on_close_callback=self._al_cerrar_conexion,
+            )
+            self._conexion.ioloop.start()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._listo.set()
+
+    def _al_abrir_conexion(self, conexion: pika.SelectConnection) -> None:
+        conexion.channel(on_open_callback=self._al_abrir_canal)
+
+    def _al_fallar_conexion(self, conexion: pika.SelectConnection, error: BaseException) -> None:
+        self.error = error
+        conexion.ioloop.stop()
+
+    def _al_cerrar_conexion(self, conexion: pika.SelectConnection, motivo: BaseException) -> None:
+        if not self._terminando:
+            self.error = motivo
+        conexion.ioloop.stop()
+
+    def _al_abrir_canal(self, canal) -> None:
+        self._canal = canal
+        canal.confirm_delivery(ack_nack_callback=self._al_confirmar)
+        self._listo.set()
+        if self.limite_cola is not None:
+            self._consultar_profundidad()
+        self._bombear()
+
+    def _consultar_profundidad(self) -> None:
+        """
+        Consulta la cantidad de mensajes en la cola del broker y programa la siguiente consulta.
+        """
+        if self._cerrado:
+            return
+        self._canal.queue_declare(queue=self.nom_queue, passive=True, callback=self._al_recibir_profundidad)
+        self._conexion.ioloop.call_later(self.intervalo_profundidad, self._consultar_profundidad)
+
+    def _al_recibir_profundidad(self, respuesta) -> None:
+        pausado: bool = respuesta.method.message_count >= self.limite_cola
+        if pausado != self._pausado:
+            estado: str = "pausando" if pausado else "reanudando"
+            print(f"[PUBLICADOR] Cola con {respuesta.method.message_count} mensajes, {estado} envío.")
+        self._pausado = pausado
+
+    def _al_confirmar(self, trama) -> None:
+        """
+        Procesa un basic.ack o basic.nack del broker (posiblemente con `multiple`).
+        """
+        metodo = trama.method
+        rechazado: bool = isinstance(metodo, pika.spec.Basic.Nack)
+        if metodo.multiple:
+            while self._en_vuelo and next(iter(self._en_vuelo)) <= metodo.delivery_tag:
+                self._resolver(self._en_vuelo.popitem(last=False)[1], rechazado)
+        else:
+            mensaje = self._en_vuelo.pop(metodo.delivery_tag, None)
+            if mensaje is not None:
+                self._resolver(mensaje, rechazado)
+        self._enviar()
+
+    def _resolver(self, mensaje: Tuple[Any, ...], rechazado: bool) -> None:
+        if rechazado:
+            self._reenviar.append(mensaje)
+            self.reintentos += 1
+        else:
+            self.confirmados += 1
+            if mensaje[3] is not None:
+                mensaje[3]()
+
+    def _siguiente_mensaje(self) -> Any:
+        if self._reenviar:
+            return self._reenviar.popleft()
+        return self.pendientes.get_nowait()
+
+    def _enviar(self) -> None:
+        """
+        Publica mensajes mientras haya espacio en la ventana y el broker no esté saturado.
+        Cierra la conexión cuando se pidió terminar y ya no quedan mensajes sin confirmar.
+        """
+        if self._cerrado:
+            return
+        while not self._pausado and len(self._en_vuelo) < self.ventana:
+            try:
+                mensaje = self._siguiente_mensaje()
+            except queue.Empty:
+                break
+            if mensaje is _FIN:
+                self._terminando = True
+                continue
+            cuerpo, tipo_contenido, cabeceras, _ = mensaje
+            self._canal.basic_publish(
+                exchange="",
+                routing_key=self.nom_queue,
+                body=cuerpo,
+                properties=pika.BasicProperties(delivery_mode=2, content_type=tipo_contenido, headers=cabeceras),
+            )
+            self._en_vuelo[self._siguiente_tag] = mensaje
+            self._siguiente_tag += 1
+        if self._terminando and not self._en_vuelo and not self._reenviar:
+            self._cerrado = True
+            self._conexion.close()
+
+    def _bombear(self) -> None:
+        """
+        Revisa periódicamente la cola local, ya que la generación no despierta al hilo publicador.
+        """
+        self._enviar()
+        if not self._cerrado:
+            self._conexion.ioloop.call_later(0.005, self._bombear)
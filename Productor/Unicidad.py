@@ -0,0 +1,213 @@
+"""
+__________________________________________________________________________________________
+Módulo: Unicidad.py
+Descripción: Rastreadores de escenarios únicos para el Productor. Sustituyen al conjunto
+`escenarios` original, cuyo consumo de memoria crece con el número de iteraciones.
+Modos disponibles:
+    1. "ninguno": no rastrea nada.
+    2. "exacto": conserva cada escenario (comportamiento original, memoria sin límite).
+    3. "hll": estima el número de escenarios únicos con HyperLogLog.
+    4. "bloom": cuenta escenarios nuevos con un filtro de Bloom (permite deduplicar).
+Los modos aproximados usan una cantidad de memoria fija y configurable, y calculan los
+hashes de forma vectorizada sobre los bytes crudos de cada bloque.
+__________________________________________________________________________________________
+"""
+import math
+import hashlib
+import numpy as np
+from typing import Dict, List, Optional
+
+MODO_NINGUNO: str = "ninguno"
+MODO_EXACTO: str = "exacto"
+MODO_HLL: str = "hll"
+MODO_BLOOM: str = "bloom"
+
+_SEMILLA_HASH: np.uint64 = np.uint64(0x9E3779B97F4A7C15)
+
+def _mezclar(x: np.ndarray) -> np.ndarray:
+    """
+    Finalizador de splitmix64 aplicado elemento a elemento sobre un arreglo uint64.
+    """
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def hash_bloque(columnas: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Calcula un hash de 64 bits por escenario a partir de los bytes crudos de sus valores.
+        columnas (dict): Bloque columnar nombre -> arreglo float64.
+        Returns: Arreglo uint64 con un hash por fila.
+    """
+    nombres = sorted(columnas)
+    filas: int = len(columnas[nombres[0]]) if nombres else 0
+    hashes = np.full(filas, _SEMILLA_HASH, dtype=np.uint64)
+    for nombre in nombres:
+        palabras = np.ascontiguousarray(columnas[nombre], dtype="<f8").view("<u8")
+        hashes = _mezclar(hashes ^ palabras)
+    return hashes
+
+def hash_json(escenarios: List[str]) -> np.ndarray:
+    """
+    Calcula un hash de 64 bits por escenario serializado en JSON.
+        escenarios (list): Escenarios en formato JSON.
+        Returns: Arreglo uint64 con un hash por escenario.
+    """
+    digestos = b"".join(hashlib.blake2b(e.encode("utf-8"), digest_size=8).digest() for e in escenarios)
+    return np.frombuffer(digestos, dtype="<u8")
+
+
+class Unicidad:
+    """
+    Interfaz común de los rastreadores. Por defecto no rastrea nada (modo "ninguno").
+    """
+    aproximado: bool = False
+
+    def registrar_json(self, escenarios: List[str]) -> None:
+        """
+        Registra un lote de escenarios serializados en JSON.
+        """
+
+    def registrar_bloque(self, columnas: Dict[str, np.ndarray]) -> None:
+        """
+        Registra un bloque columnar de escenarios.
+        """
+
+    def unicos(self) -> Optional[int]:
+        """
+        Devuelve la cantidad (exacta o estimada) de escenarios únicos, o None si no se rastrea.
+        """
+        return None
+
+
+class UnicidadExacta(Unicidad):
+    """
+    Conserva cada escenario en un conjunto, igual que el productor original.
+    """
+
+    def __init__(self) -> None:
+        self.escenarios: set = set()
+
+    def registrar_json(self, escenarios: List[str]) -> None:
+        self.escenarios.update(escenarios)
+
+    def registrar_bloque(self, columnas: Dict[str, np.ndarray]) -> None:
+        if not columnas:
+            return
+        matriz = np.column_stack([columnas[nombre] for nombre in sorted(columnas)])
+        filas = np.ascontiguousarray(matriz).view(np.dtype((np.void, matriz.shape[1] * matriz.itemsize)))
+        self.escenarios.update(filas.ravel().tolist())
+
+    def unicos(self) -> Optional[int]:
+        return len(self.escenarios)
+
+
+class UnicidadHyperLogLog(Unicidad):
+    """
+    Estimador HyperLogLog con 2**precision registros de un byte. El error relativo típico
+    es 1.04 / sqrt(2**precision) (≈0.8 % con precisión 14, usando 16 KiB).
+    """
+    aproximado: bool = True
+
+    def __init__(self, precision: int = 14) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError("La precisión de HyperLogLog debe estar entre 4 y 18.")
+        self.precision: int = precision
+        self.registros: np.ndarray = np.zeros(1 << precision, dtype=np.uint8)
+
+    def registrar_json(self, escenarios: List[str]) -> None:
+        self.registrar_hashes(hash_json(escenarios))
+
+    def registrar_bloque(self, columnas: Dict[str, np.ndarray]) -> None:
+        self.registrar_hashes(hash_bloque(columnas))
+
+    def registrar_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Actualiza los registros con un arreglo de hashes de 64 bits.
+        """
+        bits_resto: int = 64 - self.precision
+        indices = (hashes >> np.uint64(bits_resto)).astype(np.intp)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+        # Posición del bit menos significativo encendido: las potencias de dos son exactas en float64
+        bit_bajo = resto & (~resto + np.uint64(1))
+        with np.errstate(divide="ignore"):
+            rho = np.log2(bit_bajo.astype(np.float64)).astype(np.int64) + 1
+        rho = np.where(resto == 0, bits_resto + 1, rho).astype(np.uint8)
+        np.maximum.at(self.registros, indices, rho)
+
+    def unicos(self) -> Optional[int]:
+        m: int = self.registros.size
+        alfa: float = 0.7213 / (1 + 1.079 / m)
+        estimacion: float = alfa * m * m / float(np.sum(np.ldexp(1.0, -self.registros.astype(np.int64))))
+        vacios: int = int(np.count_nonzero(self.registros == 0))
+        if estimacion <= 2.5 * m and vacios:
+            estimacion = m * math.log(m / vacios)
+        return int(round(estimacion))
+
+
+class UnicidadBloom(Unicidad):
+    """
+    Filtro de Bloom de tamaño fijo. Cuenta los escenarios que no estaban en el filtro; los
+    falsos positivos hacen que la cuenta sea una cota inferior. `nuevos` permite deduplicar.
+    """
+    aproximado: bool = True
+
+    def __init__(self, memoria_bytes: int, elementos_esperados: int) -> None:
+        self.bits: int = max(64, memoria_bytes * 8)
+        self.num_hashes: int = min(16, max(1, round(self.bits / max(1, elementos_esperados) * math.log(2))))
+        self.filtro: np.ndarray = np.zeros((self.bits + 7) // 8, dtype=np.uint8)
+        self.contador: int = 0
+
+    def _posiciones(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Calcula las `num_hashes` posiciones de cada hash con doble hashing (Kirsch-Mitzenmacher).
+        """
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.num_hashes, dtype=np.uint64)
+        return ((h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self.bits)).astype(np.intp)
+
+    def nuevos(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Inserta los hashes y devuelve una máscara con los que no estaban presentes (incluida
+        la primera aparición de los repetidos dentro del mismo lote).
+        """
+        _, primeros = np.unique(hashes, return_index=True)
+        mascara = np.zeros(len(hashes), dtype=bool)
+        posiciones = self._posiciones(hashes[primeros])
+        presentes = np.all(self.filtro[posiciones >> 3] & (1 << (posiciones & 7)).astype(np.uint8), axis=1)
+        mascara[primeros[~presentes]] = True
+        posiciones = posiciones.ravel()
+        np.bitwise_or.at(self.filtro, posiciones >> 3, (1 << (posiciones & 7)).astype(np.uint8))
+        self.contador += int(np.count_nonzero(mascara))
+        return mascara
+
+    def registrar_json(self, escenarios: List[str]) -> None:
+        self.nuevos(hash_json(escenarios))
+
+    def registrar_bloque(self, columnas: Dict[str, np.ndarray]) -> None:
+        self.nuevos(hash_bloque(columnas))
+
+    def unicos(self) -> Optional[int]:
+        return self.contador
+
+
+def crear_unicidad(modo: str, memoria_bytes: int = 1 << 14, elementos_esperados: int = 0) -> Unicidad:
+    """
+    Crea el rastreador de unicidad indicado.
+        modo (str): "ninguno", "exacto", "hll" o "bloom".
+        memoria_bytes (int): Memoria máxima de los modos aproximados (en "hll" se redondea a la
+            potencia de dos inferior).
+        elementos_esperados (int): Escenarios esperados, para dimensionar el filtro de Bloom.
+        Returns: Instancia del rastreador.
+    """
+    if modo == MODO_NINGUNO:
+        return Unicidad()
+    if modo == MODO_EXACTO:
+        return UnicidadExacta()
+    if modo == MODO_HLL:
+        return UnicidadHyperLogLog(precision=min(18, max(4, int(memoria_bytes).bit_length() - 1)))
+    if modo == MODO_BLOOM:
+        return UnicidadBloom(memoria_bytes=memoria_bytes, elementos_esperados=elementos_esperados)
+    raise ValueError(f"Modo de unicidad desconocido: {modo}")
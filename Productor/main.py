@@ -9,11 +9,34 @@ específicos.
 ______________________________________________________________________________
 """
 from Productor import Productor
+from Transporte import crear_transporte
 
 IP: str = 'localhost'
 EXCHANGE: str = 'Cofiguracion'  # Nombre del exchange donde se enviará la configuración
 QUEUE: str = 'Escenarios'       # Nombre de la cola donde se enviarán los escenarios
 RUTA_MODELO: str = './modelo.json'  # Ruta al archivo JSON con el modelo de simulación
+MODO: str = 'json'              # Formato de envío: 'json' (un escenario por mensaje), 'bloque' o 'semilla'
+TAMANO_BLOQUE: int = 10000      # Escenarios por bloque/unidad; en modo 'json' es el lote de cada tarea del pool
+SEMILLA: int | None = None      # Entropía de la corrida (None = aleatoria); permite reproducir resultados
+PARALELISMO: str = 'procesos'   # 'procesos' o 'hilos' (evita arranque de procesos y pickling con bloques grandes)
+TRABAJADORES: int | None = None # Trabajadores del pool (None = todos los núcleos)
+UNICIDAD: str = 'exacto'        # Rastreo de escenarios únicos: 'ninguno', 'exacto', 'hll' o 'bloom'
+MEMORIA_UNICIDAD: int = 1 << 14 # Bytes máximos para los rastreos aproximados ('hll' y 'bloom')
+ASINCRONO: bool = False         # Publica desde un hilo propio con confirmaciones y contrapresión
+VENTANA_CONFIRMACIONES: int = 1000  # Mensajes máximos sin confirmar por el broker (modo asíncrono)
+CAPACIDAD_ENVIO: int = 64       # Mensajes máximos esperando al publicador (modo asíncrono)
+LIMITE_COLA: int | None = None  # Mensajes en la cola del broker a partir de los cuales se pausa el envío
+EXCHANGE_CONTROL: str = 'Control'  # Exchange de progreso y parada anticipada (si el modelo define "parada")
+CORRIDA: str | None = None      # Identificador de la corrida (None = nuevo); repetirlo reanuda la corrida
+RUTA_PUNTOS_CONTROL: str | None = None  # Directorio de los puntos de control (None = desactivados)
+INTERVALO_PUNTO_CONTROL: float = 5.0    # Segundos entre puntos de control
+# Servidor de RabbitMQ; las credenciales se toman de RABBITMQ_USUARIO y RABBITMQ_CONTRASENA (guest por defecto)
+TRANSPORTE: dict = {'backend': 'rabbitmq', 'host': IP, 'puerto': 5672, 'vhost': '/'}
+PUERTO_METRICAS: int | None = None  # Puerto de /metrics en formato Prometheus (None = desactivado)
+# Trazas por etapa y perfil (None = desactivadas), p. ej. {'activo': True, 'muestreo': 0.01, 'ruta': './trazas',
+# 'perfil': 'muestreo', 'segundos_perfil': 10}. Con trazas configuradas, SIGUSR1 las activa o desactiva (y exporta)
+# y SIGUSR2 muestrea las pilas del proceso durante 'segundos_perfil'
+TRAZAS: dict | None = None
 
 def main() -> None:
     """
@@ -21,7 +44,30 @@ def main() -> None:
     simulación desde un archivo JSON, y utiliza RabbitMQ para enviar la 
     configuración al exchange y los escenarios generados a la cola indicada.
     """
-    productor: Productor = Productor(ip=IP, nom_exchange=EXCHANGE, nom_queue=QUEUE, ruta_modelo=RUTA_MODELO)
+    productor: Productor = Productor(
+        ip=IP,
+        nom_exchange=EXCHANGE,
+        nom_queue=QUEUE,
+        ruta_modelo=RUTA_MODELO,
+        modo=MODO,
+        tamano_bloque=TAMANO_BLOQUE,
+        semilla=SEMILLA,
+        paralelismo=PARALELISMO,
+        trabajadores=TRABAJADORES,
+        unicidad=UNICIDAD,
+        memoria_unicidad=MEMORIA_UNICIDAD,
+        asincrono=ASINCRONO,
+        ventana_confirmaciones=VENTANA_CONFIRMACIONES,
+        capacidad_envio=CAPACIDAD_ENVIO,
+        limite_cola=LIMITE_COLA,
+        nom_exchange_control=EXCHANGE_CONTROL,
+        corrida=CORRIDA,
+        ruta_puntos_control=RUTA_PUNTOS_CONTROL,
+        intervalo_punto_control=INTERVALO_PUNTO_CONTROL,
+        transporte=crear_transporte(TRANSPORTE),
+        puerto_metricas=PUERTO_METRICAS,
+        trazas=TRAZAS
+    )
     productor.iniciar_productor()
     
 if __name__ == '__main__':
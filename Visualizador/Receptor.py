@@ -0,0 +1,332 @@
+'''
+___________________________________________________________________________
+Módulo: Receptor.py
+Descripción: Hilo que vacía continuamente la cola de resultados de una corrida (de RabbitMQ o del
+transporte local, ver Comun/Transporte.py) para el Visualizador. Los resultados no se guardan: los
+estadísticos y el histograma se mantienen de forma incremental (Welford/Chan), así que la memoria no
+crece con la corrida y cada actualización de la interfaz solo lee una instantánea en O(1).
+____________________________________________________________________________
+'''
+from typing import Any, Dict, List
+import os
+import sys
+import json
+import threading
+import numpy as np
+import pika
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Comun"))
+from Mensajes import TIPO_CONTENIDO_AGREGADO, decodificar_bloque, es_bloque
+from Estadisticas import Estadisticas, EstadisticasBarrido, decodificar_agregado
+from Transporte import TransporteRabbitMQ, declarar_cola_corrida
+from Submuestreo import SerieAcotada
+from Metricas import RegistroMetricas, Tasa
+from Archivo import LectorArchivo
+from PuntoControl import COMPONENTE_AGREGADOR, SeguimientoRangos, cargar_json, guardar_json, ruta_punto_control
+
+# Segundos entre consultas de la cantidad de mensajes pendientes en la cola de resultados
+INTERVALO_PENDIENTES: float = 1.0
+
+class Receptor(threading.Thread):
+    """
+    Hilo consumidor de la cola de resultados. Tiene su propia conexión, ya que las conexiones
+    de pika no deben compartirse entre hilos. Sus métricas (mensajes recibidos, tasa de ingesta y
+    mensajes pendientes en la cola) quedan en `metricas` para que el Visualizador las exponga.
+    """
+    def __init__(self, host: str, cola: str, max_bins: int = 64, max_puntos: int = 500,
+                 transporte: Any = None, corrida: str | None = None, ruta_puntos_control: str | None = None,
+                 intervalo_punto_control: float = 5.0, archivo: str | None = None,
+                 nom_exchange: str | None = None) -> None:
+        """
+        Parámetros:
+            host (str): Dirección del servidor RabbitMQ (si no se indica otro transporte).
+            cola (str): Nombre de la cola de resultados (la de cada corrida deriva de él).
+            max_bins (int): Cantidad máxima de bins del histograma.
+            max_puntos (int): Cantidad máxima de puntos de la serie de la media acumulada.
+            transporte (TransporteRabbitMQ | TransporteLocal | None): Transporte de los resultados.
+            corrida (str | None): Identificador de la corrida que se sigue y de sus puntos de control.
+            ruta_puntos_control (str | None): Directorio de los puntos de control; None los desactiva. Si ya
+                hay uno de la misma corrida, el Receptor la reanuda a partir de los estadísticos guardados.
+            intervalo_punto_control (float): Segundos entre puntos de control.
+            archivo (str | None): Directorio de una corrida archivada que se reproduce en lugar de consumir la cola.
+            nom_exchange (str | None): Exchange de configuración donde se espera la próxima corrida si no se indica `corrida`.
+        """
+        super().__init__(name="Receptor", daemon=True)
+        self.host: str = host
+        self.transporte: Any = transporte if transporte is not None else TransporteRabbitMQ(host=host)
+        self.cola: str = cola
+        self.corrida: str | None = corrida
+        self.nom_exchange: str | None = nom_exchange
+        self.bloqueo: threading.Lock = threading.Lock()
+        self.max_bins: int = max_bins
+        self.estadisticas: Estadisticas = Estadisticas(max_bins=max_bins)
+        # Salidas secundarias: nombre -> estadísticos; `nombres_salidas` empieza por la principal
+        self.salidas: Dict[str, Estadisticas] = {}
+        self.nombres_salidas: List[str] | None = None
+        # Estimadores de cada punto del barrido de parámetros; None si la corrida no lo define
+        self.barrido: EstadisticasBarrido | None = None
+        self.convergencia: SerieAcotada = SerieAcotada(max_puntos=max_puntos)
+        self.mensajes: int = 0
+        self.lista: threading.Event = threading.Event()
+        self.archivo: str | None = archivo
+
+        self.ruta_punto_control: str | None = None
+        self.intervalo_punto_control: float = intervalo_punto_control
+        self.seguimiento: SeguimientoRangos = SeguimientoRangos()
+        self.reanudada: bool = False
+        self.descartados: int = 0
+        self._ultimo_tag: int | None = None
+        if ruta_puntos_control is not None and corrida is not None:
+            self.ruta_punto_control = ruta_punto_control(ruta_puntos_control, corrida, COMPONENTE_AGREGADOR)
+            guardado: Dict[str, Any] | None = cargar_json(self.ruta_punto_control)
+            if guardado is not None:
+                self.estadisticas = Estadisticas.desde_dict(guardado["estadisticas"])
+                self.mensajes = guardado.get("mensajes", 0)
+                self.seguimiento = SeguimientoRangos.desde_dict(guardado.get("rangos", {}))
+                self.salidas = {
+                    nombre: Estadisticas.desde_dict(datos) for nombre, datos in (guardado.get("salidas") or {}).items()
+                }
+                self.nombres_salidas = guardado.get("nombres_salidas")
+                if guardado.get("barrido") is not None:
+                    self.barrido = EstadisticasBarrido.desde_dict(guardado["barrido"])
+                self.convergencia.agregar(self.estadisticas.n, self.estadisticas.estimacion())
+                self.reanudada = True
+                print(f"[RECEPTOR] Reanudando la corrida {corrida} con {self.estadisticas.n} escenarios agregados.")
+
+        self.metricas: RegistroMetricas = RegistroMetricas()
+        self.metrica_mensajes = self.metricas.contador(
+            "montecarlo_visualizador_mensajes_recibidos_total", "Mensajes recibidos de la cola de resultados.")
+        self.metrica_escenarios = self.metricas.contador(
+            "montecarlo_visualizador_escenarios_recibidos_total", "Resultados de escenarios agregados.")
+        self.metricas.indicador(
+            "montecarlo_visualizador_escenarios_por_segundo",
+            "Resultados agregados por segundo desde la consulta anterior.",
+            Tasa(lambda: self.estadisticas.n)
+        )
+        self.metrica_pendientes = self.metricas.indicador(
+            "montecarlo_visualizador_resultados_pendientes", "Mensajes en espera en la cola de resultados.")
+
+    def run(self) -> None:
+        """
+        Se conecta, determina la corrida que sigue y consume su cola de resultados indefinidamente.
+        Cada corrida tiene su propia cola (ver `Transporte.cola_corrida`), así que no interfiere con otras
+        corridas que compartan los consumidores ni hace falta purgarla. Con puntos de control, los
+        mensajes se confirman al broker solo después de guardar el estado que los incluye. Con
+        `archivo`, reproduce la corrida archivada y termina.
+        """
+        if self.archivo is not None:
+            self.lista.set()
+            self.reproducir(self.archivo)
+            return
+        conexion: pika.BlockingConnection = self.transporte.conectar()
+        canal = conexion.channel()
+        if self.corrida is None and self.nom_exchange is not None:
+            self.esperar_corrida(canal)
+        cola: str = declarar_cola_corrida(canal, self.transporte, self.cola, self.corrida)
+        self.lista.set()
+
+        def consultar_pendientes() -> None:
+            self.metrica_pendientes.establecer(canal.queue_declare(queue=cola, passive=True).method.message_count)
+            conexion.call_later(INTERVALO_PENDIENTES, consultar_pendientes)
+
+        conexion.call_later(INTERVALO_PENDIENTES, consultar_pendientes)
+
+        # Con puntos de control, los mensajes se confirman solo después de guardar el estado que los incluye
+        def guardar_y_confirmar() -> None:
+            self.guardar_punto_control()
+            if self._ultimo_tag is not None:
+                canal.basic_ack(delivery_tag=self._ultimo_tag, multiple=True)
+                self._ultimo_tag = None
+            conexion.call_later(self.intervalo_punto_control, guardar_y_confirmar)
+
+        confirmar_manual: bool = self.ruta_punto_control is not None
+        if confirmar_manual:
+            conexion.call_later(self.intervalo_punto_control, guardar_y_confirmar)
+        canal.basic_consume(queue=cola, on_message_callback=self.recibir, auto_ack=not confirmar_manual)
+        canal.start_consuming()
+
+    def esperar_corrida(self, canal: Any) -> None:
+        """
+        Se suscribe al exchange de configuración y espera a que se anuncie una corrida para seguirla.
+        `lista` se activa ya suscrito, así que la configuración de un productor iniciado después no se pierde.
+
+        Parámetros:
+            canal (Any): Canal del transporte.
+        """
+        canal.exchange_declare(exchange=self.nom_exchange, exchange_type="fanout")
+        cola_configuracion: str = canal.queue_declare(queue="", exclusive=True).method.queue
+        canal.queue_bind(exchange=self.nom_exchange, queue=cola_configuracion)
+        self.lista.set()
+
+        def recibir_configuracion(ch: Any, method: Any, properties: Any, body: bytes) -> None:
+            self.corrida = json.loads(body.decode("utf-8")).get("corrida")
+            ch.basic_cancel(method.consumer_tag)
+            ch.stop_consuming()
+
+        print("[RECEPTOR] Esperando el anuncio de una corrida...")
+        canal.basic_consume(queue=cola_configuracion, on_message_callback=recibir_configuracion, auto_ack=True)
+        canal.start_consuming()
+        print(f"[RECEPTOR] Siguiendo la corrida {self.corrida}.")
+
+    def reproducir(self, directorio: str) -> None:
+        """
+        Incorpora todas las filas de una corrida archivada, por bloques leídos con `np.memmap`, a los
+        estadísticos, al histograma y a la serie acotada, sin cargar la corrida completa en memoria.
+        Las corridas archivadas no guardan el barrido de parámetros.
+        """
+        lector: LectorArchivo = LectorArchivo(directorio)
+        print(f"[RECEPTOR] Reproduciendo {lector.filas} escenarios de {directorio}.")
+        self.nombres_salidas = lector.salidas
+        secundarias: List[str] = (lector.salidas or [])[1:]
+        for columnas, antiteticas, media_control in lector.bloques(["resultado", "control", *secundarias]):
+            valores: np.ndarray = columnas["resultado"]
+            control: Any = columnas.get("control") if media_control is not None else None
+            # Solo se actualizan los estadísticos: las filas se leen del memmap y no se copian a memoria
+            with self.bloqueo:
+                self.estadisticas.agregar(
+                    valores,
+                    control=control,
+                    media_control=media_control if control is not None else None,
+                    antiteticas=antiteticas
+                )
+                self.agregar_salidas(columnas, secundarias, antiteticas)
+                self.convergencia.agregar(self.estadisticas.n, self.estadisticas.estimacion())
+            self.metrica_escenarios.incrementar(valores.size)
+
+    def guardar_punto_control(self) -> None:
+        """
+        Escribe los estadísticos y los rangos completados en el punto de control, si está activado.
+        """
+        if self.ruta_punto_control is None:
+            return
+        with self.bloqueo:
+            datos: Dict[str, Any] = {
+                "estadisticas": self.estadisticas.a_dict(),
+                "mensajes": self.mensajes,
+                "rangos": self.seguimiento.a_dict(),
+                "salidas": {nombre: estadisticas.a_dict() for nombre, estadisticas in self.salidas.items()},
+                "nombres_salidas": self.nombres_salidas,
+                "barrido": self.barrido.a_dict() if self.barrido is not None else None,
+            }
+        guardar_json(self.ruta_punto_control, datos)
+
+    def recibir(self, ch: Any, method: Any, properties: Any, body: bytes) -> None:
+        """
+        Incorpora un mensaje (resultado, bloque de resultados o agregado parcial). Con reducción de
+        varianza (cabeceras "antiteticas" y "media_control" y columna "control"), la media reportada es
+        la del estimador correspondiente. Los mensajes cuyos rangos ya estaban completos (reentregas o
+        republicaciones al reanudar) se descartan.
+        """
+        if method is not None and self.ruta_punto_control is not None:
+            self._ultimo_tag = method.delivery_tag
+        cabeceras: Dict[str, Any] = (properties.headers if properties is not None else None) or {}
+        rangos: Any = cabeceras.get("rangos")
+        if rangos:
+            with self.bloqueo:
+                if self.seguimiento.duplicado(rangos):
+                    self.descartados += 1
+                    return
+                self.seguimiento.registrar(rangos)
+
+        if cabeceras.get("salidas"):
+            self.nombres_salidas = cabeceras["salidas"]
+        if cabeceras.get("barrido"):
+            self.agregar_barrido(EstadisticasBarrido.desde_dict(cabeceras["barrido"]))
+        if properties is not None and properties.content_type == TIPO_CONTENIDO_AGREGADO:
+            parcial, secundarias = decodificar_agregado(body)
+            with self.bloqueo:
+                self.estadisticas.combinar(parcial)
+                for nombre, secundaria in secundarias.items():
+                    self.salidas.setdefault(nombre, Estadisticas(max_bins=self.max_bins)).combinar(secundaria)
+                self.convergencia.agregar(self.estadisticas.n, self.estadisticas.estimacion())
+                self.mensajes += 1
+            self.metrica_mensajes.incrementar()
+            self.metrica_escenarios.incrementar(parcial.n)
+            return
+
+        if es_bloque(body):
+            mensaje: Dict[str, Any] = decodificar_bloque(body)
+        else:
+            mensaje = json.loads(body.decode("utf-8"))
+        valores: Any = mensaje.get("resultado")
+        media_control: Any = cabeceras.get("media_control")
+        control: Any = mensaje.get("control") if media_control is not None else None
+        with self.bloqueo:
+            self.estadisticas.agregar(
+                valores,
+                control=control,
+                media_control=media_control if control is not None else None,
+                antiteticas=bool(cabeceras.get("antiteticas"))
+            )
+            self.agregar_salidas(mensaje, (cabeceras.get("salidas") or [])[1:], bool(cabeceras.get("antiteticas")))
+            self.convergencia.agregar(self.estadisticas.n, self.estadisticas.estimacion())
+            self.mensajes += 1
+        self.metrica_mensajes.incrementar()
+        self.metrica_escenarios.incrementar(np.size(valores))
+
+    def agregar_salidas(self, columnas: Dict[str, Any], nombres: List[str], antiteticas: bool) -> None:
+        """
+        Incorpora los valores de las salidas secundarias (debe llamarse con el bloqueo tomado), cada una
+        con sus propios estadísticos; la serie y el histograma siguen a la salida principal.
+        """
+        for nombre in nombres:
+            if nombre in columnas:
+                self.salidas.setdefault(nombre, Estadisticas(max_bins=self.max_bins)).agregar(
+                    columnas[nombre], antiteticas=antiteticas
+                )
+
+    def agregar_barrido(self, parcial: EstadisticasBarrido) -> None:
+        """
+        Fusiona los estimadores por punto del barrido de un mensaje.
+        """
+        with self.bloqueo:
+            if self.barrido is None:
+                self.barrido = parcial
+            else:
+                self.barrido.combinar(parcial)
+
+    def resumen_salidas(self) -> List[Dict[str, Any]]:
+        """
+        Estadísticos de cada salida, empezando por la principal; vacío si la corrida tiene una sola
+        (debe llamarse con el bloqueo tomado).
+        """
+        if not self.salidas:
+            return []
+        nombres: List[str] = self.nombres_salidas or ["resultado", *self.salidas]
+        filas: List[Dict[str, Any]] = []
+        for indice, nombre in enumerate(nombres):
+            estadisticas: Estadisticas | None = self.estadisticas if indice == 0 else self.salidas.get(nombre)
+            if estadisticas is None or not estadisticas.n:
+                continue
+            filas.append({
+                "nombre": nombre,
+                "n": estadisticas.n,
+                "media": estadisticas.estimacion(),
+                "error_estandar": estadisticas.error_estandar(),
+                "desviacion": estadisticas.desviacion(),
+                "minimo": estadisticas.minimo,
+                "maximo": estadisticas.maximo,
+            })
+        return filas
+
+    def instantanea(self) -> Dict[str, Any]:
+        """
+        Devuelve una copia consistente de los estadísticos actuales, con el histograma como
+        bordes y conteos y la serie de la media acumulada ya acotada.
+        """
+        with self.bloqueo:
+            bordes, conteos = self.estadisticas.histograma.densos()
+            escenarios, medias = self.convergencia.datos()
+            return {
+                "n": self.estadisticas.n,
+                "media": self.estadisticas.estimacion(),
+                "error_estandar": self.estadisticas.error_estandar(),
+                "varianza": self.estadisticas.varianza(),
+                "desviacion": self.estadisticas.desviacion(),
+                "bordes": bordes,
+                "conteos": conteos,
+                "escenarios": escenarios,
+                "medias": medias,
+                "salidas": self.resumen_salidas(),
+                "barrido": self.barrido.resumen() if self.barrido is not None else [],
+            }
@@ -0,0 +1,96 @@
+'''
+___________________________________________________________________________
+Módulo: Submuestreo.py
+Descripción: Series de tamaño acotado para las gráficas del Visualizador. La serie de
+la media acumulada se reduce con Largest-Triangle-Three-Buckets (LTTB), que conserva
+la forma visual de la curva con un número fijo de puntos, de modo que el tamaño de
+los datos enviados al navegador no depende de la cantidad de resultados.
+____________________________________________________________________________
+'''
+from typing import Tuple
+import numpy as np
+
+def lttb(x: np.ndarray, y: np.ndarray, umbral: int) -> np.ndarray:
+    """
+    Selecciona `umbral` puntos representativos de una serie con el algoritmo LTTB.
+    Parámetros:
+        x (np.ndarray): Abscisas en orden creciente.
+        y (np.ndarray): Ordenadas.
+        umbral (int): Cantidad de puntos a conservar (al menos 3).
+    Retorna:
+        np.ndarray: Índices de los puntos seleccionados, incluidos el primero y el último.
+    """
+    n: int = len(x)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+
+    # Cubetas para los puntos intermedios; el primero y el último se conservan siempre
+    limites: np.ndarray = np.linspace(1, n - 1, umbral - 1).astype(np.int64)
+    indices: np.ndarray = np.empty(umbral, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    anterior: int = 0
+    for i in range(umbral - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        # Promedio de la cubeta siguiente (o el último punto para la última cubeta)
+        siguiente_fin: int = limites[i + 2] if i + 2 < len(limites) else n
+        siguiente_inicio: int = fin if i + 2 < len(limites) else n - 1
+        x_promedio: float = x[siguiente_inicio:siguiente_fin].mean()
+        y_promedio: float = y[siguiente_inicio:siguiente_fin].mean()
+
+        areas: np.ndarray = np.abs(
+            (x[anterior] - x_promedio) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (y_promedio - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[i + 1] = anterior
+    return indices
+
+class SerieAcotada:
+    """
+    Serie (x, y) que nunca supera `max_puntos`. Solo guarda puntos separados al menos `paso`
+    en x; al llenarse se compacta con LTTB a la mitad de su capacidad y `paso` se ajusta para
+    que los puntos nuevos mantengan la misma densidad que los antiguos. El último punto recibido
+    se conserva siempre para que la curva llegue al valor actual.
+    """
+    def __init__(self, max_puntos: int = 500) -> None:
+        """
+        Parámetros:
+            max_puntos (int): Cantidad máxima de puntos almacenados (al menos 6, para que la
+                compactación a la mitad conserve los 3 puntos que necesita LTTB).
+        """
+        if max_puntos < 6:
+            raise ValueError("La serie acotada necesita al menos 6 puntos.")
+        self.max_puntos: int = max_puntos
+        self._x: np.ndarray = np.empty(max_puntos, dtype=np.float64)
+        self._y: np.ndarray = np.empty(max_puntos, dtype=np.float64)
+        self.n: int = 0
+        self.paso: float = 0.0
+        self._ultimo: Tuple[float, float] | None = None
+
+    def agregar(self, x: float, y: float) -> None:
+        """
+        Agrega un punto al final de la serie, compactándola si está llena.
+        """
+        if self.n and x - self._x[self.n - 1] < self.paso:
+            self._ultimo = (x, y)
+            return
+        if self.n == self.max_puntos:
+            seleccion: np.ndarray = lttb(self._x, self._y, self.max_puntos // 2)
+            self.n = len(seleccion)
+            self._x[:self.n] = self._x[seleccion]
+            self._y[:self.n] = self._y[seleccion]
+            self.paso = (self._x[self.n - 1] - self._x[0]) / self.n
+        self._x[self.n] = x
+        self._y[self.n] = y
+        self.n += 1
+        self._ultimo = None
+
+    def datos(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve una copia de los puntos almacenados, incluido el último punto recibido.
+        """
+        x, y = self._x[:self.n].copy(), self._y[:self.n].copy()
+        if self._ultimo is not None:
+            x = np.append(x, self._ultimo[0])
+            y = np.append(y, self._ultimo[1])
+        return x, y
@@ -3,18 +3,26 @@ ___________________________________________________________________________
 Módulo: Visualizador.py
 Descripción: Módulo encargado de la visualización de resultados de una simulación
 Monte Carlo distribuida.
-Recibe resultados a través de RabbitMQ y muestra en tiempo real la media acumulada
+Recibe resultados a través de RabbitMQ (individuales en JSON, en bloques binarios
+columnares o como agregados parciales de los consumidores) mediante un hilo receptor
+en segundo plano (ver Receptor.py) y muestra en tiempo real la media acumulada
 de los escenarios simulados usando una interfaz web interactiva basada en Dash y Plotly.
+Opcionalmente expone las métricas del receptor y el tiempo de cada actualización en formato Prometheus,
+y registra trazas de la actualización (instantánea y construcción de figuras) o perfila el proceso (ver Comun/Trazas.py).
+Si el modelo define varias salidas, muestra además una tabla con los estadísticos de cada una.
+Si define un barrido de parámetros, otra tabla muestra la estimación de cada punto y su diferencia con la
+configuración base, estimada sobre los mismos escenarios.
 ____________________________________________________________________________
 '''
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+import time
 import dash
 from dash import dcc, html, no_update
 from dash.dependencies import Output, Input
 import plotly.graph_objs as go
-import numpy as np
-import pika
-import json
+from Receptor import Receptor
+from Metricas import iniciar_servidor
+from Trazas import Trazador, crear_trazador
 
 # Hoja de estilo externa para fuentes
 hojas_de_estilo_externas: List[str] = ['https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;700&display=swap']
@@ -25,16 +33,35 @@ class Visualizador:
     Se encarga de crear la interfaz web, conectarse a RabbitMQ para recibir resultados,
     y actualizar en tiempo real la gráfica de la media acumulada.
     """
-    def __init__(self, host: str = "localhost", cola: str = "Resultados") -> None:
+    def __init__(self, host: str = "localhost", cola: str = "Resultados",
+                 max_bins: int = 64, max_puntos: int = 500, transporte: Any = None,
+                 puerto_metricas: Optional[int] = None, trazas: Optional[Dict[str, Any]] = None,
+                 corrida: Optional[str] = None, ruta_puntos_control: Optional[str] = None,
+                 intervalo_punto_control: float = 5.0, archivo: Optional[str] = None,
+                 nom_exchange: Optional[str] = None) -> None:
         """
         Inicializa la aplicación Dash, configura el layout, conecta a RabbitMQ y
         registra los callbacks para la actualización automática del gráfico.
         Parámetros:
             host (str): Dirección del servidor RabbitMQ.
             cola (str): Nombre de la cola de mensajes.
+            max_bins (int): Cantidad máxima de bins del histograma.
+            max_puntos (int): Cantidad máxima de puntos de la gráfica de media acumulada.
+            transporte (TransporteRabbitMQ | TransporteLocal | None): Transporte de los resultados;
+                None usa RabbitMQ en `host`.
+            puerto_metricas (int | None): Puerto HTTP de las métricas; None no las expone.
+            trazas (dict | None): Configuración de las trazas y del perfil (ver Comun/Trazas.py).
+            corrida (str | None): Identificador de la corrida que se muestra (y que se reanuda desde los
+                puntos de control); None sigue la próxima corrida anunciada en `nom_exchange`.
+            ruta_puntos_control (str | None): Directorio de los puntos de control del Receptor; None los desactiva.
+            intervalo_punto_control (float): Segundos entre puntos de control.
+            archivo (str | None): Directorio de una corrida archivada (ver Comun/Archivo.py) que se
+                reproduce en lugar de recibir resultados.
+            nom_exchange (str | None): Exchange de configuración donde se anuncian las corridas.
+        Ambos límites acotan el tamaño de los datos enviados al navegador en cada actualización.
         """
-        # Lista para almacenar los resultados recibidos
-        self.resultados: List[float] = []
+        # Cantidad de resultados mostrados en la última actualización
+        self.ultimo_n: int = 0
 
         # Inicializa la aplicación Dash con la hoja de estilo externa
         self.aplicacion: dash.Dash = dash.Dash(__name__, external_stylesheets=hojas_de_estilo_externas)
@@ -55,6 +82,10 @@ class Visualizador:
                             html.P("Media:"),
                             html.P(id="valor-media", children="--")
                         ], className="estadistico"),
+                        html.Div([
+                            html.P("Error Estándar:"),
+                            html.P(id="valor-error", children="--")
+                        ], className="estadistico"),
                         html.Div([
                             html.P("Varianza:"),
                             html.P(id="valor-varianza", children="--")
@@ -67,7 +98,11 @@ class Visualizador:
                             html.P("Simulaciones:"),
                             html.P(id="valor-simulaciones", children="0")
                         ], className="estadistico"),
-                    ], className="panel-estadisticos-contenido")
+                    ], className="panel-estadisticos-contenido"),
+                    # Estadísticos de cada salida cuando el modelo define varias
+                    html.Div(id="tabla-salidas"),
+                    # Estimación de cada punto cuando el modelo define un barrido de parámetros
+                    html.Div(id="tabla-barrido")
                 ], className="panel-estadisticos")
             ], className="contenedor-estadisticos"),
             
@@ -118,8 +153,9 @@ class Visualizador:
                         config={"displayModeBar": False},
                         figure={
                             "data": [
-                                go.Histogram(
+                                go.Bar(
                                     x=[],
+                                    y=[],
                                     marker_color='#f9c846',
                                     opacity=0.7,
                                     name="Distribución"
@@ -156,15 +192,19 @@ class Visualizador:
             ], className="pie-de-pagina")
         ], className="contenedor-principal")
         
-        # Conexión a RabbitMQ para recibir los resultados de la simulación
-        self.rabbit_connection: pika.BlockingConnection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=host, credentials=pika.PlainCredentials('guest', 'guest'))
+        # Hilo que vacía la cola de resultados de RabbitMQ en segundo plano
+        self.receptor: Receptor = Receptor(
+            host=host, cola=cola, max_bins=max_bins, max_puntos=max_puntos, transporte=transporte,
+            corrida=corrida, ruta_puntos_control=ruta_puntos_control, intervalo_punto_control=intervalo_punto_control,
+            archivo=archivo, nom_exchange=nom_exchange
         )
-        self.rabbit_channel = self.rabbit_connection.channel()
-        self.rabbit_channel.queue_declare(queue=cola)
+        self.receptor.start()
 
-        # Limpia la cola de resultados al iniciar la aplicación
-        self.rabbit_channel.queue_purge(queue=cola)
+        # Métricas del receptor más el tiempo de actualización de la interfaz
+        self.metrica_actualizacion = self.receptor.metricas.histograma(
+            "montecarlo_visualizador_actualizacion_segundos", "Tiempo de cada actualización de los gráficos.")
+        self.servidor_metricas = iniciar_servidor(self.receptor.metricas, puerto_metricas)
+        self.trazador: Trazador = crear_trazador("visualizador", trazas)
 
         # Almacena el nombre de la cola para su uso en el callback
         self.cola: str = cola
@@ -240,6 +280,22 @@ class Visualizador:
                 color: #f9c846;
                 margin-top: 0;
             }
+            .tabla-salidas {
+                width: 100%;
+                margin-top: 15px;
+                border-collapse: collapse;
+                text-align: center;
+            }
+            .tabla-salidas th {
+                color: #a7a7a7;
+                font-weight: normal;
+                padding: 5px;
+            }
+            .tabla-salidas td {
+                color: #f9c846;
+                padding: 5px;
+                border-top: 1px solid rgba(211,211,211,0.2);
+            }
             .contenedor-graficos {
                 display: flex;
                 flex-wrap: wrap;
@@ -282,59 +338,70 @@ class Visualizador:
     def registrar_callbacks(self) -> None:
         """
         Registra los callbacks que actualizan los gráficos y estadísticos en tiempo real
-        cada vez que se recibe un nuevo resultado desde RabbitMQ.
+        con los resultados que el receptor ha recibido desde RabbitMQ.
         """
         @self.aplicacion.callback(
-            [Output("grafico-en-vivo", "extendData"),
+            [Output("grafico-en-vivo", "figure"),
              Output("histograma", "figure"),
              Output("valor-media", "children"),
+             Output("valor-error", "children"),
              Output("valor-varianza", "children"),
              Output("valor-desviacion", "children"),
-             Output("valor-simulaciones", "children")],
+             Output("valor-simulaciones", "children"),
+             Output("tabla-salidas", "children"),
+             Output("tabla-barrido", "children")],
             Input("componente-intervalo", "n_intervals")
         )
         def actualizar_visualizador(n: int) -> Union[
             Any,
-            Tuple[Dict[str, List[List[Union[int, float]]]], Dict[str, Any], str, str, str, str]
+            Tuple[Dict[str, Any], Dict[str, Any], str, str, str, str, str, Any, Any]
         ]:
             """
             Callback ejecutado periódicamente por el componente Interval.
-            Obtiene un nuevo resultado de la cola RabbitMQ, actualiza la lista de resultados,
-            calcula la media acumulada, estadísticos y actualiza el histograma.
+            Lee una instantánea de los estadísticos que mantiene el hilo receptor (todos los
+            resultados recibidos hasta el momento) y redibuja la media acumulada, los estadísticos
+            y el histograma. La media y su error estándar son los del estimador usado por la corrida
+            (simple, con variables antitéticas o con variable de control). La serie de la media acumulada está submuestreada y el histograma se
+            envía como bordes y conteos, por lo que ni el costo ni el tamaño de los datos enviados
+            dependen de cuántos resultados se hayan recibido. Si la corrida tiene varias salidas, una
+            tabla muestra los estadísticos de cada una (las gráficas siguen a la principal), y si tiene
+            un barrido de parámetros, otra muestra cada punto y su diferencia con la configuración base.
             """
-            method, header, body = self.rabbit_channel.basic_get(
-                queue=self.cola, auto_ack=True
-            )
-            if not method:
-                return no_update, no_update, no_update, no_update, no_update, no_update
-
-            mensaje: Dict[str, Any] = json.loads(body.decode("utf-8"))
-            resultado: float = mensaje.get("resultado")
-            self.resultados.append(resultado)
+            inicio: float = time.perf_counter()
+            instantanea: Dict[str, Any] = self.receptor.instantanea()
+            if instantanea["n"] == self.ultimo_n:
+                return no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
+            self.ultimo_n = instantanea["n"]
+            leida: float = time.perf_counter()
+            self.trazador.registrar("instantanea", inicio, leida)
 
-            id_escenario: int = len(self.resultados)
-            media_acumulada: float = np.mean(self.resultados)
+            id_escenario: int = instantanea["n"]
+            media_acumulada: float = instantanea["media"]
             
             # Calcular estadísticos
             media: float = media_acumulada
-            varianza: float = np.var(self.resultados) if len(self.resultados) > 1 else 0
-            desviacion: float = np.std(self.resultados) if len(self.resultados) > 1 else 0
+            error_estandar: float = instantanea["error_estandar"]
+            varianza: float = instantanea["varianza"]
+            desviacion: float = instantanea["desviacion"]
             
             # Formatear estadísticos como cadenas con formato a 3 decimales
             media_str: str = f"{media:.3f}"
+            error_str: str = f"{error_estandar:.3f}" if error_estandar != float("inf") else "--"
             varianza_str: str = f"{varianza:.3f}"
             desviacion_str: str = f"{desviacion:.3f}"
             simulaciones_str: str = str(id_escenario)
             
-            # Crear histograma actualizado
+            # Crear histograma actualizado a partir de los bins combinados
+            bordes, conteos = instantanea["bordes"], instantanea["conteos"]
             histograma_figura = {
                 "data": [
-                    go.Histogram(
-                        x=self.resultados,
+                    go.Bar(
+                        x=((bordes[:-1] + bordes[1:]) / 2).tolist(),
+                        y=conteos.tolist(),
+                        width=float(bordes[1] - bordes[0]) if len(bordes) > 1 else None,
                         marker_color='#f9c846',
                         opacity=0.7,
-                        name="Distribución",
-                        nbinsx=30
+                        name="Distribución"
                     )
                 ],
                 "layout": go.Layout(
@@ -358,20 +425,107 @@ class Visualizador:
                 )
             }
             
-            # Devuelve los datos para actualizar la gráfica de la media acumulada
+            # Gráfica de la media acumulada con la serie submuestreada
+            convergencia_figura = {
+                "data": [
+                    go.Scatter(
+                        x=instantanea["escenarios"].tolist(),
+                        y=instantanea["medias"].tolist(),
+                        mode="lines+markers",
+                        name="Media Acumulada"
+                    )
+                ],
+                "layout": go.Layout(
+                    title="Media Acumulada",
+                    xaxis=dict(
+                        title="Escenario",
+                        gridcolor='rgba(211,211,211,0.2)',
+                        linecolor='rgba(211,211,211,0.5)'
+                    ),
+                    yaxis=dict(
+                        title="Media obtenida",
+                        gridcolor='rgba(211,211,211,0.2)',
+                        linecolor='rgba(211,211,211,0.5)'
+                    ),
+                    template="plotly_dark",
+                    plot_bgcolor='rgba(33, 33, 33, 0.8)',
+                    paper_bgcolor='rgba(33, 33, 33, 0.8)',
+                    hovermode='closest',
+                    margin=dict(l=40, r=40, t=40, b=40),
+                    uirevision='constant'
+                )
+            }
+
+            fin: float = time.perf_counter()
+            self.trazador.registrar("figuras", leida, fin)
+            self.metrica_actualizacion.observar(fin - inicio)
             return (
-                {"x": [[id_escenario]], "y": [[media_acumulada]]},
+                convergencia_figura,
                 histograma_figura,
                 media_str,
+                error_str,
                 varianza_str,
                 desviacion_str,
-                simulaciones_str
+                simulaciones_str,
+                self.tabla_salidas(instantanea["salidas"]),
+                self.tabla_barrido(instantanea["barrido"])
             )
 
+    def tabla_salidas(self, salidas: List[Dict[str, Any]]) -> Any:
+        """
+        Construye la tabla con los estadísticos de cada salida.
+        Parámetros:
+            salidas (list): Filas de `Receptor.resumen_salidas`; vacía si la corrida tiene una sola salida.
+        """
+        if not salidas:
+            return []
+        encabezados: List[str] = ["Salida", "Media", "Error Estándar", "Desviación Estándar", "Mínimo", "Máximo"]
+        filas: List[Any] = [
+            html.Tr([
+                html.Td(salida["nombre"]),
+                html.Td(f"{salida['media']:.3f}"),
+                html.Td(f"{salida['error_estandar']:.3f}" if salida["error_estandar"] != float("inf") else "--"),
+                html.Td(f"{salida['desviacion']:.3f}"),
+                html.Td(f"{salida['minimo']:.3f}"),
+                html.Td(f"{salida['maximo']:.3f}"),
+            ])
+            for salida in salidas
+        ]
+        return html.Table(
+            [html.Thead(html.Tr([html.Th(encabezado) for encabezado in encabezados])), html.Tbody(filas)],
+            className="tabla-salidas"
+        )
+
+    def tabla_barrido(self, barrido: List[Dict[str, Any]]) -> Any:
+        """
+        Construye la tabla con la estimación de cada punto del barrido de parámetros.
+        Parámetros:
+            barrido (list): Filas de `EstadisticasBarrido.resumen`; vacía si la corrida no define barrido.
+        """
+        if not barrido:
+            return []
+        formato = lambda valor: f"{valor:.3f}" if valor != float("inf") else "--"
+        encabezados: List[str] = ["Punto", "Media", "Error Estándar", "Diferencia", "Error de la Diferencia"]
+        filas: List[Any] = [
+            html.Tr([
+                html.Td(", ".join(f"{nombre}={valor:g}" for nombre, valor in punto["punto"].items())),
+                html.Td(formato(punto["media"])),
+                html.Td(formato(punto["error_estandar"])),
+                html.Td(formato(punto["diferencia"])),
+                html.Td(formato(punto["error_diferencia"])),
+            ])
+            for punto in barrido
+        ]
+        return html.Table(
+            [html.Thead(html.Tr([html.Th(encabezado) for encabezado in encabezados])), html.Tbody(filas)],
+            className="tabla-salidas"
+        )
+
     def iniciar(self, debug: bool = False) -> None:
         """
         Inicia el servidor web de la aplicación Dash.
         Parámetros:
             debug (bool): Si es True, activa el modo debug de Dash.
         """
-        self.aplicacion.run(debug=debug)
\ No newline at end of file
+        with self.trazador.perfilar():
+            self.aplicacion.run(debug=debug)
\ No newline at end of file
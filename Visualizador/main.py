@@ -7,18 +7,38 @@ y el modo debug, de forma similar al enfoque usado en el Consumidor.
 ____________________________________________________________________________
 '''
 from Visualizador import Visualizador
+from Transporte import crear_transporte
 
 # Parámetros configurables para el Visualizador
 IP: str = 'localhost'
 COLA: str = 'Resultados'
+EXCHANGE: str = 'Cofiguracion'  # Exchange donde el productor anuncia cada corrida
 DEBUG: bool = False         
+MAX_BINS: int = 64          # Bins máximos del histograma (el ancho se adapta al rango de los datos)
+MAX_PUNTOS: int = 500       # Puntos máximos de la gráfica de media acumulada (submuestreo LTTB)
+# Servidor de RabbitMQ; las credenciales se toman de RABBITMQ_USUARIO y RABBITMQ_CONTRASENA (guest por defecto)
+TRANSPORTE: dict = {'backend': 'rabbitmq', 'host': IP, 'puerto': 5672, 'vhost': '/'}
+PUERTO_METRICAS: int | None = None  # Puerto de /metrics en formato Prometheus (None = desactivado)
+# Trazas por etapa y perfil (None = desactivadas), p. ej. {'activo': True, 'muestreo': 0.01, 'ruta': './trazas',
+# 'perfil': 'muestreo', 'segundos_perfil': 10}. Con trazas configuradas, SIGUSR1 las activa o desactiva (y exporta)
+# y SIGUSR2 muestrea las pilas del proceso durante 'segundos_perfil'
+TRAZAS: dict | None = None
+CORRIDA: str | None = None      # Corrida que se muestra (la del productor); None sigue la próxima que se anuncie
+RUTA_PUNTOS_CONTROL: str | None = None  # Directorio de los puntos de control (None = desactivados)
+INTERVALO_PUNTO_CONTROL: float = 5.0    # Segundos entre puntos de control
+ARCHIVO: str | None = None      # Directorio de una corrida archivada (<RUTA_ARCHIVO>/<corrida>) que se reproduce
 
 def main() -> None:
     """
     Función principal que inicializa el visualizador con los parámetros configurados
     y arranca el servidor web para la visualización de la simulación.
     """
-    visualizador = Visualizador(host=IP, cola=COLA)
+    visualizador = Visualizador(
+        host=IP, cola=COLA, max_bins=MAX_BINS, max_puntos=MAX_PUNTOS, transporte=crear_transporte(TRANSPORTE),
+        puerto_metricas=PUERTO_METRICAS, trazas=TRAZAS, corrida=CORRIDA,
+        ruta_puntos_control=RUTA_PUNTOS_CONTROL, intervalo_punto_control=INTERVALO_PUNTO_CONTROL,
+        archivo=ARCHIVO, nom_exchange=EXCHANGE
+    )
     visualizador.iniciar(debug=DEBUG)
 
 if __name__ == "__main__":
@@ -0,0 +1,13 @@
+"""
+_____________________________________________________________________________________
+Módulo: conftest.py
+Descripción: Configuración de pytest. Agrega al path los directorios de los componentes,
+igual que hacen sus propios scripts con `sys.path.append`, para importar sus módulos.
+_____________________________________________________________________________________
+"""
+import os
+import sys
+
+RAIZ: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for componente in ("Comun", "Consumidor", "Productor", "Visualizador", "Benchmark"):
+    sys.path.append(os.path.join(RAIZ, componente))
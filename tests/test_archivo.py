@@ -0,0 +1,125 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_archivo.py
+Descripción: Pruebas de Comun/Archivo.py: escritura por trozos, recuperación tras una
+escritura interrumpida y reproducción de una corrida archivada con `np.memmap`.
+_____________________________________________________________________________________
+"""
+import os
+
+import numpy as np
+
+from Archivo import ARCHIVO_INDICE, EXTENSION_COLUMNA, EscritorArchivo, LectorArchivo, ruta_corrida
+from Estadisticas import Estadisticas
+from Receptor import Receptor
+
+def escribir(ruta, filas, filas_trozo, segmento=700, antiteticas=False, **metadatos):
+    """
+    Escribe `filas` filas en segmentos de `segmento` y devuelve el escritor y las columnas escritas.
+    """
+    rng = np.random.default_rng(filas)
+    columnas = {"x": rng.normal(size=filas), "resultado": rng.normal(10.0, 2.0, size=filas)}
+    escritor = EscritorArchivo(ruta, "c1", filas_trozo=filas_trozo, metadatos=metadatos)
+    for inicio in range(0, filas, segmento):
+        escritor.agregar({nombre: valores[inicio:inicio + segmento] for nombre, valores in columnas.items()},
+                         antiteticas=antiteticas)
+    return escritor, columnas
+
+def leer(directorio, columnas=None, filas_bloque=512):
+    lector = LectorArchivo(directorio)
+    bloques = list(lector.bloques(columnas, filas_bloque=filas_bloque))
+    nombres = columnas or lector.columnas
+    return {nombre: np.concatenate([np.asarray(bloque[nombre]) for bloque, _, _ in bloques]) for nombre in nombres}, bloques
+
+def test_ida_y_vuelta_por_trozos(tmp_path):
+    escritor, columnas = escribir(str(tmp_path), 5000, filas_trozo=1024)
+    escritor.cerrar()
+    assert escritor.trozos[0] == [0, 1024, False]
+    assert sum(filas for _, filas, _ in escritor.trozos) == 5000
+    leidas, bloques = leer(ruta_corrida(str(tmp_path), "c1"))
+    assert all(bloque["x"].size <= 512 for bloque, _, _ in bloques)
+    for nombre, valores in columnas.items():
+        np.testing.assert_array_equal(leidas[nombre], valores)
+
+def test_columnas_faltantes_se_rellenan_y_nuevas_se_ignoran(tmp_path):
+    escritor = EscritorArchivo(str(tmp_path), "c1", filas_trozo=8)
+    escritor.agregar({"resultado": np.arange(4.0), "control": np.ones(4)})
+    escritor.agregar({"resultado": np.arange(4.0, 6.0), "otra": np.zeros(2)})
+    escritor.agregar({"resultado": 7.0, "control": 2.0})
+    escritor.cerrar()
+    leidas, _ = leer(ruta_corrida(str(tmp_path), "c1"))
+    assert list(leidas) == ["resultado", "control"]
+    np.testing.assert_array_equal(leidas["resultado"], [0, 1, 2, 3, 4, 5, 7])
+    np.testing.assert_array_equal(leidas["control"], [1, 1, 1, 1, np.nan, np.nan, 2])
+
+def test_pares_antiteticos_por_trozo(tmp_path):
+    escritor = EscritorArchivo(str(tmp_path), "c1", filas_trozo=8)
+    escritor.agregar({"resultado": np.arange(8.0)}, antiteticas=True)
+    escritor.agregar({"resultado": np.arange(3.0)}, antiteticas=True)
+    escritor.cerrar()
+    assert [pares for _, _, pares in escritor.trozos] == [True, False]
+
+def test_segmento_independiente_no_marca_pares_en_trozos_siguientes(tmp_path):
+    escritor = EscritorArchivo(str(tmp_path), "c1", filas_trozo=8)
+    escritor.agregar({"resultado": np.arange(20.0)})
+    escritor.agregar({"resultado": np.arange(4.0)}, antiteticas=True)
+    escritor.cerrar()
+    assert [pares for _, _, pares in escritor.trozos] == [False, False, False]
+
+def test_escritura_interrumpida_se_trunca_al_indice(tmp_path):
+    escritor, columnas = escribir(str(tmp_path), 3000, filas_trozo=1024)
+    # Simula una caída: el último trozo se escribe a medias y el índice no se actualiza
+    for nombre in escritor.columnas:
+        salida = escritor._salidas[nombre]
+        salida.write(memoryview(escritor._buffers[nombre][:100]))
+        salida.write(b"\x01\x02\x03")
+        salida.flush()
+    assert escritor.filas == 2048
+    lector = LectorArchivo(ruta_corrida(str(tmp_path), "c1"))
+    assert lector.filas == 2048
+    assert os.path.getsize(os.path.join(escritor.directorio, "x" + EXTENSION_COLUMNA)) > 2048 * 8
+    leidas, _ = leer(lector.directorio)
+    for nombre, valores in columnas.items():
+        np.testing.assert_array_equal(leidas[nombre], valores[:2048])
+
+def test_partes_sin_indice_se_ignoran(tmp_path):
+    escritor, columnas = escribir(str(tmp_path), 1500, filas_trozo=512)
+    escritor.cerrar()
+    # Parte de otro proceso que cayó antes de escribir su primer trozo
+    huerfano = EscritorArchivo(str(tmp_path), "c1", filas_trozo=512)
+    huerfano.agregar({"x": np.zeros(10), "resultado": np.zeros(10)})
+    assert not os.path.exists(os.path.join(huerfano.directorio, ARCHIVO_INDICE))
+    leidas, _ = leer(ruta_corrida(str(tmp_path), "c1"))
+    np.testing.assert_array_equal(leidas["resultado"], columnas["resultado"])
+
+def test_reproduccion_coincide_con_numpy(tmp_path):
+    rng = np.random.default_rng(3)
+    valores = np.empty(0)
+    for _ in range(2):
+        parte = rng.gamma(2.0, 3.0, size=2500)
+        escritor = EscritorArchivo(str(tmp_path), "c1", filas_trozo=1000)
+        escritor.agregar({"resultado": parte})
+        escritor.cerrar()
+        valores = np.concatenate([valores, parte])
+    directorio = ruta_corrida(str(tmp_path), "c1")
+    receptor = Receptor("localhost", "R", archivo=directorio)
+    receptor.reproducir(directorio)
+    assert receptor.estadisticas.n == valores.size
+    assert np.isclose(receptor.estadisticas.estimacion(), valores.mean())
+    assert np.isclose(receptor.estadisticas.varianza(), valores.var())
+    assert receptor.convergencia.datos()[0][-1] == valores.size
+
+def test_reproduccion_con_variable_de_control(tmp_path):
+    rng = np.random.default_rng(5)
+    control = rng.normal(1.0, 1.0, size=4000)
+    resultado = 3.0 * control + rng.normal(size=4000)
+    escritor = EscritorArchivo(str(tmp_path), "c1", filas_trozo=1000, metadatos={"media_control": 1.0})
+    escritor.agregar({"resultado": resultado, "control": control})
+    escritor.cerrar()
+    esperado = Estadisticas()
+    esperado.agregar(resultado, control=control, media_control=1.0)
+    directorio = ruta_corrida(str(tmp_path), "c1")
+    receptor = Receptor("localhost", "R", archivo=directorio)
+    receptor.reproducir(directorio)
+    assert np.isclose(receptor.estadisticas.estimacion(), esperado.estimacion())
+    assert np.isclose(receptor.estadisticas.error_estandar(), esperado.error_estandar())
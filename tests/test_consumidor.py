@@ -0,0 +1,151 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_consumidor.py
+Descripción: Pruebas del Consumidor con varias corridas que comparten la cola de escenarios,
+sobre el broker en memoria de los benchmarks (Benchmark/BrokerMemoria.py): cambio de corrida
+sin recompilar, expulsión de la corrida menos usada, corridas detenidas y mensajes de
+corridas cuya configuración aún no se conoce.
+_____________________________________________________________________________________
+"""
+import sys
+import json
+
+import numpy as np
+import pika
+import pytest
+
+from BrokerMemoria import BrokerMemoria
+from Consumidor import Consumidor
+from Mensajes import CONTROL_DETENER, codificar_bloque, codificar_control, decodificar_bloque
+
+COEFICIENTES: dict = {"A": 2.0, "B": 3.0, "C": 5.0}
+
+def configuracion(corrida: str) -> dict:
+    return {"formula": "a * x", "a": COEFICIENTES[corrida], "corrida": corrida}
+
+@pytest.fixture
+def broker():
+    broker = BrokerMemoria()
+    with broker.instalar():
+        yield broker
+
+def crear_consumidor(broker, **opciones) -> Consumidor:
+    """
+    Consumidor conectado al broker en memoria que cuenta las configuraciones que compila.
+    """
+    consumidor = Consumidor(ip="", nom_exchange="C", nom_queue_escenarios="E", nom_queue_resultados="R", **opciones)
+    consumidor.configurar_conexion()
+    consumidor.compiladas = []
+    original = consumidor.compilar_configuracion
+
+    def compilar(configuracion: dict) -> None:
+        consumidor.compiladas.append(configuracion["corrida"])
+        original(configuracion)
+
+    consumidor.compilar_configuracion = compilar
+    return consumidor
+
+def publicar_configuracion(consumidor: Consumidor, corrida: str) -> None:
+    """
+    Deja la configuración en la cola de configuración de la corrida, como hace el productor.
+    """
+    cola: str = consumidor.transporte.cola_corrida("C", corrida)
+    consumidor.canal.queue_declare(queue=cola, durable=True)
+    consumidor.canal.basic_publish(exchange="", routing_key=cola, body=json.dumps(configuracion(corrida)))
+
+def publicar_bloques(consumidor: Consumidor, corridas: list) -> dict:
+    """
+    Publica un bloque de escenarios por cada corrida de la lista y devuelve las entradas por corrida.
+    """
+    rng = np.random.default_rng(1)
+    entradas: dict = {}
+    for corrida in corridas:
+        x = rng.uniform(size=10)
+        entradas.setdefault(corrida, []).append(x)
+        consumidor.canal.basic_publish(
+            exchange="", routing_key="E", body=codificar_bloque({"x": x}),
+            properties=pika.BasicProperties(headers={"corrida": corrida})
+        )
+    return {corrida: np.concatenate(valores) for corrida, valores in entradas.items()}
+
+def resultados(broker, corrida: str) -> np.ndarray:
+    mensajes = broker.colas.get(f"R.{corrida}", ())
+    return np.concatenate([decodificar_bloque(mensaje.cuerpo)["resultado"] for mensaje in mensajes])
+
+def test_intercala_corridas_sin_recompilar(broker):
+    consumidor = crear_consumidor(broker, prefetch=4)
+    consumidor.aplicar_configuracion(configuracion("A"))
+    consumidor.registrar_configuracion(configuracion("B"))
+    entradas: dict = publicar_bloques(consumidor, ["A", "B"] * 5)
+    consumidor.procesar_escenarios()
+    assert consumidor.compiladas == ["A", "B"]
+    for corrida, x in entradas.items():
+        np.testing.assert_allclose(resultados(broker, corrida), COEFICIENTES[corrida] * x)
+    assert list(consumidor.corridas) == ["A"] and consumidor.corrida == "B"
+    assert "R" not in broker.colas
+
+def test_lote_no_mezcla_corridas(broker):
+    consumidor = crear_consumidor(broker, prefetch=8, ack_lote=4)
+    consumidor.aplicar_configuracion(configuracion("A"))
+    consumidor.registrar_configuracion(configuracion("B"))
+    entradas: dict = publicar_bloques(consumidor, ["A", "A", "B", "A", "B", "B"])
+    consumidor.procesar_escenarios()
+    consumidor.vaciar_lote()
+    for corrida, x in entradas.items():
+        np.testing.assert_allclose(resultados(broker, corrida), COEFICIENTES[corrida] * x)
+    assert broker.confirmados == 6
+
+def test_expulsa_la_corrida_menos_usada(broker):
+    consumidor = crear_consumidor(broker, max_corridas=2)
+    for corrida in COEFICIENTES:
+        publicar_configuracion(consumidor, corrida)
+    consumidor.aplicar_configuracion(configuracion("A"))
+    entradas: dict = publicar_bloques(consumidor, ["B", "A", "C", "A", "B"])
+    consumidor.procesar_escenarios()
+    # C expulsa a B (A se usó más recientemente) y B vuelve a leerse de su cola de configuración
+    assert consumidor.compiladas == ["A", "B", "C", "B"]
+    assert list(consumidor.corridas) == ["A"] and consumidor.corrida == "B"
+    for corrida, x in entradas.items():
+        np.testing.assert_allclose(resultados(broker, corrida), COEFICIENTES[corrida] * x)
+    # Leer la configuración no la retira de su cola
+    assert len(broker.colas["C.B"]) == 1
+
+def test_configuracion_nueva_reemplaza_la_guardada(broker):
+    consumidor = crear_consumidor(broker)
+    consumidor.aplicar_configuracion(configuracion("A"))
+    consumidor.registrar_configuracion(configuracion("B"))
+    consumidor.activar_corrida("B")
+    assert list(consumidor.corridas) == ["A"]
+    consumidor.registrar_configuracion({**configuracion("A"), "a": 11.0})
+    assert not consumidor.corridas
+    consumidor.activar_corrida("A")
+    assert consumidor.compiladas == ["A", "B", "A"]
+    assert consumidor.constantes["a"] == 11.0
+
+def test_corridas_detenidas_acotadas(broker):
+    consumidor = crear_consumidor(broker, max_corridas=2)
+    consumidor.aplicar_configuracion(configuracion("A"))
+    for corrida in ("A", "B", "C"):
+        consumidor.callback_control(consumidor.canal, None, None, codificar_control(CONTROL_DETENER, corrida))
+    assert list(consumidor.corridas_detenidas) == ["B", "C"]
+    publicar_bloques(consumidor, ["B", "C"])
+    consumidor.procesar_escenarios()
+    assert consumidor.mensajes_descartados == 2
+    assert broker.confirmados == 2
+    assert list(consumidor.corridas_detenidas) == ["B", "C"]
+
+@pytest.mark.parametrize("ack_lote", [1, 4])
+def test_corrida_desconocida_se_retiene_hasta_conocer_su_configuracion(broker, monkeypatch, ack_lote):
+    monkeypatch.setattr(sys.modules["Consumidor"], "ESPERA_CORRIDA_DESCONOCIDA", 0.01)
+    consumidor = crear_consumidor(broker, prefetch=8, ack_lote=ack_lote)
+    consumidor.aplicar_configuracion(configuracion("A"))
+    entradas: dict = publicar_bloques(consumidor, ["C", "A", "A", "A", "A"])
+    # La configuración de C llega después de varias devoluciones (y, con lotes, de confirmar el de A)
+    consumidor.conexion.call_later(0.05, lambda: publicar_configuracion(consumidor, "C"))
+    consumidor.procesar_escenarios()
+    consumidor.vaciar_lote()
+    assert consumidor.mensajes_devueltos >= 2
+    assert broker.rechazados == 0
+    assert broker.confirmados == 5
+    for corrida, x in entradas.items():
+        np.testing.assert_allclose(resultados(broker, corrida), COEFICIENTES[corrida] * x)
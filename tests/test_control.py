@@ -0,0 +1,72 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_control.py
+Descripción: Pruebas de la parada anticipada (Productor/Control.py) con el transporte
+local: el productor, el control y un consumidor corren en hilos del mismo proceso.
+_____________________________________________________________________________________
+"""
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from Transporte import TransporteLocal
+from Productor import Productor
+from Consumidor import Consumidor
+from Mensajes import CONTROL_PROGRESO, codificar_control, decodificar_control
+
+MODELO: dict = {
+    "formula": "a * x + b",
+    "iteraciones": 5000,
+    "num_variables": 1,
+    "constantes": {"a": 2.0, "b": 1.0},
+    "variables": {
+        "x": {"tipo": "continua", "parametros": {"distribucion": "uniforme", "limite_inferior": 0, "limite_superior": 1}}
+    },
+    # Una precisión inalcanzable y sin tiempo máximo: la corrida solo termina al contar todos los escenarios
+    "parada": {"precision": 1e-12, "minimo_escenarios": 10},
+}
+
+def test_control_ida_y_vuelta():
+    mensaje: dict = decodificar_control(codificar_control(CONTROL_PROGRESO, "abc", rechazados=3))
+    assert mensaje == {"tipo": CONTROL_PROGRESO, "corrida": "abc", "rechazados": 3}
+
+@pytest.mark.parametrize("modo", ["bloque", "semilla"])
+def test_esperar_control_termina_con_un_bloque_rechazado(tmp_path, modo):
+    ruta = tmp_path / "modelo.json"
+    ruta.write_text(json.dumps(MODELO))
+    transporte = TransporteLocal(colas=["E", "R"])
+    consumidor = Consumidor(
+        ip="", nom_exchange="C", nom_queue_escenarios="E", nom_queue_resultados="R", prefetch=4,
+        nom_exchange_control="X", intervalo_control=0.05, transporte=transporte
+    )
+    original = consumidor.evaluar_bloque
+    llamadas: list = []
+
+    def evaluar_fallando_una_vez(columnas):
+        llamadas.append(len(next(iter(columnas.values()))))
+        if len(llamadas) == 2:
+            raise FloatingPointError("bloque inválido")
+        return original(columnas)
+
+    consumidor.evaluar_bloque = evaluar_fallando_una_vez
+    hilo_consumidor = threading.Thread(target=consumidor.iniciar_consumidor, daemon=True)
+    hilo_consumidor.start()
+    productor = Productor(
+        ip="", nom_exchange="C", nom_queue="E", ruta_modelo=str(ruta), modo=modo, tamano_bloque=1000,
+        semilla=1, paralelismo="hilos", trabajadores=1, unicidad="ninguno", nom_exchange_control="X",
+        transporte=transporte
+    )
+    hilo_productor = threading.Thread(target=productor.iniciar_productor, daemon=True)
+    hilo_productor.start()
+    hilo_productor.join(timeout=60)
+    consumidor.conexion.add_callback_threadsafe(consumidor.canal.stop_consuming)
+    hilo_consumidor.join(timeout=10)
+
+    assert not hilo_productor.is_alive(), "esperar_control no terminó tras el rechazo de un bloque"
+    assert productor.control.motivo == "completa"
+    assert productor.control.rechazados == 1000
+    assert productor.control.estadisticas.n == 4000
+    assert consumidor.escenarios_rechazados == 1000
+    np.testing.assert_allclose(productor.control.estadisticas.estimacion(), 2.0, rtol=0.05)
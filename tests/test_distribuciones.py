@@ -0,0 +1,119 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_distribuciones.py
+Descripción: Pruebas de Comun/Distribuciones.py: tablas de alias, frecuencias de las
+variables discretas, cuantiles de las distribuciones y compilación del plan de muestreo.
+_____________________________________________________________________________________
+"""
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from Distribuciones import DISTRIBUCIONES, compilar_plan, muestrear_alias, tabla_alias
+
+PROBABILIDADES = np.array([0.1, 0.3, 0.3, 0.2, 0.1, 0.0])
+
+def probabilidades_de_tabla(umbrales, alias):
+    """
+    Probabilidad de cada índice que representa una tabla de alias.
+    """
+    k = len(umbrales)
+    resultado = umbrales.copy()
+    np.add.at(resultado, alias, 1.0 - umbrales)
+    return resultado / k
+
+@pytest.mark.parametrize("probabilidades", [PROBABILIDADES, np.ones(7), np.array([5.0]), np.arange(1.0, 50.0)])
+def test_tabla_alias_representa_las_probabilidades(probabilidades):
+    umbrales, alias = tabla_alias(probabilidades)
+    np.testing.assert_allclose(probabilidades_de_tabla(umbrales, alias), probabilidades / probabilidades.sum(), atol=1e-12)
+    assert np.all((umbrales >= 0) & (umbrales <= 1))
+
+def test_muestreo_por_alias_reproduce_las_frecuencias():
+    umbrales, alias = tabla_alias(PROBABILIDADES)
+    indices = muestrear_alias(np.random.default_rng(0), umbrales, alias, 400_000)
+    frecuencias = np.bincount(indices, minlength=len(PROBABILIDADES)) / indices.size
+    np.testing.assert_allclose(frecuencias, PROBABILIDADES, atol=0.003)
+    assert frecuencias[-1] == 0.0
+
+def variable(definicion):
+    return compilar_plan({"v": definicion})[0]
+
+def test_categorica_muestreo_y_cuantil():
+    v = variable({"tipo": "discreta", "parametros": {"valores": [10, 20, 30, 40, 50, 60], "probabilidades": PROBABILIDADES.tolist()}})
+    assert v.distribucion.nombre == "categorica"
+    muestra = v.distribucion.muestrear(np.random.default_rng(1), v.parametros, 400_000)
+    for valor, probabilidad in zip(range(10, 70, 10), PROBABILIDADES):
+        assert np.mean(muestra == valor) == pytest.approx(probabilidad, abs=0.003)
+    u = (np.arange(10_000) + 0.5) / 10_000
+    cuantiles = v.distribucion.cuantil(v.parametros, u)
+    for valor, probabilidad in zip(range(10, 70, 10), PROBABILIDADES):
+        assert np.mean(cuantiles == valor) == pytest.approx(probabilidad, abs=1e-4)
+
+U = np.linspace(0.001, 0.999, 999)
+
+@pytest.mark.parametrize("definicion, esperado", [
+    ({"distribucion": "uniforme", "limite_inferior": 2, "limite_superior": 6}, 2 + 4 * U),
+    ({"distribucion": "normal", "media": 5, "desviacion": 2}, np.array([NormalDist(5, 2).inv_cdf(p) for p in U])),
+    ({"distribucion": "lognormal", "media_log": 0.5, "desviacion_log": 0.3},
+     np.exp(np.array([NormalDist(0.5, 0.3).inv_cdf(p) for p in U]))),
+    ({"distribucion": "exponencial", "tasa": 4.0}, -np.log1p(-U) / 4.0),
+    ({"distribucion": "exponencial", "media": 3.0}, -3.0 * np.log1p(-U)),
+], ids=["uniforme", "normal", "lognormal", "exponencial-tasa", "exponencial-media"])
+def test_cuantiles_continuos(definicion, esperado):
+    v = variable({"tipo": "continua", "parametros": definicion})
+    # La inversa normal de Acklam tiene un error absoluto del orden de 1e-9 en z, que cerca de la mediana
+    # supera la tolerancia relativa
+    np.testing.assert_allclose(v.distribucion.cuantil(v.parametros, U), esperado, rtol=1e-8, atol=1e-7)
+
+def test_cuantil_triangular_invierte_la_distribucion():
+    v = variable({"tipo": "continua", "parametros": {"distribucion": "triangular", "minimo": 1, "moda": 2, "maximo": 5}})
+    x = v.distribucion.cuantil(v.parametros, U)
+    acumulada = np.where(x < 2, (x - 1) ** 2 / (4 * 1), 1 - (5 - x) ** 2 / (4 * 3))
+    np.testing.assert_allclose(acumulada, U, atol=1e-12)
+
+def test_cuantil_poisson_coincide_con_la_acumulada():
+    v = variable({"tipo": "discreta", "parametros": {"distribucion": "poisson", "tasa": 3.5}})
+    k = v.distribucion.cuantil(v.parametros, U)
+    acumulada = lambda n: sum(math.exp(-3.5) * 3.5 ** i / math.factorial(i) for i in range(int(n) + 1))
+    for p, valor in zip(U[::50], k[::50]):
+        assert acumulada(valor) > p
+        assert valor == 0 or acumulada(valor - 1) <= p
+
+def test_empirica_muestrea_solo_los_valores_dados():
+    v = variable({"tipo": "discreta", "parametros": {"distribucion": "empirica", "valores": [3, 1, 2, 2]}})
+    muestra = v.distribucion.muestrear(np.random.default_rng(2), v.parametros, 10_000)
+    assert set(np.unique(muestra)) == {1.0, 2.0, 3.0}
+    assert np.mean(muestra == 2.0) == pytest.approx(0.5, abs=0.02)
+    np.testing.assert_array_equal(v.distribucion.cuantil(v.parametros, np.array([0.1, 0.3, 0.6, 0.9])), [1, 2, 2, 3])
+
+def test_recorte_a_limites():
+    v = variable({"tipo": "continua", "parametros": {"distribucion": "normal", "media": 0, "desviacion": 10,
+                                                      "limite_inferior": -1, "limite_superior": 1}})
+    valores = v.distribucion.ajustar(v.parametros, v.distribucion.muestrear(np.random.default_rng(3), v.parametros, 1000))
+    assert valores.min() == -1 and valores.max() == 1
+
+def test_plan_conserva_el_orden_y_es_de_solo_lectura():
+    plan = compilar_plan({
+        "b": {"tipo": "continua", "parametros": {"distribucion": "gamma", "forma": 2, "tasa": 0.5}},
+        "a": {"tipo": "discreta", "parametros": {"valores": [1, 2], "probabilidades": [0.5, 0.5]}},
+    })
+    assert [v.nombre for v in plan] == ["b", "a"]
+    assert plan[0].parametros.escala == 2.0
+    with pytest.raises(ValueError):
+        plan[1].parametros.valores[0] = 5.0
+
+@pytest.mark.parametrize("definicion", [
+    {"tipo": "continua", "parametros": {"distribucion": "inexistente"}},
+    {"tipo": "continua", "parametros": {"distribucion": "normal", "media": 0}},
+    {"tipo": "discreta", "parametros": {"valores": [1, 2], "probabilidades": [1.0]}},
+    {"tipo": "discreta", "parametros": {"valores": [1, 2], "probabilidades": [-1.0, 0.5]}},
+])
+def test_plan_rechaza_definiciones_invalidas(definicion):
+    with pytest.raises(ValueError):
+        compilar_plan({"v": definicion})
+
+def test_registro_incluye_las_distribuciones_documentadas():
+    assert {"uniforme", "normal", "lognormal", "triangular", "exponencial", "beta", "gamma",
+            "categorica", "poisson", "empirica"} <= set(DISTRIBUCIONES)
@@ -0,0 +1,183 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_estadisticas.py
+Descripción: Pruebas de Comun/Estadisticas.py. Comprueban que los momentos fusionados
+(Welford/Chan), el histograma, el estimador con pares antitéticos y variable de control,
+y las estadísticas de barrido coinciden con el cálculo directo de numpy sobre todos los
+valores, sin importar cómo se partan los datos entre bloques o consumidores.
+_____________________________________________________________________________________
+"""
+import math
+
+import numpy as np
+import pytest
+
+from Estadisticas import Estadisticas, EstadisticasBarrido, Estimador, Histograma, promediar_pares
+
+@pytest.fixture
+def valores():
+    return np.random.default_rng(7).lognormal(mean=2.0, sigma=0.8, size=10_007)
+
+def partir(arreglo, cortes):
+    return np.split(arreglo, cortes)
+
+def comprobar_momentos(estadisticas, referencia):
+    assert estadisticas.n == referencia.size
+    assert estadisticas.estimacion() == pytest.approx(np.mean(referencia), rel=1e-12)
+    assert estadisticas.varianza() == pytest.approx(np.var(referencia), rel=1e-10)
+    assert estadisticas.desviacion() == pytest.approx(np.std(referencia), rel=1e-10)
+    assert estadisticas.error_estandar() == pytest.approx(np.std(referencia, ddof=1) / math.sqrt(referencia.size), rel=1e-10)
+    assert estadisticas.minimo == referencia.min()
+    assert estadisticas.maximo == referencia.max()
+
+@pytest.mark.parametrize("cortes", [[], [1], [13, 500, 501, 9000], list(range(100, 10_000, 100))])
+def test_agregar_por_bloques_coincide_con_numpy(valores, cortes):
+    estadisticas = Estadisticas()
+    for parte in partir(valores, cortes):
+        estadisticas.agregar(parte)
+    comprobar_momentos(estadisticas, valores)
+
+@pytest.mark.parametrize("cortes", [[5000], [1, 2, 3], [2500, 5000, 7500]])
+def test_combinar_parciales_coincide_con_numpy(valores, cortes):
+    total = Estadisticas()
+    for parte in partir(valores, cortes):
+        parcial = Estadisticas()
+        parcial.agregar(parte)
+        total.combinar(parcial)
+    total.combinar(Estadisticas())
+    comprobar_momentos(total, valores)
+    assert sum(total.histograma.conteos.values()) == valores.size
+
+def test_valor_escalar_y_vacio():
+    estadisticas = Estadisticas()
+    estadisticas.agregar(np.empty(0))
+    assert estadisticas.n == 0
+    estadisticas.agregar(3.5)
+    assert (estadisticas.n, estadisticas.estimacion(), estadisticas.varianza()) == (1, 3.5, 0.0)
+    assert estadisticas.error_estandar() == math.inf
+
+def test_serializacion_ida_y_vuelta(valores):
+    estadisticas = Estadisticas()
+    estadisticas.agregar(valores)
+    for recuperada in (Estadisticas.desde_dict(estadisticas.a_dict()), Estadisticas.decodificar(estadisticas.codificar())):
+        assert recuperada.a_dict() == estadisticas.a_dict()
+        assert recuperada.estimacion() == estadisticas.estimacion()
+        assert recuperada.error_estandar() == estadisticas.error_estandar()
+
+def test_histograma_cuenta_cada_valor_en_su_bin(valores):
+    histograma = Histograma(max_bins=32)
+    for parte in partir(valores, [1000, 4000]):
+        histograma.agregar(parte)
+    assert max(histograma.conteos) - min(histograma.conteos) + 1 <= 32
+    indices, cantidades = np.unique(np.floor(np.ldexp(valores, -histograma.exponente)).astype(np.int64), return_counts=True)
+    assert histograma.conteos == dict(zip(indices.tolist(), cantidades.tolist()))
+    bordes, conteos = histograma.densos()
+    np.testing.assert_array_equal(np.histogram(valores, bins=bordes)[0], conteos)
+
+def test_histograma_combinar_anchos_distintos():
+    rng = np.random.default_rng(1)
+    estrecho, ancho = rng.normal(0, 0.01, 2000), rng.normal(0, 100, 2000)
+    combinado, fino, grueso = Histograma(), Histograma(), Histograma()
+    fino.agregar(estrecho)
+    grueso.agregar(ancho)
+    combinado.combinar(fino)
+    combinado.combinar(grueso)
+    assert sum(combinado.conteos.values()) == 4000
+    todos = np.concatenate([estrecho, ancho])
+    indices, cantidades = np.unique(np.floor(np.ldexp(todos, -combinado.exponente)).astype(np.int64), return_counts=True)
+    assert combinado.conteos == dict(zip(indices.tolist(), cantidades.tolist()))
+    assert Histograma.desde_dict(combinado.a_dict()).conteos == combinado.conteos
+
+def test_histograma_ignora_no_finitos():
+    histograma = Histograma()
+    histograma.agregar(np.array([np.nan, np.inf, 1.0, 2.0]))
+    assert sum(histograma.conteos.values()) == 2
+
+def test_promediar_pares():
+    np.testing.assert_array_equal(promediar_pares(np.array([1.0, 3.0, 5.0, 9.0, 4.0])), [2.0, 7.0, 4.0])
+    np.testing.assert_array_equal(promediar_pares(np.array([[1.0, 3.0], [2.0, 6.0]])), [[2.0], [4.0]])
+
+def test_antiteticas_usa_el_promedio_de_cada_par(valores):
+    pares = promediar_pares(valores)
+    estadisticas = Estadisticas()
+    for parte in partir(valores, [2000, 6000]):
+        estadisticas.agregar(parte, antiteticas=True)
+    assert estadisticas.n == valores.size
+    assert estadisticas.estimacion() == pytest.approx(np.mean(pares), rel=1e-12)
+    assert estadisticas.error_estandar() == pytest.approx(np.std(pares, ddof=1) / math.sqrt(pares.size), rel=1e-10)
+    assert estadisticas.varianza() == pytest.approx(np.var(valores), rel=1e-10)
+
+def test_variable_de_control_coincide_con_regresion():
+    rng = np.random.default_rng(11)
+    control = rng.normal(10.0, 2.0, 20_000)
+    resultados = 3.0 * control + rng.normal(0.0, 1.0, control.size)
+    estimador = Estimador(media_conocida=10.0)
+    for parte_y, parte_c in zip(partir(resultados, [7000, 15000]), partir(control, [7000, 15000])):
+        parcial = Estimador(media_conocida=10.0)
+        parcial.agregar(parte_y, parte_c)
+        estimador.combinar(parcial)
+
+    coeficiente = np.cov(resultados, control, ddof=0)[0, 1] / np.var(control)
+    esperado = np.mean(resultados) - coeficiente * (np.mean(control) - 10.0)
+    residuos = resultados - coeficiente * control
+    residual = np.sum(np.square(residuos - residuos.mean()))
+    assert estimador.coeficiente() == pytest.approx(coeficiente, rel=1e-10)
+    assert estimador.estimacion() == pytest.approx(esperado, rel=1e-12)
+    assert estimador.error_estandar() == pytest.approx(math.sqrt(residual / (control.size - 2) / control.size), rel=1e-8)
+    assert estimador.error_estandar() < np.std(resultados, ddof=1) / math.sqrt(control.size) / 3
+
+def test_estimador_sin_media_conocida_ignora_control(valores):
+    estimador = Estimador()
+    estimador.agregar(valores, valores)
+    assert estimador.estimacion() == pytest.approx(np.mean(valores), rel=1e-12)
+    assert estimador.coeficiente() == 0.0
+
+def test_serializacion_con_variable_de_control(valores):
+    estadisticas = Estadisticas()
+    estadisticas.agregar(valores, control=valores * 0.5, media_control=4.0)
+    recuperada = Estadisticas.decodificar(estadisticas.codificar())
+    assert recuperada.a_dict() == estadisticas.a_dict()
+    assert recuperada.estimacion() == estadisticas.estimacion()
+    assert recuperada.error_estandar() == estadisticas.error_estandar()
+
+PUNTOS = [{"precio": 10.0}, {"precio": 12.0}, {"precio": 15.0}]
+
+def generar_barrido(rng, n):
+    base = rng.normal(5.0, 1.0, n)
+    matriz = np.stack([base * (1.0 + 0.1 * k) + rng.normal(0, 0.01, n) for k in range(len(PUNTOS))])
+    return matriz, base
+
+@pytest.mark.parametrize("antiteticas", [False, True])
+def test_barrido_coincide_con_numpy_por_punto(antiteticas):
+    rng = np.random.default_rng(5)
+    matriz, base = generar_barrido(rng, 4000)
+    barrido = EstadisticasBarrido(PUNTOS)
+    for columnas in np.split(np.arange(4000), [1000, 2500]):
+        barrido.agregar(matriz[:, columnas], base[columnas], antiteticas=antiteticas)
+    resumen = barrido.resumen()
+    assert [fila["punto"] for fila in resumen] == PUNTOS
+    for fila, resultados in zip(resumen, matriz):
+        diferencias = resultados - base
+        if antiteticas:
+            resultados, diferencias = promediar_pares(resultados), promediar_pares(diferencias)
+        assert fila["n"] == resultados.size
+        assert fila["media"] == pytest.approx(np.mean(resultados), rel=1e-12)
+        assert fila["error_estandar"] == pytest.approx(np.std(resultados, ddof=1) / math.sqrt(resultados.size), rel=1e-10)
+        assert fila["diferencia"] == pytest.approx(np.mean(diferencias), rel=1e-10, abs=1e-12)
+        assert fila["error_diferencia"] == pytest.approx(np.std(diferencias, ddof=1) / math.sqrt(diferencias.size), rel=1e-10)
+
+def test_barrido_combinar_mitades_y_serializar():
+    rng = np.random.default_rng(9)
+    matriz, base = generar_barrido(rng, 3000)
+    control = base + rng.normal(0, 0.5, base.size)
+    completo = EstadisticasBarrido(PUNTOS, media_conocida=5.0)
+    completo.agregar(matriz, base, control)
+    combinado = EstadisticasBarrido(PUNTOS)
+    for columnas in np.split(np.arange(3000), [1200]):
+        mitad = EstadisticasBarrido(PUNTOS, media_conocida=5.0)
+        mitad.agregar(matriz[:, columnas], base[columnas], control[columnas])
+        combinado.combinar(EstadisticasBarrido.desde_dict(mitad.a_dict()))
+    for propio, esperado in zip(combinado.resumen(), completo.resumen()):
+        assert propio["n"] == esperado["n"]
+        for llave in ("media", "error_estandar", "diferencia", "error_diferencia"):
+            assert propio[llave] == pytest.approx(esperado[llave], rel=1e-9, abs=1e-12)
@@ -0,0 +1,131 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_formula.py
+Descripción: Pruebas de Consumidor/Formula.py. Las fórmulas compiladas (con constantes
+plegadas, subexpresiones compartidas entre salidas y barridos de parámetros) se comparan
+con una evaluación directa con `eval` de las expresiones originales.
+_____________________________________________________________________________________
+"""
+import math
+import numpy as np
+import pytest
+
+from Formula import (
+    CONSTANTES_MATEMATICAS, FUNCIONES, BarridoCompilado, FormulaCompilada, FormulaInvalida, SalidasCompiladas
+)
+
+CONSTANTES: dict = {"precio": 12.5, "costo_fijo": 1000.0, "tasa": 0.05}
+SALIDAS: dict = {
+    "ganancia": "ingreso - costo",
+    "ingreso": "precio * demanda * exp(-tasa * plazo)",
+    "costo": "costo_fijo + 3.0 * demanda + sqrt(plazo)",
+    "margen": "where(ingreso > 0, ganancia / ingreso, 0.0)",
+}
+
+def evaluar_directo(formula: str, constantes: dict, valores: dict) -> np.ndarray:
+    """
+    Evalúa una expresión sin compilar, con las mismas funciones permitidas.
+    """
+    globales: dict = {"__builtins__": {}, "np": np, "math": math, **FUNCIONES, **CONSTANTES_MATEMATICAS}
+    return eval(formula, globales, {**constantes, **valores})
+
+def evaluar_salidas_directo(salidas: dict, constantes: dict, valores: dict) -> dict:
+    """
+    Evalúa las salidas una por una, repitiendo hasta que se resuelvan las referencias entre ellas.
+    """
+    resueltas: dict = {}
+    while len(resueltas) < len(salidas):
+        for nombre, formula in salidas.items():
+            if nombre not in resueltas:
+                try:
+                    resueltas[nombre] = evaluar_directo(formula, constantes, {**valores, **resueltas})
+                except NameError:
+                    pass
+    return resueltas
+
+@pytest.fixture
+def escenarios() -> dict:
+    rng = np.random.default_rng(7)
+    return {"demanda": rng.uniform(50, 150, 1000), "plazo": rng.uniform(1, 10, 1000)}
+
+def test_formula_compilada_igual_a_eval(escenarios):
+    formula: str = "precio * demanda - costo_fijo / (1 + tasa) ** plazo + np.log(demanda) * math.pi"
+    compilada = FormulaCompilada(formula, CONSTANTES)
+    np.testing.assert_allclose(compilada.evaluar(escenarios), evaluar_directo(formula, CONSTANTES, escenarios))
+    assert compilada.variables == ("demanda", "plazo")
+
+def test_formula_escalar_igual_a_eval():
+    formula: str = "max(precio - x, 0) + abs(x - 3)"
+    compilada = FormulaCompilada(formula, CONSTANTES)
+    assert compilada.evaluar({"x": 2.0}) == pytest.approx(evaluar_directo(formula, CONSTANTES, {"x": 2.0}))
+
+def test_plegado_de_constantes():
+    compilada = FormulaCompilada("x * (precio * 2 + sqrt(16)) + e * 0", CONSTANTES)
+    assert compilada.expresion == "x * 29.0 + 0.0"
+
+def test_division_entre_cero_constante_se_conserva():
+    compilada = FormulaCompilada("x + 1 / (tasa - 0.05)", CONSTANTES)
+    with pytest.raises(ZeroDivisionError):
+        compilada.evaluar({"x": 1.0})
+
+@pytest.mark.parametrize("formula", [
+    "__import__('os').system('true')",
+    "x.__class__",
+    "(lambda y: y)(x)",
+    "[x for x in range(3)]",
+    "open('archivo')",
+    "np.load('archivo')",
+    "sqrt(x=4)",
+    "'texto'",
+    "_oculta + 1",
+])
+def test_lista_blanca_rechaza(formula):
+    with pytest.raises(FormulaInvalida):
+        FormulaCompilada(formula, CONSTANTES)
+
+def test_salidas_compiladas_igual_a_eval(escenarios):
+    compiladas = SalidasCompiladas(SALIDAS, CONSTANTES)
+    esperadas: dict = evaluar_salidas_directo(SALIDAS, CONSTANTES, escenarios)
+    for nombre, valor in zip(compiladas.nombres, compiladas.evaluar(escenarios)):
+        np.testing.assert_allclose(valor, esperadas[nombre], rtol=1e-12)
+    assert compiladas.nombres == tuple(SALIDAS)
+    # "ingreso" y "costo" aparecen en varias salidas y se calculan una sola vez
+    assert compiladas.compartidas >= 2
+
+def test_salidas_con_escalares():
+    valores: dict = {"demanda": 100.0, "plazo": 4.0}
+    resultados = SalidasCompiladas(SALIDAS, CONSTANTES).evaluar(valores)
+    esperadas: dict = evaluar_salidas_directo(SALIDAS, CONSTANTES, valores)
+    assert [float(valor) for valor in resultados] == pytest.approx([esperadas[nombre] for nombre in SALIDAS])
+
+def test_salidas_referencia_circular():
+    with pytest.raises(FormulaInvalida, match="circular"):
+        SalidasCompiladas({"a": "b + x", "b": "a * 2"}, {})
+
+@pytest.mark.parametrize("nombre", ["precio", "exp", "pi", "np", "_privada", "no valido"])
+def test_salidas_rechazan_nombres_de_constantes_y_reservados(nombre):
+    with pytest.raises(ValueError):
+        SalidasCompiladas({"principal": "x + 1", nombre: "x * 2"}, CONSTANTES)
+
+@pytest.mark.parametrize("salidas", [None, SALIDAS])
+def test_barrido_igual_a_eval_por_punto(escenarios, salidas):
+    puntos: list = [{"precio": 10.0}, {"precio": 15.0, "tasa": 0.02}, {"tasa": 0.1}]
+    formula: str = next(iter(SALIDAS.values())) if salidas else "precio * demanda * exp(-tasa * plazo) - costo_fijo"
+    barrido = BarridoCompilado(formula, CONSTANTES, puntos, salidas)
+    matriz: np.ndarray = barrido.evaluar(escenarios)
+    assert matriz.shape == (len(puntos), 1000)
+    for fila, punto in zip(matriz, puntos):
+        constantes: dict = {**CONSTANTES, **punto}
+        if salidas:
+            esperada = evaluar_salidas_directo(salidas, constantes, escenarios)["ganancia"]
+        else:
+            esperada = evaluar_directo(formula, constantes, escenarios)
+        np.testing.assert_allclose(fila, esperada, rtol=1e-12)
+
+def test_barrido_con_escenario_escalar():
+    barrido = BarridoCompilado("precio * x", CONSTANTES, [{"precio": 1.0}, {"precio": 2.0}])
+    np.testing.assert_allclose(barrido.evaluar({"x": 3.0}), [[3.0], [6.0]])
+
+def test_barrido_rechaza_constantes_no_definidas():
+    with pytest.raises(FormulaInvalida):
+        BarridoCompilado("precio * x", CONSTANTES, [{"inexistente": 1.0}])
@@ -0,0 +1,68 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_mensajes.py
+Descripción: Pruebas de ida y vuelta de los formatos de mensaje de Comun/Mensajes.py y del
+agregado parcial de Comun/Estadisticas.py con varias salidas.
+_____________________________________________________________________________________
+"""
+import numpy as np
+import pytest
+
+from Mensajes import (
+    FIRMA_BLOQUE, codificar_bloque, codificar_unidad, decodificar_bloque, decodificar_unidad, es_bloque
+)
+from Estadisticas import Estadisticas, codificar_agregado, decodificar_agregado
+
+@pytest.mark.parametrize("filas", [0, 1, 7, 1000])
+@pytest.mark.parametrize("nombres", [["x"], ["a", "bb", "variable_larga"], ["ñandú", "x"]])
+def test_bloque_ida_y_vuelta(filas, nombres):
+    rng = np.random.default_rng(filas)
+    columnas: dict = {nombre: rng.normal(size=filas) for nombre in nombres}
+    cuerpo: bytes = codificar_bloque(columnas)
+    assert es_bloque(cuerpo)
+    decodificadas: dict = decodificar_bloque(cuerpo)
+    assert list(decodificadas) == nombres
+    for nombre in nombres:
+        assert decodificadas[nombre].dtype == np.float64
+        np.testing.assert_array_equal(decodificadas[nombre], columnas[nombre])
+
+def test_bloque_convierte_a_float64_y_conserva_especiales():
+    valores = np.array([1, 2, 3], dtype=np.int32)
+    especiales = np.array([np.nan, np.inf, -0.0])
+    decodificadas: dict = decodificar_bloque(codificar_bloque({"entero": valores, "especial": especiales}))
+    np.testing.assert_array_equal(decodificadas["entero"], [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(decodificadas["especial"], especiales)
+    assert np.signbit(decodificadas["especial"][2])
+
+def test_bloque_columnas_alineadas_a_8_bytes():
+    cuerpo: bytes = codificar_bloque({"abc": np.arange(3.0)})
+    assert (len(cuerpo) - 3 * 8) % 8 == 0
+
+def test_bloque_rechaza_columnas_de_distinta_longitud():
+    with pytest.raises(ValueError):
+        codificar_bloque({"a": np.zeros(3), "b": np.zeros(4)})
+
+def test_bloque_rechaza_firma_ajena():
+    cuerpo: bytes = b"XXXX" + codificar_bloque({"a": np.zeros(2)})[len(FIRMA_BLOQUE):]
+    assert not es_bloque(cuerpo)
+    with pytest.raises(ValueError):
+        decodificar_bloque(cuerpo)
+
+def test_json_no_es_bloque():
+    assert not es_bloque(b'{"x": 1.0}')
+
+def test_unidad_ida_y_vuelta():
+    entropia: int = 2 ** 120 + 12345
+    unidad: dict = decodificar_unidad(codificar_unidad("corrida", entropia, 5000, 250))
+    assert unidad == {"corrida": "corrida", "entropia": entropia, "inicio": 5000, "cantidad": 250}
+
+def test_agregado_ida_y_vuelta():
+    rng = np.random.default_rng(3)
+    principal, secundaria = Estadisticas(), Estadisticas()
+    principal.agregar(rng.normal(5, 2, 500))
+    secundaria.agregar(rng.exponential(1, 500))
+    recuperada, salidas = decodificar_agregado(codificar_agregado(principal, {"costo": secundaria}))
+    assert recuperada.a_dict() == principal.a_dict()
+    assert list(salidas) == ["costo"]
+    assert salidas["costo"].a_dict() == secundaria.a_dict()
+    assert decodificar_agregado(codificar_agregado(principal))[1] == {}
@@ -0,0 +1,79 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_muestreo.py
+Descripción: Pruebas de Comun/Muestreo.py: estratificación de las secuencias de Sobol y
+Halton y del hipercubo latino, independencia de la partición en rangos y precisión de
+`normal_inversa`.
+_____________________________________________________________________________________
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from Muestreo import (
+    METODO_HALTON, METODO_LHS, METODO_SOBOL, Halton, HipercuboLatino, Sobol, crear_secuencia, normal_inversa
+)
+
+ENTROPIA: int = 12345
+
+def es_permutacion(estratos: np.ndarray, total: int) -> bool:
+    return np.array_equal(np.sort(estratos), np.arange(total))
+
+@pytest.mark.parametrize("secuencia", [Sobol(5, ENTROPIA), Halton(5, ENTROPIA)], ids=["sobol", "halton"])
+def test_rangos_disjuntos_reproducen_la_secuencia(secuencia):
+    completa = secuencia.puntos(0, 1000)
+    partes = np.concatenate([secuencia.puntos(0, 137), secuencia.puntos(137, 500), secuencia.puntos(637, 363)])
+    np.testing.assert_array_equal(completa, partes)
+    assert np.all((completa > 0) & (completa < 1))
+
+def test_aleatorizacion_depende_de_la_entropia():
+    np.testing.assert_array_equal(Sobol(3, ENTROPIA).puntos(0, 64), Sobol(3, ENTROPIA).puntos(0, 64))
+    assert not np.array_equal(Sobol(3, ENTROPIA).puntos(0, 64), Sobol(3, ENTROPIA + 1).puntos(0, 64))
+
+def test_sobol_estratifica_cada_dimension_y_pares():
+    puntos = Sobol(21, ENTROPIA).puntos(0, 1024)
+    for d in range(21):
+        assert es_permutacion(np.floor(puntos[:, d] * 1024).astype(int), 1024)
+    # Las dos primeras dimensiones forman una red (0, 10, 2): un punto por celda de 32 x 32
+    celdas = np.floor(puntos[:, 0] * 32).astype(int) * 32 + np.floor(puntos[:, 1] * 32).astype(int)
+    assert es_permutacion(celdas, 1024)
+
+@pytest.mark.parametrize("dimension, base, digitos", [(0, 2, 10), (1, 3, 6), (2, 5, 4)])
+def test_halton_estratifica_por_potencias_de_la_base(dimension, base, digitos):
+    total = base ** digitos
+    puntos = Halton(3, ENTROPIA).puntos(0, total)
+    assert es_permutacion(np.floor(puntos[:, dimension] * total).astype(int), total)
+
+def test_hipercubo_latino_un_punto_por_estrato():
+    total = 1000
+    lhs = HipercuboLatino(4, ENTROPIA, total)
+    rng = np.random.default_rng(0)
+    puntos = np.concatenate([lhs.puntos(inicio, 250, rng) for inicio in range(0, total, 250)])
+    assert np.all((puntos > 0) & (puntos < 1))
+    for d in range(4):
+        assert es_permutacion(np.floor(puntos[:, d] * total).astype(int), total)
+    # El estrato de cada índice no depende del rango ni del generador que lo produce
+    otros = lhs.puntos(300, 10, np.random.default_rng(99))
+    np.testing.assert_array_equal(np.floor(otros * total), np.floor(puntos[300:310] * total))
+
+def test_hipercubo_latino_rechaza_indices_fuera_del_diseno():
+    with pytest.raises(ValueError):
+        HipercuboLatino(2, ENTROPIA, 100).puntos(90, 20, np.random.default_rng(0))
+    with pytest.raises(ValueError):
+        HipercuboLatino(2, ENTROPIA, 0)
+
+def test_crear_secuencia():
+    assert isinstance(crear_secuencia(METODO_SOBOL, 2, ENTROPIA), Sobol)
+    assert isinstance(crear_secuencia(METODO_HALTON, 2, ENTROPIA), Halton)
+    assert isinstance(crear_secuencia(METODO_LHS, 2, ENTROPIA, total=10), HipercuboLatino)
+    with pytest.raises(ValueError):
+        crear_secuencia("otro", 2, ENTROPIA)
+    with pytest.raises(ValueError):
+        Sobol(22, ENTROPIA)
+
+def test_normal_inversa_coincide_con_la_exacta():
+    u = np.concatenate([np.logspace(-15, -1, 200), np.linspace(0.01, 0.99, 999), 1 - np.logspace(-12, -1, 200)])
+    exacta = np.array([NormalDist().inv_cdf(p) for p in u])
+    np.testing.assert_allclose(normal_inversa(u), exacta, rtol=1.2e-9, atol=1e-12)
+    assert normal_inversa(np.array([0.5]))[0] == 0.0
@@ -0,0 +1,113 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_puntocontrol.py
+Descripción: Pruebas de Comun/PuntoControl.py: fusión de intervalos, seguimiento de rangos
+recibidos y reanudación del productor desde su punto de control.
+_____________________________________________________________________________________
+"""
+import random
+
+import pytest
+
+from PuntoControl import (COMPONENTE_AGREGADOR, Intervalos, PuntoControlProductor, SeguimientoRangos,
+                          cargar_json, guardar_json, ruta_punto_control)
+
+def test_intervalos_fusionan_solapados_y_contiguos():
+    intervalos = Intervalos([(10, 20), (30, 40), (50, 60)])
+    intervalos.agregar(20, 30)
+    assert intervalos.a_lista() == [[10, 40], [50, 60]]
+    intervalos.agregar(45, 55)
+    assert intervalos.a_lista() == [[10, 40], [45, 60]]
+    intervalos.agregar(0, 100)
+    assert intervalos.a_lista() == [[0, 100]]
+
+def test_intervalos_ignoran_vacios_y_conservan_disjuntos():
+    intervalos = Intervalos([(5, 5), (8, 3)])
+    assert intervalos.a_lista() == []
+    intervalos.agregar(50, 60)
+    intervalos.agregar(0, 10)
+    intervalos.agregar(20, 30)
+    assert intervalos.a_lista() == [[0, 10], [20, 30], [50, 60]]
+    assert intervalos.total() == 30
+
+def test_intervalos_coinciden_con_un_conjunto():
+    rng = random.Random(7)
+    intervalos = Intervalos()
+    esperado = set()
+    for _ in range(500):
+        inicio = rng.randrange(0, 1000)
+        fin = inicio + rng.randrange(0, 30)
+        intervalos.agregar(inicio, fin)
+        esperado.update(range(inicio, fin))
+    assert intervalos.total() == len(esperado)
+    assert all(fin_previo < inicio for fin_previo, inicio in zip(intervalos.fines, intervalos.inicios[1:]))
+    assert all(inicio < fin for inicio, fin in zip(intervalos.inicios, intervalos.fines))
+    for _ in range(500):
+        inicio = rng.randrange(0, 1000)
+        fin = inicio + rng.randrange(1, 20)
+        assert intervalos.contiene(inicio, fin) == esperado.issuperset(range(inicio, fin))
+
+def test_intervalos_unir():
+    intervalos = Intervalos([(0, 10)])
+    intervalos.unir(Intervalos([(10, 15), (40, 50)]))
+    assert intervalos.a_lista() == [[0, 15], [40, 50]]
+
+def test_seguimiento_completa_rangos_en_partes():
+    seguimiento = SeguimientoRangos()
+    seguimiento.registrar([[0, 600, 1000]])
+    assert seguimiento.parciales == {0: [600, 1000]}
+    assert not seguimiento.duplicado([[0, 400, 1000]])
+    seguimiento.registrar([[0, 400, 1000], [1000, 1000, 1000]])
+    assert seguimiento.parciales == {}
+    assert seguimiento.completados.a_lista() == [[0, 2000]]
+
+def test_seguimiento_duplicado_solo_si_todos_los_rangos_estan_completos():
+    seguimiento = SeguimientoRangos([(0, 1000)])
+    assert seguimiento.duplicado([[0, 1000, 1000]])
+    assert not seguimiento.duplicado([[0, 1000, 1000], [1000, 500, 1000]])
+    assert not seguimiento.duplicado([])
+    # Un rango ya completo no vuelve a contarse
+    seguimiento.registrar([[0, 1000, 1000]])
+    assert seguimiento.parciales == {}
+    assert seguimiento.completados.total() == 1000
+
+def test_seguimiento_serializa_parciales():
+    seguimiento = SeguimientoRangos()
+    seguimiento.registrar([[0, 1000, 1000], [2000, 300, 1000]])
+    copia = SeguimientoRangos.desde_dict(seguimiento.a_dict())
+    assert copia.completados.a_lista() == [[0, 1000]]
+    assert copia.parciales == {2000: [300, 1000]}
+
+def test_productor_reanuda_con_la_misma_entropia(tmp_path):
+    directorio = str(tmp_path)
+    punto = PuntoControlProductor(directorio, "c1")
+    assert not punto.reanudada
+    assert punto.iniciar(1234, {"iteraciones": 3000}) == 1234
+    for inicio in (0, 1000, 2000):
+        punto.publicado(inicio, 1000, mensajes=2)
+    punto.confirmado(0, 2)
+    punto.confirmado(1000)
+    punto.guardar(forzar=True)
+
+    reanudado = PuntoControlProductor(directorio, "c1")
+    assert reanudado.reanudada
+    assert reanudado.iniciar(999, {"iteraciones": 3000}) == 1234
+    assert reanudado.publicados.a_lista() == [[0, 3000]]
+    assert reanudado.confirmados.a_lista() == [[0, 1000]]
+    with pytest.raises(ValueError):
+        PuntoControlProductor(directorio, "c1").iniciar(1234, {"iteraciones": 5000})
+
+def test_completados_incluye_los_rangos_del_agregador(tmp_path):
+    directorio = str(tmp_path)
+    seguimiento = SeguimientoRangos()
+    seguimiento.registrar([[2000, 1000, 1000]])
+    guardar_json(ruta_punto_control(directorio, "c1", COMPONENTE_AGREGADOR), {"rangos": seguimiento.a_dict()})
+    punto = PuntoControlProductor(directorio, "c1")
+    punto.iniciar(1, {})
+    punto.publicado(0, 1000)
+    punto.confirmado(0)
+    assert punto.completados(incluir_confirmados=False).a_lista() == [[2000, 3000]]
+    assert punto.completados(incluir_confirmados=True).a_lista() == [[0, 1000], [2000, 3000]]
+
+def test_cargar_json_inexistente(tmp_path):
+    assert cargar_json(str(tmp_path / "no.json")) is None
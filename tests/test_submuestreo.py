@@ -0,0 +1,54 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_submuestreo.py
+Descripción: Pruebas de Visualizador/Submuestreo.py: selección de puntos con LTTB y
+tamaño acotado de la serie de la media acumulada.
+_____________________________________________________________________________________
+"""
+import numpy as np
+import pytest
+
+from Submuestreo import SerieAcotada, lttb
+
+@pytest.mark.parametrize("umbral", [3, 10, 99])
+def test_lttb_conserva_extremos_y_orden(umbral):
+    x = np.arange(1000.0)
+    y = np.sin(x / 50.0)
+    indices = lttb(x, y, umbral)
+    assert len(indices) == umbral
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+def test_lttb_elige_el_pico():
+    x = np.arange(100.0)
+    y = np.zeros(100)
+    y[37] = 10.0
+    assert 37 in lttb(x, y, 5)
+
+@pytest.mark.parametrize("umbral", [0, 2, 100, 200])
+def test_lttb_sin_reduccion(umbral):
+    np.testing.assert_array_equal(lttb(np.arange(100.0), np.zeros(100), umbral), np.arange(100))
+
+@pytest.mark.parametrize("max_puntos", [6, 7, 50, 500])
+def test_serie_acotada_no_supera_el_maximo(max_puntos):
+    serie = SerieAcotada(max_puntos=max_puntos)
+    for i in range(20_000):
+        serie.agregar(float(i), 1.0 / (i + 1))
+        assert serie.n <= max_puntos
+    x, y = serie.datos()
+    assert len(x) <= max_puntos + 1
+    assert x[0] == 0.0 and x[-1] == 19_999.0 and y[-1] == 1.0 / 20_000
+    assert np.all(np.diff(x) > 0)
+
+def test_serie_acotada_conserva_todo_si_cabe():
+    serie = SerieAcotada(max_puntos=10)
+    for i in range(10):
+        serie.agregar(float(i), float(i * i))
+    x, y = serie.datos()
+    np.testing.assert_array_equal(x, np.arange(10.0))
+    np.testing.assert_array_equal(y, np.arange(10.0) ** 2)
+
+@pytest.mark.parametrize("max_puntos", [0, 1, 5])
+def test_serie_acotada_rechaza_capacidad_insuficiente(max_puntos):
+    with pytest.raises(ValueError):
+        SerieAcotada(max_puntos=max_puntos)
@@ -0,0 +1,115 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_transporte.py
+Descripción: Pruebas de los canales emulados de Comun/Transporte.py, con el transporte local y
+con el broker en memoria de los benchmarks: marca de reentrega, devolución de mensajes sin
+bloquearse aunque la cola acotada esté llena y registro de difusiones del transporte local.
+_____________________________________________________________________________________
+"""
+import time
+
+import pytest
+
+from BrokerMemoria import BrokerMemoria
+from Transporte import RegistroDifusiones, TransporteLocal
+
+def obtener(canal, cola, espera=2.0):
+    """
+    `basic_get` que espera a que el mensaje llegue (las colas de multiprocessing lo envían desde un hilo).
+    """
+    limite = time.monotonic() + espera
+    while True:
+        metodo, propiedades, cuerpo = canal.basic_get(cola)
+        if metodo is not None or time.monotonic() > limite:
+            return metodo, cuerpo
+        time.sleep(0.005)
+
+@pytest.fixture(params=["local", "memoria"])
+def conexion(request):
+    if request.param == "local":
+        yield TransporteLocal(["E"], capacidad=2).conectar()
+    else:
+        broker = BrokerMemoria()
+        conexion = broker.conexion()
+        conexion.channel().queue_declare(queue="E")
+        yield conexion
+
+def test_reentrega_marca_redelivered_y_conserva_el_orden(conexion):
+    canal = conexion.channel()
+    for cuerpo in (b"1", b"2"):
+        canal.basic_publish(exchange="", routing_key="E", body=cuerpo)
+    primero, _ = obtener(canal, "E")
+    segundo, _ = obtener(canal, "E")
+    assert not primero.redelivered and not segundo.redelivered
+    canal.basic_nack(delivery_tag=segundo.delivery_tag, multiple=True)
+    recibidos = [obtener(canal, "E") for _ in range(2)]
+    assert [cuerpo for _, cuerpo in recibidos] == [b"1", b"2"]
+    assert all(metodo.redelivered for metodo, _ in recibidos)
+    canal.basic_ack(delivery_tag=recibidos[-1][0].delivery_tag, multiple=True)
+    canal.basic_publish(exchange="", routing_key="E", body=b"3")
+    metodo, _ = obtener(canal, "E")
+    assert not metodo.redelivered
+
+def test_cerrar_devuelve_los_sin_confirmar(conexion):
+    canal = conexion.channel()
+    canal.basic_publish(exchange="", routing_key="E", body=b"1")
+    obtener(canal, "E")
+    canal.close()
+    metodo, cuerpo = obtener(conexion.channel(), "E")
+    assert cuerpo == b"1" and metodo.redelivered
+
+def test_devolver_no_se_bloquea_con_la_cola_llena():
+    transporte = TransporteLocal(["E"], capacidad=2)
+    canal = transporte.conectar().channel()
+    canal.basic_publish(exchange="", routing_key="E", body=b"1")
+    canal.basic_publish(exchange="", routing_key="E", body=b"2")
+    metodo, _ = obtener(canal, "E")
+    # Un productor vuelve a llenar la cola acotada antes del rechazo
+    canal.basic_publish(exchange="", routing_key="E", body=b"3")
+    assert transporte.cola("E").full()
+    canal.basic_nack(delivery_tag=metodo.delivery_tag)
+    obtener(canal, "E")
+    canal.close()
+    recibidos = [obtener(transporte.conectar().channel(), "E")[1] for _ in range(3)]
+    assert sorted(recibidos) == [b"1", b"2", b"3"]
+
+def test_registro_descarta_lo_que_todos_leyeron():
+    registro = RegistroDifusiones(retencion=0.0)
+    registro.registrar("a")
+    registro.registrar("b")
+    registro.difundir("X", b"1", None)
+    registro.difundir("Y", b"2", None)
+    assert registro.leer("a", "X") == [(b"1", None)]
+    assert registro.cantidad() == 2
+    assert registro.leer("b", "Y") == [(b"2", None)]
+    assert registro.cantidad() == 0
+    registro.difundir("X", b"3", None)
+    registro.olvidar("b")
+    assert registro.leer("a", "X") == [(b"3", None)]
+    assert registro.cantidad() == 0
+
+def test_registro_conserva_los_mensajes_recientes_para_suscripciones_tardias():
+    registro = RegistroDifusiones(retencion=60.0)
+    registro.registrar("a")
+    registro.difundir("X", b"1", None)
+    assert registro.leer("a", "X") == [(b"1", None)]
+    assert registro.leer("tardio", "X") == [(b"1", None)]
+    assert registro.leer("tardio", "X") == []
+
+def test_suscripcion_local_recibe_difusiones_previas_y_nuevas():
+    transporte = TransporteLocal(["E"])
+    publicador = transporte.conectar().channel()
+    publicador.basic_publish(exchange="configuracion", routing_key="", body=b"1")
+    publicador.basic_publish(exchange="control", routing_key="", body=b"ignorado")
+    canal = transporte.conectar().channel()
+    suscripcion = canal.queue_declare(queue="", exclusive=True).method.queue
+    canal.queue_bind(queue=suscripcion, exchange="configuracion")
+    recibidos = []
+    canal.basic_consume(queue=suscripcion, on_message_callback=lambda *args: recibidos.append(args[3]), auto_ack=True)
+    canal.entregar(espera=0.0)
+    publicador.basic_publish(exchange="configuracion", routing_key="", body=b"2")
+    canal.entregar(espera=0.0)
+    canal.entregar(espera=0.0)
+    assert recibidos == [b"1", b"2"]
+    assert transporte.difundidas() == 3
+    canal.close()
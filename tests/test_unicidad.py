@@ -0,0 +1,75 @@
+"""
+_____________________________________________________________________________________
+Módulo: test_unicidad.py
+Descripción: Pruebas de los rastreadores de escenarios únicos de Productor/Unicidad.py:
+conteo exacto, error de la estimación de HyperLogLog y ausencia de falsos negativos del
+filtro de Bloom.
+_____________________________________________________________________________________
+"""
+import json
+
+import numpy as np
+import pytest
+
+from Unicidad import (
+    MODO_BLOOM, MODO_EXACTO, MODO_HLL, MODO_NINGUNO, UnicidadBloom, UnicidadExacta, UnicidadHyperLogLog,
+    crear_unicidad, hash_bloque, hash_json
+)
+
+def bloque(rng, filas, distintos):
+    """
+    Genera un bloque de dos columnas con exactamente `distintos` escenarios diferentes.
+    """
+    indices = np.concatenate([np.arange(distintos), rng.integers(0, distintos, filas - distintos)])
+    rng.shuffle(indices)
+    return {"x": indices.astype(np.float64), "y": indices * 0.5 + 1.0}
+
+def test_hash_bloque_depende_de_los_valores_no_del_orden_de_columnas():
+    columnas = {"a": np.array([1.0, 2.0, 1.0]), "b": np.array([3.0, 4.0, 3.0])}
+    hashes = hash_bloque(columnas)
+    np.testing.assert_array_equal(hashes, hash_bloque({"b": columnas["b"], "a": columnas["a"]}))
+    assert hashes[0] == hashes[2] != hashes[1]
+    assert len(set(hash_json(["{}", "[]", "{}"]).tolist())) == 2
+
+def test_exacta_cuenta_bloques_y_json():
+    rng = np.random.default_rng(0)
+    unicidad = UnicidadExacta()
+    unicidad.registrar_bloque(bloque(rng, 5000, 1234))
+    unicidad.registrar_bloque({})
+    assert unicidad.unicos() == 1234
+    exacta_json = UnicidadExacta()
+    exacta_json.registrar_json([json.dumps({"x": i % 10}) for i in range(100)])
+    assert exacta_json.unicos() == 10
+
+@pytest.mark.parametrize("distintos", [100, 5000, 100_000])
+def test_hyperloglog_dentro_del_error_esperado(distintos):
+    rng = np.random.default_rng(distintos)
+    unicidad = UnicidadHyperLogLog(precision=14)
+    datos = bloque(rng, distintos * 2, distintos)
+    for inicio in range(0, distintos * 2, 10_000):
+        unicidad.registrar_bloque({nombre: columna[inicio:inicio + 10_000] for nombre, columna in datos.items()})
+    # Cinco veces el error típico de 1.04 / sqrt(2**14)
+    assert abs(unicidad.unicos() - distintos) <= 0.05 * distintos
+
+def test_hyperloglog_rechaza_precision_fuera_de_rango():
+    with pytest.raises(ValueError):
+        UnicidadHyperLogLog(precision=3)
+
+def test_bloom_sin_falsos_negativos():
+    rng = np.random.default_rng(4)
+    hashes = hash_bloque(bloque(rng, 20_000, 10_000))
+    unicidad = UnicidadBloom(memoria_bytes=1 << 14, elementos_esperados=10_000)
+    mascara = unicidad.nuevos(hashes)
+    # Cada escenario se marca como nuevo a lo sumo una vez y las repeticiones nunca
+    assert unicidad.unicos() == np.count_nonzero(mascara) <= 10_000
+    assert np.unique(hashes[mascara]).size == np.count_nonzero(mascara)
+    assert not unicidad.nuevos(hashes).any()
+    assert unicidad.unicos() >= 0.99 * 10_000
+
+def test_crear_unicidad():
+    assert crear_unicidad(MODO_NINGUNO).unicos() is None
+    assert isinstance(crear_unicidad(MODO_EXACTO), UnicidadExacta)
+    assert crear_unicidad(MODO_HLL, memoria_bytes=5000).precision == 12
+    assert isinstance(crear_unicidad(MODO_BLOOM, elementos_esperados=10), UnicidadBloom)
+    with pytest.raises(ValueError):
+        crear_unicidad("otro")